@@ -0,0 +1,45 @@
+"""add_prompt_template_confidence_count
+
+Revision ID: 5e2a9c1d7f43
+Revises: b41f0c7d92e3
+Create Date: 2026-10-19 14:05:12.530417
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5e2a9c1d7f43"
+down_revision: str | Sequence[str] | None = "b41f0c7d92e3"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Add the count of confidence-reporting uses behind avg_confidence."""
+    op.add_column(
+        "source_prompt_templates",
+        sa.Column(
+            "confidence_count",
+            sa.Integer(),
+            server_default="0",
+            nullable=False,
+            comment="Number of uses that reported a confidence, behind avg_confidence",
+        ),
+    )
+    # Best available seed: every past use is assumed to have reported a confidence
+    op.execute(
+        """
+        UPDATE source_prompt_templates
+        SET confidence_count = CASE WHEN avg_confidence IS NULL THEN 0
+                                    ELSE COALESCE(usage_count, 0) END
+        """
+    )
+
+
+def downgrade() -> None:
+    """Drop confidence_count."""
+    op.drop_column("source_prompt_templates", "confidence_count")
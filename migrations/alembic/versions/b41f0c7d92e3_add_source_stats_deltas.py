@@ -0,0 +1,126 @@
+"""add_source_stats_deltas
+
+Revision ID: b41f0c7d92e3
+Revises: 66703a7a9dba
+Create Date: 2026-10-19 10:12:41.208733
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b41f0c7d92e3"
+down_revision: str | Sequence[str] | None = "66703a7a9dba"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Add running sums to document_sources and the source_stats_deltas table."""
+    # Exact running sums behind the rounded averages, so merging never re-reads jobs
+    op.add_column(
+        "document_sources",
+        sa.Column(
+            "accuracy_count",
+            sa.Integer(),
+            server_default="0",
+            nullable=False,
+            comment="Number of documents contributing to avg_accuracy",
+        ),
+    )
+    op.add_column(
+        "document_sources",
+        sa.Column(
+            "accuracy_sum",
+            sa.Numeric(precision=16, scale=4),
+            server_default="0",
+            nullable=False,
+            comment="Sum of document accuracies behind avg_accuracy",
+        ),
+    )
+    op.add_column(
+        "document_sources",
+        sa.Column(
+            "cost_sum",
+            sa.Numeric(precision=16, scale=4),
+            server_default="0",
+            nullable=False,
+            comment="Sum of document costs behind avg_cost_per_document",
+        ),
+    )
+    # Seed the sums from the current (hand-maintained) values
+    op.execute(
+        """
+        UPDATE document_sources
+        SET accuracy_count = CASE WHEN avg_accuracy IS NULL THEN 0
+                                  ELSE COALESCE(total_documents_processed, 0) END,
+            accuracy_sum = COALESCE(avg_accuracy, 0) * COALESCE(total_documents_processed, 0),
+            cost_sum = COALESCE(avg_cost_per_document, 0) * COALESCE(total_documents_processed, 0)
+        """
+    )
+
+    op.create_table(
+        "source_stats_deltas",
+        sa.Column(
+            "delta_id",
+            sa.BigInteger(),
+            sa.Identity(always=True),
+            nullable=False,
+            comment="Monotonic identifier of the delta",
+        ),
+        sa.Column(
+            "source_id",
+            sa.String(length=20),
+            nullable=False,
+            comment="Source the completed documents belong to",
+        ),
+        sa.Column(
+            "documents",
+            sa.Integer(),
+            server_default="0",
+            nullable=False,
+            comment="Completed documents in this delta",
+        ),
+        sa.Column(
+            "accuracy_count",
+            sa.Integer(),
+            server_default="0",
+            nullable=False,
+            comment="Documents in this delta with a measured accuracy",
+        ),
+        sa.Column(
+            "accuracy_sum",
+            sa.Numeric(precision=16, scale=4),
+            server_default="0",
+            nullable=False,
+            comment="Sum of measured accuracies",
+        ),
+        sa.Column(
+            "cost_sum",
+            sa.Numeric(precision=16, scale=4),
+            server_default="0",
+            nullable=False,
+            comment="Sum of document costs",
+        ),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(),
+            server_default=sa.text("NOW()"),
+            nullable=True,
+            comment="Timestamp when the delta was recorded",
+        ),
+        sa.ForeignKeyConstraint(["source_id"], ["document_sources.source_id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("delta_id"),
+        comment="Pending per-source statistics deltas, folded into document_sources periodically",
+    )
+
+
+def downgrade() -> None:
+    """Drop source_stats_deltas and the running sums."""
+    op.drop_table("source_stats_deltas")
+    op.drop_column("document_sources", "cost_sum")
+    op.drop_column("document_sources", "accuracy_sum")
+    op.drop_column("document_sources", "accuracy_count")
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Benchmark OCR engines on scanned pages.
+
+Compares:
+- ``pytesseract``: one ``tesseract`` process and temp-file round trip per page;
+- ``pool[<engine>]``: OCRWorkerPool with an engine loaded once per worker.
+
+Requires the ``tesseract`` binary with ``ind`` and ``eng`` language data; the
+tesserocr rows also need ``pip install dataminer[ocr]``.
+
+Usage:
+    uv run python scripts/benchmark_ocr.py [path/to/scan.pdf] [--pages 20] [--workers 4]
+"""
+
+import argparse
+import asyncio
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+
+def make_scanned_pdf(path: Path, pages: int) -> None:
+    """Create an image-only PDF that has no text layer."""
+    import pymupdf
+
+    paragraph = (
+        "Menimbang, bahwa Terdakwa telah didakwa oleh Penuntut Umum dengan dakwaan "
+        "sebagaimana diatur dan diancam pidana dalam Pasal 2 ayat (1) Undang-Undang "
+        "Nomor 31 Tahun 1999 tentang Pemberantasan Tindak Pidana Korupsi."
+    )
+    with pymupdf.open() as source, pymupdf.open() as scanned:
+        page = source.new_page()
+        page.insert_textbox(pymupdf.Rect(50, 50, 545, 790), (paragraph + "\n") * 8, fontsize=11)
+        image = page.get_pixmap(dpi=200, colorspace=pymupdf.csGRAY).tobytes("png")
+        for _ in range(pages):
+            scanned.new_page().insert_image(pymupdf.Rect(0, 0, 595, 842), stream=image)
+        scanned.save(path)
+
+
+def bench_pytesseract(path: Path, pages: int, dpi: int) -> float:
+    """OCR every page with the per-page pytesseract path."""
+    from dataminer.services.ocr import ocr_page
+
+    started = time.perf_counter()
+    for number in range(1, pages + 1):
+        ocr_page(str(path), number, dpi=dpi)
+    return time.perf_counter() - started
+
+
+def bench_pool(path: Path, pages: int, dpi: int, workers: int, engine: str) -> float:
+    """OCR every page through an OCRWorkerPool, excluding worker start-up."""
+    from dataminer.services.ocr import OCRWorkerPool
+
+    with OCRWorkerPool(max_workers=workers, engine=engine, dpi=dpi) as pool:  # type: ignore[arg-type]
+        asyncio.run(pool.ocr_pages(str(path), [1]))  # warm up workers
+        started = time.perf_counter()
+        asyncio.run(pool.ocr_pages(str(path), range(1, pages + 1)))
+        return time.perf_counter() - started
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("pdf", nargs="?", type=Path, help="scanned PDF to OCR")
+    parser.add_argument("--pages", type=int, default=20, help="pages to OCR")
+    parser.add_argument("--workers", type=int, default=4, help="pool worker processes")
+    parser.add_argument("--dpi", type=int, default=300, help="rendering resolution")
+    args = parser.parse_args()
+
+    if shutil.which("tesseract") is None:
+        sys.exit("tesseract is not installed; nothing to benchmark")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.pdf
+        if path is None:
+            path = Path(tmp) / "scan.pdf"
+            make_scanned_pdf(path, args.pages)
+
+        rows = [("pytesseract (sequential)", bench_pytesseract(path, args.pages, args.dpi))]
+        rows.append(
+            (
+                f"pool[pytesseract] x{args.workers}",
+                bench_pool(path, args.pages, args.dpi, args.workers, "pytesseract"),
+            )
+        )
+        try:
+            import tesserocr  # noqa: F401
+        except ImportError:
+            print("tesserocr is not installed; skipping in-process engine")
+        else:
+            rows.append(
+                (
+                    f"pool[tesserocr] x{args.workers}",
+                    bench_pool(path, args.pages, args.dpi, args.workers, "tesserocr"),
+                )
+            )
+
+        baseline = rows[0][1]
+        print(f"{'engine':<28} {'seconds':>8} {'pages/s':>8} {'speedup':>8}")
+        for name, seconds in rows:
+            print(
+                f"{name:<28} {seconds:>8.2f} {args.pages / seconds:>8.2f} "
+                f"{baseline / seconds:>7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Benchmark page-parallel PDF text extraction.
+
+Reports pages/second for an increasing number of worker processes so the
+scaling with cores can be checked.
+
+Usage:
+    uv run python scripts/benchmark_pdf_extraction.py [path/to/document.pdf] [--pages 400]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+
+def make_sample_pdf(path: Path, pages: int) -> None:
+    """Create a text-heavy sample PDF."""
+    import pymupdf
+
+    paragraph = (
+        "Menimbang, bahwa Terdakwa telah didakwa oleh Penuntut Umum dengan dakwaan "
+        "sebagaimana diatur dan diancam pidana dalam Pasal 2 ayat (1) Undang-Undang "
+        "Nomor 31 Tahun 1999 tentang Pemberantasan Tindak Pidana Korupsi. "
+    ) * 6
+    with pymupdf.open() as doc:
+        for number in range(pages):
+            page = doc.new_page()
+            page.insert_textbox(pymupdf.Rect(50, 50, 545, 790), f"{number + 1}\n{paragraph}")
+        doc.save(path)
+
+
+async def run(path: Path, workers: int) -> float:
+    """Extract the document with ``workers`` processes and return pages/second."""
+    from dataminer.services.pdf_extraction import PDFExtractor
+
+    async with PDFExtractor(max_workers=workers) as extractor:
+        result = await extractor.extract(path)
+    return result.pages_per_second
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("pdf", nargs="?", type=Path, help="PDF to extract")
+    parser.add_argument("--pages", type=int, default=400, help="pages in generated sample")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.pdf
+        if path is None:
+            path = Path(tmp) / "sample.pdf"
+            make_sample_pdf(path, args.pages)
+
+        cpu_count = os.cpu_count() or 1
+        baseline = None
+        worker_counts = sorted({1, 2, 4, 8, cpu_count} & set(range(1, cpu_count + 1)))
+        print(f"{'workers':>8} {'pages/s':>10} {'speedup':>8}")
+        for workers in worker_counts:
+            rate = asyncio.run(run(path, workers))
+            baseline = baseline or rate
+            print(f"{workers:>8} {rate:>10.1f} {rate / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
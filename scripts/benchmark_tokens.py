@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""Benchmark and accuracy report for the local token counter.
+
+Measures, on a sample corpus:
+- throughput of the fast estimate, the exact reference tokenizer and a cached
+  exact count;
+- accuracy of the estimate against the reference (mean absolute percentage
+  error, p95 error and bias, where positive means over-estimating).
+
+``--fit`` re-fits the estimator coefficients to the reference tokenizer and
+reports the accuracy of the fitted model as well.
+
+References:
+- ``vertex:<model>``: Vertex AI local tokenizer (``pip install dataminer[tokenizer]``);
+- ``sentencepiece:<path>``: a SentencePiece model file;
+- ``hf:<path>``: a Hugging Face ``tokenizer.json`` (requires ``tokenizers``).
+
+Without ``--corpus`` a synthetic corpus of Indonesian judgment paragraphs is used;
+pass a directory of ``.txt`` files (one sample per paragraph) for real text.
+
+Usage:
+    uv run python scripts/benchmark_tokens.py [--corpus DIR] [--reference vertex:gemini-1.5-flash] [--fit]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+_TEMPLATES = [
+    "Menimbang, bahwa Terdakwa {name} telah didakwa oleh Penuntut Umum dengan dakwaan "
+    "sebagaimana diatur dan diancam pidana dalam Pasal {article} ayat ({clause}) "
+    "Undang-Undang Nomor {law} Tahun {year} tentang Pemberantasan Tindak Pidana Korupsi.",
+    "Menimbang, bahwa berdasarkan keterangan saksi-saksi, keterangan Terdakwa dan barang "
+    "bukti yang diajukan di persidangan, diperoleh fakta hukum bahwa pada tanggal {day} "
+    "{month} {year} bertempat di {place}, Terdakwa menerima uang sebesar Rp{amount},00 "
+    "({words} rupiah).",
+    "Menjatuhkan pidana kepada Terdakwa oleh karena itu dengan pidana penjara selama "
+    "{months} ({months_words}) bulan dan denda sebesar Rp{amount},00 dengan ketentuan "
+    "apabila denda tersebut tidak dibayar diganti dengan pidana kurungan selama {days} hari;",
+    "{n}. 1 (satu) lembar fotokopi Surat Perintah Membayar Nomor: {ref}/SPM/{code}/{year} "
+    "tanggal {day} {month} {year}, dikembalikan kepada saksi {name};",
+    "Saksi {name}, di bawah sumpah pada pokoknya menerangkan sebagai berikut: Bahwa saksi "
+    "kenal dengan Terdakwa karena hubungan pekerjaan di Dinas {place} sejak tahun {year};",
+]
+_NAMES = ["BUDI SANTOSO, S.H.", "Siti Rahmawati", "Drs. AHMAD YANI, M.Si.", "Nyoman Sudarta"]
+_PLACES = ["Kota Medan", "Kabupaten Bogor", "Pekerjaan Umum Provinsi Jawa Barat", "Surabaya"]
+_MONTHS = ["Januari", "Maret", "Juni", "Agustus", "Oktober", "Desember"]
+_NUMBER_WORDS = ["dua belas", "delapan belas", "dua puluh empat", "tiga puluh enam"]
+
+
+def synthetic_corpus(samples: int, seed: int = 7) -> list[str]:
+    """Generate judgment-style paragraphs of varying length."""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(samples):
+        paragraphs = []
+        for _ in range(rng.randint(1, 12)):
+            months = rng.choice([12, 18, 24, 36])
+            paragraphs.append(
+                rng.choice(_TEMPLATES).format(
+                    name=rng.choice(_NAMES),
+                    article=rng.randint(1, 20),
+                    clause=rng.randint(1, 4),
+                    law=rng.choice([20, 31, 8]),
+                    year=rng.randint(1999, 2024),
+                    day=rng.randint(1, 28),
+                    month=rng.choice(_MONTHS),
+                    place=rng.choice(_PLACES),
+                    amount=f"{rng.randint(1, 999) * 1_000_000:,}".replace(",", "."),
+                    words="satu miliar lima ratus juta",
+                    months=months,
+                    months_words=rng.choice(_NUMBER_WORDS),
+                    days=rng.randint(30, 180),
+                    n=rng.randint(1, 120),
+                    ref=rng.randint(100, 9999),
+                    code=rng.choice(["LS", "GU", "TU"]),
+                )
+            )
+        corpus.append("\n".join(paragraphs))
+    return corpus
+
+
+def load_corpus(directory: Path) -> list[str]:
+    """Read paragraphs from ``.txt`` files in ``directory``."""
+    corpus = []
+    for path in sorted(directory.glob("*.txt")):
+        corpus.extend(p.strip() for p in path.read_text().split("\n\n") if p.strip())
+    return corpus
+
+
+def load_reference(spec: str) -> Callable[[str], int]:
+    """Create the reference token counter named by ``spec``."""
+    kind, _, target = spec.partition(":")
+    if kind == "vertex":
+        from dataminer.utils.tokens import load_exact_counter
+
+        counter = load_exact_counter(target)
+        if counter is None:
+            sys.exit("Vertex AI local tokenizer is not installed")
+        return counter
+    if kind == "sentencepiece":
+        import sentencepiece
+
+        processor = sentencepiece.SentencePieceProcessor(model_file=target)
+        return lambda text: len(processor.encode(text))
+    if kind == "hf":
+        import tokenizers
+
+        tokenizer = tokenizers.Tokenizer.from_file(target)
+        return lambda text: len(tokenizer.encode(text, add_special_tokens=False).ids)
+    sys.exit(f"Unknown reference '{spec}'")
+
+
+def accuracy(estimates: list[int], reference: list[int]) -> tuple[float, float, float]:
+    """MAPE, p95 absolute percentage error and mean bias, in percent."""
+    errors = [(e - r) / r * 100 for e, r in zip(estimates, reference, strict=True) if r]
+    absolute = sorted(abs(error) for error in errors)
+    p95 = absolute[min(len(absolute) - 1, int(len(absolute) * 0.95))]
+    return statistics.fmean(absolute), p95, statistics.fmean(errors)
+
+
+def throughput(func: Callable[[str], int], corpus: list[str]) -> float:
+    """Megabytes of text counted per second."""
+    size = sum(len(text.encode("utf-8")) for text in corpus)
+    started = time.perf_counter()
+    for text in corpus:
+        func(text)
+    return size / (time.perf_counter() - started) / 1e6
+
+
+def main() -> None:
+    """Run the benchmark and accuracy report."""
+    from dataminer.utils.tokens import TokenCounter, TokenEstimator
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--corpus", type=Path, help="directory of .txt samples")
+    parser.add_argument("--samples", type=int, default=2000, help="synthetic samples")
+    parser.add_argument(
+        "--reference", default="vertex:gemini-1.5-flash", help="reference tokenizer spec"
+    )
+    parser.add_argument("--fit", action="store_true", help="fit estimator coefficients")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else synthetic_corpus(args.samples)
+    reference = load_reference(args.reference)
+    reference_counts = [reference(text) for text in corpus]
+    print(f"corpus: {len(corpus)} samples, {sum(reference_counts):,} reference tokens\n")
+
+    estimators = {"default": TokenEstimator()}
+    if args.fit:
+        # Fit on even samples, report on odd ones.
+        train = list(zip(corpus[::2], reference_counts[::2], strict=True))
+        estimators["fitted"] = TokenEstimator.fit(train)
+        held_out = corpus[1::2]
+        held_out_counts = reference_counts[1::2]
+    else:
+        held_out, held_out_counts = corpus, reference_counts
+
+    print(f"{'estimator':<10} {'MAPE %':>8} {'p95 %':>8} {'bias %':>8}")
+    for name, estimator in estimators.items():
+        mape, p95, bias = accuracy([estimator.estimate(t) for t in held_out], held_out_counts)
+        print(f"{name:<10} {mape:>8.2f} {p95:>8.2f} {bias:>+8.2f}")
+    if args.fit:
+        coefficients = ", ".join(f"{c:.4f}" for c in estimators["fitted"].coefficients())
+        print(f"\nfitted coefficients: TokenEstimator({coefficients})")
+
+    counter = TokenCounter(exact=reference, cache_size=len(corpus) + 1)
+    for text in corpus:
+        counter.count(text)  # warm the cache
+    print(f"\n{'counter':<14} {'MB/s':>10}")
+    for name, func in (
+        ("estimate", counter.estimate),
+        ("exact", reference),
+        ("exact cached", counter.count),
+    ):
+        print(f"{name:<14} {throughput(func, corpus):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
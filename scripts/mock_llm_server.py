@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""Local mock of the Gemini ``generateContent`` API for offline throughput tests.
+
+``streamGenerateContent`` is served too, sending the same answer in small
+server-sent events spread over the latency.
+
+``serve`` starts the mock; point the service at it with
+``LLM_BASE_URL=http://127.0.0.1:8089/v1/models``. Each call sleeps for a
+latency drawn around ``--latency-ms`` and fails with HTTP 429 or 503 at the
+configured rates, so retry, cool-down and concurrency behaviour can be observed
+without a GCP project.
+
+``bench`` starts the mock in-process and drives it with :class:`LLMClient`,
+comparing sequential calls with concurrent ones.
+
+Usage:
+    uv run python scripts/mock_llm_server.py serve [--latency-ms 800] [--error-rate 0.05]
+    uv run python scripts/mock_llm_server.py bench [--calls 200] [--concurrency 16]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import socket
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+
+def create_app(
+    latency_ms: float = 800.0,
+    jitter_ms: float = 200.0,
+    error_rate: float = 0.0,
+    rate_limit_rate: float = 0.0,
+    seed: int | None = None,
+) -> FastAPI:
+    """Create the mock API.
+
+    Args:
+        latency_ms: Mean response latency.
+        jitter_ms: Uniform latency jitter around the mean.
+        error_rate: Fraction of calls answered with HTTP 503.
+        rate_limit_rate: Fraction of calls answered with HTTP 429 and ``Retry-After: 1``.
+        seed: Random seed for reproducible runs.
+    """
+    rng = random.Random(seed)
+    app = FastAPI(title="mock-llm")
+    app.state.calls = 0
+
+    @app.post("/v1/models/{model}:generateContent")
+    async def generate_content(model: str, request: Request) -> Any:
+        app.state.calls += 1
+        body = await request.json()
+        prompt = "".join(
+            part.get("text", "") for content in body["contents"] for part in content["parts"]
+        )
+        await asyncio.sleep(max(0.0, latency_ms + rng.uniform(-jitter_ms, jitter_ms)) / 1000)
+
+        roll = rng.random()
+        if roll < rate_limit_rate:
+            return JSONResponse(
+                {"error": {"code": 429, "status": "RESOURCE_EXHAUSTED"}},
+                status_code=429,
+                headers={"retry-after": "1"},
+            )
+        if roll < rate_limit_rate + error_rate:
+            return JSONResponse({"error": {"code": 503, "status": "UNAVAILABLE"}}, status_code=503)
+
+        text = json.dumps(
+            {"model": model, "prompt_sha256": hashlib.sha256(prompt.encode()).hexdigest()}
+        )
+        return {
+            "candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}],
+            "usageMetadata": {
+                "promptTokenCount": max(1, len(prompt) // 4),
+                "candidatesTokenCount": max(1, len(text) // 4),
+            },
+        }
+
+    @app.post("/v1/models/{model}:streamGenerateContent")
+    async def stream_generate_content(model: str, request: Request) -> Any:
+        app.state.calls += 1
+        body = await request.json()
+        prompt = "".join(
+            part.get("text", "") for content in body["contents"] for part in content["parts"]
+        )
+        text = json.dumps(
+            {"model": model, "prompt_sha256": hashlib.sha256(prompt.encode()).hexdigest()}
+        )
+        pieces = [text[i : i + 16] for i in range(0, len(text), 16)]
+        delay = max(0.0, latency_ms + rng.uniform(-jitter_ms, jitter_ms)) / 1000 / len(pieces)
+
+        async def events() -> Any:
+            for index, piece in enumerate(pieces):
+                await asyncio.sleep(delay)
+                event: dict[str, Any] = {
+                    "candidates": [{"content": {"role": "model", "parts": [{"text": piece}]}}]
+                }
+                if index == len(pieces) - 1:
+                    event["candidates"][0]["finishReason"] = "STOP"
+                    event["usageMetadata"] = {
+                        "promptTokenCount": max(1, len(prompt) // 4),
+                        "candidatesTokenCount": max(1, len(text) // 4),
+                    }
+                yield f"data: {json.dumps(event)}\r\n\r\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+async def _mock_token() -> str:
+    return "mock"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+async def bench(args: argparse.Namespace) -> None:
+    """Compare sequential and concurrent calls against an in-process mock."""
+    from dataminer.services.llm_client import LLMClient, ModelLimits
+
+    port = _free_port()
+    app = create_app(args.latency_ms, args.jitter_ms, args.error_rate, args.rate_limit_rate, 7)
+    server = uvicorn.Server(uvicorn.Config(app, port=port, log_level="warning"))
+    serve_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    base_url = f"http://127.0.0.1:{port}/v1/models"
+    model = "gemini-1.5-flash"
+    prompts = [f"Ekstrak identitas terdakwa dari segmen {i}" for i in range(args.calls)]
+    try:
+        for concurrency in (1, args.concurrency):
+            async with LLMClient(
+                base_url=base_url,
+                token_provider=_mock_token,
+                limits={model: ModelLimits(concurrency=concurrency)},
+                backoff_base_seconds=0.2,
+            ) as llm:
+                started = time.perf_counter()
+                results = await asyncio.gather(
+                    *(llm.generate(p, model=model, max_retries=3) for p in prompts),
+                    return_exceptions=True,
+                )
+                elapsed = time.perf_counter() - started
+            failures = sum(isinstance(result, Exception) for result in results)
+            retried = sum(
+                result.attempts - 1 for result in results if not isinstance(result, Exception)
+            )
+            print(
+                f"concurrency={concurrency:<3} calls={args.calls} {elapsed:7.2f}s "
+                f"{args.calls / elapsed:7.1f} calls/s retries={retried} failures={failures}"
+            )
+    finally:
+        server.should_exit = True
+        await serve_task
+
+
+def main() -> None:
+    """Run the mock server or the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("command", choices=["serve", "bench"])
+    parser.add_argument("--port", type=int, default=8089, help="serve: listen port")
+    parser.add_argument("--latency-ms", type=float, default=800.0, help="mean latency")
+    parser.add_argument("--jitter-ms", type=float, default=200.0, help="latency jitter")
+    parser.add_argument("--error-rate", type=float, default=0.05, help="HTTP 503 rate")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.02, help="HTTP 429 rate")
+    parser.add_argument("--calls", type=int, default=100, help="bench: calls to make")
+    parser.add_argument("--concurrency", type=int, default=16, help="bench: concurrent calls")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        app = create_app(args.latency_ms, args.jitter_ms, args.error_rate, args.rate_limit_rate)
+        uvicorn.run(app, host="127.0.0.1", port=args.port)
+    else:
+        asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
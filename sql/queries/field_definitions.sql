@@ -0,0 +1,8 @@
+-- name: ListFieldDefinitionsBySource :many
+SELECT field_id, source_id, field_name, field_display_name, field_category, field_type,
+       extraction_method, extraction_section, regex_pattern, llm_prompt_template_id,
+       is_required, validation_rules, confidence_threshold, normalization_rules,
+       display_order, created_at, updated_at
+FROM source_field_definitions
+WHERE source_id = $1
+ORDER BY display_order NULLS LAST, field_name;
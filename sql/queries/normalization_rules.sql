@@ -0,0 +1,6 @@
+-- name: ListActiveNormalizationRules :many
+SELECT rule_id, source_id, rule_name, rule_type, pattern, replacement, is_regex,
+       apply_to_sections, priority, is_active, created_at, updated_at
+FROM source_normalization_rules
+WHERE source_id = $1 AND is_active = true
+ORDER BY priority, created_at;
@@ -0,0 +1,39 @@
+-- name: ListActivePromptTemplates :many
+SELECT template_id, source_id, template_name, template_type, language_code, prompt_text,
+       variables, usage_count, avg_confidence, avg_tokens_used, is_active, version,
+       created_at, updated_at, confidence_count
+FROM source_prompt_templates
+WHERE source_id = $1 AND is_active = true
+ORDER BY template_name, version DESC;
+
+-- name: MergePromptTemplateUsage :exec
+-- Folds per-template usage deltas from one worker into the running averages.
+-- avg_confidence is weighted by confidence_count (uses that reported a
+-- confidence), avg_tokens_used by usage_count.
+UPDATE source_prompt_templates AS t
+SET usage_count = COALESCE(t.usage_count, 0) + d.uses,
+    confidence_count = t.confidence_count + d.confidence_count,
+    avg_confidence = CASE
+        WHEN d.confidence_count = 0 THEN t.avg_confidence
+        WHEN t.avg_confidence IS NULL OR t.confidence_count = 0
+            THEN round(d.confidence_sum / d.confidence_count, 2)
+        ELSE round(
+            (t.avg_confidence * t.confidence_count + d.confidence_sum)
+            / (t.confidence_count + d.confidence_count), 2)
+    END,
+    avg_tokens_used = CASE
+        WHEN d.uses = 0 THEN t.avg_tokens_used
+        WHEN t.avg_tokens_used IS NULL THEN round(d.tokens_sum / d.uses)::integer
+        ELSE round(
+            (t.avg_tokens_used::numeric * COALESCE(t.usage_count, 0) + d.tokens_sum)
+            / (COALESCE(t.usage_count, 0) + d.uses))::integer
+    END,
+    updated_at = now()
+FROM unnest(
+    sqlc.arg('template_ids')::uuid[],
+    sqlc.arg('uses')::integer[],
+    sqlc.arg('confidence_counts')::integer[],
+    sqlc.arg('confidence_sums')::numeric[],
+    sqlc.arg('tokens_sums')::numeric[]
+) AS d(template_id, uses, confidence_count, confidence_sum, tokens_sum)
+WHERE t.template_id = d.template_id;
@@ -1,14 +1,16 @@
 -- name: ListSources :many
 SELECT source_id, source_name, country_code, primary_language, secondary_languages,
        legal_system, document_type, is_active, phase, total_documents_processed,
-       avg_accuracy, avg_cost_per_document, created_at, updated_at
+       avg_accuracy, avg_cost_per_document, created_at, updated_at,
+       accuracy_count, accuracy_sum, cost_sum
 FROM document_sources
 ORDER BY source_id;
 
 -- name: GetSourceByID :one
 SELECT source_id, source_name, country_code, primary_language, secondary_languages,
        legal_system, document_type, is_active, phase, total_documents_processed,
-       avg_accuracy, avg_cost_per_document, created_at, updated_at
+       avg_accuracy, avg_cost_per_document, created_at, updated_at,
+       accuracy_count, accuracy_sum, cost_sum
 FROM document_sources
 WHERE source_id = $1;
 
@@ -21,17 +23,65 @@ INSERT INTO document_sources (
 )
 RETURNING source_id, source_name, country_code, primary_language, secondary_languages,
           legal_system, document_type, is_active, phase, total_documents_processed,
-          avg_accuracy, avg_cost_per_document, created_at, updated_at;
+          avg_accuracy, avg_cost_per_document, created_at, updated_at,
+          accuracy_count, accuracy_sum, cost_sum;
 
 -- name: UpdateSource :one
+-- avg_accuracy and avg_cost_per_document are derived from the running sums by
+-- MergeSourceStatsDeltas and are not writable here.
 UPDATE document_sources
 SET source_name = COALESCE(sqlc.narg('source_name'), source_name),
     is_active = COALESCE(sqlc.narg('is_active'), is_active),
     phase = COALESCE(sqlc.narg('phase'), phase),
-    avg_accuracy = COALESCE(sqlc.narg('avg_accuracy'), avg_accuracy),
-    avg_cost_per_document = COALESCE(sqlc.narg('avg_cost_per_document'), avg_cost_per_document),
     updated_at = NOW()
 WHERE source_id = sqlc.arg('source_id')
 RETURNING source_id, source_name, country_code, primary_language, secondary_languages,
           legal_system, document_type, is_active, phase, total_documents_processed,
-          avg_accuracy, avg_cost_per_document, created_at, updated_at;
+          avg_accuracy, avg_cost_per_document, created_at, updated_at,
+          accuracy_count, accuracy_sum, cost_sum;
+
+-- name: AddSourceStatsDeltas :exec
+-- Appends per-source deltas of completed jobs; never touches document_sources rows.
+INSERT INTO source_stats_deltas (source_id, documents, accuracy_count, accuracy_sum, cost_sum)
+SELECT *
+FROM unnest(
+    sqlc.arg('source_ids')::varchar[],
+    sqlc.arg('documents')::integer[],
+    sqlc.arg('accuracy_counts')::integer[],
+    sqlc.arg('accuracy_sums')::numeric[],
+    sqlc.arg('cost_sums')::numeric[]
+);
+
+-- name: MergeSourceStatsDeltas :many
+-- Consumes pending deltas and folds them into the sources' running sums and averages.
+-- Deltas are deleted and applied in one statement, so concurrent merges cannot double count.
+WITH consumed AS (
+    DELETE FROM source_stats_deltas
+    RETURNING source_id, documents, accuracy_count, accuracy_sum, cost_sum
+), totals AS (
+    SELECT source_id,
+           sum(documents)::integer AS documents,
+           sum(accuracy_count)::integer AS accuracy_count,
+           sum(accuracy_sum) AS accuracy_sum,
+           sum(cost_sum) AS cost_sum
+    FROM consumed
+    GROUP BY source_id
+)
+UPDATE document_sources AS s
+SET total_documents_processed = COALESCE(s.total_documents_processed, 0) + t.documents,
+    accuracy_count = s.accuracy_count + t.accuracy_count,
+    accuracy_sum = s.accuracy_sum + t.accuracy_sum,
+    cost_sum = s.cost_sum + t.cost_sum,
+    avg_accuracy = CASE
+        WHEN s.accuracy_count + t.accuracy_count = 0 THEN s.avg_accuracy
+        ELSE round((s.accuracy_sum + t.accuracy_sum) / (s.accuracy_count + t.accuracy_count), 2)
+    END,
+    avg_cost_per_document = CASE
+        WHEN COALESCE(s.total_documents_processed, 0) + t.documents = 0 THEN s.avg_cost_per_document
+        ELSE round(
+            (s.cost_sum + t.cost_sum) / (COALESCE(s.total_documents_processed, 0) + t.documents), 2)
+    END,
+    updated_at = NOW()
+FROM totals AS t
+WHERE s.source_id = t.source_id
+RETURNING s.source_id, s.total_documents_processed;
@@ -54,7 +54,10 @@ CREATE TABLE public.document_sources (
     avg_accuracy numeric(4,2),
     avg_cost_per_document numeric(10,2),
     created_at timestamp without time zone DEFAULT now(),
-    updated_at timestamp without time zone DEFAULT now()
+    updated_at timestamp without time zone DEFAULT now(),
+    accuracy_count integer DEFAULT 0 NOT NULL,
+    accuracy_sum numeric(16,4) DEFAULT 0 NOT NULL,
+    cost_sum numeric(16,4) DEFAULT 0 NOT NULL
 );
 
 
@@ -163,6 +166,27 @@ COMMENT ON COLUMN public.document_sources.created_at IS 'Timestamp when record w
 COMMENT ON COLUMN public.document_sources.updated_at IS 'Timestamp when record was last updated';
 
 
+--
+-- Name: COLUMN document_sources.accuracy_count; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.document_sources.accuracy_count IS 'Number of documents contributing to avg_accuracy';
+
+
+--
+-- Name: COLUMN document_sources.accuracy_sum; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.document_sources.accuracy_sum IS 'Sum of document accuracies behind avg_accuracy';
+
+
+--
+-- Name: COLUMN document_sources.cost_sum; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.document_sources.cost_sum IS 'Sum of document costs behind avg_cost_per_document';
+
+
 --
 -- Name: source_extraction_profiles; Type: TABLE; Schema: public; Owner: -
 --
@@ -634,7 +658,8 @@ CREATE TABLE public.source_prompt_templates (
     is_active boolean DEFAULT true,
     version integer DEFAULT 1,
     created_at timestamp without time zone DEFAULT now(),
-    updated_at timestamp without time zone DEFAULT now()
+    updated_at timestamp without time zone DEFAULT now(),
+    confidence_count integer DEFAULT 0 NOT NULL
 );
 
 
@@ -743,6 +768,98 @@ COMMENT ON COLUMN public.source_prompt_templates.created_at IS 'Timestamp when r
 COMMENT ON COLUMN public.source_prompt_templates.updated_at IS 'Timestamp when record was last updated';
 
 
+--
+-- Name: COLUMN source_prompt_templates.confidence_count; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.source_prompt_templates.confidence_count IS 'Number of uses that reported a confidence, behind avg_confidence';
+
+
+--
+-- Name: source_stats_deltas; Type: TABLE; Schema: public; Owner: -
+--
+
+CREATE TABLE public.source_stats_deltas (
+    delta_id bigint NOT NULL,
+    source_id character varying(20) NOT NULL,
+    documents integer DEFAULT 0 NOT NULL,
+    accuracy_count integer DEFAULT 0 NOT NULL,
+    accuracy_sum numeric(16,4) DEFAULT 0 NOT NULL,
+    cost_sum numeric(16,4) DEFAULT 0 NOT NULL,
+    created_at timestamp without time zone DEFAULT now()
+);
+
+
+--
+-- Name: TABLE source_stats_deltas; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON TABLE public.source_stats_deltas IS 'Pending per-source statistics deltas, folded into document_sources periodically';
+
+
+--
+-- Name: COLUMN source_stats_deltas.delta_id; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.source_stats_deltas.delta_id IS 'Monotonic identifier of the delta';
+
+
+--
+-- Name: COLUMN source_stats_deltas.source_id; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.source_stats_deltas.source_id IS 'Source the completed documents belong to';
+
+
+--
+-- Name: COLUMN source_stats_deltas.documents; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.source_stats_deltas.documents IS 'Completed documents in this delta';
+
+
+--
+-- Name: COLUMN source_stats_deltas.accuracy_count; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.source_stats_deltas.accuracy_count IS 'Documents in this delta with a measured accuracy';
+
+
+--
+-- Name: COLUMN source_stats_deltas.accuracy_sum; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.source_stats_deltas.accuracy_sum IS 'Sum of measured accuracies';
+
+
+--
+-- Name: COLUMN source_stats_deltas.cost_sum; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.source_stats_deltas.cost_sum IS 'Sum of document costs';
+
+
+--
+-- Name: COLUMN source_stats_deltas.created_at; Type: COMMENT; Schema: public; Owner: -
+--
+
+COMMENT ON COLUMN public.source_stats_deltas.created_at IS 'Timestamp when the delta was recorded';
+
+
+--
+-- Name: source_stats_deltas_delta_id_seq; Type: SEQUENCE; Schema: public; Owner: -
+--
+
+ALTER TABLE public.source_stats_deltas ALTER COLUMN delta_id ADD GENERATED ALWAYS AS IDENTITY (
+    SEQUENCE NAME public.source_stats_deltas_delta_id_seq
+    START WITH 1
+    INCREMENT BY 1
+    NO MINVALUE
+    NO MAXVALUE
+    CACHE 1
+);
+
+
 --
 -- Name: alembic_version alembic_version_pkc; Type: CONSTRAINT; Schema: public; Owner: -
 --
@@ -815,6 +932,14 @@ ALTER TABLE ONLY public.source_prompt_templates
     ADD CONSTRAINT source_prompt_templates_source_id_template_name_version_key UNIQUE (source_id, template_name, version);
 
 
+--
+-- Name: source_stats_deltas source_stats_deltas_pkey; Type: CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.source_stats_deltas
+    ADD CONSTRAINT source_stats_deltas_pkey PRIMARY KEY (delta_id);
+
+
 --
 -- Name: idx_fields_category; Type: INDEX; Schema: public; Owner: -
 --
@@ -889,6 +1014,14 @@ ALTER TABLE ONLY public.source_prompt_templates
     ADD CONSTRAINT source_prompt_templates_source_id_fkey FOREIGN KEY (source_id) REFERENCES public.document_sources(source_id);
 
 
+--
+-- Name: source_stats_deltas source_stats_deltas_source_id_fkey; Type: FK CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.source_stats_deltas
+    ADD CONSTRAINT source_stats_deltas_source_id_fkey FOREIGN KEY (source_id) REFERENCES public.document_sources(source_id) ON DELETE CASCADE;
+
+
 --
 -- PostgreSQL database dump complete
 --
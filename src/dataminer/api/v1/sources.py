@@ -89,8 +89,6 @@ async def update_source_config(
         source_name=update_dict.get("source_name"),
         is_active=update_dict.get("is_active"),
         phase=update_dict.get("phase"),
-        avg_accuracy=update_dict.get("avg_accuracy"),
-        avg_cost_per_document=update_dict.get("avg_cost_per_document"),
     )
 
     if not updated_source:
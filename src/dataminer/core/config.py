@@ -72,6 +72,114 @@ class Settings(BaseSettings):
     job_timeout_seconds: int = Field(default=300, description="Job timeout in seconds")
     max_retries: int = Field(default=3, description="Max retries for failed jobs")
 
+    # OCR Settings
+    ocr_engine: Literal["auto", "tesserocr", "pytesseract"] = Field(
+        default="auto", description="OCR engine (auto prefers in-process tesserocr)"
+    )
+    ocr_workers: int = Field(default=4, description="OCR worker processes")
+    ocr_dpi: int = Field(default=300, description="Page rendering resolution for OCR")
+    page_cache_enabled: bool = Field(default=True, description="Cache rendered page images")
+    page_cache_dir: str = Field(
+        default="/tmp/dataminer/page-cache", description="Rendered page image cache directory"
+    )
+    page_cache_max_mb: int = Field(default=4096, description="Rendered page cache size (MiB)")
+    ocr_correction_index_path: str = Field(
+        default="/tmp/dataminer/ocr-lexicon.idx",
+        description="Memory-mapped OCR correction index, built from a corpus lexicon",
+    )
+    ocr_correction_max_distance: int = Field(
+        default=2, description="Maximum edit distance of OCR corrections"
+    )
+
+    # Document Storage Settings
+    document_store_dir: str = Field(
+        default="/tmp/dataminer/documents", description="Local document store directory"
+    )
+    http_max_connections: int = Field(default=20, description="Pooled HTTP connections")
+    http_max_downloads_per_host: int = Field(
+        default=4, description="Concurrent document downloads per host"
+    )
+    http_timeout_seconds: float = Field(default=60.0, description="HTTP connect/read timeout")
+
+    # Streaming Settings
+    stream_window_pages: int = Field(
+        default=16, description="Pages in flight at once in streaming mode"
+    )
+    worker_max_rss_mb: int = Field(
+        default=1024, description="Resident memory cap of the worker process (MiB)"
+    )
+
+    # Source Classification Settings
+    classification_sample_pages: int = Field(
+        default=5, description="Pages sampled to classify a document's source"
+    )
+    classification_min_confidence: float = Field(
+        default=0.75, description="Rule-based confidence below which the LLM decides"
+    )
+    classification_llm_model: str = Field(
+        default="gemini-1.5-flash", description="Model asked about ambiguous documents"
+    )
+
+    # LLM Settings
+    vertex_project: str = Field(default="", description="GCP project for Vertex AI")
+    vertex_location: str = Field(default="us-central1", description="Vertex AI region")
+    llm_base_url: str | None = Field(
+        default=None,
+        description="Models endpoint override, e.g. the local mock server",
+    )
+    llm_api_key: str | None = Field(
+        default=None, description="API key sent instead of Google credentials"
+    )
+    llm_max_connections: int = Field(default=32, description="Pooled LLM HTTP connections")
+    llm_model_concurrency: int = Field(default=8, description="Concurrent calls per model")
+    llm_requests_per_minute: int = Field(
+        default=0, description="Request pacing per model (0 disables pacing)"
+    )
+    llm_timeout_quick_seconds: float = Field(default=20.0, description="Quick pass timeout")
+    llm_timeout_detailed_seconds: float = Field(default=60.0, description="Detailed pass timeout")
+    llm_timeout_validation_seconds: float = Field(
+        default=20.0, description="Validation pass timeout"
+    )
+    llm_timeout_deep_dive_seconds: float = Field(default=90.0, description="Deep dive pass timeout")
+
+    # LLM Response Cache Settings
+    llm_cache_ttl_seconds: int = Field(default=604800, description="Redis LLM cache TTL")
+    llm_cache_max_entry_bytes: int = Field(
+        default=262144, description="Largest LLM response stored in the cache"
+    )
+    llm_cache_max_temperature: float = Field(
+        default=0.2, description="Calls above this temperature are not cached"
+    )
+    llm_cache_memory_entries: int = Field(default=2048, description="In-process LLM cache entries")
+    llm_cache_memory_mb: int = Field(default=64, description="In-process LLM cache size (MiB)")
+    llm_cache_memory_ttl_seconds: int = Field(default=900, description="In-process LLM cache TTL")
+    llm_cache_lock_seconds: int = Field(
+        default=120,
+        description="How long one worker may hold the Redis lock while computing a missed prompt",
+    )
+
+    # Token Counting Settings
+    tokenizer_model: str = Field(
+        default="gemini-1.5-flash", description="Model whose tokenizer gives exact counts"
+    )
+    token_exact_margin: float = Field(
+        default=0.15, description="Relative distance from a limit that triggers exact counting"
+    )
+    token_cache_size: int = Field(default=4096, description="Exact token counts kept in memory")
+
+    # Template Stats Settings
+    template_stats_flush_seconds: float = Field(
+        default=30.0, description="Interval between flushes of prompt template usage stats"
+    )
+
+    # Source Stats Settings
+    source_stats_flush_seconds: float = Field(
+        default=10.0, description="Interval between appends of completed-job stats deltas"
+    )
+    source_stats_merge_seconds: float = Field(
+        default=60.0, description="Interval between merges of stats deltas into document_sources"
+    )
+
     # Cost Settings
     default_max_cost_per_document: float = Field(
         default=2.00, description="Default max cost per document"
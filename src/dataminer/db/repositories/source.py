@@ -8,10 +8,22 @@ from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from dataminer.db.queries import profiles, sources
+from dataminer.db.queries import (
+    field_definitions,
+    normalization_rules,
+    profiles,
+    prompt_templates,
+    sources,
+)
 
 if TYPE_CHECKING:
-    from dataminer.db.queries.models import DocumentSource, SourceExtractionProfile
+    from dataminer.db.queries.models import (
+        DocumentSource,
+        SourceExtractionProfile,
+        SourceFieldDefinition,
+        SourceNormalizationRule,
+        SourcePromptTemplate,
+    )
 
 
 class SourceRepository:
@@ -67,8 +79,6 @@ class SourceRepository:
         source_name: str | None = None,
         is_active: bool | None = None,
         phase: int | None = None,
-        avg_accuracy: Decimal | None = None,
-        avg_cost_per_document: Decimal | None = None,
     ) -> DocumentSource | None:
         """Update document source configuration."""
         conn = await self.session.connection()
@@ -78,8 +88,6 @@ class SourceRepository:
             source_name=source_name,
             is_active=is_active,
             phase=phase,
-            avg_accuracy=avg_accuracy,
-            avg_cost_per_document=avg_cost_per_document,
         )
 
     async def get_profiles_by_source(self, source_id: str) -> list[SourceExtractionProfile]:
@@ -149,3 +157,79 @@ class SourceRepository:
             source_id=source_id, profile_name=profile_name
         )
         return bool(result)
+
+    async def get_active_normalization_rules(self, source_id: str) -> list[SourceNormalizationRule]:
+        """Get active normalization rules for a source, in priority order."""
+        conn = await self.session.connection()
+        querier = normalization_rules.AsyncQuerier(conn)
+        # Convert AsyncIterator to list
+        return [rule async for rule in querier.list_active_normalization_rules(source_id=source_id)]
+
+    async def get_field_definitions(self, source_id: str) -> list[SourceFieldDefinition]:
+        """Get a source's field definitions in display order."""
+        conn = await self.session.connection()
+        querier = field_definitions.AsyncQuerier(conn)
+        # Convert AsyncIterator to list
+        return [
+            field async for field in querier.list_field_definitions_by_source(source_id=source_id)
+        ]
+
+    async def get_active_prompt_templates(self, source_id: str) -> list[SourcePromptTemplate]:
+        """Get a source's active prompt templates, newest version first per name."""
+        conn = await self.session.connection()
+        querier = prompt_templates.AsyncQuerier(conn)
+        # Convert AsyncIterator to list
+        return [
+            template async for template in querier.list_active_prompt_templates(source_id=source_id)
+        ]
+
+    async def merge_prompt_template_usage(
+        self,
+        template_ids: list[UUID],
+        uses: list[int],
+        confidence_counts: list[int],
+        confidence_sums: list[Decimal],
+        tokens_sums: list[Decimal],
+    ) -> None:
+        """Fold usage deltas of several templates into their stats in one statement."""
+        conn = await self.session.connection()
+        querier = prompt_templates.AsyncQuerier(conn)
+        await querier.merge_prompt_template_usage(
+            template_ids=template_ids,
+            uses=uses,
+            confidence_counts=confidence_counts,
+            confidence_sums=confidence_sums,
+            tokens_sums=tokens_sums,
+        )
+
+    async def add_source_stats_deltas(
+        self,
+        source_ids: list[str],
+        documents: list[int],
+        accuracy_counts: list[int],
+        accuracy_sums: list[Decimal],
+        cost_sums: list[Decimal],
+    ) -> None:
+        """Append statistics deltas of completed jobs, one row per source."""
+        conn = await self.session.connection()
+        querier = sources.AsyncQuerier(conn)
+        await querier.add_source_stats_deltas(
+            source_ids=source_ids,
+            documents=documents,
+            accuracy_counts=accuracy_counts,
+            accuracy_sums=accuracy_sums,
+            cost_sums=cost_sums,
+        )
+
+    async def merge_source_stats_deltas(self) -> dict[str, int]:
+        """Fold pending deltas into document_sources.
+
+        Returns:
+            The new ``total_documents_processed`` of each updated source.
+        """
+        conn = await self.session.connection()
+        querier = sources.AsyncQuerier(conn)
+        return {
+            row.source_id: row.total_documents_processed or 0
+            async for row in querier.merge_source_stats_deltas()
+        }
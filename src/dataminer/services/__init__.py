@@ -0,0 +1,90 @@
+"""Business logic services."""
+
+from dataminer.services.classification import SourceClassification, SourceClassifier
+from dataminer.services.confidence import ConfidenceScorer, FieldEvidence
+from dataminer.services.costs import JobCostLedger
+from dataminer.services.document_store import (
+    DocumentFetcher,
+    DocumentStore,
+    LocalDocumentStore,
+    StoredObject,
+)
+from dataminer.services.field_extraction import FieldDefinition, RegexFieldExtractor
+from dataminer.services.llm_cache import LLMResponseCache
+from dataminer.services.llm_client import LLMClient, LLMResponse
+from dataminer.services.normalization import (
+    NormalizationEngine,
+    NormalizationProgram,
+    NormalizationRule,
+)
+from dataminer.services.ocr import OCRWorkerPool
+from dataminer.services.ocr_correction import OCRCorrector, SymSpellIndex
+from dataminer.services.ocr_routing import OCRRouter, RoutedDocument, RoutedPage
+from dataminer.services.page_cache import PageImage, PageImageCache
+from dataminer.services.page_quality import PageQuality, score_page_text
+from dataminer.services.pass_planner import PassDecision, PassPlanner
+from dataminer.services.pdf_extraction import DocumentText, PageText, PDFExtractor
+from dataminer.services.prompt_packing import PackedPromptRunner, PromptPacker, PromptPart
+from dataminer.services.prompt_templates import CompiledTemplate, PromptTemplateCache
+from dataminer.services.review import ReviewState
+from dataminer.services.segmentation import SectionScanner, SectionSpan, Segment, Segmenter
+from dataminer.services.source_stats import SourceStatsMerger, SourceStatsRecorder
+from dataminer.services.streaming import PageStore, StreamedDocument, StreamingDocumentProcessor
+from dataminer.services.streaming_extraction import StreamingFieldExtractor
+from dataminer.services.template_stats import TemplateUsageAccumulator, TemplateUsageFlusher
+from dataminer.services.validation import ValidationEngine, ValidatorProgram
+
+__all__ = [
+    "CompiledTemplate",
+    "ConfidenceScorer",
+    "DocumentFetcher",
+    "DocumentStore",
+    "DocumentText",
+    "FieldDefinition",
+    "FieldEvidence",
+    "JobCostLedger",
+    "LLMClient",
+    "LLMResponse",
+    "LLMResponseCache",
+    "LocalDocumentStore",
+    "NormalizationEngine",
+    "NormalizationProgram",
+    "NormalizationRule",
+    "OCRCorrector",
+    "OCRRouter",
+    "OCRWorkerPool",
+    "PDFExtractor",
+    "PackedPromptRunner",
+    "PageImage",
+    "PageImageCache",
+    "PageQuality",
+    "PageStore",
+    "PageText",
+    "PassDecision",
+    "PassPlanner",
+    "PromptPacker",
+    "PromptPart",
+    "PromptTemplateCache",
+    "RegexFieldExtractor",
+    "ReviewState",
+    "RoutedDocument",
+    "RoutedPage",
+    "SectionScanner",
+    "SectionSpan",
+    "Segment",
+    "Segmenter",
+    "SourceClassification",
+    "SourceClassifier",
+    "SourceStatsMerger",
+    "SourceStatsRecorder",
+    "StoredObject",
+    "StreamedDocument",
+    "StreamingDocumentProcessor",
+    "StreamingFieldExtractor",
+    "SymSpellIndex",
+    "TemplateUsageAccumulator",
+    "TemplateUsageFlusher",
+    "ValidationEngine",
+    "ValidatorProgram",
+    "score_page_text",
+]
@@ -0,0 +1,521 @@
+"""Source classification and language detection (PRD Stage 2).
+
+Most documents identify themselves in their first pages: an Indonesian
+verdict has ``Nomor 123/Pid.B/2023/PN Jkt.Sel`` and "DEMI KEADILAN BERDASARKAN
+KETUHANAN YANG MAHA ESA", a Singapore judgment ``[2023] SGHC 12`` and "Coram".
+:class:`SourceClassifier` decides those without an LLM:
+
+1. a few pages are sampled (the first ones, the last one and evenly spaced
+   ones in between);
+2. a :class:`FingerprintIndex` runs every source's case-number patterns and
+   header phrases as one precompiled alternation, so the sample is scanned
+   once; each source scores the weights of the distinct patterns it matched;
+3. a character trigram model assigns each chunk of the sample a language by
+   cosine similarity between hashed trigram count vectors and per-language
+   profile vectors (NumPy), giving the document's language set;
+4. confidence combines the winner's share of the score with how strong the
+   evidence is. Only documents below ``classification_min_confidence`` are
+   escalated to an LLM (:meth:`SourceClassifier.resolve`).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+from collections.abc import Awaitable, Callable, Iterable, Mapping, Sequence
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING, Literal
+
+import numpy as np
+
+from dataminer.core.config import get_settings
+from dataminer.services.llm_client import LLMError
+
+if TYPE_CHECKING:
+    from dataminer.services.llm_client import LLMClient
+
+logger = logging.getLogger(__name__)
+
+Language = Literal["id", "en", "ms"]
+
+SAMPLE_PAGE_CHARS = 4000
+PROFILE_DIM = 4096
+CHUNK_WORDS = 60
+# Cosine lead over the runner-up profile needed for a chunk to vote
+MIN_LANGUAGE_MARGIN = 0.04
+
+
+@dataclass(frozen=True, slots=True)
+class SourceFingerprint:
+    """Identifying patterns of a source: ``(regex, weight)`` pairs."""
+
+    source: str
+    patterns: tuple[tuple[str, float], ...]
+    languages: frozenset[str] = frozenset()
+
+
+SOURCE_FINGERPRINTS: tuple[SourceFingerprint, ...] = (
+    SourceFingerprint(
+        "ID_SC",
+        (
+            (r"\d+\s*/\s*(?:Pid|Pdt)(?:\.[A-Za-z.]+)?\s*/\s*\d{4}\s*/\s*(?:PN|PT|MA)\b", 3.0),
+            (r"DEMI\s+KEADILAN\s+BERDASARKAN\s+KETUHANAN\s+YANG\s+MAHA\s+ESA", 2.0),
+            (r"\bPengadilan\s+(?:Negeri|Tinggi)\b", 1.0),
+            (r"\bMENGADILI\b", 1.0),
+            (r"\bTerdakwa\b", 1.0),
+            (r"\bPenuntut\s+Umum\b", 1.0),
+            (r"\bMahkamah\s+Agung\b", 0.5),
+        ),
+        frozenset({"id"}),
+    ),
+    SourceFingerprint(
+        "SG_SC",
+        (
+            (r"\[\d{4}\]\s+SG(?:HC|CA|DC|MC|HCR|HCF|HCA)\s+\d+", 3.0),
+            (r"REPUBLIC\s+OF\s+SINGAPORE", 2.0),
+            (r"\bCoram\b", 1.5),
+            (r"\bGrounds\s+of\s+Decision\b", 1.0),
+            (r"\bSupreme\s+Court\s+of\s+Singapore\b", 1.0),
+            (r"\b(?:Plaintiff|Appellant|Respondent|Defendant)s?\b", 0.5),
+        ),
+        frozenset({"en"}),
+    ),
+    SourceFingerprint(
+        "ID_REG",
+        (
+            (
+                r"\b(?:UNDANG-UNDANG|PERATURAN\s+(?:PEMERINTAH|PRESIDEN|MENTERI|DAERAH))"
+                r"\s+REPUBLIK\s+INDONESIA\s+NOMOR",
+                3.0,
+            ),
+            (r"DENGAN\s+RAHMAT\s+TUHAN\s+YANG\s+MAHA\s+ESA", 2.0),
+            (r"\bMEMUTUSKAN\s*:", 1.5),
+            (r"\bMenetapkan\s*:", 1.0),
+            (r"\bBAB\s+[IVXLC]+\b", 1.0),
+            (r"\bMenimbang\s*:", 0.5),
+            (r"\bMengingat\s*:", 0.5),
+        ),
+        frozenset({"id"}),
+    ),
+    SourceFingerprint(
+        "MY_PR",
+        (
+            (r"Suruhanjaya\s+Pencegahan\s+Rasuah\s+Malaysia", 3.0),
+            (r"\b(?:SPRM|MACC)\b", 2.0),
+            (r"\b\d{6}-\d{2}-\d{4}\b", 2.0),
+            (r"\bPesalah\b", 1.0),
+            (r"\bMahkamah\s+Sesyen\b", 1.5),
+            (r"\bSeksyen\s+\d+", 1.0),
+            (r"\bAkta\s+Suruhanjaya\b", 1.0),
+        ),
+        frozenset({"ms", "en"}),
+    ),
+    SourceFingerprint(
+        "ID_LKPP",
+        (
+            (r"\bLKPP\b", 2.0),
+            (r"Lembaga\s+Kebijakan\s+Pengadaan\s+Barang\s*/\s*Jasa\s+Pemerintah", 3.0),
+            (r"\bDaftar\s+Hitam\b", 2.0),
+            (r"\b\d{2}\.\d{3}\.\d{3}\.\d-\d{3}\.\d{3}\b", 1.5),
+            (r"\bNPWP\b", 1.0),
+            (r"\bPenyedia\b", 1.0),
+        ),
+        frozenset({"id"}),
+    ),
+    SourceFingerprint(
+        "OS",
+        (
+            (r"\bOpenSanctions\b", 3.0),
+            (r"\bSpecially\s+Designated\s+Nationals\b", 2.0),
+            (r"\bOFAC\b", 1.5),
+            (r"\bsanctions?\s+(?:list|program|programme)\b", 1.5),
+            (r"\bAliases\b", 1.0),
+            (r"\bNationality\b", 0.5),
+        ),
+        frozenset({"en"}),
+    ),
+)
+
+# Short samples of each language's legal register; profiles are built from these
+# unless a corpus-trained set is supplied (LanguageModel.from_samples).
+LANGUAGE_SAMPLES: dict[str, tuple[str, ...]] = {
+    "id": (
+        "Menimbang bahwa terdakwa telah didakwa oleh penuntut umum dengan dakwaan yang "
+        "disusun secara alternatif, maka majelis hakim akan mempertimbangkan dakwaan yang "
+        "paling sesuai dengan fakta hukum yang terungkap di persidangan.",
+        "Menyatakan terdakwa tersebut di atas terbukti secara sah dan meyakinkan bersalah "
+        "melakukan tindak pidana tanpa hak atau melawan hukum, menjatuhkan pidana penjara "
+        "selama lima tahun dan denda sejumlah satu miliar rupiah, dengan ketentuan apabila "
+        "denda tersebut tidak dibayar diganti dengan pidana penjara selama tiga bulan.",
+        "Peraturan ini mulai berlaku pada tanggal diundangkan. Agar setiap orang "
+        "mengetahuinya, memerintahkan pengundangan peraturan ini dengan penempatannya dalam "
+        "lembaran negara. Penyedia barang dan jasa yang dikenakan sanksi daftar hitam "
+        "karena uang jaminan tidak dikembalikan kepada pemerintah daerah.",
+        "Karena itu saksi menerangkan bahwa ia mengenal terdakwa dan tidak ada hubungan "
+        "keluarga, kemudian barang bukti berupa telepon genggam dikembalikan kepada pemiliknya.",
+    ),
+    "ms": (
+        "Tertuduh telah dipertuduhkan di Mahkamah Sesyen atas kesalahan di bawah seksyen "
+        "enam belas akta suruhanjaya pencegahan rasuah Malaysia kerana telah menerima suapan "
+        "wang tunai sebagai dorongan untuk melakukan sesuatu perbuatan berkenaan dengan "
+        "urusan jabatan kerajaan.",
+        "Mahkamah mendapati pihak pendakwaan telah berjaya membuktikan kes melampaui keraguan "
+        "munasabah dan tertuduh disabitkan dengan kesalahan tersebut serta dijatuhi hukuman "
+        "penjara selama dua tahun dan denda sebanyak lima kali ganda nilai suapan atau "
+        "sepuluh ribu ringgit, yang mana lebih tinggi.",
+        "Beliau hendaklah membayar denda itu dalam tempoh yang ditetapkan dan sekiranya "
+        "gagal, hendaklah dipenjarakan. Maklumat pesalah ini dipaparkan untuk makluman awam "
+        "sahaja dan tidak boleh digunakan bagi tujuan lain daripada yang dibenarkan.",
+        "Kenyataan saksi pendakwaan menunjukkan bahawa wang itu diterima oleh tertuduh di "
+        "pejabatnya, dan pihak pembelaan tidak dapat menimbulkan keraguan terhadap kes itu.",
+    ),
+    "en": (
+        "The appellant was convicted in the High Court of trafficking in a controlled drug "
+        "and appealed against both conviction and sentence. Having considered the evidence "
+        "and the submissions of counsel, we are of the view that the appeal should be "
+        "dismissed for the reasons which follow.",
+        "The defendant is a company incorporated in Singapore. The plaintiff claims damages "
+        "for breach of contract and the judge found that the agreement was not terminated "
+        "validly, so the plaintiff was entitled to the sums claimed with interest and costs.",
+        "The entity is listed on the consolidated sanctions list maintained by the authority, "
+        "together with its aliases, nationality, date of birth, passport numbers and the "
+        "sanctions programme under which the designation was made.",
+        "In the circumstances, the court held that the respondent had not discharged the "
+        "burden of proof and the application was therefore allowed with costs to be paid.",
+    ),
+}
+
+
+class ClassificationError(ValueError):
+    """Raised when a fingerprint or language profile is invalid."""
+
+
+# ---------------------------------------------------------------------------
+# Fingerprints
+
+
+class FingerprintIndex:
+    """All sources' patterns compiled into one alternation, scanned once."""
+
+    def __init__(self, fingerprints: Iterable[SourceFingerprint] = SOURCE_FINGERPRINTS):
+        """Compile the patterns.
+
+        Raises:
+            ClassificationError: If a pattern does not compile or has capturing groups.
+        """
+        self.fingerprints = tuple(fingerprints)
+        self._patterns: list[tuple[str, str, float]] = []
+        alternatives = []
+        for fingerprint in self.fingerprints:
+            for pattern, weight in fingerprint.patterns:
+                try:
+                    compiled = re.compile(pattern)
+                except re.error as e:
+                    raise ClassificationError(f"{fingerprint.source}: {e}") from e
+                if compiled.groups:
+                    raise ClassificationError(
+                        f"{fingerprint.source}: use non-capturing groups in {pattern!r}"
+                    )
+                alternatives.append(f"(?P<p{len(self._patterns)}>{pattern})")
+                self._patterns.append((fingerprint.source, pattern, weight))
+        self._regex = re.compile("|".join(alternatives), re.IGNORECASE)
+
+    @property
+    def sources(self) -> tuple[str, ...]:
+        """Source ids, in definition order."""
+        return tuple(f.source for f in self.fingerprints)
+
+    def scan(self, text: str) -> tuple[dict[str, float], dict[str, list[str]]]:
+        """Score every source on ``text``.
+
+        Returns:
+            The summed weight of distinct matched patterns per source, and the
+            matched texts per source as evidence.
+        """
+        matched: dict[int, str] = {}
+        for match in self._regex.finditer(text):
+            index = int((match.lastgroup or "p0")[1:])
+            matched.setdefault(index, match.group())
+        scores = dict.fromkeys(self.sources, 0.0)
+        evidence: dict[str, list[str]] = {}
+        for index, snippet in sorted(matched.items()):
+            source, _, weight = self._patterns[index]
+            scores[source] += weight
+            evidence.setdefault(source, []).append(" ".join(snippet.split()))
+        return scores, evidence
+
+
+# ---------------------------------------------------------------------------
+# Language model
+
+_WORD = re.compile(r"[^\W\d_]+")
+_MIX = (np.uint64(0x9E3779B1), np.uint64(0x85EBCA77), np.uint64(0xC2B2AE3D))
+
+
+def trigram_vector(text: str, dim: int = PROFILE_DIM) -> np.ndarray:
+    """L2-normalized hashed character trigram counts of ``text``'s words."""
+    words = _WORD.findall(text.lower())
+    padded = " " + " ".join(words) + " "
+    if len(padded) < 3 or dim & (dim - 1):
+        return np.zeros(dim, dtype=np.float32)
+    codes = np.frombuffer(padded.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    hashed = (codes[:-2] * _MIX[0]) ^ (codes[1:-1] * _MIX[1]) ^ (codes[2:] * _MIX[2])
+    buckets = ((hashed >> np.uint64(15)) & np.uint64(dim - 1)).astype(np.intp)
+    vector = np.sqrt(np.bincount(buckets, minlength=dim).astype(np.float32))
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
+
+
+class LanguageModel:
+    """Per-language trigram profile vectors; detection is one matrix product."""
+
+    def __init__(self, languages: Sequence[str], profiles: np.ndarray):
+        """Initialize from a (languages, dim) matrix of normalized profiles."""
+        if profiles.shape[0] != len(languages):
+            raise ClassificationError("One profile per language is required")
+        self.languages = tuple(languages)
+        self.profiles = profiles.astype(np.float32)
+        self.dim = profiles.shape[1]
+
+    @classmethod
+    def from_samples(
+        cls, samples: Mapping[str, Iterable[str]] = LANGUAGE_SAMPLES, dim: int = PROFILE_DIM
+    ) -> LanguageModel:
+        """Build profiles from sample texts per language."""
+        languages = list(samples)
+        profiles = np.stack([trigram_vector(" ".join(samples[lang]), dim) for lang in languages])
+        return cls(languages, profiles)
+
+    def similarities(self, chunks: Sequence[str]) -> np.ndarray:
+        """(chunks, languages) cosine similarities."""
+        if not chunks:
+            return np.zeros((0, len(self.languages)), dtype=np.float32)
+        vectors = np.stack([trigram_vector(chunk, self.dim) for chunk in chunks])
+        return vectors @ self.profiles.T
+
+    def detect(
+        self,
+        text: str,
+        min_share: float = 0.2,
+        min_similarity: float = 0.2,
+        min_margin: float = MIN_LANGUAGE_MARGIN,
+    ) -> tuple[str, ...]:
+        """Languages of ``text``, most frequent first.
+
+        The text is cut into chunks of :data:`CHUNK_WORDS` words; each chunk
+        votes for its closest profile when it beats the runner-up by at least
+        ``min_margin``, and languages with at least ``min_share`` of the votes
+        are returned. Close languages such as Indonesian and Malay share most
+        trigrams, so a chunk without a clear winner abstains rather than guess.
+        """
+        words = _WORD.findall(text)
+        chunks = [" ".join(words[i : i + CHUNK_WORDS]) for i in range(0, len(words), CHUNK_WORDS)]
+        if len(chunks) > 1 and len(chunks[-1].split()) < CHUNK_WORDS // 3:
+            tail = chunks.pop()
+            chunks[-1] = f"{chunks[-1]} {tail}"
+        similarities = self.similarities(chunks)
+        if not len(similarities):
+            return ()
+        best = similarities.argmax(axis=1)
+        ranked = np.sort(similarities, axis=1)
+        runner_up = ranked[:, -2] if ranked.shape[1] > 1 else 0.0
+        confident = (ranked[:, -1] >= min_similarity) & (ranked[:, -1] - runner_up >= min_margin)
+        votes = np.bincount(best[confident], minlength=len(self.languages))
+        if not votes.sum():
+            return ()
+        shares = votes / votes.sum()
+        order = np.argsort(-shares, kind="stable")
+        return tuple(self.languages[i] for i in order if shares[i] >= min_share)
+
+
+# ---------------------------------------------------------------------------
+# Classifier
+
+
+@dataclass(frozen=True)
+class SourceClassification:
+    """Classification of a document."""
+
+    source: str | None
+    confidence: float
+    languages: tuple[str, ...]
+    scores: dict[str, float] = field(default_factory=dict)
+    evidence: dict[str, list[str]] = field(default_factory=dict)
+    needs_llm: bool = False
+    method: Literal["rules", "llm"] = "rules"
+
+    @property
+    def language(self) -> str | None:
+        """Primary language."""
+        return self.languages[0] if self.languages else None
+
+
+def sample_pages(pages: Sequence[str], count: int, max_chars: int = SAMPLE_PAGE_CHARS) -> list[str]:
+    """Up to ``count`` pages: the first two, the last, and evenly spaced ones between."""
+    if len(pages) <= count:
+        chosen = list(range(len(pages)))
+    else:
+        head = [0, 1][: max(count - 1, 1)]
+        tail = [len(pages) - 1] if count > 1 else []
+        middle_count = max(count - len(head) - len(tail), 0)
+        step = (len(pages) - 1 - len(head)) / (middle_count + 1)
+        middle = [len(head) - 1 + round(step * (i + 1)) for i in range(middle_count)]
+        chosen = sorted(set(head + middle + tail))
+    return [pages[i][:max_chars] for i in chosen]
+
+
+SourceEscalation = Callable[[str, Sequence[str]], Awaitable[str | None]]
+
+
+class SourceClassifier:
+    """Rule-based source classification with LLM escalation for ambiguous documents.
+
+    Usage:
+        classifier = SourceClassifier()
+        result = classifier.classify([page.text for page in document.pages])
+        if result.needs_llm:
+            result = await classifier.resolve(pages, LLMSourceEscalation(llm))
+    """
+
+    def __init__(
+        self,
+        index: FingerprintIndex | None = None,
+        language_model: LanguageModel | None = None,
+        *,
+        sample_size: int | None = None,
+        min_confidence: float | None = None,
+        strong_score: float = 5.0,
+        language_bonus: float = 0.5,
+    ):
+        """Initialize the classifier.
+
+        Args:
+            index: Fingerprint index. Defaults to :data:`SOURCE_FINGERPRINTS`.
+            language_model: Language profiles. Defaults to :data:`LANGUAGE_SAMPLES`.
+            sample_size: Pages sampled. Defaults to ``settings.classification_sample_pages``.
+            min_confidence: Confidence below which a document needs the LLM.
+                Defaults to ``settings.classification_min_confidence``.
+            strong_score: Score at which the evidence alone is conclusive.
+            language_bonus: Added to sources whose languages include the
+                document's primary language, once they matched a pattern.
+        """
+        settings = get_settings()
+        self.index = index or FingerprintIndex()
+        self.language_model = language_model or LanguageModel.from_samples()
+        self.sample_size = sample_size or settings.classification_sample_pages
+        self.min_confidence = (
+            settings.classification_min_confidence if min_confidence is None else min_confidence
+        )
+        self.strong_score = strong_score
+        self.language_bonus = language_bonus
+        self._languages = {f.source: f.languages for f in self.index.fingerprints}
+
+    def classify(self, pages: Sequence[str]) -> SourceClassification:
+        """Classify a document from its page texts."""
+        sample = "\n".join(sample_pages(pages, self.sample_size))
+        scores, evidence = self.index.scan(sample)
+        languages = self.language_model.detect(sample)
+        if languages:
+            for candidate, score in scores.items():
+                if score and languages[0] in self._languages.get(candidate, ()):
+                    scores[candidate] = score + self.language_bonus
+
+        ranked = sorted(scores.items(), key=lambda item: -item[1])
+        top_source, top = ranked[0] if ranked else (None, 0.0)
+        second = ranked[1][1] if len(ranked) > 1 else 0.0
+        source: str | None = None
+        if not top:
+            confidence = 0.0
+        else:
+            share = top / (top + second)
+            confidence, source = share * min(1.0, top / self.strong_score), top_source
+        result = SourceClassification(
+            source=source,
+            confidence=round(confidence, 3),
+            languages=languages,
+            scores=scores,
+            evidence=evidence,
+            needs_llm=confidence < self.min_confidence,
+        )
+        logger.debug(
+            "Document classified",
+            extra={
+                "source": source,
+                "confidence": result.confidence,
+                "languages": list(languages),
+                "needs_llm": result.needs_llm,
+            },
+        )
+        return result
+
+    async def resolve(
+        self, pages: Sequence[str], escalate: SourceEscalation
+    ) -> SourceClassification:
+        """Classify, asking ``escalate`` only when the rules are not confident."""
+        result = self.classify(pages)
+        if not result.needs_llm:
+            return result
+        sample = "\n".join(sample_pages(pages, self.sample_size))
+        candidates = [s for s, score in sorted(result.scores.items(), key=lambda i: -i[1])]
+        answer = await escalate(sample, candidates)
+        if answer not in self.index.sources:
+            logger.info(
+                "Source escalation inconclusive", extra={"answer": answer, "rules": result.source}
+            )
+            return result
+        return replace(
+            result,
+            source=answer,
+            confidence=max(result.confidence, self.min_confidence),
+            needs_llm=False,
+            method="llm",
+        )
+
+
+SOURCE_DESCRIPTIONS: dict[str, str] = {
+    "ID_SC": "Indonesian Supreme Court / court decision (putusan)",
+    "SG_SC": "Singapore Supreme Court judgment",
+    "ID_REG": "Indonesian regulation (UU, PP, Perpres, Permen)",
+    "MY_PR": "Malaysia Pesalah Rasuah (MACC corruption offender record)",
+    "ID_LKPP": "LKPP procurement blacklist (daftar hitam)",
+    "OS": "Open Sanctions / sanctions list entry",
+}
+
+
+class LLMSourceEscalation:
+    """Asks an LLM which source an ambiguous document comes from."""
+
+    def __init__(self, llm: LLMClient, model: str | None = None, max_chars: int = 6000):
+        """Initialize the escalation.
+
+        Args:
+            llm: LLM client.
+            model: Model name. Defaults to ``settings.classification_llm_model``.
+            max_chars: Sample characters sent.
+        """
+        self.llm = llm
+        self.model = model or get_settings().classification_llm_model
+        self.max_chars = max_chars
+
+    def prompt(self, sample: str, candidates: Sequence[str]) -> str:
+        """Classification prompt."""
+        options = "\n".join(f"- {s}: {SOURCE_DESCRIPTIONS.get(s, s)}" for s in candidates)
+        return (
+            "Which source does this document come from? Answer with JSON "
+            '{"source": "<id>"} using one of these ids, or null if none fits.\n'
+            f"{options}\n\nDocument excerpt:\n{sample[: self.max_chars]}"
+        )
+
+    async def __call__(self, sample: str, candidates: Sequence[str]) -> str | None:
+        """The source id answered, or None if the call fails or the answer is unusable."""
+        try:
+            response = await self.llm.generate(
+                self.prompt(sample, candidates), model=self.model, llm_pass="quick", temperature=0.0
+            )
+            answer = json.loads(response.text)
+        except (LLMError, json.JSONDecodeError) as e:
+            logger.warning("Source escalation failed", extra={"error": str(e)})
+            return None
+        source = answer.get("source") if isinstance(answer, dict) else None
+        return source if isinstance(source, str) and source in candidates else None
@@ -0,0 +1,385 @@
+"""Confidence thresholds and review tiers (PRD §4.4).
+
+Every field belongs to a review tier. A field whose confidence is below its
+tier's threshold needs more work (another pass, or human review):
+
+- ``critical`` (0.90): identifiers and the outcome of the case;
+- ``important`` (0.85): charges, prosecutor and presiding judge;
+- ``standard`` (0.75): everything else, or the field's own
+  ``confidence_threshold`` when that is stricter.
+
+A field's ``field_category`` names its tier (``contextual`` fields are
+reviewed as standard); the PRD's field lists only place fields whose category
+is unset or is not a tier.
+
+A field's confidence is the weighted average of five factor scores
+(:data:`CONFIDENCE_FACTORS`). :class:`ConfidenceScorer` encodes each field's
+factor levels once into a small integer matrix (fields x factors); scoring is
+then a table lookup and one matrix-vector product with the weights, so a whole
+backlog can be rescored with new weights or thresholds in a few array
+operations, yielding ``requires_review`` and ``review_priority`` per job.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Literal
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from dataminer.services.field_extraction import ExtractedField, FieldDefinition
+    from dataminer.services.validation import ValidationReport
+
+ReviewTier = Literal["critical", "important", "standard"]
+
+REVIEW_THRESHOLDS: dict[ReviewTier, float] = {
+    "critical": 0.90,
+    "important": 0.85,
+    "standard": 0.75,
+}
+
+CRITICAL_FIELDS = frozenset(
+    {"case_number", "defendant_name", "verdict", "decision_date", "sentence_prison_total_months"}
+)
+IMPORTANT_FIELDS = frozenset(
+    {"charge_primary_article", "charge_proven", "prosecutor_name", "judge_presiding"}
+)
+
+# ``field_category`` values that name a review tier
+CATEGORY_TIERS: dict[str, ReviewTier] = {
+    "critical": "critical",
+    "important": "important",
+    "standard": "standard",
+    "contextual": "standard",
+}
+
+
+def field_tier(field_name: str, field_category: str | None = None) -> ReviewTier:
+    """Review tier of a field, from its category or else the PRD field lists."""
+    tier = CATEGORY_TIERS.get((field_category or "").strip().lower())
+    if tier is not None:
+        return tier
+    if field_name in CRITICAL_FIELDS:
+        return "critical"
+    if field_name in IMPORTANT_FIELDS:
+        return "important"
+    return "standard"
+
+
+def field_threshold(definition: FieldDefinition) -> float:
+    """Confidence a field must reach: its tier threshold or its own, if stricter."""
+    return max(
+        REVIEW_THRESHOLDS[field_tier(definition.field_name, definition.field_category)],
+        definition.confidence_threshold,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Confidence scoring
+
+CONFIDENCE_FACTORS: dict[str, dict[str, float]] = {
+    "extraction_method": {
+        "regex_match": 0.95,
+        "llm_with_validation": 0.85,
+        "llm_only": 0.70,
+        "inferred": 0.50,
+    },
+    "field_presence": {
+        "explicit_label": 0.95,
+        "section_present": 0.85,
+        "implicit_location": 0.70,
+        "not_found": 0.30,
+    },
+    "validation_status": {
+        "all_rules_pass": 1.0,
+        "minor_warnings": 0.90,
+        "format_issues": 0.70,
+        "validation_failed": 0.40,
+    },
+    "cross_field_consistency": {
+        "fully_consistent": 1.0,
+        "minor_discrepancy": 0.85,
+        "major_discrepancy": 0.60,
+        "contradictory": 0.30,
+    },
+    "llm_certainty": {"high": 0.95, "medium": 0.80, "low": 0.60},
+}
+
+CONFIDENCE_WEIGHTS: dict[str, float] = {
+    "extraction_method": 0.25,
+    "field_presence": 0.20,
+    "validation_status": 0.25,
+    "cross_field_consistency": 0.20,
+    "llm_certainty": 0.10,
+}
+
+FACTORS: tuple[str, ...] = tuple(CONFIDENCE_FACTORS)
+TIERS: tuple[ReviewTier, ...] = ("critical", "important", "standard")
+
+# Added to a job's review priority by the tier of its worst field
+TIER_PRIORITY_BOOST: dict[ReviewTier, int] = {"critical": 2, "important": 1, "standard": 0}
+
+_MISSING = -1
+
+
+class ConfidenceScoringError(ValueError):
+    """Raised for an unknown factor or factor level."""
+
+
+def llm_certainty(confidence: float) -> str:
+    """``llm_certainty`` level of a confidence reported by the model."""
+    if confidence >= 0.85:
+        return "high"
+    if confidence >= 0.60:
+        return "medium"
+    return "low"
+
+
+@dataclass(frozen=True, slots=True)
+class FieldEvidence:
+    """Factor levels of one extracted field; ``None`` leaves a factor out."""
+
+    extraction_method: str | None = None
+    field_presence: str | None = None
+    validation_status: str | None = None
+    cross_field_consistency: str | None = None
+    llm_certainty: str | None = None
+
+    @classmethod
+    def from_field(
+        cls,
+        extracted: ExtractedField,
+        report: ValidationReport | None = None,
+        expected_section: str | None = None,
+    ) -> FieldEvidence:
+        """Derive factor levels from an extracted field and its validation report."""
+        name = extracted.field_name
+        if extracted.value is None:
+            method, presence = "inferred", "not_found"
+        elif extracted.method != "llm":
+            method, presence = "regex_match", "explicit_label"
+        else:
+            method = "llm_with_validation" if report is not None else "llm_only"
+            in_section = expected_section is None or extracted.section == expected_section
+            presence = "section_present" if in_section else "implicit_location"
+        return cls(
+            extraction_method=method,
+            field_presence=presence,
+            validation_status=report.status(name) if report is not None else None,
+            cross_field_consistency=report.consistency(name) if report is not None else None,
+            llm_certainty=llm_certainty(extracted.confidence)
+            if extracted.method == "llm"
+            else None,
+        )
+
+
+@dataclass(frozen=True)
+class EncodedEvidence:
+    """Factor levels of many fields of many jobs, encoded for vectorized scoring.
+
+    Rows are fields; ``job_index`` maps each row to its job in ``job_ids``.
+    """
+
+    job_ids: tuple[object, ...]
+    field_names: tuple[str, ...]
+    codes: np.ndarray  # (fields, factors) int8 level codes, -1 when missing
+    job_index: np.ndarray  # (fields,) int
+    tier_index: np.ndarray  # (fields,) int8 index into TIERS
+    field_thresholds: np.ndarray  # (fields,) the fields' own thresholds, 0 when none
+
+    def __len__(self) -> int:
+        return len(self.field_names)
+
+
+@dataclass(frozen=True)
+class ScoredBatch:
+    """Rescoring outcome for a batch of jobs."""
+
+    job_ids: tuple[object, ...]
+    confidence: np.ndarray  # (fields,)
+    below_threshold: np.ndarray  # (fields,) bool
+    requires_review: np.ndarray  # (jobs,) bool
+    review_priority: np.ndarray  # (jobs,) int, 1-10; 0 when no review is needed
+
+    def review_updates(self) -> list[tuple[object, bool, int | None]]:
+        """``(job_id, requires_review, review_priority)`` rows for a bulk update."""
+        return [
+            (job_id, bool(flag), int(priority) if flag else None)
+            for job_id, flag, priority in zip(
+                self.job_ids, self.requires_review, self.review_priority, strict=True
+            )
+        ]
+
+
+class ConfidenceScorer:
+    """Vectorized PRD §4.4 confidence scoring.
+
+    Usage:
+        scorer = ConfidenceScorer()
+        encoded = scorer.encode({job_id: {name: FieldEvidence(...), ...}, ...})
+        batch = scorer.score_batch(encoded)
+        rows = batch.review_updates()  # (job_id, requires_review, review_priority)
+        tuned = ConfidenceScorer(weights={**CONFIDENCE_WEIGHTS, "llm_certainty": 0.2})
+        rescored = tuned.score_batch(encoded)  # no re-encoding
+    """
+
+    def __init__(
+        self,
+        weights: Mapping[str, float] | None = None,
+        levels: Mapping[str, Mapping[str, float]] | None = None,
+        thresholds: Mapping[ReviewTier, float] | None = None,
+    ):
+        """Initialize the scorer.
+
+        Args:
+            weights: Weight per factor. Defaults to :data:`CONFIDENCE_WEIGHTS`.
+            levels: Level scores per factor. Defaults to :data:`CONFIDENCE_FACTORS`;
+                level names (and their order) must stay the same, only scores change.
+            thresholds: Threshold per review tier. Defaults to :data:`REVIEW_THRESHOLDS`.
+
+        Raises:
+            ConfidenceScoringError: If a factor is unknown.
+        """
+        weights = {**CONFIDENCE_WEIGHTS, **(weights or {})}
+        levels = {**CONFIDENCE_FACTORS, **(levels or {})}
+        unknown = (set(weights) | set(levels)) - set(FACTORS)
+        if unknown:
+            raise ConfidenceScoringError(f"Unknown confidence factors: {sorted(unknown)}")
+        self.weights = np.array([weights[f] for f in FACTORS], dtype=np.float64)
+        self.level_names = {f: tuple(CONFIDENCE_FACTORS[f]) for f in FACTORS}
+        self._codes = {f: {name: i for i, name in enumerate(self.level_names[f])} for f in FACTORS}
+        width = max(len(names) for names in self.level_names.values())
+        # (factors, levels) score table; the extra last column is the "missing" slot
+        self.table = np.full((len(FACTORS), width + 1), np.nan)
+        for i, factor in enumerate(FACTORS):
+            for name, code in self._codes[factor].items():
+                self.table[i, code] = levels[factor][name]
+        tier_thresholds = {**REVIEW_THRESHOLDS, **(thresholds or {})}
+        self.tier_thresholds = np.array([tier_thresholds[t] for t in TIERS], dtype=np.float64)
+        self._tier_boost = np.array([TIER_PRIORITY_BOOST[t] for t in TIERS], dtype=np.int64)
+
+    def _encode_row(self, evidence: FieldEvidence) -> tuple[int, ...]:
+        row = []
+        for factor in FACTORS:
+            level = getattr(evidence, factor)
+            if level is None:
+                row.append(_MISSING)
+                continue
+            code = self._codes[factor].get(level)
+            if code is None:
+                raise ConfidenceScoringError(f"Unknown {factor} level {level!r}")
+            row.append(code)
+        return tuple(row)
+
+    def encode(
+        self,
+        jobs: Mapping[object, Mapping[str, FieldEvidence]],
+        field_thresholds: Mapping[str, float] | None = None,
+        field_categories: Mapping[str, str | None] | None = None,
+    ) -> EncodedEvidence:
+        """Encode the factor levels of many jobs' fields.
+
+        Each distinct evidence combination and field name is encoded once.
+
+        Args:
+            jobs: Evidence per field, per job id.
+            field_thresholds: Fields' own ``confidence_threshold`` values, applied
+                when stricter than their tier's.
+            field_categories: Fields' ``field_category``, which decides their tier
+                when it names one.
+
+        Raises:
+            ConfidenceScoringError: If a level is unknown.
+        """
+        field_thresholds = field_thresholds or {}
+        field_categories = field_categories or {}
+        tier_of = {tier: i for i, tier in enumerate(TIERS)}
+        job_ids = tuple(jobs)
+        rows: dict[FieldEvidence, tuple[int, ...]] = {}
+        per_name: dict[str, tuple[int, float]] = {}
+        codes: list[tuple[int, ...]] = []
+        names: list[str] = []
+        tiers: list[int] = []
+        thresholds: list[float] = []
+        job_index: list[int] = []
+        for j, job_id in enumerate(job_ids):
+            for name, evidence in jobs[job_id].items():
+                row = rows.get(evidence)
+                if row is None:
+                    row = rows[evidence] = self._encode_row(evidence)
+                tier = per_name.get(name)
+                if tier is None:
+                    tier = per_name[name] = (
+                        tier_of[field_tier(name, field_categories.get(name))],
+                        field_thresholds.get(name, 0.0),
+                    )
+                codes.append(row)
+                names.append(name)
+                tiers.append(tier[0])
+                thresholds.append(tier[1])
+                job_index.append(j)
+        return EncodedEvidence(
+            job_ids=job_ids,
+            field_names=tuple(names),
+            codes=np.array(codes, dtype=np.int8).reshape(len(codes), len(FACTORS)),
+            job_index=np.array(job_index, dtype=np.int64),
+            tier_index=np.array(tiers, dtype=np.int8),
+            field_thresholds=np.array(thresholds, dtype=np.float64),
+        )
+
+    def factor_scores(self, encoded: EncodedEvidence) -> np.ndarray:
+        """(fields, factors) factor scores; NaN where a factor is missing."""
+        return self.table[np.arange(len(FACTORS)), encoded.codes]
+
+    def confidence(self, encoded: EncodedEvidence) -> np.ndarray:
+        """Weighted average of each field's present factors."""
+        scores = self.factor_scores(encoded)
+        present = ~np.isnan(scores)
+        weighted = np.where(present, scores, 0.0) @ self.weights
+        total = present @ self.weights
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(total > 0, weighted / total, 0.0)
+
+    def thresholds(self, encoded: EncodedEvidence) -> np.ndarray:
+        """Threshold each field must reach."""
+        return np.maximum(self.tier_thresholds[encoded.tier_index], encoded.field_thresholds)
+
+    def score_batch(self, encoded: EncodedEvidence) -> ScoredBatch:
+        """Score every field and derive per-job review flags.
+
+        A job requires review when any field is below its threshold. Its
+        priority (1-10) grows with the worst shortfall, one point per 0.05, plus
+        :data:`TIER_PRIORITY_BOOST` for the tier of the field furthest below.
+        """
+        confidence = self.confidence(encoded)
+        shortfall = np.maximum(self.thresholds(encoded) - confidence, 0.0)
+        below = shortfall > 1e-9
+        jobs = len(encoded.job_ids)
+
+        worst = np.zeros(jobs)
+        np.maximum.at(worst, encoded.job_index, shortfall)
+        requires_review = worst > 1e-9
+
+        # Tier boost of the worst field per job (ties favour the stricter tier)
+        boost = np.zeros(jobs, dtype=np.int64)
+        is_worst = below & (shortfall >= worst[encoded.job_index] - 1e-9)
+        np.maximum.at(
+            boost,
+            encoded.job_index[is_worst],
+            self._tier_boost[encoded.tier_index[is_worst]],
+        )
+        priority = np.clip(1 + np.floor(worst / 0.05).astype(np.int64) + boost, 1, 10)
+        return ScoredBatch(
+            job_ids=encoded.job_ids,
+            confidence=confidence,
+            below_threshold=below,
+            requires_review=requires_review,
+            review_priority=np.where(requires_review, priority, 0),
+        )
+
+    def score(self, evidence: Mapping[str, FieldEvidence]) -> dict[str, float]:
+        """Confidence of each field of one job."""
+        encoded = self.encode({None: evidence})
+        return dict(zip(encoded.field_names, self.confidence(encoded).tolist(), strict=True))
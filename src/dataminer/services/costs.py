@@ -0,0 +1,124 @@
+"""LLM pricing and per-job cost accounting.
+
+:class:`JobCostLedger` accumulates the cost of a job's LLM calls per
+``extraction_jobs`` cost column (``cost_llm_quick``, ``cost_llm_detailed``,
+``cost_llm_validation``) together with what cache hits saved, so the job
+row and cost reports can be written from one place. The savings are written
+next to the costs as ``cost_llm_cache_savings``, ``tokens_saved_total`` and
+``llm_cache_hits``.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from dataminer.services.llm_client import LLMPass, LLMResponse
+
+logger = logging.getLogger(__name__)
+
+_PER_MILLION = Decimal(1_000_000)
+
+
+@dataclass(frozen=True, slots=True)
+class ModelPrice:
+    """USD price per million input and output tokens."""
+
+    input_per_million: Decimal
+    output_per_million: Decimal
+
+    def cost(self, prompt_tokens: int, output_tokens: int) -> Decimal:
+        """Cost of a call with the given token counts."""
+        return (
+            self.input_per_million * prompt_tokens + self.output_per_million * output_tokens
+        ) / _PER_MILLION
+
+
+MODEL_PRICES: dict[str, ModelPrice] = {
+    "gemini-1.5-flash": ModelPrice(Decimal("0.075"), Decimal("0.30")),
+    "gemini-1.5-pro": ModelPrice(Decimal("1.25"), Decimal("5.00")),
+    "gemini-2.0-flash": ModelPrice(Decimal("0.10"), Decimal("0.40")),
+}
+# Unknown models are priced like the most expensive known model, so budgets err safe.
+FALLBACK_PRICE = max(MODEL_PRICES.values(), key=lambda price: price.output_per_million)
+
+# extraction_jobs cost column charged for each pass. The deep dive runs on the
+# detailed model and has no column of its own.
+PASS_COST_COLUMNS: dict[str, str] = {
+    "quick": "cost_llm_quick",
+    "detailed": "cost_llm_detailed",
+    "validation": "cost_llm_validation",
+    "deep_dive": "cost_llm_detailed",
+}
+
+
+def model_price(model: str) -> ModelPrice:
+    """Price for ``model``, matching versioned names such as ``gemini-1.5-pro-002``."""
+    price = MODEL_PRICES.get(model)
+    if price is None:
+        for name, candidate in MODEL_PRICES.items():
+            if model.startswith(name):
+                return candidate
+        logger.warning("No price for model, using fallback price", extra={"model": model})
+        return FALLBACK_PRICE
+    return price
+
+
+def call_cost(model: str, prompt_tokens: int, output_tokens: int) -> Decimal:
+    """USD cost of one call to ``model``."""
+    return model_price(model).cost(prompt_tokens, output_tokens)
+
+
+@dataclass
+class JobCostLedger:
+    """Running LLM cost of one extraction job."""
+
+    costs: dict[str, Decimal] = field(default_factory=dict)
+    savings: dict[str, Decimal] = field(default_factory=dict)
+    tokens_used_total: int = 0
+    tokens_saved_total: int = 0
+    calls: int = 0
+    cache_hits: int = 0
+
+    def record(self, llm_pass: LLMPass, response: LLMResponse) -> Decimal:
+        """Record a call; cache hits count as savings instead of cost.
+
+        Returns:
+            The cost of the call had it been paid for.
+        """
+        column = PASS_COST_COLUMNS[llm_pass]
+        cost = call_cost(response.model, response.prompt_tokens, response.output_tokens)
+        self.calls += 1
+        if response.cached:
+            self.cache_hits += 1
+            self.savings[column] = self.savings.get(column, Decimal(0)) + cost
+            self.tokens_saved_total += response.total_tokens
+        else:
+            self.costs[column] = self.costs.get(column, Decimal(0)) + cost
+            self.tokens_used_total += response.total_tokens
+        return cost
+
+    @property
+    def total_cost(self) -> Decimal:
+        """Cost actually paid."""
+        return sum(self.costs.values(), Decimal(0))
+
+    @property
+    def total_saved(self) -> Decimal:
+        """Cost avoided by cache hits."""
+        return sum(self.savings.values(), Decimal(0))
+
+    def job_columns(self) -> dict[str, Decimal | int]:
+        """Values for the ``extraction_jobs`` LLM cost, token and cache savings columns."""
+        columns: dict[str, Decimal | int] = {
+            column: self.costs.get(column, Decimal(0)).quantize(Decimal("0.0001"))
+            for column in dict.fromkeys(PASS_COST_COLUMNS.values())
+        }
+        columns["tokens_used_total"] = self.tokens_used_total
+        columns["cost_llm_cache_savings"] = self.total_saved.quantize(Decimal("0.0001"))
+        columns["tokens_saved_total"] = self.tokens_saved_total
+        columns["llm_cache_hits"] = self.cache_hits
+        return columns
@@ -0,0 +1,284 @@
+"""Document storage and retrieval.
+
+:class:`DocumentStore` gives documents GCS-style object semantics:
+
+- keys are content-addressed (``sha256/<aa>/<sha256>``), so the same PDF is
+  stored once no matter how many jobs reference it;
+- uploads are streamed and hashed on the way in, never buffered whole;
+- reads can be ranged, so large PDFs can be processed without loading them.
+
+:class:`LocalDocumentStore` implements it on the local filesystem and is used
+for development and tests.
+
+:class:`DocumentFetcher` downloads ``document_url`` sources into a store over
+one shared, pooled HTTP/2 client with a per-host concurrency cap, so fetching
+many documents from the same court site reuses connections instead of opening
+a new TLS session per document.
+"""
+
+from __future__ import annotations
+
+import abc
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+from collections import defaultdict
+from collections.abc import AsyncIterable, AsyncIterator
+from dataclasses import dataclass
+from pathlib import Path
+
+import httpx
+
+from dataminer.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+
+class DocumentNotFoundError(KeyError):
+    """Raised when a key does not exist in the store."""
+
+
+class DocumentFetchError(Exception):
+    """Raised when a document cannot be downloaded."""
+
+
+@dataclass(frozen=True, slots=True)
+class StoredObject:
+    """Metadata of a stored document."""
+
+    key: str
+    sha256: str
+    size: int
+
+
+def content_key(sha256: str) -> str:
+    """Content-addressed key for a document with the given hex sha256."""
+    return f"sha256/{sha256[:2]}/{sha256}"
+
+
+class DocumentStore(abc.ABC):
+    """Content-addressed document storage."""
+
+    @abc.abstractmethod
+    async def put_stream(self, chunks: AsyncIterable[bytes]) -> StoredObject:
+        """Store a document from a stream of chunks, hashing it on the way in."""
+
+    @abc.abstractmethod
+    async def stat(self, key: str) -> StoredObject:
+        """Return metadata for ``key``.
+
+        Raises:
+            DocumentNotFoundError: If the key does not exist.
+        """
+
+    @abc.abstractmethod
+    async def read_range(self, key: str, start: int, length: int) -> bytes:
+        """Read ``length`` bytes of ``key`` starting at ``start``.
+
+        Raises:
+            DocumentNotFoundError: If the key does not exist.
+        """
+
+    @abc.abstractmethod
+    def stream(self, key: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        """Read ``key`` as a stream of chunks."""
+
+    @abc.abstractmethod
+    async def local_path(self, key: str) -> Path:
+        """Return a local file with the document's content.
+
+        Backends on local disk return the stored file itself; remote backends
+        spool the object to a local file first. Processing opens this path so
+        that MuPDF range-reads it instead of loading it into memory.
+        """
+
+    async def exists(self, key: str) -> bool:
+        """Check whether ``key`` exists."""
+        try:
+            await self.stat(key)
+        except DocumentNotFoundError:
+            return False
+        return True
+
+    async def put_file(self, path: str | Path) -> StoredObject:
+        """Store a local file."""
+
+        async def chunks() -> AsyncIterator[bytes]:
+            with Path(path).open("rb") as file:
+                while chunk := await asyncio.to_thread(file.read, DEFAULT_CHUNK_SIZE):
+                    yield chunk
+
+        return await self.put_stream(chunks())
+
+
+def _move_into_place(tmp_path: Path, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path.replace(path)
+
+
+def _read_range(path: Path, start: int, length: int) -> bytes:
+    with path.open("rb") as file:
+        file.seek(start)
+        return file.read(length)
+
+
+class LocalDocumentStore(DocumentStore):
+    """Document store on the local filesystem."""
+
+    def __init__(self, root: str | Path | None = None):
+        """Initialize the store.
+
+        Args:
+            root: Storage directory. Defaults to ``settings.document_store_dir``.
+        """
+        self.root = Path(root or get_settings().document_store_dir)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if not path.is_relative_to(self.root.resolve()):
+            raise DocumentNotFoundError(key)
+        return path
+
+    async def put_stream(self, chunks: AsyncIterable[bytes]) -> StoredObject:
+        """Store a document from a stream of chunks, hashing it on the way in."""
+        digest = hashlib.sha256()
+        size = 0
+        handle, tmp_name = await asyncio.to_thread(
+            tempfile.mkstemp, prefix=".upload-", dir=self.root
+        )
+        try:
+            with os.fdopen(handle, "wb") as tmp:
+                async for chunk in chunks:
+                    digest.update(chunk)
+                    size += len(chunk)
+                    await asyncio.to_thread(tmp.write, chunk)
+
+            sha256 = digest.hexdigest()
+            key = content_key(sha256)
+            # Same content, same key: an existing object is already correct.
+            await asyncio.to_thread(_move_into_place, Path(tmp_name), self._path(key))
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+        return StoredObject(key=key, sha256=sha256, size=size)
+
+    async def stat(self, key: str) -> StoredObject:
+        """Return metadata for ``key``."""
+        try:
+            size = self._path(key).stat().st_size
+        except FileNotFoundError as e:
+            raise DocumentNotFoundError(key) from e
+        return StoredObject(key=key, sha256=key.rsplit("/", 1)[-1], size=size)
+
+    async def read_range(self, key: str, start: int, length: int) -> bytes:
+        """Read ``length`` bytes of ``key`` starting at ``start``."""
+        try:
+            return await asyncio.to_thread(_read_range, self._path(key), start, length)
+        except FileNotFoundError as e:
+            raise DocumentNotFoundError(key) from e
+
+    async def stream(self, key: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        """Read ``key`` as a stream of chunks."""
+        try:
+            file = self._path(key).open("rb")
+        except FileNotFoundError as e:
+            raise DocumentNotFoundError(key) from e
+        with file:
+            while chunk := await asyncio.to_thread(file.read, chunk_size):
+                yield chunk
+
+    async def local_path(self, key: str) -> Path:
+        """Return the stored file itself."""
+        path = self._path(key)
+        if not path.exists():
+            raise DocumentNotFoundError(key)
+        return path
+
+
+class DocumentFetcher:
+    """Download documents into a store over a shared, pooled HTTP/2 client.
+
+    Usage:
+        async with DocumentFetcher(store) as fetcher:
+            stored = await fetcher.fetch(job.document_url)
+    """
+
+    def __init__(
+        self,
+        store: DocumentStore,
+        client: httpx.AsyncClient | None = None,
+        max_connections: int | None = None,
+        max_per_host: int | None = None,
+        timeout_seconds: float | None = None,
+    ):
+        """Initialize the fetcher.
+
+        Args:
+            store: Store that receives downloaded documents.
+            client: HTTP client to use instead of an owned pooled client.
+            max_connections: Pool size. Defaults to ``settings.http_max_connections``.
+            max_per_host: Concurrent downloads per host. Defaults to
+                ``settings.http_max_downloads_per_host``.
+            timeout_seconds: Connect/read timeout. Defaults to ``settings.http_timeout_seconds``.
+        """
+        settings = get_settings()
+        self.store = store
+        self.max_per_host = max_per_host or settings.http_max_downloads_per_host
+        if client is None:
+            max_connections = max_connections or settings.http_max_connections
+            client = httpx.AsyncClient(
+                http2=True,
+                follow_redirects=True,
+                timeout=httpx.Timeout(timeout_seconds or settings.http_timeout_seconds),
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections,
+                ),
+            )
+            self._owns_client = True
+        else:
+            self._owns_client = False
+        self.client = client
+        self._host_slots: defaultdict[str, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(self.max_per_host)
+        )
+
+    async def close(self) -> None:
+        """Close the owned HTTP client."""
+        if self._owns_client:
+            await self.client.aclose()
+
+    async def __aenter__(self) -> DocumentFetcher:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.close()
+
+    async def fetch(self, url: str) -> StoredObject:
+        """Stream ``url`` into the store, hashing as it downloads.
+
+        Raises:
+            DocumentFetchError: If the request fails or returns an error status.
+        """
+        host = httpx.URL(url).host
+        async with self._host_slots[host]:
+            try:
+                async with self.client.stream("GET", url) as response:
+                    response.raise_for_status()
+                    stored = await self.store.put_stream(
+                        response.aiter_bytes(chunk_size=DEFAULT_CHUNK_SIZE)
+                    )
+            except httpx.HTTPError as e:
+                raise DocumentFetchError(f"Failed to download {url}: {e}") from e
+
+        logger.info(
+            "Document downloaded",
+            extra={"url": url, "key": stored.key, "size": stored.size},
+        )
+        return stored
@@ -0,0 +1,233 @@
+"""Deterministic field extraction ahead of the LLM passes.
+
+Fields whose ``extraction_method`` is ``regex`` or ``hybrid`` are resolved with
+their ``regex_pattern`` before any prompt is built. Patterns are compiled once
+per source and grouped by ``extraction_section``, so each section's text is
+only searched by the patterns that belong to it. A regex match gets the PRD's
+0.95 ``regex_match`` confidence; resolved fields are dropped from the LLM field
+list, which shrinks prompts and can remove whole calls. Unmatched fields fall
+through to the LLM.
+
+The value is the pattern's ``value`` named group if it has one, else its first
+group, else the whole match.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from collections import defaultdict
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import TYPE_CHECKING, Any
+
+from dataminer.services.segmentation import SectionSpan, section_name
+
+if TYPE_CHECKING:
+    from dataminer.db.queries.models import SourceFieldDefinition
+
+logger = logging.getLogger(__name__)
+
+REGEX_CONFIDENCE = 0.95
+WHOLE_DOCUMENT = "*"
+
+# Methods resolved (or attempted) by regex, and methods answered by the LLM.
+REGEX_METHODS = frozenset({"regex", "hybrid"})
+LLM_METHODS = frozenset({"llm", "hybrid", "regex"})
+
+
+class InvalidFieldPatternError(ValueError):
+    """Raised when a field's ``regex_pattern`` cannot be compiled."""
+
+
+@dataclass(frozen=True, slots=True)
+class FieldDefinition:
+    """Extraction configuration of one field."""
+
+    field_name: str
+    extraction_method: str = "llm"
+    extraction_section: str | None = None
+    regex_pattern: str | None = None
+    field_category: str | None = None
+    field_type: str | None = None
+    is_required: bool = False
+    confidence_threshold: float = 0.75
+    validation_rules: dict[str, Any] | None = None
+    llm_prompt_template_id: str | None = None
+
+    @classmethod
+    def from_model(cls, model: SourceFieldDefinition) -> FieldDefinition:
+        """Create a definition from a ``source_field_definitions`` row."""
+        threshold = model.confidence_threshold
+        return cls(
+            field_name=model.field_name,
+            extraction_method=(model.extraction_method or "llm").lower(),
+            extraction_section=model.extraction_section,
+            regex_pattern=model.regex_pattern,
+            field_category=model.field_category,
+            field_type=model.field_type,
+            is_required=bool(model.is_required),
+            confidence_threshold=float(threshold if threshold is not None else Decimal("0.75")),
+            validation_rules=model.validation_rules,  # type: ignore[arg-type]
+            llm_prompt_template_id=(
+                str(model.llm_prompt_template_id) if model.llm_prompt_template_id else None
+            ),
+        )
+
+    @property
+    def section(self) -> str:
+        """Canonical section searched for the field."""
+        if not self.extraction_section or self.extraction_section.strip() in ("", "*", "all"):
+            return WHOLE_DOCUMENT
+        return section_name(self.extraction_section)
+
+
+@dataclass(frozen=True, slots=True)
+class ExtractedField:
+    """A field value with its provenance."""
+
+    field_name: str
+    value: Any
+    confidence: float
+    method: str
+    section: str | None = None
+    start: int | None = None
+    end: int | None = None
+
+    @classmethod
+    def from_answer(cls, field_name: str, raw: Any, section: str | None = None) -> ExtractedField:
+        """Field from an LLM answer: a ``{"value", "confidence"}`` object or a bare value.
+
+        A bare value, a missing or non-numeric confidence, and a null value all
+        get confidence 0; reported confidences are clamped to ``[0, 1]``.
+        """
+        if isinstance(raw, dict) and "value" in raw:
+            value = raw["value"]
+            reported = raw.get("confidence")
+            if isinstance(reported, int | float) and not isinstance(reported, bool):
+                confidence = min(max(float(reported), 0.0), 1.0)
+            else:
+                confidence = 0.0
+        else:
+            value, confidence = raw, 0.0
+        return cls(
+            field_name=field_name,
+            value=value,
+            confidence=confidence if value is not None else 0.0,
+            method="llm",
+            section=section,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class _CompiledField:
+    definition: FieldDefinition
+    regex: re.Pattern[str]
+    group: int | str
+
+
+@dataclass
+class FieldResolution:
+    """Outcome of deterministic extraction for one document."""
+
+    resolved: dict[str, ExtractedField] = field(default_factory=dict)
+    remaining: list[FieldDefinition] = field(default_factory=list)
+
+    @property
+    def llm_field_names(self) -> list[str]:
+        """Fields still to be extracted by the LLM."""
+        return [definition.field_name for definition in self.remaining]
+
+    def remaining_by_section(self) -> dict[str, list[FieldDefinition]]:
+        """Fields still to be extracted, grouped by section."""
+        grouped: dict[str, list[FieldDefinition]] = defaultdict(list)
+        for definition in self.remaining:
+            grouped[definition.section].append(definition)
+        return dict(grouped)
+
+
+def _compile(definition: FieldDefinition) -> _CompiledField:
+    try:
+        regex = re.compile(definition.regex_pattern or "", re.MULTILINE)
+    except re.error as e:
+        raise InvalidFieldPatternError(f"Field '{definition.field_name}': {e}") from e
+    group: int | str = "value" if "value" in regex.groupindex else (1 if regex.groups else 0)
+    return _CompiledField(definition, regex, group)
+
+
+class RegexFieldExtractor:
+    """Resolves regex-extractable fields of a source before the LLM passes.
+
+    Usage:
+        extractor = RegexFieldExtractor(FieldDefinition.from_model(m) for m in rows)
+        resolution = extractor.extract(text, spans)
+        prompt_fields = resolution.remaining
+    """
+
+    def __init__(self, definitions: Iterable[FieldDefinition]):
+        """Compile every regex and hybrid field's pattern, grouped by section.
+
+        Raises:
+            InvalidFieldPatternError: If a pattern does not compile.
+        """
+        self.definitions = tuple(definitions)
+        self._by_section: dict[str, list[_CompiledField]] = defaultdict(list)
+        for definition in self.definitions:
+            if definition.extraction_method in REGEX_METHODS and definition.regex_pattern:
+                self._by_section[definition.section].append(_compile(definition))
+
+    @property
+    def sections(self) -> list[str]:
+        """Sections that have regex fields."""
+        return list(self._by_section)
+
+    def extract(self, text: str, spans: Sequence[SectionSpan] = ()) -> FieldResolution:
+        """Resolve regex fields in ``text`` and list the fields left for the LLM.
+
+        Args:
+            text: Document text.
+            spans: Section spans of ``text``. Fields whose section is not found
+                are searched in the whole document.
+        """
+        located: dict[str, SectionSpan] = {}
+        for span in spans:
+            located.setdefault(span.section, span)
+
+        resolution = FieldResolution()
+        for section, compiled_fields in self._by_section.items():
+            found = located.get(section)
+            start = found.start if found is not None else 0
+            end = found.end if found is not None else len(text)
+            for compiled in compiled_fields:
+                match = compiled.regex.search(text, start, end)
+                if match is None:
+                    continue
+                value = match.group(compiled.group)
+                if value is None or not value.strip():
+                    continue
+                name = compiled.definition.field_name
+                resolution.resolved[name] = ExtractedField(
+                    field_name=name,
+                    value=" ".join(value.split()),
+                    confidence=REGEX_CONFIDENCE,
+                    method="regex",
+                    section=found.section if found is not None else None,
+                    start=match.start(compiled.group),
+                    end=match.end(compiled.group),
+                )
+
+        resolution.remaining = [
+            definition
+            for definition in self.definitions
+            if definition.extraction_method in LLM_METHODS
+            and definition.field_name not in resolution.resolved
+        ]
+        logger.debug(
+            "Regex fields resolved",
+            extra={
+                "resolved": len(resolution.resolved),
+                "remaining_for_llm": len(resolution.remaining),
+            },
+        )
+        return resolution
@@ -0,0 +1,375 @@
+"""Two-tier cache of LLM responses.
+
+Retries, reprocessing after a profile change and sections repeated across
+appeal documents all resend identical prompts. At low temperature the answer is
+effectively deterministic, so it is cached under
+``(template_id, template_version, model, temperature, sha256(prompt))``:
+
+- an in-process LRU front tier (bounded by entries, bytes and TTL) answers
+  repeats within a worker without a network round trip;
+- Redis is the shared tier across workers, with its own TTL. Entries larger
+  than ``llm_cache_max_entry_bytes`` are not stored; the Redis instance itself
+  should run with an ``allkeys-lru`` ``maxmemory`` policy.
+
+Identical prompts in flight at the same time are computed once. Within a worker,
+concurrent callers share one in-flight task per key; across workers, the first
+to miss takes a short Redis lock (``SET NX``) and the others poll Redis for its
+answer until the lock is released or expires, then fall back to calling the model.
+Callers served this way are recorded as cache hits.
+
+Bumping a template's version changes the key, so edited prompts never hit stale
+answers. The cache is best-effort: Redis errors are logged and the call goes to
+the model. Hits are recorded in the job's :class:`~dataminer.services.costs.JobCostLedger`
+as savings rather than cost.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING, Any, Protocol
+
+from dataminer.core.config import get_settings
+from dataminer.services.llm_client import LLMClient, LLMPass, LLMResponse
+
+if TYPE_CHECKING:
+    from dataminer.services.costs import JobCostLedger
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "dataminer:llm:v1"
+LOCK_POLL_SECONDS = 0.25
+
+
+class RedisLike(Protocol):
+    """The subset of ``redis.asyncio.Redis`` the cache uses."""
+
+    async def get(self, name: str) -> Any:
+        """Get a value."""
+        ...
+
+    async def set(self, name: str, value: bytes, ex: int | None = None, *, nx: bool = False) -> Any:
+        """Set a value with an expiry in seconds, only if absent when ``nx``."""
+        ...
+
+    async def delete(self, *names: str) -> Any:
+        """Delete keys."""
+        ...
+
+
+@dataclass(frozen=True, slots=True)
+class CacheKey:
+    """Identity of a cacheable LLM call."""
+
+    template_id: str
+    template_version: int
+    model: str
+    temperature: float
+    prompt_sha256: str
+
+    @classmethod
+    def for_prompt(
+        cls, template_id: str, template_version: int, model: str, temperature: float, prompt: str
+    ) -> CacheKey:
+        """Key for a rendered prompt."""
+        return cls(
+            template_id=str(template_id),
+            template_version=template_version,
+            model=model,
+            temperature=round(temperature, 2),
+            prompt_sha256=hashlib.sha256(prompt.encode("utf-8")).hexdigest(),
+        )
+
+    @property
+    def redis_key(self) -> str:
+        """Redis key of the entry."""
+        return (
+            f"{KEY_PREFIX}:{self.template_id}:{self.template_version}:{self.model}:"
+            f"{self.temperature:.2f}:{self.prompt_sha256}"
+        )
+
+    @property
+    def lock_key(self) -> str:
+        """Redis key of the lock held while the entry is computed."""
+        return f"{self.redis_key}:lock"
+
+
+def _encode(response: LLMResponse) -> bytes:
+    return json.dumps(
+        {
+            "text": response.text,
+            "model": response.model,
+            "prompt_tokens": response.prompt_tokens,
+            "output_tokens": response.output_tokens,
+        },
+        ensure_ascii=False,
+    ).encode("utf-8")
+
+
+def _decode(data: bytes) -> LLMResponse:
+    payload = json.loads(data)
+    return LLMResponse(
+        text=payload["text"],
+        model=payload["model"],
+        prompt_tokens=payload["prompt_tokens"],
+        output_tokens=payload["output_tokens"],
+        latency_ms=0.0,
+        attempts=0,
+        cached=True,
+    )
+
+
+class MemoryTier:
+    """Bounded in-process LRU of encoded responses with a TTL."""
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: float):
+        """Initialize the tier."""
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self.size_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> bytes | None:
+        """Return a live entry, dropping it if it has expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, data = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """Store an entry, evicting the least recently used beyond the limits."""
+        if len(data) > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, data)
+        self.size_bytes += len(data)
+        while len(self._entries) > self.max_entries or self.size_bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str) -> None:
+        _, data = self._entries.pop(key)
+        self.size_bytes -= len(data)
+
+
+class LLMResponseCache:
+    """LLM calls served from an in-process tier, then Redis, then the model.
+
+    Usage:
+        cache = LLMResponseCache(llm, redis=redis_client)
+        response = await cache.generate(
+            prompt, template_id=t.template_id, template_version=t.version,
+            model=profile.llm_model_quick, llm_pass="quick", ledger=job_costs,
+        )
+    """
+
+    def __init__(
+        self,
+        llm: LLMClient,
+        redis: RedisLike | None = None,
+        ttl_seconds: int | None = None,
+        max_entry_bytes: int | None = None,
+        max_temperature: float | None = None,
+        memory_max_entries: int | None = None,
+        memory_max_mb: int | None = None,
+        memory_ttl_seconds: int | None = None,
+        lock_seconds: int | None = None,
+    ):
+        """Initialize the cache.
+
+        Args:
+            llm: Client used on a miss.
+            redis: Shared tier. Without it only the in-process tier is used.
+            ttl_seconds: Redis entry TTL. Defaults to ``settings.llm_cache_ttl_seconds``.
+            max_entry_bytes: Largest response stored. Defaults to
+                ``settings.llm_cache_max_entry_bytes``.
+            max_temperature: Calls above this temperature bypass the cache. Defaults
+                to ``settings.llm_cache_max_temperature``.
+            memory_max_entries: In-process entries. Defaults to
+                ``settings.llm_cache_memory_entries``.
+            memory_max_mb: In-process size. Defaults to ``settings.llm_cache_memory_mb``.
+            memory_ttl_seconds: In-process TTL. Defaults to
+                ``settings.llm_cache_memory_ttl_seconds``.
+            lock_seconds: Expiry of the cross-worker lock on a missed key. Defaults
+                to ``settings.llm_cache_lock_seconds``.
+        """
+        settings = get_settings()
+        self.llm = llm
+        self.redis = redis
+        self.ttl_seconds = ttl_seconds or settings.llm_cache_ttl_seconds
+        self.max_entry_bytes = max_entry_bytes or settings.llm_cache_max_entry_bytes
+        self.max_temperature = (
+            max_temperature if max_temperature is not None else settings.llm_cache_max_temperature
+        )
+        self.memory = MemoryTier(
+            max_entries=memory_max_entries or settings.llm_cache_memory_entries,
+            max_bytes=(memory_max_mb or settings.llm_cache_memory_mb) * 1024 * 1024,
+            ttl_seconds=memory_ttl_seconds or settings.llm_cache_memory_ttl_seconds,
+        )
+        self.lock_seconds = lock_seconds or settings.llm_cache_lock_seconds
+        self._inflight: dict[str, asyncio.Task[tuple[LLMResponse, bool]]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @classmethod
+    def from_settings(cls, llm: LLMClient, **kwargs: Any) -> LLMResponseCache:
+        """Create a cache backed by ``settings.redis_url``."""
+        from redis.asyncio import Redis
+
+        settings = get_settings()
+        redis = Redis.from_url(
+            str(settings.redis_url), max_connections=settings.redis_max_connections
+        )
+        return cls(llm, redis=redis, **kwargs)
+
+    async def _redis_get(self, key: str) -> bytes | None:
+        if self.redis is None:
+            return None
+        try:
+            data = await self.redis.get(key)
+        except Exception as e:
+            logger.warning("LLM cache read failed", extra={"error": str(e)})
+            return None
+        return bytes(data) if data is not None else None
+
+    async def _redis_set(self, key: str, data: bytes) -> None:
+        if self.redis is None:
+            return
+        try:
+            await self.redis.set(key, data, ex=self.ttl_seconds)
+        except Exception as e:
+            logger.warning("LLM cache write failed", extra={"error": str(e)})
+
+    async def lookup(self, key: CacheKey) -> LLMResponse | None:
+        """Return a cached response from either tier."""
+        redis_key = key.redis_key
+        data = self.memory.get(redis_key)
+        if data is None:
+            data = await self._redis_get(redis_key)
+            if data is None:
+                return None
+            self.memory.put(redis_key, data)
+        return _decode(data)
+
+    async def store(self, key: CacheKey, response: LLMResponse) -> None:
+        """Store a response in both tiers if it is within the size limit."""
+        data = _encode(response)
+        if len(data) > self.max_entry_bytes:
+            return
+        self.memory.put(key.redis_key, data)
+        await self._redis_set(key.redis_key, data)
+
+    async def _acquire(self, key: CacheKey) -> bool | None:
+        """Take the cross-worker lock: True if taken, False if held elsewhere, None if no Redis."""
+        if self.redis is None:
+            return None
+        try:
+            return bool(await self.redis.set(key.lock_key, b"1", ex=self.lock_seconds, nx=True))
+        except Exception as e:
+            logger.warning("LLM cache lock failed", extra={"error": str(e)})
+            return None
+
+    async def _release(self, key: CacheKey) -> None:
+        if self.redis is None:
+            return
+        try:
+            await self.redis.delete(key.lock_key)
+        except Exception as e:
+            logger.warning("LLM cache unlock failed", extra={"error": str(e)})
+
+    async def _wait_for(self, key: CacheKey) -> LLMResponse | None:
+        """Poll Redis for another worker's answer while it holds the lock."""
+        deadline = time.monotonic() + self.lock_seconds
+        while time.monotonic() < deadline:
+            await asyncio.sleep(LOCK_POLL_SECONDS)
+            data = await self._redis_get(key.redis_key)
+            if data is not None:
+                self.memory.put(key.redis_key, data)
+                return _decode(data)
+            if await self._redis_get(key.lock_key) is None:
+                break
+        return None
+
+    async def _fill(
+        self, key: CacheKey, prompt: str, call: dict[str, Any]
+    ) -> tuple[LLMResponse, bool]:
+        """Serve ``key`` from the cache or compute it once; returns ``(response, hit)``."""
+        cached = await self.lookup(key)
+        if cached is not None:
+            return cached, True
+        locked = await self._acquire(key)
+        if locked is False:
+            cached = await self._wait_for(key)
+            if cached is not None:
+                return cached, True
+        try:
+            response = await self.llm.generate(prompt, **call)
+            await self.store(key, response)
+        finally:
+            if locked:
+                await self._release(key)
+        return response, False
+
+    def _forget(self, name: str, task: asyncio.Task[tuple[LLMResponse, bool]]) -> None:
+        if self._inflight.get(name) is task:
+            del self._inflight[name]
+        if not task.cancelled():
+            task.exception()  # retrieved here when every waiter was cancelled
+
+    async def generate(
+        self,
+        prompt: str,
+        *,
+        template_id: str,
+        template_version: int,
+        model: str,
+        llm_pass: LLMPass = "quick",
+        temperature: float = 0.1,
+        ledger: JobCostLedger | None = None,
+        **kwargs: Any,
+    ) -> LLMResponse:
+        """Return the cached response for ``prompt`` or call the model.
+
+        Concurrent calls for the same key wait for the first one instead of
+        calling the model again. Extra keyword arguments are passed to
+        :meth:`LLMClient.generate`.
+        """
+        call = {"model": model, "llm_pass": llm_pass, "temperature": temperature, **kwargs}
+        if temperature > self.max_temperature:
+            response = await self.llm.generate(prompt, **call)
+        else:
+            key = CacheKey.for_prompt(template_id, template_version, model, temperature, prompt)
+            name = key.redis_key
+            task = self._inflight.get(name)
+            leader = task is None
+            if task is None:
+                task = asyncio.ensure_future(self._fill(key, prompt, call))
+                self._inflight[name] = task
+                task.add_done_callback(lambda done: self._forget(name, done))
+            response, hit = await asyncio.shield(task)
+            if not leader:
+                self.coalesced += 1
+                response = replace(response, cached=True, latency_ms=0.0, attempts=0)
+            if hit or not leader:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if ledger is not None:
+            ledger.record(llm_pass, response)
+        return response
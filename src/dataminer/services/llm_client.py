@@ -0,0 +1,467 @@
+"""Pooled async client for Gemini ``generateContent`` calls.
+
+Multi-pass extraction issues many LLM calls per document, so they must not be
+serialized, and they must not overrun provider quotas either:
+
+- every call goes through one shared HTTP/2 connection pool;
+- each model has its own concurrency semaphore and request pacing
+  (``requests_per_minute``), so a burst of Pro calls cannot starve Flash calls;
+- a 429 puts the whole model into a cool-down (honoring ``Retry-After``) instead
+  of letting every in-flight call hammer the quota independently;
+- each pass has its own timeout (a quick scan should fail fast, a deep dive
+  may legitimately take longer);
+- retryable failures (429, 5xx, timeouts, connection errors) are retried with
+  full-jitter exponential backoff up to the profile's ``max_retries``;
+- long answers can be consumed as they are generated with :meth:`LLMClient.stream`.
+
+``scripts/mock_llm_server.py`` serves the same API locally with configurable
+latency and error rates for offline throughput testing.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import random
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any, Literal
+
+import httpx
+
+from dataminer.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+LLMPass = Literal["quick", "detailed", "validation", "deep_dive"]
+TokenProvider = Callable[[], Awaitable[str]]
+
+RETRYABLE_STATUS = frozenset({408, 429, 500, 502, 503, 504})
+
+
+class LLMError(Exception):
+    """Raised when an LLM call fails."""
+
+
+class LLMRateLimitError(LLMError):
+    """Raised when the provider keeps rejecting calls for quota reasons."""
+
+
+@dataclass(frozen=True, slots=True)
+class ModelLimits:
+    """Client-side limits for one model."""
+
+    concurrency: int
+    requests_per_minute: int = 0  # 0 = no pacing
+
+
+@dataclass(frozen=True, slots=True)
+class LLMResponse:
+    """Result of an LLM call."""
+
+    text: str
+    model: str
+    prompt_tokens: int
+    output_tokens: int
+    latency_ms: float
+    attempts: int
+    cached: bool = False
+
+    @property
+    def total_tokens(self) -> int:
+        """Prompt plus output tokens."""
+        return self.prompt_tokens + self.output_tokens
+
+
+@dataclass(frozen=True, slots=True)
+class LLMStreamChunk:
+    """One event of a streamed completion.
+
+    Token counts are cumulative and only set on events that carry usage.
+    """
+
+    text: str
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+    finish_reason: str | None = None
+
+
+class _ModelLimiter:
+    """Concurrency, pacing and quota cool-down for one model."""
+
+    def __init__(self, limits: ModelLimits):
+        self.limits = limits
+        self.semaphore = asyncio.Semaphore(limits.concurrency)
+        self._interval = 60.0 / limits.requests_per_minute if limits.requests_per_minute else 0.0
+        self._next_start = 0.0
+        self._cooldown_until = 0.0
+
+    async def wait_turn(self) -> None:
+        """Wait until pacing and any quota cool-down allow another request."""
+        now = time.monotonic()
+        start = max(now, self._next_start, self._cooldown_until)
+        self._next_start = start + self._interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    def cool_down(self, seconds: float) -> None:
+        """Hold back all requests to this model for ``seconds``."""
+        self._cooldown_until = max(self._cooldown_until, time.monotonic() + seconds)
+
+
+def _retry_after(response: httpx.Response) -> float | None:
+    value = response.headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class GoogleAccessToken:
+    """Bearer tokens from Google application default credentials, refreshed on expiry."""
+
+    def __init__(self) -> None:
+        """Initialize the provider. Credentials are loaded on first use."""
+        self._credentials: Any = None
+        self._lock = asyncio.Lock()
+
+    async def __call__(self) -> str:
+        """Return a valid access token.
+
+        Raises:
+            LLMError: If google-auth is not installed.
+        """
+        try:
+            import google.auth
+            import google.auth.transport.requests
+        except ImportError as e:
+            raise LLMError("google-auth is required for Vertex AI authentication") from e
+
+        async with self._lock:
+            if self._credentials is None:
+                self._credentials, _ = await asyncio.to_thread(
+                    google.auth.default, scopes=["https://www.googleapis.com/auth/cloud-platform"]
+                )
+            if not self._credentials.valid:
+                await asyncio.to_thread(
+                    self._credentials.refresh, google.auth.transport.requests.Request()
+                )
+            return str(self._credentials.token)
+
+
+class LLMClient:
+    """Shared, concurrency-limited Gemini client.
+
+    Usage:
+        async with LLMClient() as llm:
+            response = await llm.generate(prompt, model="gemini-1.5-flash", llm_pass="quick")
+    """
+
+    def __init__(
+        self,
+        base_url: str | None = None,
+        client: httpx.AsyncClient | None = None,
+        token_provider: TokenProvider | None = None,
+        limits: dict[str, ModelLimits] | None = None,
+        pass_timeouts: dict[str, float] | None = None,
+        backoff_base_seconds: float = 0.5,
+        backoff_max_seconds: float = 20.0,
+    ):
+        """Initialize the client.
+
+        Args:
+            base_url: Models endpoint; ``{base_url}/{model}:generateContent`` is called.
+                Defaults to ``settings.llm_base_url`` or the Vertex AI endpoint for
+                ``settings.vertex_project``/``settings.vertex_location``.
+            client: HTTP client to use instead of an owned pooled client.
+            token_provider: Returns a bearer token. Defaults to Google application
+                default credentials unless ``settings.llm_api_key`` is set.
+            limits: Per-model limits. Unlisted models get
+                ``settings.llm_model_concurrency`` and ``settings.llm_requests_per_minute``.
+            pass_timeouts: Per-pass request timeouts in seconds. Defaults to the
+                ``settings.llm_timeout_*_seconds`` values.
+            backoff_base_seconds: First retry's maximum backoff.
+            backoff_max_seconds: Maximum backoff of any retry.
+        """
+        settings = get_settings()
+        self.settings = settings
+        self.base_url = (base_url or settings.llm_base_url or self._vertex_url()).rstrip("/")
+        if client is None:
+            client = httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(
+                    max_connections=settings.llm_max_connections,
+                    max_keepalive_connections=settings.llm_max_connections,
+                ),
+            )
+            self._owns_client = True
+        else:
+            self._owns_client = False
+        self.client = client
+        if token_provider is None and not settings.llm_api_key:
+            token_provider = GoogleAccessToken()
+        self.token_provider = token_provider
+        self.limits = limits or {}
+        self.pass_timeouts: dict[str, float] = {
+            "quick": settings.llm_timeout_quick_seconds,
+            "detailed": settings.llm_timeout_detailed_seconds,
+            "validation": settings.llm_timeout_validation_seconds,
+            "deep_dive": settings.llm_timeout_deep_dive_seconds,
+            **(pass_timeouts or {}),
+        }
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self._limiters: dict[str, _ModelLimiter] = {}
+
+    def _vertex_url(self) -> str:
+        location = self.settings.vertex_location
+        return (
+            f"https://{location}-aiplatform.googleapis.com/v1/projects/"
+            f"{self.settings.vertex_project}/locations/{location}/publishers/google/models"
+        )
+
+    def _limiter(self, model: str) -> _ModelLimiter:
+        limiter = self._limiters.get(model)
+        if limiter is None:
+            limits = self.limits.get(model) or ModelLimits(
+                concurrency=self.settings.llm_model_concurrency,
+                requests_per_minute=self.settings.llm_requests_per_minute,
+            )
+            limiter = self._limiters[model] = _ModelLimiter(limits)
+        return limiter
+
+    async def close(self) -> None:
+        """Close the owned HTTP client."""
+        if self._owns_client:
+            await self.client.aclose()
+
+    async def __aenter__(self) -> LLMClient:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.close()
+
+    async def _headers(self) -> dict[str, str]:
+        if self.settings.llm_api_key:
+            return {"x-goog-api-key": self.settings.llm_api_key}
+        if self.token_provider is not None:
+            return {"authorization": f"Bearer {await self.token_provider()}"}
+        return {}
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff before retry ``attempt`` (1-based)."""
+        ceiling = min(self.backoff_max_seconds, self.backoff_base_seconds * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling)
+
+    @staticmethod
+    def _body(
+        prompt: str, temperature: float, max_output_tokens: int | None, response_mime_type: str
+    ) -> dict[str, Any]:
+        generation_config: dict[str, Any] = {
+            "temperature": temperature,
+            "responseMimeType": response_mime_type,
+        }
+        if max_output_tokens is not None:
+            generation_config["maxOutputTokens"] = max_output_tokens
+        return {
+            "contents": [{"role": "user", "parts": [{"text": prompt}]}],
+            "generationConfig": generation_config,
+        }
+
+    async def generate(
+        self,
+        prompt: str,
+        *,
+        model: str,
+        llm_pass: LLMPass = "quick",
+        temperature: float = 0.1,
+        max_output_tokens: int | None = None,
+        max_retries: int | None = None,
+        response_mime_type: str = "application/json",
+    ) -> LLMResponse:
+        """Generate a completion for ``prompt``.
+
+        Args:
+            prompt: Rendered prompt text.
+            model: Model name, e.g. the profile's ``llm_model_quick``.
+            llm_pass: Extraction pass; selects the request timeout.
+            temperature: Sampling temperature.
+            max_output_tokens: Output token cap.
+            max_retries: Retries after the first attempt. Defaults to ``settings.max_retries``.
+            response_mime_type: Requested response format.
+
+        Raises:
+            LLMRateLimitError: If the model is still rate limited after all retries.
+            LLMError: If the call fails with a non-retryable error or runs out of retries.
+        """
+        retries = self.settings.max_retries if max_retries is None else max_retries
+        body = self._body(prompt, temperature, max_output_tokens, response_mime_type)
+        url = f"{self.base_url}/{model}:generateContent"
+        timeout = httpx.Timeout(self.pass_timeouts[llm_pass], connect=10.0)
+        limiter = self._limiter(model)
+        started = time.perf_counter()
+        last_error = LLMError(f"{model} {llm_pass} call failed")
+
+        for attempt in range(1, retries + 2):
+            if attempt > 1:
+                await asyncio.sleep(self._backoff(attempt - 1))
+            async with limiter.semaphore:
+                await limiter.wait_turn()
+                try:
+                    response = await self.client.post(
+                        url, json=body, headers=await self._headers(), timeout=timeout
+                    )
+                except httpx.TimeoutException as e:
+                    last_error = LLMError(f"{model} {llm_pass} call timed out: {e!r}")
+                    continue
+                except httpx.TransportError as e:
+                    last_error = LLMError(f"{model} {llm_pass} call failed: {e!r}")
+                    continue
+
+            if response.status_code == 429:
+                retry_after = _retry_after(response) or self._backoff(attempt)
+                limiter.cool_down(retry_after)
+                last_error = LLMRateLimitError(f"{model} is rate limited")
+                logger.warning(
+                    "LLM rate limited",
+                    extra={"model": model, "attempt": attempt, "retry_after": retry_after},
+                )
+                continue
+            if response.status_code in RETRYABLE_STATUS:
+                last_error = LLMError(f"{model} returned HTTP {response.status_code}")
+                continue
+            if response.is_error:
+                raise LLMError(
+                    f"{model} returned HTTP {response.status_code}: {response.text[:500]}"
+                )
+
+            try:
+                payload = response.json()
+            except ValueError as e:
+                last_error = LLMError(f"{model} returned a malformed response: {e!r}")
+                continue
+            result = self._parse(payload, model, started, attempt)
+            logger.debug(
+                "LLM call completed",
+                extra={
+                    "model": model,
+                    "llm_pass": llm_pass,
+                    "attempts": attempt,
+                    "latency_ms": round(result.latency_ms),
+                    "total_tokens": result.total_tokens,
+                },
+            )
+            return result
+
+        raise last_error
+
+    async def stream(
+        self,
+        prompt: str,
+        *,
+        model: str,
+        llm_pass: LLMPass = "detailed",
+        temperature: float = 0.1,
+        max_output_tokens: int | None = None,
+        max_retries: int | None = None,
+        response_mime_type: str = "application/json",
+    ) -> AsyncIterator[LLMStreamChunk]:
+        """Stream a completion for ``prompt`` as it is generated.
+
+        Uses ``streamGenerateContent`` with server-sent events. Failures before
+        the first chunk are retried like :meth:`generate`; once output has been
+        yielded, a failure ends the stream with :class:`LLMError` and the caller
+        keeps what it received.
+
+        Raises:
+            LLMRateLimitError: If the model is still rate limited after all retries.
+            LLMError: If the call fails, or the stream breaks off.
+        """
+        retries = self.settings.max_retries if max_retries is None else max_retries
+        body = self._body(prompt, temperature, max_output_tokens, response_mime_type)
+        url = f"{self.base_url}/{model}:streamGenerateContent"
+        timeout = httpx.Timeout(self.pass_timeouts[llm_pass], connect=10.0)
+        limiter = self._limiter(model)
+        last_error = LLMError(f"{model} {llm_pass} stream failed")
+
+        for attempt in range(1, retries + 2):
+            if attempt > 1:
+                await asyncio.sleep(self._backoff(attempt - 1))
+            yielded = False
+            async with limiter.semaphore:
+                await limiter.wait_turn()
+                try:
+                    async with self.client.stream(
+                        "POST",
+                        url,
+                        params={"alt": "sse"},
+                        json=body,
+                        headers=await self._headers(),
+                        timeout=timeout,
+                    ) as response:
+                        if response.status_code == 429:
+                            retry_after = _retry_after(response) or self._backoff(attempt)
+                            limiter.cool_down(retry_after)
+                            last_error = LLMRateLimitError(f"{model} is rate limited")
+                            continue
+                        if response.status_code in RETRYABLE_STATUS:
+                            last_error = LLMError(f"{model} returned HTTP {response.status_code}")
+                            continue
+                        if response.is_error:
+                            await response.aread()
+                            raise LLMError(
+                                f"{model} returned HTTP {response.status_code}: "
+                                f"{response.text[:500]}"
+                            )
+                        async for line in response.aiter_lines():
+                            if not line.startswith("data:"):
+                                continue
+                            chunk = self._parse_chunk(json.loads(line[5:]))
+                            if chunk.text or chunk.output_tokens:
+                                yielded = True
+                                yield chunk
+                        return
+                except (httpx.TransportError, json.JSONDecodeError) as e:
+                    # A malformed or truncated event breaks the stream like a dropped connection
+                    last_error = LLMError(f"{model} {llm_pass} stream failed: {e!r}")
+                    if yielded:
+                        raise last_error from e
+                    continue
+
+        raise last_error
+
+    @staticmethod
+    def _parse_chunk(payload: dict[str, Any]) -> LLMStreamChunk:
+        """Build a chunk from one ``streamGenerateContent`` event."""
+        candidates = payload.get("candidates") or [{}]
+        parts = candidates[0].get("content", {}).get("parts", [])
+        usage = payload.get("usageMetadata", {})
+        return LLMStreamChunk(
+            text="".join(part.get("text", "") for part in parts),
+            prompt_tokens=int(usage.get("promptTokenCount", 0)),
+            output_tokens=int(usage.get("candidatesTokenCount", 0)),
+            finish_reason=candidates[0].get("finishReason"),
+        )
+
+    @staticmethod
+    def _parse(payload: dict[str, Any], model: str, started: float, attempts: int) -> LLMResponse:
+        """Build a response from a ``generateContent`` payload.
+
+        Raises:
+            LLMError: If the payload has no candidates.
+        """
+        candidates = payload.get("candidates") or []
+        if not candidates:
+            raise LLMError(f"{model} returned no candidates")
+        parts = candidates[0].get("content", {}).get("parts", [])
+        usage = payload.get("usageMetadata", {})
+        return LLMResponse(
+            text="".join(part.get("text", "") for part in parts),
+            model=model,
+            prompt_tokens=int(usage.get("promptTokenCount", 0)),
+            output_tokens=int(usage.get("candidatesTokenCount", 0)),
+            latency_ms=(time.perf_counter() - started) * 1000,
+            attempts=attempts,
+        )
@@ -0,0 +1,234 @@
+"""Compiled text normalization for ``source_normalization_rules``.
+
+A source's active rules are compiled once into a :class:`NormalizationProgram`
+instead of running ``re.sub`` for every rule over every page:
+
+- rules run in ascending ``priority`` order; rules sharing a priority form one
+  step and are treated as independent of each other;
+- within a step, all literal rules are merged into a single trie-shaped regex,
+  so every literal is matched in one left-to-right pass (longest match wins)
+  with a dictionary lookup for the replacement;
+- regex rules are compiled once and applied in the order they were defined;
+- the program keeps an index from section name to the steps that apply to it
+  (rules with no ``apply_to_sections`` apply everywhere), built lazily per
+  section and reused.
+
+Compiled programs are cached by rule-set version (a fingerprint of the active
+rules), so a rule change is picked up on the next lookup and nothing is
+recompiled otherwise.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from collections import OrderedDict
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+from itertools import groupby
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from dataminer.db.queries.models import SourceNormalizationRule
+
+ALL_SECTIONS = "*"
+
+
+class InvalidNormalizationRuleError(ValueError):
+    """Raised when a rule's pattern cannot be compiled."""
+
+
+@dataclass(frozen=True, slots=True)
+class NormalizationRule:
+    """A single normalization rule."""
+
+    rule_name: str
+    pattern: str
+    replacement: str = ""
+    is_regex: bool = False
+    apply_to_sections: tuple[str, ...] | None = None
+    priority: int = 100
+
+    @classmethod
+    def from_model(cls, model: SourceNormalizationRule) -> NormalizationRule:
+        """Create a rule from a ``source_normalization_rules`` row."""
+        return cls(
+            rule_name=model.rule_name,
+            pattern=model.pattern,
+            replacement=model.replacement or "",
+            is_regex=bool(model.is_regex),
+            apply_to_sections=tuple(model.apply_to_sections) if model.apply_to_sections else None,
+            priority=model.priority if model.priority is not None else 100,
+        )
+
+    def applies_to(self, section: str) -> bool:
+        """Check whether the rule applies to ``section``."""
+        return (
+            self.apply_to_sections is None
+            or section == ALL_SECTIONS
+            or section in self.apply_to_sections
+        )
+
+
+def rule_set_version(rules: Iterable[NormalizationRule]) -> str:
+    """Fingerprint of a rule set; changes whenever any rule changes."""
+    payload = json.dumps(
+        [
+            [r.rule_name, r.pattern, r.replacement, r.is_regex, r.apply_to_sections, r.priority]
+            for r in rules
+        ],
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def trie_pattern(literals: Iterable[str]) -> str:
+    """Build a regex whose structure is the trie of ``literals``.
+
+    ``["Rp", "Rp.", "Pasal"]`` becomes ``(?:Pasal|Rp(?:\\.)?)``: the regex engine
+    walks the trie instead of trying each alternative at every position, and the
+    optional tails make the longest literal win.
+    """
+    trie: dict = {}
+    for literal in literals:
+        if not literal:
+            continue
+        node = trie
+        for char in literal:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def build(node: dict) -> str:
+        terminal = "" in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if terminal:
+            return f"(?:{body})?"
+        return body
+
+    return build(trie)
+
+
+@dataclass(frozen=True, slots=True)
+class _LiteralPass:
+    """All literal rules of one priority step, matched in a single pass."""
+
+    regex: re.Pattern[str]
+    replacements: dict[str, str]
+
+    def apply(self, text: str) -> str:
+        replacements = self.replacements
+        return self.regex.sub(lambda match: replacements[match.group()], text)
+
+
+@dataclass(frozen=True, slots=True)
+class _RegexRule:
+    regex: re.Pattern[str]
+    replacement: str
+
+    def apply(self, text: str) -> str:
+        return self.regex.sub(self.replacement, text)
+
+
+_Step = _LiteralPass | _RegexRule
+
+
+def _compile_regex(rule: NormalizationRule) -> _RegexRule:
+    try:
+        return _RegexRule(re.compile(rule.pattern, re.MULTILINE), rule.replacement)
+    except re.error as e:
+        raise InvalidNormalizationRuleError(f"Rule '{rule.rule_name}': {e}") from e
+
+
+def _compile_steps(rules: Sequence[NormalizationRule]) -> tuple[_Step, ...]:
+    """Compile rules (already filtered for one section) into ordered steps."""
+    steps: list[_Step] = []
+    for _, group in groupby(sorted(rules, key=lambda rule: rule.priority), lambda r: r.priority):
+        group_rules = list(group)
+        literals: dict[str, str] = {}
+        for rule in group_rules:
+            if not rule.is_regex and rule.pattern:
+                # First definition wins for duplicate literals at the same priority
+                literals.setdefault(rule.pattern, rule.replacement)
+        if literals:
+            steps.append(_LiteralPass(re.compile(trie_pattern(literals)), literals))
+        steps.extend(_compile_regex(rule) for rule in group_rules if rule.is_regex)
+    return tuple(steps)
+
+
+@dataclass
+class NormalizationProgram:
+    """Compiled, section-indexed form of a source's normalization rules."""
+
+    rules: tuple[NormalizationRule, ...]
+    version: str
+    _sections: dict[str, tuple[_Step, ...]] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def compile(cls, rules: Iterable[NormalizationRule]) -> NormalizationProgram:
+        """Compile rules, validating every regex up front.
+
+        Raises:
+            InvalidNormalizationRuleError: If any regex rule does not compile.
+        """
+        rules = tuple(rules)
+        for rule in rules:
+            if rule.is_regex:
+                _compile_regex(rule)
+        program = cls(rules=rules, version=rule_set_version(rules))
+        program._sections[ALL_SECTIONS] = _compile_steps(rules)
+        return program
+
+    def steps_for(self, section: str | None) -> tuple[_Step, ...]:
+        """Compiled steps that apply to ``section`` (all rules when ``None``)."""
+        key = section or ALL_SECTIONS
+        steps = self._sections.get(key)
+        if steps is None:
+            steps = _compile_steps([rule for rule in self.rules if rule.applies_to(key)])
+            self._sections[key] = steps
+        return steps
+
+    def normalize(self, text: str, section: str | None = None) -> str:
+        """Apply the rules for ``section`` to ``text``."""
+        for step in self.steps_for(section):
+            text = step.apply(text)
+        return text
+
+
+class NormalizationEngine:
+    """Cache of compiled normalization programs, keyed by source and rule-set version."""
+
+    def __init__(self, max_programs: int = 64):
+        """Initialize the engine.
+
+        Args:
+            max_programs: Compiled programs kept before the least recently used is dropped.
+        """
+        self.max_programs = max_programs
+        self._programs: OrderedDict[tuple[str, str], NormalizationProgram] = OrderedDict()
+
+    def program(self, source_id: str, rules: Iterable[NormalizationRule]) -> NormalizationProgram:
+        """Return the compiled program for a source's current rules."""
+        rules = tuple(rules)
+        key = (source_id, rule_set_version(rules))
+        program = self._programs.get(key)
+        if program is None:
+            program = NormalizationProgram.compile(rules)
+            self._programs[key] = program
+            if len(self._programs) > self.max_programs:
+                self._programs.popitem(last=False)
+        else:
+            self._programs.move_to_end(key)
+        return program
+
+    def program_from_models(
+        self, source_id: str, models: Iterable[SourceNormalizationRule]
+    ) -> NormalizationProgram:
+        """Return the compiled program for ``source_normalization_rules`` rows."""
+        return self.program(
+            source_id,
+            (NormalizationRule.from_model(model) for model in models if model.is_active),
+        )
@@ -0,0 +1,311 @@
+"""OCR of PDF pages with Tesseract.
+
+Pages are rendered by PyMuPDF straight to 8-bit grayscale pixmaps and handed to
+an :class:`OCREngine` as raw samples (optionally through the shared
+:class:`~dataminer.services.page_cache.PageImageCache`, so retries and later
+passes reuse rendered pages). Two engines are available:
+
+- ``tesserocr``: keeps a Tesseract instance loaded in-process through the C API
+  (``pip install dataminer[ocr]``). This is the fast path.
+- ``pytesseract``: starts a ``tesseract`` process per image and exchanges files
+  through a temp directory. Kept as a fallback when tesserocr is not installed.
+
+:class:`OCRWorkerPool` runs an engine in each of a fixed set of worker
+processes. Engines are created once per worker when the process starts, so the
+language models (``ind`` + ``eng``) are loaded once, not once per page.
+Page cache keys need the document's sha256; the pool passes the digest the
+document store already computed (:meth:`OCRWorkerPool.known_digest`) to its
+workers, and only hashes a file itself, once, when no digest was given.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import OrderedDict
+from collections.abc import Iterable
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import Literal, Protocol
+
+import pymupdf
+
+from dataminer.core.config import get_settings
+from dataminer.services.page_cache import PageImage, PageImageCache, render_page, sha256_file
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OCR_LANGUAGE = "ind+eng"
+DEFAULT_OCR_DPI = 300
+
+EngineName = Literal["auto", "tesserocr", "pytesseract"]
+
+# Documents whose sha256 the pool remembers.
+MAX_KNOWN_DIGESTS = 64
+
+
+class OCREngine(Protocol):
+    """Recognizes text in a grayscale image."""
+
+    name: str
+
+    def recognize(self, image: PageImage) -> str:
+        """Return the text in ``image``."""
+        ...
+
+    def close(self) -> None:
+        """Release engine resources."""
+        ...
+
+
+class PytesseractEngine:
+    """Tesseract via pytesseract (one ``tesseract`` process per image)."""
+
+    name = "pytesseract"
+
+    def __init__(self, language: str = DEFAULT_OCR_LANGUAGE):
+        """Initialize the engine."""
+        self.language = language
+
+    def recognize(self, image: PageImage) -> str:
+        """Return the text in ``image``."""
+        import pytesseract
+        from PIL import Image
+
+        pil_image = Image.frombytes("L", (image.width, image.height), image.samples)
+        return pytesseract.image_to_string(pil_image, lang=self.language)
+
+    def close(self) -> None:
+        """Release engine resources."""
+
+
+class TesserocrEngine:
+    """In-process Tesseract via tesserocr, initialized once and reused."""
+
+    name = "tesserocr"
+
+    def __init__(self, language: str = DEFAULT_OCR_LANGUAGE):
+        """Load Tesseract with ``language`` models.
+
+        Raises:
+            ImportError: If tesserocr is not installed.
+        """
+        import tesserocr
+
+        self.language = language
+        self._api = tesserocr.PyTessBaseAPI(lang=language)
+
+    def recognize(self, image: PageImage) -> str:
+        """Return the text in ``image``."""
+        self._api.SetImageBytes(image.samples, image.width, image.height, 1, image.width)
+        return self._api.GetUTF8Text()
+
+    def close(self) -> None:
+        """Release engine resources."""
+        self._api.End()
+
+
+def create_engine(name: EngineName = "auto", language: str = DEFAULT_OCR_LANGUAGE) -> OCREngine:
+    """Create an OCR engine, preferring tesserocr when ``name`` is ``auto``."""
+    if name == "pytesseract":
+        return PytesseractEngine(language)
+    try:
+        return TesserocrEngine(language)
+    except ImportError:
+        if name == "tesserocr":
+            raise
+        logger.warning("tesserocr is not installed, falling back to pytesseract")
+        return PytesseractEngine(language)
+
+
+def ocr_page(
+    path: str,
+    page_number: int,
+    *,
+    language: str = DEFAULT_OCR_LANGUAGE,
+    dpi: int = DEFAULT_OCR_DPI,
+) -> str:
+    """OCR a single 1-based page with pytesseract.
+
+    Used when no worker pool is available; see :class:`OCRWorkerPool`.
+    """
+    with pymupdf.open(path) as doc:
+        image = render_page(doc, page_number, dpi)
+    return PytesseractEngine(language).recognize(image)
+
+
+# Per-process state of an OCRWorkerPool worker.
+_worker_engine: OCREngine | None = None
+_worker_cache: PageImageCache | None = None
+_worker_doc: pymupdf.Document | None = None
+_worker_doc_path: str | None = None
+_worker_doc_sha256: str | None = None
+
+
+def _init_worker(engine_name: EngineName, language: str, cache_root: str | None) -> None:
+    """Load the OCR engine (and open the page cache) once when a worker starts."""
+    global _worker_engine, _worker_cache
+    _worker_engine = create_engine(engine_name, language)
+    _worker_cache = PageImageCache(cache_root) if cache_root else None
+
+
+def _open_cached(path: str, sha256: str | None) -> pymupdf.Document:
+    """Open ``path``, reusing the worker's document when it is the same file."""
+    global _worker_doc, _worker_doc_path, _worker_doc_sha256
+    if _worker_doc_path != path or _worker_doc is None:
+        if _worker_doc is not None:
+            _worker_doc.close()
+        _worker_doc = pymupdf.open(path)
+        _worker_doc_path = path
+    _worker_doc_sha256 = sha256
+    return _worker_doc
+
+
+def _render_in_worker(doc: pymupdf.Document, page_number: int, dpi: int) -> PageImage:
+    if _worker_cache is None or _worker_doc_sha256 is None:
+        return render_page(doc, page_number, dpi)
+    return _worker_cache.get_or_render(doc, _worker_doc_sha256, page_number, dpi)
+
+
+def _ocr_pages_in_worker(
+    path: str, page_numbers: list[int], dpi: int, sha256: str | None = None
+) -> list[str]:
+    """Render and OCR pages inside a worker process.
+
+    ``sha256`` keys the page cache; without it pages are rendered uncached.
+    """
+    if _worker_engine is None:
+        raise RuntimeError("OCR worker was not initialized")
+    doc = _open_cached(path, sha256)
+    return [
+        _worker_engine.recognize(_render_in_worker(doc, number, dpi)) for number in page_numbers
+    ]
+
+
+class OCRWorkerPool:
+    """Pool of worker processes, each holding a loaded OCR engine.
+
+    Usage:
+        with OCRWorkerPool() as pool:
+            text = await pool.ocr_page(path, 3)
+
+    The pool is also a plain ``(path, page_number) -> text`` callable, so it can
+    be passed to :class:`~dataminer.services.ocr_routing.OCRRouter` directly.
+    """
+
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        engine: EngineName | None = None,
+        language: str = DEFAULT_OCR_LANGUAGE,
+        dpi: int | None = None,
+        page_cache_dir: str | Path | None = None,
+    ):
+        """Initialize the pool. Worker processes start on first use.
+
+        Args:
+            max_workers: Worker processes. Defaults to ``settings.ocr_workers``.
+            engine: Engine to load in each worker. Defaults to ``settings.ocr_engine``.
+            language: Tesseract language(s), e.g. ``ind+eng``.
+            dpi: Rendering resolution. Defaults to ``settings.ocr_dpi``.
+            page_cache_dir: Rendered page cache directory. Defaults to
+                ``settings.page_cache_dir`` when ``settings.page_cache_enabled``.
+        """
+        settings = get_settings()
+        self.max_workers = max_workers or settings.ocr_workers
+        self.engine = engine or settings.ocr_engine
+        self.language = language
+        self.dpi = dpi or settings.ocr_dpi
+        if page_cache_dir is None and settings.page_cache_enabled:
+            page_cache_dir = settings.page_cache_dir
+        self.page_cache_dir = str(page_cache_dir) if page_cache_dir else None
+        self._executor: Executor | None = None
+        self._digests: OrderedDict[str, tuple[tuple[int, int], str]] = OrderedDict()
+
+    @property
+    def executor(self) -> Executor:
+        """Worker processes, started on first use."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(self.engine, self.language, self.page_cache_dir),
+            )
+        return self._executor
+
+    def close(self) -> None:
+        """Stop the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def known_digest(self, path: str | Path, sha256: str) -> None:
+        """Record the sha256 of ``path`` computed elsewhere, e.g. by the document store."""
+        self._remember(str(path), sha256)
+
+    def _remember(self, path: str, sha256: str) -> None:
+        stat = Path(path).stat()
+        self._digests[path] = ((stat.st_mtime_ns, stat.st_size), sha256)
+        self._digests.move_to_end(path)
+        while len(self._digests) > MAX_KNOWN_DIGESTS:
+            self._digests.popitem(last=False)
+
+    def digest(self, path: str) -> str | None:
+        """sha256 used for ``path``'s page cache keys; None when the cache is off.
+
+        Uses the recorded digest while the file is unchanged, hashing the file
+        once otherwise.
+        """
+        if self.page_cache_dir is None:
+            return None
+        known = self._digests.get(path)
+        if known is not None:
+            stat = Path(path).stat()
+            if known[0] == (stat.st_mtime_ns, stat.st_size):
+                return known[1]
+        sha256 = sha256_file(path)
+        self._remember(path, sha256)
+        return sha256
+
+    def __enter__(self) -> OCRWorkerPool:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __call__(self, path: str, page_number: int) -> str:
+        """OCR one page, blocking until it is done."""
+        return self.executor.submit(
+            _ocr_pages_in_worker, path, [page_number], self.dpi, self.digest(path)
+        ).result()[0]
+
+    async def ocr_page(self, path: str, page_number: int) -> str:
+        """OCR one 1-based page."""
+        loop = asyncio.get_running_loop()
+        sha256 = await asyncio.to_thread(self.digest, path)
+        texts = await loop.run_in_executor(
+            self.executor, _ocr_pages_in_worker, path, [page_number], self.dpi, sha256
+        )
+        return texts[0]
+
+    async def ocr_pages(
+        self, path: str, page_numbers: Iterable[int], pages_per_task: int = 4
+    ) -> dict[int, str]:
+        """OCR several pages, spreading them across workers in small batches."""
+        numbers = sorted(set(page_numbers))
+        batches = [numbers[i : i + pages_per_task] for i in range(0, len(numbers), pages_per_task)]
+        loop = asyncio.get_running_loop()
+        sha256 = await asyncio.to_thread(self.digest, path)
+        results = await asyncio.gather(
+            *(
+                loop.run_in_executor(
+                    self.executor, _ocr_pages_in_worker, path, batch, self.dpi, sha256
+                )
+                for batch in batches
+            )
+        )
+        return {
+            number: text
+            for batch, texts in zip(batches, results, strict=True)
+            for number, text in zip(batch, texts, strict=True)
+        }
@@ -0,0 +1,610 @@
+"""OCR error correction against an Indonesian legal lexicon (PRD Stage 2).
+
+Scanned verdicts come back with errors such as ``PasaI`` (``l`` read as ``I``),
+``Terdakvva``, ``0leh`` or ``yank``. :class:`OCRCorrector` fixes them token by
+token in three steps:
+
+1. known words are left alone (one hash probe);
+2. confusable-character rewrites (:data:`CONFUSABLES`: ``I``/``1``→``l``,
+   ``0``→``o``, ``vv``→``w``, ``rn``→``m``...) that produce a known word win;
+3. otherwise a SymSpell lookup. A token with OCR noise (digits or ``!``/``|``
+   among its letters, or a stray capital) takes the most frequent word within
+   ``max_distance`` edits. A clean lowercase token (``yank``, ``bukli``) takes
+   a word one edit away only when that word is at least
+   :data:`MIN_FREQUENCY_RATIO` times as frequent as the runner-up.
+
+Whether a clean word is a misread is decided by the lexicon, not by its shape,
+so the lexicon has to come from a corpus of clean decisions
+(:meth:`SymSpellIndex.from_corpus`): a valid word it lacks (``tinggal``) would
+be edited towards a neighbour (``tanggal``). :data:`DEFAULT_LEXICON` is far too
+small for real text. Capitalized tokens, which are often names (``Sari``), only
+get confusable rewrites.
+
+The SymSpell index precomputes the delete-neighbourhood of every lexicon word
+(all strings reachable by up to ``max_distance`` deletions of its prefix), so a
+lookup generates the input's own deletes and probes a hash table for each,
+instead of comparing against the whole lexicon. :class:`SymSpellIndex` stores
+the table, postings and words in one flat file that is memory-mapped read-only,
+so every worker process shares the same pages. The file is written to a temp
+file and published with ``os.replace``, like the page cache.
+
+Corrections are memoized per token, and verdicts repeat the same vocabulary
+over and over, so most tokens of a long document cost one dictionary lookup.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import logging
+import mmap
+import os
+import re
+import struct
+import tempfile
+from collections import Counter, OrderedDict
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from dataminer.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Frequent words of Indonesian court decisions, most frequent first. A seed
+# vocabulary for tests and for extending a corpus lexicon; too small to build a
+# production index from.
+DEFAULT_LEXICON: tuple[str, ...] = (
+    "yang",
+    "dan",
+    "di",
+    "dengan",
+    "terdakwa",
+    "dalam",
+    "tidak",
+    "ini",
+    "itu",
+    "pasal",
+    "ke",
+    "oleh",
+    "untuk",
+    "dari",
+    "pada",
+    "bahwa",
+    "tersebut",
+    "perkara",
+    "saksi",
+    "pidana",
+    "negeri",
+    "pengadilan",
+    "hakim",
+    "penuntut",
+    "umum",
+    "jaksa",
+    "nomor",
+    "tahun",
+    "ayat",
+    "undang",
+    "atau",
+    "telah",
+    "sebagai",
+    "putusan",
+    "barang",
+    "bukti",
+    "hukum",
+    "menyatakan",
+    "secara",
+    "bersalah",
+    "melakukan",
+    "tindak",
+    "penjara",
+    "denda",
+    "bulan",
+    "hari",
+    "tanggal",
+    "narkotika",
+    "majelis",
+    "ketua",
+    "anggota",
+    "panitera",
+    "pengganti",
+    "mengadili",
+    "menimbang",
+    "mengingat",
+    "memperhatikan",
+    "dakwaan",
+    "tuntutan",
+    "primair",
+    "subsidair",
+    "terbukti",
+    "sah",
+    "meyakinkan",
+    "menjatuhkan",
+    "dikurangi",
+    "penahanan",
+    "ditahan",
+    "ditetapkan",
+    "dirampas",
+    "dimusnahkan",
+    "dikembalikan",
+    "membebankan",
+    "biaya",
+    "sejumlah",
+    "rupiah",
+    "selama",
+    "seluruhnya",
+    "sebesar",
+    "keterangan",
+    "alat",
+    "keadaan",
+    "memberatkan",
+    "meringankan",
+    "kasasi",
+    "banding",
+    "mahkamah",
+    "agung",
+    "tinggi",
+    "republik",
+    "indonesia",
+    "demikian",
+    "diputuskan",
+    "musyawarah",
+    "diucapkan",
+    "sidang",
+    "terbuka",
+    "dihadiri",
+    "penasihat",
+    "kuasa",
+    "pemohon",
+    "termohon",
+    "amar",
+    "kesatu",
+    "kedua",
+    "ketiga",
+    "tanpa",
+    "hak",
+    "melawan",
+    "menerima",
+    "menolak",
+    "membatalkan",
+    "menguatkan",
+    "memperbaiki",
+    "menjual",
+    "membeli",
+    "menguasai",
+    "memiliki",
+    "menyimpan",
+    "golongan",
+    "bukan",
+    "tanaman",
+    "gram",
+    "berat",
+    "bersih",
+)
+
+# Confusable OCR readings, applied to lowercased tokens: wrong -> candidates.
+CONFUSABLES: dict[str, tuple[str, ...]] = {
+    "0": ("o",),
+    "1": ("l", "i"),
+    "i": ("l",),
+    "l": ("i",),
+    "!": ("l", "i"),
+    "|": ("l", "i"),
+    "5": ("s",),
+    "8": ("b",),
+    "6": ("b",),
+    "2": ("z",),
+    "vv": ("w",),
+    "rn": ("m",),
+    "m": ("rn",),
+    "cl": ("d",),
+    "ii": ("u",),
+    "li": ("h",),
+    "nn": ("m",),
+}
+
+_MAGIC = b"DMSYMSP1"
+_HEADER = struct.Struct("<8s6I")  # magic, max_distance, prefix_length, words, slots, postings, blob
+_EMPTY = np.uint64(0)
+_TOKEN = re.compile(r"[^\W_]+(?:[!|][^\W_]*)*")
+# Glyphs that do not belong inside a word
+_OCR_NOISE = re.compile(r"[\d!|]")
+# How much more frequent than the runner-up a one-edit correction of a clean
+# token must be
+MIN_FREQUENCY_RATIO = 10
+
+
+class OCRIndexError(ValueError):
+    """Raised when an index file is missing, truncated or of another format."""
+
+
+def _key(text: str) -> int:
+    """Stable 64-bit key of a string; 0 is reserved for empty slots."""
+    key = int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+    return key or 1
+
+
+def deletes(word: str, max_distance: int, prefix_length: int) -> set[str]:
+    """``word``'s prefix and every string reachable by deleting up to ``max_distance`` characters."""
+    word = word[:prefix_length]
+    found = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {
+            candidate[:i] + candidate[i + 1 :]
+            for candidate in frontier
+            if len(candidate) > 1
+            for i in range(len(candidate))
+        } - found
+        found |= frontier
+    return found
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance, or ``limit + 1`` once it exceeds ``limit``."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2: list[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        best = current[0]
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+            best = min(best, value)
+        if best > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1] if previous[-1] <= limit else limit + 1
+
+
+@dataclass(frozen=True, slots=True)
+class Suggestion:
+    """A lexicon word close to the input."""
+
+    term: str
+    distance: int
+    frequency: int
+
+
+class SymSpellIndex:
+    """Delete-neighbourhood index over a lexicon, backed by a flat (mappable) buffer.
+
+    Layout after the header: slot keys (uint64), posting starts and lengths
+    (uint32), postings (word ids, uint32), word offsets and frequencies
+    (uint32), then the UTF-8 words.
+
+    Usage:
+        SymSpellIndex.build(lexicon).save(path)
+        index = SymSpellIndex.load(path)  # memory-mapped
+        index.lookup("terdakvva")
+    """
+
+    def __init__(self, buffer: bytes | mmap.mmap, source: mmap.mmap | None = None):
+        """Wrap an index buffer; use :meth:`build` or :meth:`load`.
+
+        Raises:
+            OCRIndexError: If the buffer is not an index.
+        """
+        if len(buffer) < _HEADER.size:
+            raise OCRIndexError("OCR index is truncated")
+        magic, max_distance, prefix_length, words, slots, postings, blob = _HEADER.unpack_from(
+            buffer
+        )
+        if magic != _MAGIC:
+            raise OCRIndexError("Not an OCR correction index")
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self._buffer = buffer
+        self._mmap = source
+        offset = _HEADER.size
+        sizes = [slots * 8, slots * 4, slots * 4, postings * 4, (words + 1) * 4, words * 4, blob]
+        if len(buffer) < offset + sum(sizes):
+            raise OCRIndexError("OCR index is truncated")
+
+        def view(dtype: type, count: int) -> np.ndarray:
+            nonlocal offset
+            array: np.ndarray = np.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+            offset += array.nbytes
+            return array
+
+        self._keys = view(np.uint64, slots)
+        self._starts = view(np.uint32, slots)
+        self._lengths = view(np.uint32, slots)
+        self._postings = view(np.uint32, postings)
+        self._offsets = view(np.uint32, words + 1)
+        self._frequencies = view(np.uint32, words)
+        self._blob_offset = offset
+        self._mask = slots - 1
+        self._words: dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._frequencies)
+
+    @classmethod
+    def build(
+        cls, lexicon: Mapping[str, int], max_distance: int = 2, prefix_length: int = 7
+    ) -> SymSpellIndex:
+        """Build an in-memory index from word frequencies."""
+        frequencies: Counter[str] = Counter()
+        for word, count in lexicon.items():
+            frequencies[word.lower()] += count
+        words = sorted(frequencies, key=lambda w: (-frequencies[w], w))
+
+        neighbourhood: dict[int, list[int]] = {}
+        for word_id, word in enumerate(words):
+            for delete in deletes(word, max_distance, prefix_length):
+                neighbourhood.setdefault(_key(delete), []).append(word_id)
+
+        slots = 1
+        while slots < 2 * max(len(neighbourhood), 1):
+            slots *= 2
+        keys = np.zeros(slots, dtype=np.uint64)
+        starts = np.zeros(slots, dtype=np.uint32)
+        lengths = np.zeros(slots, dtype=np.uint32)
+        postings: list[int] = []
+        for key, ids in neighbourhood.items():
+            slot = key & (slots - 1)
+            while keys[slot] != _EMPTY:
+                slot = (slot + 1) & (slots - 1)
+            keys[slot] = key
+            starts[slot] = len(postings)
+            lengths[slot] = len(ids)
+            postings.extend(ids)
+
+        encoded = [w.encode("utf-8") for w in words]
+        offsets = np.zeros(len(words) + 1, dtype=np.uint32)
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+        blob = b"".join(encoded)
+        header = _HEADER.pack(
+            _MAGIC, max_distance, prefix_length, len(words), slots, len(postings), len(blob)
+        )
+        buffer = b"".join(
+            [
+                header,
+                keys.tobytes(),
+                starts.tobytes(),
+                lengths.tobytes(),
+                np.array(postings, dtype=np.uint32).tobytes(),
+                offsets.tobytes(),
+                np.array([frequencies[w] for w in words], dtype=np.uint32).tobytes(),
+                blob,
+            ]
+        )
+        return cls(buffer)
+
+    @classmethod
+    def from_corpus(
+        cls, texts: Iterable[str], max_distance: int = 2, prefix_length: int = 7, min_count: int = 2
+    ) -> SymSpellIndex:
+        """Build an index from the alphabetic words of clean texts."""
+        counts: Counter[str] = Counter()
+        for text in texts:
+            counts.update(w for w in re.findall(r"[^\W\d_]+", text.lower()) if len(w) > 1)
+        return cls.build(
+            {w: c for w, c in counts.items() if c >= min_count}, max_distance, prefix_length
+        )
+
+    def save(self, path: str | Path) -> None:
+        """Write the index atomically."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-", suffix=".idx")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(self._buffer)
+            Path(temp).replace(path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                Path(temp).unlink()
+            raise
+
+    @classmethod
+    def load(cls, path: str | Path) -> SymSpellIndex:
+        """Memory-map an index file read-only.
+
+        Raises:
+            OCRIndexError: If the file is not a valid index.
+        """
+        with Path(path).open("rb") as f:
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:
+                raise OCRIndexError(f"OCR index {path} is empty") from e
+        return cls(mapped, source=mapped)
+
+    def close(self) -> None:
+        """Release the memory map, if any."""
+        if self._mmap is not None:
+            self._keys = self._starts = self._lengths = np.empty(0)
+            self._postings = self._offsets = self._frequencies = np.empty(0)
+            self._mmap.close()
+            self._mmap = None
+
+    def word(self, word_id: int) -> str:
+        """Lexicon word by id."""
+        word = self._words.get(word_id)
+        if word is None:
+            start = self._blob_offset + int(self._offsets[word_id])
+            end = self._blob_offset + int(self._offsets[word_id + 1])
+            word = self._words[word_id] = bytes(self._buffer[start:end]).decode("utf-8")
+        return word
+
+    def _probe(self, text: str) -> np.ndarray:
+        key = np.uint64(_key(text))
+        slot = int(key) & self._mask
+        while True:
+            stored = self._keys[slot]
+            if stored == _EMPTY:
+                return self._postings[:0]
+            if stored == key:
+                start = int(self._starts[slot])
+                return self._postings[start : start + int(self._lengths[slot])]
+            slot = (slot + 1) & self._mask
+
+    def frequency(self, word: str) -> int:
+        """Frequency of ``word`` in the lexicon (0 when unknown)."""
+        word = word.lower()
+        for word_id in self._probe(word[: self.prefix_length]).tolist():
+            if self.word(word_id) == word:
+                return int(self._frequencies[word_id])
+        return 0
+
+    def __contains__(self, word: object) -> bool:
+        return isinstance(word, str) and self.frequency(word) > 0
+
+    def lookup(self, word: str, max_distance: int | None = None) -> list[Suggestion]:
+        """Lexicon words within ``max_distance`` edits, closest and most frequent first."""
+        word = word.lower()
+        limit = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+        seen: set[int] = set()
+        suggestions: list[Suggestion] = []
+        for delete in deletes(word, limit, self.prefix_length):
+            for word_id in self._probe(delete).tolist():
+                if word_id in seen:
+                    continue
+                seen.add(word_id)
+                term = self.word(word_id)
+                distance = edit_distance(word, term, limit)
+                if distance <= limit:
+                    suggestions.append(Suggestion(term, distance, int(self._frequencies[word_id])))
+        suggestions.sort(key=lambda s: (s.distance, -s.frequency, s.term))
+        return suggestions
+
+
+def confusable_variants(token: str, max_rewrites: int = 2) -> list[str]:
+    """Strings reachable by up to ``max_rewrites`` confusable-character rewrites."""
+    found: dict[str, None] = {}
+    frontier = [token]
+    for _ in range(max_rewrites):
+        following: list[str] = []
+        for text in frontier:
+            for wrong, candidates in CONFUSABLES.items():
+                start = text.find(wrong)
+                while start != -1:
+                    for right in candidates:
+                        variant = text[:start] + right + text[start + len(wrong) :]
+                        if variant != token and variant not in found:
+                            found[variant] = None
+                            following.append(variant)
+                    start = text.find(wrong, start + 1)
+        frontier = following
+    return list(found)
+
+
+def _match_case(original: str, corrected: str) -> str:
+    letters = [c for c in original if c.isalpha()]
+    if len(letters) > 1 and all(c.isupper() for c in letters):
+        return corrected.upper()
+    # "PasaI": a capital read in place of a lowercase letter keeps the word title case
+    rest = letters[1:]
+    if original[:1].isupper() and 2 * sum(c.isupper() for c in rest) < max(len(rest), 1):
+        return corrected.capitalize()
+    return corrected
+
+
+class OCRCorrector:
+    """Corrects OCR errors token by token.
+
+    Usage:
+        corrector = OCRCorrector.from_settings()
+        text = corrector.correct_text(page.text)
+    """
+
+    def __init__(
+        self, index: SymSpellIndex, max_distance: int | None = None, max_memo_entries: int = 65536
+    ):
+        """Initialize the corrector.
+
+        Args:
+            index: Lexicon index.
+            max_distance: Maximum edits of a correction; short tokens get fewer
+                (1 edit up to 5 characters, none below 3). Defaults to the index's.
+            max_memo_entries: Corrected tokens kept for reuse.
+        """
+        self.index = index
+        self.max_distance = index.max_distance if max_distance is None else max_distance
+        self.max_memo_entries = max_memo_entries
+        self._memo: OrderedDict[str, str] = OrderedDict()
+        self.corrections = 0
+
+    @classmethod
+    def from_settings(cls, lexicon: Mapping[str, int] | None = None) -> OCRCorrector:
+        """Map the configured index file, building it from ``lexicon`` on first use.
+
+        Raises:
+            OCRIndexError: If the index file does not exist and no lexicon is given.
+        """
+        settings = get_settings()
+        path = Path(settings.ocr_correction_index_path)
+        if not path.exists():
+            if lexicon is None:
+                raise OCRIndexError(
+                    f"OCR correction index {path} does not exist; build it from a corpus "
+                    "lexicon (SymSpellIndex.from_corpus) first"
+                )
+            SymSpellIndex.build(lexicon, settings.ocr_correction_max_distance).save(path)
+            logger.info("OCR correction index built", extra={"path": str(path)})
+        return cls(SymSpellIndex.load(path), settings.ocr_correction_max_distance)
+
+    def _limit(self, token: str) -> int:
+        if len(token) < 3:
+            return 0
+        return min(self.max_distance, 1 if len(token) <= 5 else self.max_distance)
+
+    def _correct_lower(self, token: str, fuzzy: bool, noisy: bool) -> str:
+        if token.isdigit() or token in self.index:
+            return token
+        known = [v for v in confusable_variants(token) if v in self.index]
+        if known:
+            return max(known, key=lambda v: (self.index.frequency(v), v))
+        limit = self._limit(token)
+        if not fuzzy or not limit or not any(c.isalpha() for c in token):
+            return token
+        suggestions = self.index.lookup(token, limit if noisy else 1)
+        if not suggestions:
+            return token
+        best = suggestions[0]
+        if noisy:
+            return best.term
+        # A clean token is a misread or a word the lexicon lacks; edit it only
+        # towards a neighbour that clearly dominates.
+        runner_up = suggestions[1].frequency if len(suggestions) > 1 else 0
+        return best.term if best.frequency >= MIN_FREQUENCY_RATIO * runner_up else token
+
+    def correct_token(self, token: str) -> str:
+        """Corrected form of one token, keeping its capitalization."""
+        corrected = self._memo.get(token)
+        if corrected is not None:
+            self._memo.move_to_end(token)
+            return corrected
+        lower = token.lower()
+        noisy = bool(_OCR_NOISE.search(token)) or any(c.isupper() for c in token[1:])
+        fixed = self._correct_lower(lower, fuzzy=not token[:1].isupper(), noisy=noisy)
+        if fixed == lower and lower not in self.index:
+            corrected = token
+        else:
+            # Known words get their case normalized too ("dI" -> "di")
+            corrected = _match_case(token, fixed)
+        self._memo[token] = corrected
+        if len(self._memo) > self.max_memo_entries:
+            self._memo.popitem(last=False)
+        return corrected
+
+    def correct_text(self, text: str) -> str:
+        """Correct every token of ``text``; whitespace and punctuation are kept."""
+
+        def replace(match: re.Match[str]) -> str:
+            token = match.group()
+            corrected = self.correct_token(token)
+            if corrected != token:
+                self.corrections += 1
+            return corrected
+
+        return _TOKEN.sub(replace, text)
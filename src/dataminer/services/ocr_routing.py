@@ -0,0 +1,195 @@
+"""Per-page OCR routing.
+
+Instead of deciding document-wide whether to OCR, every page's text layer is
+scored (see :mod:`dataminer.services.page_quality`) and only pages scoring below
+the profile's ``ocr_threshold`` are sent to Tesseract. Mixed documents (a
+searchable judgment with a few scanned attachments) therefore OCR only the
+scanned pages.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from dataminer.services.ocr import DEFAULT_OCR_DPI, DEFAULT_OCR_LANGUAGE, ocr_page
+from dataminer.services.page_quality import PageQuality, score_page_text
+
+if TYPE_CHECKING:
+    from dataminer.db.queries.models import SourceExtractionProfile
+    from dataminer.services.pdf_extraction import PageText
+
+logger = logging.getLogger(__name__)
+
+OCRFunction = Callable[[str, int], str]
+
+
+@dataclass(frozen=True, slots=True)
+class RoutedPage:
+    """Final text of a page and how it was obtained."""
+
+    page_number: int
+    text: str
+    method: str  # "pymupdf", "pdfplumber" or "ocr"
+    quality: PageQuality
+    ocr_used: bool  # the page's text came from OCR
+
+
+@dataclass(slots=True)
+class RoutedDocument:
+    """All routed pages of a document."""
+
+    pages: list[RoutedPage] = field(default_factory=list)
+
+    @property
+    def ocr_pages(self) -> list[int]:
+        """1-based numbers of the pages whose text came from OCR."""
+        return [page.page_number for page in self.pages if page.ocr_used]
+
+    @property
+    def ocr_used(self) -> bool:
+        """Whether any page's text came from OCR."""
+        return any(page.ocr_used for page in self.pages)
+
+    @property
+    def is_scanned(self) -> bool:
+        """Whether every page's text came from OCR."""
+        return bool(self.pages) and all(page.ocr_used for page in self.pages)
+
+    @property
+    def text(self) -> str:
+        """Full document text, pages separated by form feeds."""
+        return "\f".join(page.text for page in self.pages)
+
+
+class OCRRouter:
+    """Route pages with a poor text layer to OCR, keeping the rest as extracted."""
+
+    def __init__(
+        self,
+        threshold: float = 0.80,
+        language: str = DEFAULT_OCR_LANGUAGE,
+        dpi: int = DEFAULT_OCR_DPI,
+        max_concurrency: int = 4,
+        max_pending: int | None = None,
+        ocr: OCRFunction | None = None,
+    ):
+        """Initialize the router.
+
+        Args:
+            threshold: Pages scoring below this are OCR'd (profile ``ocr_threshold``).
+            language: Tesseract language(s), e.g. ``ind+eng``.
+            dpi: Rendering resolution for OCR.
+            max_concurrency: Pages OCR'd at the same time.
+            max_pending: Pages held between extraction and the caller, finished
+                or not. Defaults to four times ``max_concurrency``.
+            ocr: Callable ``(path, page_number) -> text``, typically an
+                :class:`~dataminer.services.ocr.OCRWorkerPool`. Defaults to one
+                pytesseract call per page.
+        """
+        self.threshold = threshold
+        self.language = language
+        self.dpi = dpi
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_pending = max(self.max_concurrency, max_pending or 4 * self.max_concurrency)
+        self._ocr = ocr or self._pytesseract
+
+    @property
+    def ocr(self) -> OCRFunction:
+        """The OCR callable pages are sent to."""
+        return self._ocr
+
+    @classmethod
+    def from_profile(
+        cls,
+        profile: SourceExtractionProfile,
+        dpi: int = DEFAULT_OCR_DPI,
+        max_concurrency: int = 4,
+        max_pending: int | None = None,
+        ocr: OCRFunction | None = None,
+    ) -> OCRRouter:
+        """Create a router configured by an extraction profile."""
+        threshold = float(profile.ocr_threshold) if profile.ocr_threshold is not None else 0.80
+        return cls(
+            threshold=threshold,
+            language=profile.ocr_language or DEFAULT_OCR_LANGUAGE,
+            dpi=dpi,
+            max_concurrency=max_concurrency,
+            max_pending=max_pending,
+            ocr=ocr,
+        )
+
+    def _pytesseract(self, path: str, page_number: int) -> str:
+        return ocr_page(path, page_number, language=self.language, dpi=self.dpi)
+
+    async def _resolve(self, path: str, page: PageText, quality: PageQuality) -> RoutedPage:
+        """OCR a failing page, keeping the extracted text if OCR does no better."""
+        ocr_text = await asyncio.to_thread(self._ocr, path, page.page_number)
+        ocr_quality = score_page_text(ocr_text)
+        if ocr_quality.score >= quality.score:
+            return RoutedPage(page.page_number, ocr_text, "ocr", ocr_quality, ocr_used=True)
+        return RoutedPage(page.page_number, page.text, page.method, quality, ocr_used=False)
+
+    async def route(self, path: str, pages: AsyncIterator[PageText]) -> AsyncIterator[RoutedPage]:
+        """Yield pages in order, OCR-ing only those below the threshold.
+
+        Up to ``max_concurrency`` failing pages are OCR'd concurrently while
+        passing pages keep streaming behind them in order. At most
+        ``max_pending`` pages are held in total, so a slow OCR page at the head
+        stops extraction instead of letting finished pages pile up behind it.
+        """
+        # (page, whether it was sent to OCR)
+        pending: deque[tuple[asyncio.Future[RoutedPage], bool]] = deque()
+        in_flight = 0
+
+        try:
+            async for page in pages:
+                quality = score_page_text(page.text)
+                needs_ocr = quality.needs_ocr(self.threshold)
+                future: asyncio.Future[RoutedPage]
+                if needs_ocr:
+                    future = asyncio.ensure_future(self._resolve(path, page, quality))
+                    in_flight += 1
+                else:
+                    future = asyncio.get_running_loop().create_future()
+                    future.set_result(
+                        RoutedPage(page.page_number, page.text, page.method, quality, False)
+                    )
+                pending.append((future, needs_ocr))
+
+                # Release finished pages from the head; block when either window is full.
+                while pending and (
+                    pending[0][0].done()
+                    or in_flight >= self.max_concurrency
+                    or len(pending) >= self.max_pending
+                ):
+                    head, sent_to_ocr = pending.popleft()
+                    in_flight -= sent_to_ocr
+                    yield await head
+
+            while pending:
+                yield await pending.popleft()[0]
+        finally:
+            for future, _ in pending:
+                future.cancel()
+
+    async def process(self, path: str, pages: AsyncIterator[PageText]) -> RoutedDocument:
+        """Route every page of a document."""
+        document = RoutedDocument()
+        async for page in self.route(path, pages):
+            document.pages.append(page)
+
+        logger.info(
+            "OCR routing completed",
+            extra={
+                "path": path,
+                "page_count": len(document.pages),
+                "ocr_pages": len(document.ocr_pages),
+                "threshold": self.threshold,
+            },
+        )
+        return document
@@ -0,0 +1,223 @@
+"""On-disk cache of rendered page images.
+
+OCR retries, the Document AI fallback, the reviewer side-by-side view and
+deep-dive passes all need the same rasterized pages. Rendering a 2,000-page scan
+takes minutes of CPU, so rendered pages are cached on local disk keyed by
+``(document sha256, page, dpi, colorspace)``.
+
+Entries are stored as binary PNM (``P5`` grayscale / ``P6`` RGB): a short text
+header followed by the raw samples, so reading an entry needs no decoding.
+
+The cache is safe to share between worker processes:
+
+- writes go to a temp file in the target directory and are published with
+  ``os.replace``, so readers see either no entry or a complete one;
+- recency is the file's mtime, bumped on every hit, so LRU order is shared
+  by all processes;
+- eviction tolerates entries disappearing underneath it.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Literal
+
+import pymupdf
+
+from dataminer.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+Colorspace = Literal["gray", "rgb"]
+
+_PNM_MAGIC: dict[Colorspace, bytes] = {"gray": b"P5", "rgb": b"P6"}
+_PNM_COLORSPACE: dict[bytes, Colorspace] = {
+    magic: colorspace for colorspace, magic in _PNM_MAGIC.items()
+}
+_ENTRY_SUFFIX = ".pnm"
+_TMP_PREFIX = ".tmp-"
+_STALE_TMP_SECONDS = 3600
+
+
+@dataclass(frozen=True, slots=True)
+class PageImage:
+    """Rendered page as raw 8-bit, row-major samples."""
+
+    width: int
+    height: int
+    samples: bytes
+    colorspace: Colorspace = "gray"
+
+    @property
+    def channels(self) -> int:
+        """Samples per pixel."""
+        return 1 if self.colorspace == "gray" else 3
+
+    def to_pnm(self) -> bytes:
+        """Serialize as binary PNM."""
+        header = b"%s\n%d %d\n255\n" % (_PNM_MAGIC[self.colorspace], self.width, self.height)
+        return header + self.samples
+
+    @classmethod
+    def from_pnm(cls, data: bytes) -> PageImage:
+        """Parse binary PNM written by :meth:`to_pnm`."""
+        magic, size, maxval, samples = data.split(b"\n", 3)
+        width, height = (int(value) for value in size.split())
+        if magic not in _PNM_COLORSPACE or maxval != b"255":
+            raise ValueError("Unsupported PNM image")
+        image = cls(width, height, samples, _PNM_COLORSPACE[magic])
+        if len(samples) != width * height * image.channels:
+            raise ValueError("Truncated PNM image")
+        return image
+
+
+def sha256_file(path: str | Path, chunk_size: int = 1024 * 1024) -> str:
+    """Hex sha256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with Path(path).open("rb") as file:
+        while chunk := file.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def render_page(
+    doc: pymupdf.Document, page_number: int, dpi: int, colorspace: Colorspace = "gray"
+) -> PageImage:
+    """Render a 1-based page without encoding it."""
+    pixmap = doc[page_number - 1].get_pixmap(
+        dpi=dpi,
+        colorspace=pymupdf.csGRAY if colorspace == "gray" else pymupdf.csRGB,
+        alpha=False,
+    )
+    return PageImage(pixmap.width, pixmap.height, pixmap.samples, colorspace)
+
+
+class PageImageCache:
+    """Size-bounded LRU cache of rendered pages on local disk."""
+
+    def __init__(self, root: str | Path | None = None, max_bytes: int | None = None):
+        """Initialize the cache.
+
+        Args:
+            root: Cache directory. Defaults to ``settings.page_cache_dir``.
+            max_bytes: Size bound. Defaults to ``settings.page_cache_max_mb``.
+        """
+        settings = get_settings()
+        self.root = Path(root or settings.page_cache_dir)
+        self.max_bytes = max_bytes or settings.page_cache_max_mb * 1024 * 1024
+        self.root.mkdir(parents=True, exist_ok=True)
+        # Approximate bytes written since the last eviction pass; the pass itself
+        # measures the directory, so other processes' writes are accounted for.
+        self._size_estimate: int | None = None
+
+    def _entry_path(self, doc_sha256: str, page_number: int, dpi: int, colorspace: str) -> Path:
+        name = f"{doc_sha256}-p{page_number}-{dpi}dpi-{colorspace}{_ENTRY_SUFFIX}"
+        return self.root / doc_sha256[:2] / name
+
+    def get(
+        self, doc_sha256: str, page_number: int, dpi: int, colorspace: Colorspace = "gray"
+    ) -> PageImage | None:
+        """Return a cached page, or ``None`` on a miss."""
+        path = self._entry_path(doc_sha256, page_number, dpi, colorspace)
+        try:
+            data = path.read_bytes()
+            image = PageImage.from_pnm(data)
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            logger.warning("Discarding corrupt page cache entry", extra={"path": str(path)})
+            path.unlink(missing_ok=True)
+            return None
+
+        with contextlib.suppress(FileNotFoundError):
+            os.utime(path)  # mark as recently used
+        return image
+
+    def put(self, doc_sha256: str, page_number: int, dpi: int, image: PageImage) -> None:
+        """Store a page atomically, evicting least recently used entries if needed."""
+        path = self._entry_path(doc_sha256, page_number, dpi, image.colorspace)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = image.to_pnm()
+
+        handle, tmp_name = tempfile.mkstemp(prefix=_TMP_PREFIX, dir=path.parent)
+        try:
+            with os.fdopen(handle, "wb") as tmp:
+                tmp.write(data)
+            Path(tmp_name).replace(path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+        if self._size_estimate is None:
+            self._size_estimate = self.size_bytes()
+        else:
+            self._size_estimate += len(data)
+        if self._size_estimate > self.max_bytes:
+            self.evict()
+
+    def get_or_render(
+        self,
+        doc: pymupdf.Document,
+        doc_sha256: str,
+        page_number: int,
+        dpi: int,
+        colorspace: Colorspace = "gray",
+    ) -> PageImage:
+        """Return a cached page, rendering and caching it on a miss."""
+        image = self.get(doc_sha256, page_number, dpi, colorspace)
+        if image is None:
+            image = render_page(doc, page_number, dpi, colorspace)
+            self.put(doc_sha256, page_number, dpi, image)
+        return image
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        """``(mtime, size, path)`` of every entry, tolerating concurrent removal."""
+        entries = []
+        now = time.time()
+        for path in self.root.glob("*/*"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if path.name.startswith(_TMP_PREFIX):
+                # Leftover from a crashed writer
+                if now - stat.st_mtime > _STALE_TMP_SECONDS:
+                    path.unlink(missing_ok=True)
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def size_bytes(self) -> int:
+        """Total size of cached entries."""
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self, target_ratio: float = 0.9) -> int:
+        """Remove least recently used entries until under ``target_ratio * max_bytes``.
+
+        Returns:
+            Number of entries removed.
+        """
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * target_ratio
+        removed = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        self._size_estimate = total
+        if removed:
+            logger.info(
+                "Evicted page cache entries",
+                extra={"removed": removed, "size_bytes": total, "max_bytes": self.max_bytes},
+            )
+        return removed
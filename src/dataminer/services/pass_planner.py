@@ -0,0 +1,264 @@
+"""Adaptive planning of the detailed, validation and deep-dive passes.
+
+Instead of running every pass on every document, the planner decides per
+field group what is still worth paying for:
+
+- **detailed**: only fields whose quick-pass confidence is below their review
+  threshold (:mod:`dataminer.services.confidence`) are sent again;
+- **validation**: only groups with critical fields that are not yet certain
+  (below ``VALIDATION_SKIP_CONFIDENCE``);
+- **deep dive**: only when the profile enables it, for fields still below
+  ``deep_dive_confidence_threshold`` after the detailed pass.
+
+Every planned call is costed against what remains of ``max_cost_per_document``
+(cost already paid plus calls already planned). When the budget is tight, or the
+detailed model no longer fits, a call is downgraded to the quick model; when
+nothing fits it is skipped and its fields are left for review. Each decision
+is recorded as a :class:`PassDecision`, so easy documents finish in one or two
+calls and the reasons are visible when they do not.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import TYPE_CHECKING, Literal
+
+from dataminer.core.config import get_settings
+from dataminer.services.confidence import field_threshold, field_tier
+from dataminer.services.costs import JobCostLedger, call_cost
+
+if TYPE_CHECKING:
+    from dataminer.db.queries.models import SourceExtractionProfile
+    from dataminer.services.field_extraction import FieldDefinition
+    from dataminer.services.llm_client import LLMPass
+
+logger = logging.getLogger(__name__)
+
+PlanAction = Literal["run", "downgrade", "skip"]
+
+# Prompt sizing used to cost a planned call.
+PROMPT_OVERHEAD_TOKENS = 400
+PROMPT_TOKENS_PER_FIELD = 40
+OUTPUT_TOKENS_PER_FIELD = 60
+
+VALIDATION_SKIP_CONFIDENCE = 0.95
+
+
+@dataclass(frozen=True, slots=True)
+class FieldGroup:
+    """Fields extracted together from one section."""
+
+    name: str
+    fields: tuple[FieldDefinition, ...]
+    text_tokens: int
+
+
+@dataclass(frozen=True, slots=True)
+class PassDecision:
+    """What the planner decided for one pass of one field group."""
+
+    group: str
+    llm_pass: LLMPass
+    action: PlanAction
+    model: str | None
+    fields: tuple[str, ...]
+    estimated_cost: Decimal
+    reason: str
+
+
+@dataclass(frozen=True, slots=True)
+class PlannerConfig:
+    """Profile settings the planner needs."""
+
+    llm_model_quick: str
+    llm_model_detailed: str
+    max_cost_per_document: Decimal
+    enable_deep_dive_pass: bool = True
+    deep_dive_confidence_threshold: float = 0.75
+    tight_budget_ratio: float = 0.25
+
+    @classmethod
+    def from_profile(cls, profile: SourceExtractionProfile) -> PlannerConfig:
+        """Read the planner settings of an extraction profile."""
+        settings = get_settings()
+        max_cost = profile.max_cost_per_document
+        threshold = profile.deep_dive_confidence_threshold
+        return cls(
+            llm_model_quick=profile.llm_model_quick or "gemini-1.5-flash",
+            llm_model_detailed=profile.llm_model_detailed or "gemini-1.5-pro",
+            max_cost_per_document=Decimal(
+                str(max_cost if max_cost is not None else settings.default_max_cost_per_document)
+            ),
+            enable_deep_dive_pass=bool(profile.enable_deep_dive_pass),
+            deep_dive_confidence_threshold=float(threshold) if threshold is not None else 0.75,
+        )
+
+
+@dataclass
+class PassPlanner:
+    """Plans the passes after the quick scan for one document.
+
+    Usage:
+        planner = PassPlanner(PlannerConfig.from_profile(profile), ledger)
+        for decision in planner.plan_detailed(groups, quick_confidences):
+            if decision.action != "skip":
+                await run(decision.model, decision.fields)
+    """
+
+    config: PlannerConfig
+    ledger: JobCostLedger
+    decisions: list[PassDecision] = field(default_factory=list)
+    reserved: Decimal = Decimal(0)
+
+    @property
+    def remaining_budget(self) -> Decimal:
+        """Budget left after paid and already planned calls."""
+        return self.config.max_cost_per_document - self.ledger.total_cost - self.reserved
+
+    def estimate_cost(self, model: str, group: FieldGroup, field_count: int) -> Decimal:
+        """Estimated cost of extracting ``field_count`` fields of ``group`` with ``model``."""
+        prompt_tokens = (
+            group.text_tokens + PROMPT_OVERHEAD_TOKENS + PROMPT_TOKENS_PER_FIELD * field_count
+        )
+        return call_cost(model, prompt_tokens, OUTPUT_TOKENS_PER_FIELD * field_count)
+
+    def _budget_is_tight(self) -> bool:
+        return self.remaining_budget < self.config.max_cost_per_document * Decimal(
+            str(self.config.tight_budget_ratio)
+        )
+
+    def _decide(
+        self,
+        group: FieldGroup,
+        llm_pass: LLMPass,
+        fields: list[FieldDefinition],
+        preferred_model: str,
+        reason: str,
+    ) -> PassDecision:
+        """Fit a call into the budget, downgrading or skipping it if needed."""
+        names = tuple(definition.field_name for definition in fields)
+        quick = self.config.llm_model_quick
+        cost = self.estimate_cost(preferred_model, group, len(fields))
+
+        if preferred_model != quick and (self._budget_is_tight() or cost > self.remaining_budget):
+            cost = self.estimate_cost(quick, group, len(fields))
+            action: PlanAction = "downgrade"
+            model: str | None = quick
+            reason = f"{reason}; budget tight, using quick model"
+        else:
+            action, model = "run", preferred_model
+
+        if cost > self.remaining_budget:
+            action, model = "skip", None
+            reason = f"{reason}; over budget (remaining {self.remaining_budget:.4f})"
+        else:
+            self.reserved += cost
+
+        return self._record(PassDecision(group.name, llm_pass, action, model, names, cost, reason))
+
+    def _skip(self, group: FieldGroup, llm_pass: LLMPass, reason: str) -> PassDecision:
+        return self._record(
+            PassDecision(group.name, llm_pass, "skip", None, (), Decimal(0), reason)
+        )
+
+    def _record(self, decision: PassDecision) -> PassDecision:
+        self.decisions.append(decision)
+        logger.info(
+            "Pass planned",
+            extra={
+                "group": decision.group,
+                "llm_pass": decision.llm_pass,
+                "action": decision.action,
+                "model": decision.model,
+                "fields": len(decision.fields),
+                "estimated_cost": str(decision.estimated_cost),
+                "reason": decision.reason,
+            },
+        )
+        return decision
+
+    def settle(self, decision: PassDecision) -> None:
+        """Release a planned call's reservation once its actual cost is in the ledger."""
+        if decision.action != "skip":
+            self.reserved = max(Decimal(0), self.reserved - decision.estimated_cost)
+
+    def plan_detailed(
+        self, groups: Iterable[FieldGroup], confidences: Mapping[str, float]
+    ) -> list[PassDecision]:
+        """Plan the detailed pass from quick-pass confidences (missing fields count as 0)."""
+        planned = []
+        for group in groups:
+            weak = [
+                f for f in group.fields if confidences.get(f.field_name, 0.0) < field_threshold(f)
+            ]
+            if not weak:
+                planned.append(self._skip(group, "detailed", "quick pass above thresholds"))
+                continue
+            planned.append(
+                self._decide(
+                    group,
+                    "detailed",
+                    weak,
+                    self.config.llm_model_detailed,
+                    f"{len(weak)} field(s) below threshold",
+                )
+            )
+        return planned
+
+    def plan_validation(
+        self, groups: Iterable[FieldGroup], confidences: Mapping[str, float]
+    ) -> list[PassDecision]:
+        """Plan the validation pass for groups with uncertain critical fields."""
+        planned = []
+        for group in groups:
+            uncertain = [
+                f
+                for f in group.fields
+                if field_tier(f.field_name, f.field_category) == "critical"
+                and confidences.get(f.field_name, 0.0) < VALIDATION_SKIP_CONFIDENCE
+            ]
+            if not uncertain:
+                planned.append(self._skip(group, "validation", "no uncertain critical fields"))
+                continue
+            planned.append(
+                self._decide(
+                    group,
+                    "validation",
+                    uncertain,
+                    self.config.llm_model_quick,
+                    f"{len(uncertain)} critical field(s) to verify",
+                )
+            )
+        return planned
+
+    def plan_deep_dive(
+        self, groups: Iterable[FieldGroup], confidences: Mapping[str, float]
+    ) -> list[PassDecision]:
+        """Plan the deep dive for fields still below the profile's threshold."""
+        planned = []
+        threshold = self.config.deep_dive_confidence_threshold
+        for group in groups:
+            if not self.config.enable_deep_dive_pass:
+                planned.append(self._skip(group, "deep_dive", "deep dive disabled"))
+                continue
+            low = [f for f in group.fields if confidences.get(f.field_name, 0.0) < threshold]
+            if not low:
+                planned.append(self._skip(group, "deep_dive", "no low-confidence fields"))
+                continue
+            planned.append(
+                self._decide(
+                    group,
+                    "deep_dive",
+                    low,
+                    self.config.llm_model_detailed,
+                    f"{len(low)} field(s) below {threshold}",
+                )
+            )
+        return planned
+
+    def calls_planned(self) -> int:
+        """Number of calls the plan makes so far."""
+        return sum(decision.action != "skip" for decision in self.decisions)
@@ -0,0 +1,247 @@
+"""PDF text extraction service.
+
+Pages are extracted by a pool of worker processes, each of which opens the PDF
+independently and handles a contiguous range of pages. Results are yielded back
+in page order as an async stream, so normalization and segmentation can start
+on the first pages while later ones are still being parsed.
+
+PyMuPDF is the primary extractor; pdfplumber is used for any page PyMuPDF fails
+on (or for every page when the profile asks for ``pdfplumber``).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Literal
+
+import pymupdf
+
+from dataminer.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+ExtractionMethod = Literal["pymupdf", "pdfplumber"]
+
+
+class PDFExtractionError(Exception):
+    """Raised when a page cannot be extracted by any available method."""
+
+
+@dataclass(frozen=True, slots=True)
+class PageText:
+    """Text extracted from a single page."""
+
+    page_number: int  # 1-based
+    text: str
+    method: ExtractionMethod
+    duration_ms: float
+
+
+@dataclass(slots=True)
+class DocumentText:
+    """Text of a whole document with extraction timings."""
+
+    pages: list[PageText] = field(default_factory=list)
+    duration_ms: float = 0.0
+
+    @property
+    def page_count(self) -> int:
+        """Number of extracted pages."""
+        return len(self.pages)
+
+    @property
+    def text(self) -> str:
+        """Full document text, pages separated by form feeds."""
+        return "\f".join(page.text for page in self.pages)
+
+    @property
+    def pages_per_second(self) -> float:
+        """Overall extraction throughput."""
+        if self.duration_ms <= 0:
+            return 0.0
+        return self.page_count / (self.duration_ms / 1000)
+
+
+def count_pages(path: str | Path) -> int:
+    """Return the number of pages in a PDF without extracting any text."""
+    with pymupdf.open(path) as doc:
+        return doc.page_count
+
+
+def _extract_with_pdfplumber(path: str, page_indexes: list[int]) -> dict[int, str]:
+    """Extract the given 0-based pages with pdfplumber."""
+    import pdfplumber
+
+    with pdfplumber.open(path, pages=[index + 1 for index in page_indexes]) as pdf:
+        return {
+            index: page.extract_text() or ""
+            for index, page in zip(page_indexes, pdf.pages, strict=True)
+        }
+
+
+def extract_page_range(
+    path: str, start: int, stop: int, method: ExtractionMethod = "pymupdf"
+) -> list[PageText]:
+    """Extract pages ``[start, stop)`` (0-based) from a PDF.
+
+    This runs inside a worker process: the document is opened once per range
+    and closed before returning, so workers never share file handles.
+    """
+    pages: list[PageText] = []
+    failed: list[int] = []
+
+    if method == "pymupdf":
+        with pymupdf.open(path) as doc:
+            for index in range(start, stop):
+                started = time.perf_counter()
+                try:
+                    text = doc[index].get_text("text")
+                except Exception:
+                    logger.warning(
+                        "PyMuPDF failed on page, falling back to pdfplumber",
+                        extra={"path": path, "page": index + 1},
+                    )
+                    failed.append(index)
+                    continue
+                duration_ms = (time.perf_counter() - started) * 1000
+                pages.append(PageText(index + 1, text, "pymupdf", duration_ms))
+    else:
+        failed = list(range(start, stop))
+
+    for index in failed:
+        started = time.perf_counter()
+        try:
+            text = _extract_with_pdfplumber(path, [index])[index]
+        except Exception as e:
+            raise PDFExtractionError(f"Could not extract page {index + 1} of {path}") from e
+        duration_ms = (time.perf_counter() - started) * 1000
+        pages.append(PageText(index + 1, text, "pdfplumber", duration_ms))
+
+    pages.sort(key=lambda page: page.page_number)
+    return pages
+
+
+def _page_ranges(page_count: int, pages_per_task: int) -> Iterator[tuple[int, int]]:
+    """Split ``page_count`` pages into contiguous ranges."""
+    for start in range(0, page_count, pages_per_task):
+        yield start, min(start + pages_per_task, page_count)
+
+
+class PDFExtractor:
+    """Page-parallel PDF text extractor.
+
+    Usage:
+        async with PDFExtractor() as extractor:
+            async for page in extractor.stream_pages(path):
+                ...
+    """
+
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        pages_per_task: int = 8,
+        method: ExtractionMethod = "pymupdf",
+        executor: Executor | None = None,
+    ):
+        """Initialize the extractor.
+
+        Args:
+            max_workers: Worker processes to use. Defaults to ``settings.max_workers``
+                capped at the number of CPUs.
+            pages_per_task: Pages handed to a worker per task. Larger ranges amortize
+                the per-task document open; smaller ones balance load better.
+            method: Primary extraction method (``pymupdf`` or ``pdfplumber``).
+            executor: Optional executor to use instead of an owned process pool.
+        """
+        if pages_per_task < 1:
+            raise ValueError("pages_per_task must be at least 1")
+
+        if max_workers is None:
+            max_workers = min(get_settings().max_workers, os.cpu_count() or 1)
+        self.max_workers = max(1, max_workers)
+        self.pages_per_task = pages_per_task
+        self.method = method
+        self._executor = executor
+        self._owns_executor = executor is None
+
+    @property
+    def executor(self) -> Executor:
+        """Executor that runs page-range extraction, created on first use."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def close(self) -> None:
+        """Shut down the owned worker pool."""
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    async def __aenter__(self) -> PDFExtractor:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        self.close()
+
+    async def stream_pages(self, path: str | Path) -> AsyncIterator[PageText]:
+        """Yield page text in page order as soon as each page is available.
+
+        At most ``2 * max_workers`` page ranges are in flight at once, so a slow
+        consumer never causes the whole document to be buffered in memory.
+        """
+        path = str(path)
+        loop = asyncio.get_running_loop()
+        page_count = await loop.run_in_executor(None, count_pages, path)
+
+        ranges = _page_ranges(page_count, self.pages_per_task)
+        in_flight: deque[asyncio.Future[list[PageText]]] = deque()
+
+        def submit_next() -> None:
+            next_range = next(ranges, None)
+            if next_range is not None:
+                start, stop = next_range
+                in_flight.append(
+                    loop.run_in_executor(
+                        self.executor, extract_page_range, path, start, stop, self.method
+                    )
+                )
+
+        for _ in range(self.max_workers * 2):
+            submit_next()
+
+        try:
+            while in_flight:
+                pages = await in_flight.popleft()
+                submit_next()
+                for page in pages:
+                    yield page
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+    async def extract(self, path: str | Path) -> DocumentText:
+        """Extract every page of a document and record timings."""
+        started = time.perf_counter()
+        result = DocumentText()
+        async for page in self.stream_pages(path):
+            result.pages.append(page)
+        result.duration_ms = (time.perf_counter() - started) * 1000
+
+        logger.info(
+            "PDF text extracted",
+            extra={
+                "path": str(path),
+                "page_count": result.page_count,
+                "duration_ms": round(result.duration_ms, 2),
+                "pages_per_second": round(result.pages_per_second, 2),
+            },
+        )
+        return result
@@ -0,0 +1,270 @@
+"""Packing several section prompts into one LLM request.
+
+Short sections (header, panel, verdict) each cost a full round trip and repeat
+the shared instructions when sent separately. :class:`PromptPacker` bin-packs
+section/field-group prompts (first-fit decreasing by token size) into batches
+that fit ``max_prompt_tokens``. Each batch is rendered as one prompt: the shared
+instructions once, then one delimited task per part. The model answers with one
+JSON object keyed by task.
+
+:class:`PackedPromptRunner` sends the batches concurrently and demultiplexes
+each response back to per-part results. A batch whose request fails, whose
+response cannot be parsed, or that omits some tasks, is split in half and
+retried down to single parts, so one bad answer costs at most the parts it
+actually affected.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from collections.abc import Awaitable, Callable, Iterable, Sequence
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from dataminer.services.field_extraction import ExtractedField
+from dataminer.utils.tokens import TokenCounter, get_token_counter
+
+if TYPE_CHECKING:
+    from dataminer.services.field_extraction import FieldDefinition
+
+logger = logging.getLogger(__name__)
+
+GenerateFn = Callable[[str], Awaitable[str]]
+
+DEFAULT_INSTRUCTIONS = (
+    "You extract structured data from Indonesian court decisions. Each TASK below has "
+    "its own instructions, field list and source text. Answer with a single JSON object "
+    "whose keys are the TASK ids; each value is an object mapping every listed field to "
+    '{"value": ..., "confidence": 0.0-1.0}. Use null for values that are not in the text.'
+)
+
+# Tokens of the per-task delimiters and field list preamble.
+TASK_OVERHEAD_TOKENS = 30
+# Tokens each field name adds to a task's field list.
+FIELD_NAME_TOKENS = 4
+
+
+class PackedResponseError(ValueError):
+    """Raised when a packed response cannot be demultiplexed."""
+
+
+@dataclass(frozen=True, slots=True)
+class PromptPart:
+    """One section/field-group prompt to be packed."""
+
+    key: str
+    instructions: str
+    text: str
+    fields: tuple[str, ...]
+
+    @classmethod
+    def for_fields(
+        cls, key: str, instructions: str, text: str, definitions: Iterable[FieldDefinition]
+    ) -> PromptPart:
+        """Part extracting ``definitions`` from one section's text."""
+        return cls(key, instructions, text, tuple(d.field_name for d in definitions))
+
+    def render(self) -> str:
+        """Render the part as a delimited task block."""
+        return (
+            f"### TASK {self.key}\n{self.instructions}\n"
+            f"Fields: {', '.join(self.fields)}\n"
+            f"<<<TEXT {self.key}\n{self.text}\nTEXT {self.key}>>>"
+        )
+
+
+@dataclass
+class PromptBatch:
+    """Parts sent together in one request."""
+
+    parts: list[PromptPart]
+    tokens: int = 0
+
+    @property
+    def keys(self) -> list[str]:
+        """Task ids in the batch."""
+        return [part.key for part in self.parts]
+
+    def render(self, instructions: str) -> str:
+        """Render the batch as one prompt."""
+        blocks = "\n\n".join(part.render() for part in self.parts)
+        return f"{instructions}\n\n{blocks}\n\nRespond with JSON keyed by: {', '.join(self.keys)}"
+
+
+def _extract_json(text: str) -> Any:
+    """Parse a JSON object, tolerating Markdown code fences around it."""
+    stripped = text.strip()
+    if stripped.startswith("```"):
+        stripped = stripped.split("\n", 1)[1] if "\n" in stripped else ""
+        stripped = stripped.rsplit("```", 1)[0]
+    return json.loads(stripped)
+
+
+def demultiplex(batch: PromptBatch, response_text: str) -> dict[str, dict[str, ExtractedField]]:
+    """Split a packed JSON response into per-part field results.
+
+    Only fields that the part asked for are kept. Parts missing from the
+    response are absent from the result.
+
+    Raises:
+        PackedResponseError: If the response is not a JSON object.
+    """
+    try:
+        payload = _extract_json(response_text)
+    except json.JSONDecodeError as e:
+        raise PackedResponseError(f"Response is not valid JSON: {e}") from e
+    if not isinstance(payload, dict):
+        raise PackedResponseError("Response is not a JSON object")
+
+    results: dict[str, dict[str, ExtractedField]] = {}
+    for part in batch.parts:
+        value = payload.get(part.key)
+        if isinstance(value, dict):
+            results[part.key] = {
+                name: ExtractedField.from_answer(name, value[name], part.key)
+                for name in part.fields
+                if name in value
+            }
+    return results
+
+
+class PromptPacker:
+    """Bin-packs prompt parts into requests within a token budget."""
+
+    def __init__(
+        self,
+        max_prompt_tokens: int,
+        instructions: str = DEFAULT_INSTRUCTIONS,
+        token_counter: TokenCounter | None = None,
+    ):
+        """Initialize the packer.
+
+        Args:
+            max_prompt_tokens: Input token budget of one request.
+            instructions: Shared instructions sent once per request.
+            token_counter: Token counter. Defaults to the shared counter.
+        """
+        self.max_prompt_tokens = max_prompt_tokens
+        self.instructions = instructions
+        self.token_counter = token_counter or get_token_counter()
+        self.instruction_tokens = self.token_counter.estimate(instructions)
+
+    def part_tokens(self, part: PromptPart) -> int:
+        """Estimated tokens a part adds to a request."""
+        return (
+            self.token_counter.estimate(part.instructions)
+            + self.token_counter.estimate(part.text)
+            + len(part.fields) * FIELD_NAME_TOKENS
+            + TASK_OVERHEAD_TOKENS
+        )
+
+    def batch(self, parts: Sequence[PromptPart]) -> PromptBatch:
+        """One batch of ``parts``, with its estimated tokens."""
+        tokens = sum(self.part_tokens(part) for part in parts)
+        return PromptBatch(list(parts), tokens + self.instruction_tokens)
+
+    def pack(self, parts: Iterable[PromptPart]) -> list[PromptBatch]:
+        """Pack parts into as few batches as fit the budget.
+
+        A part larger than the budget on its own gets a batch of its own.
+        """
+        sized = sorted(
+            ((self.part_tokens(part), part) for part in parts), key=lambda item: -item[0]
+        )
+        capacity = self.max_prompt_tokens - self.instruction_tokens
+        batches: list[PromptBatch] = []
+        for tokens, part in sized:
+            for batch in batches:
+                if batch.tokens + tokens <= capacity:
+                    batch.parts.append(part)
+                    batch.tokens += tokens
+                    break
+            else:
+                batches.append(PromptBatch([part], tokens))
+        for batch in batches:
+            batch.tokens += self.instruction_tokens
+        return batches
+
+
+@dataclass
+class PackedRunResult:
+    """Per-part results of a packed run."""
+
+    results: dict[str, dict[str, ExtractedField]] = field(default_factory=dict)
+    failed: list[str] = field(default_factory=list)
+    requests: int = 0
+
+    @property
+    def fields(self) -> dict[str, ExtractedField]:
+        """All extracted fields, by field name."""
+        return {name: f for part in self.results.values() for name, f in part.items()}
+
+
+class PackedPromptRunner:
+    """Sends packed batches and demultiplexes, splitting batches that fail.
+
+    Usage:
+        runner = PackedPromptRunner(packer, generate=lambda p: call_llm(p))
+        outcome = await runner.run(parts)
+    """
+
+    def __init__(self, packer: PromptPacker, generate: GenerateFn):
+        """Initialize the runner.
+
+        Args:
+            packer: Packer used to build batches.
+            generate: Sends a prompt and returns the response text.
+        """
+        self.packer = packer
+        self.generate = generate
+
+    async def run(self, parts: Sequence[PromptPart]) -> PackedRunResult:
+        """Run all parts in as few requests as possible."""
+        outcome = PackedRunResult()
+        await self._run_batches(self.packer.pack(parts), outcome)
+        return outcome
+
+    async def _run_batches(self, batches: Sequence[PromptBatch], outcome: PackedRunResult) -> None:
+        """Run batches concurrently; an error in one fails only that batch's parts."""
+        errors = await asyncio.gather(
+            *(self._run_batch(batch, outcome) for batch in batches), return_exceptions=True
+        )
+        for batch, error in zip(batches, errors, strict=True):
+            if isinstance(error, BaseException):
+                logger.error(
+                    "Packed batch failed",
+                    extra={"tasks": batch.keys, "error": str(error)},
+                )
+                outcome.failed.extend(key for key in batch.keys if key not in outcome.results)
+
+    async def _run_batch(self, batch: PromptBatch, outcome: PackedRunResult) -> None:
+        outcome.requests += 1
+        try:
+            response = await self.generate(batch.render(self.packer.instructions))
+            results = demultiplex(batch, response)
+        except PackedResponseError as e:
+            logger.warning(
+                "Packed response could not be parsed",
+                extra={"tasks": batch.keys, "error": str(e)},
+            )
+            results = {}
+        except Exception as e:
+            logger.warning(
+                "Packed request failed",
+                extra={"tasks": batch.keys, "error": str(e)},
+            )
+            results = {}
+
+        outcome.results.update(results)
+        missing = [part for part in batch.parts if part.key not in results]
+        if not missing:
+            return
+        if len(batch.parts) == 1:
+            outcome.failed.append(batch.parts[0].key)
+            return
+        # Retry only what is missing, in halves, so one bad task cannot sink the rest.
+        middle = (len(missing) + 1) // 2
+        halves = [missing[:middle], missing[middle:]]
+        await self._run_batches([self.packer.batch(half) for half in halves if half], outcome)
@@ -0,0 +1,335 @@
+"""Compiled ``source_prompt_templates``.
+
+A template's ``prompt_text`` uses ``{{ name }}`` slots; its ``variables`` JSON
+declares them, either as a list of names or as objects with ``name``,
+``required`` and ``default``. Other braces, such as nested JSON output
+examples, are literal text; only a ``{{`` that starts like a slot but is not
+one is rejected. Each ``(template_id, version)`` is parsed and
+validated once into a :class:`CompiledTemplate`:
+
+- the static prefix (optional system prompt plus everything before the first
+  slot) is encoded once and reused as the same bytes on every render, so
+  provider-side prefix caching applies to it;
+- the rest is a tuple of pre-encoded literals and slot names, and rendering is
+  a single ``b"".join``.
+
+Values that are the same for every segment of a section (field lists, output
+schema) can be bound ahead of time with :meth:`PromptTemplateCache.bind`; bound
+values right after the prefix extend it. Lists render as ``- item`` lines and
+mappings as sorted JSON, so equal values always render to the same bytes.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from dataminer.db.queries.models import SourcePromptTemplate
+
+logger = logging.getLogger(__name__)
+
+_SLOT = re.compile(r"\{\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*\}\}")
+# ``{{`` starting something other than JSON (a quote, brace or bracket) is a broken slot;
+# nested JSON examples such as ``{"a": {"b": 1}}`` are literal text.
+_BROKEN_SLOT = re.compile(r"\{\{\s*[^\s\"'{}\[\]]")
+
+
+class PromptTemplateError(ValueError):
+    """Raised when a template is invalid or rendered without a required value."""
+
+
+@dataclass(frozen=True, slots=True)
+class VariableSpec:
+    """A declared template variable."""
+
+    name: str
+    required: bool = True
+    default: str | None = None
+
+
+def parse_variables(spec: Any) -> dict[str, VariableSpec]:
+    """Read a ``variables`` JSON value.
+
+    Accepts a list of names, a list of ``{"name", "required", "default"}``
+    objects, or a mapping of names to such objects (or to descriptions).
+
+    Raises:
+        PromptTemplateError: If the value has another shape.
+    """
+    if spec is None:
+        return {}
+    if isinstance(spec, Mapping):
+        items: list[Any] = [
+            {"name": name, **(value if isinstance(value, Mapping) else {})}
+            for name, value in spec.items()
+        ]
+    elif isinstance(spec, list):
+        items = spec
+    else:
+        raise PromptTemplateError(
+            f"variables must be a list or an object, not {type(spec).__name__}"
+        )
+
+    variables: dict[str, VariableSpec] = {}
+    for item in items:
+        if isinstance(item, str):
+            variables[item] = VariableSpec(item)
+        elif isinstance(item, Mapping) and isinstance(item.get("name"), str):
+            default = item.get("default")
+            variables[item["name"]] = VariableSpec(
+                item["name"],
+                required=bool(item.get("required", default is None)),
+                default=format_value(default) if default is not None else None,
+            )
+        else:
+            raise PromptTemplateError(f"Invalid variable declaration: {item!r}")
+    return variables
+
+
+def format_value(value: Any) -> str:
+    """Render a slot value deterministically."""
+    if isinstance(value, str):
+        return value
+    if value is None:
+        return ""
+    if isinstance(value, list | tuple):
+        return "\n".join(f"- {format_value(item)}" for item in value)
+    if isinstance(value, Mapping):
+        return json.dumps(value, ensure_ascii=False, sort_keys=True)
+    return str(value)
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledTemplate:
+    """A parsed template: a static prefix, then literals and slots."""
+
+    template_id: str
+    version: int
+    prefix: bytes
+    pieces: tuple[bytes | str, ...]
+    variables: Mapping[str, VariableSpec] = field(default_factory=dict)
+
+    @property
+    def slots(self) -> tuple[str, ...]:
+        """Unfilled slot names in order of first use."""
+        return tuple(dict.fromkeys(piece for piece in self.pieces if isinstance(piece, str)))
+
+    @property
+    def prefix_text(self) -> str:
+        """The static prefix as text."""
+        return self.prefix.decode("utf-8")
+
+    def _value(self, name: str, values: Mapping[str, Any]) -> bytes:
+        if name in values:
+            return format_value(values[name]).encode("utf-8")
+        spec = self.variables.get(name)
+        if spec is not None and spec.default is not None:
+            return spec.default.encode("utf-8")
+        if spec is not None and not spec.required:
+            return b""
+        raise PromptTemplateError(
+            f"Template {self.template_id} v{self.version}: missing value for '{name}'"
+        )
+
+    def render_bytes(self, values: Mapping[str, Any] | None = None) -> bytes:
+        """Render the prompt as UTF-8 bytes.
+
+        Raises:
+            PromptTemplateError: If a required slot has no value.
+        """
+        values = values or {}
+        out = [self.prefix]
+        for piece in self.pieces:
+            out.append(piece if isinstance(piece, bytes) else self._value(piece, values))
+        return b"".join(out)
+
+    def render(self, values: Mapping[str, Any] | None = None, **kwargs: Any) -> str:
+        """Render the prompt.
+
+        Raises:
+            PromptTemplateError: If a required slot has no value.
+        """
+        return self.render_bytes({**(values or {}), **kwargs}).decode("utf-8")
+
+    def bind(self, values: Mapping[str, Any]) -> CompiledTemplate:
+        """Fill some slots now, returning a template for the rest.
+
+        Literals and bound values directly after the prefix are folded into it.
+        """
+        prefix = [self.prefix]
+        pieces: list[bytes | str] = []
+        for piece in self.pieces:
+            if isinstance(piece, str) and piece in values:
+                piece = self._value(piece, values)
+            last = pieces[-1] if pieces else None
+            if isinstance(piece, str):
+                pieces.append(piece)
+            elif last is None:
+                prefix.append(piece)
+            elif isinstance(last, bytes):
+                pieces[-1] = last + piece
+            else:
+                pieces.append(piece)
+        variables = {name: spec for name, spec in self.variables.items() if name not in values}
+        return CompiledTemplate(
+            self.template_id, self.version, b"".join(prefix), tuple(pieces), variables
+        )
+
+
+def compile_template(
+    prompt_text: str,
+    variables: Any = None,
+    *,
+    template_id: str = "",
+    version: int = 1,
+    system_prompt: str | None = None,
+) -> CompiledTemplate:
+    """Parse and validate a template.
+
+    Args:
+        prompt_text: Template text with ``{{ name }}`` slots.
+        variables: The template's ``variables`` JSON. When given, every slot
+            must be declared and every required variable must be used.
+        template_id: Template identifier, for errors and cache keys.
+        version: Template version.
+        system_prompt: Static text placed before the template.
+
+    Raises:
+        PromptTemplateError: If a slot is malformed or undeclared, or a
+            required variable is unused.
+    """
+    declared = parse_variables(variables)
+    text = prompt_text.replace("\r\n", "\n")
+    if system_prompt:
+        text = f"{system_prompt.strip()}\n\n{text}"
+
+    literals: list[str] = []
+    names: list[str] = []
+    position = 0
+    for match in _SLOT.finditer(text):
+        literals.append(text[position : match.start()])
+        names.append(match.group(1))
+        position = match.end()
+    literals.append(text[position:])
+
+    label = f"Template {template_id or '<inline>'} v{version}"
+    for literal in literals:
+        broken = _BROKEN_SLOT.search(literal)
+        if broken:
+            snippet = literal[broken.start() : broken.start() + 40]
+            raise PromptTemplateError(f"{label}: malformed slot near {snippet!r}")
+    if variables is not None:
+        undeclared = sorted(set(names) - set(declared))
+        if undeclared:
+            raise PromptTemplateError(f"{label}: undeclared variables {undeclared}")
+        unused = sorted(n for n, spec in declared.items() if spec.required and n not in names)
+        if unused:
+            raise PromptTemplateError(f"{label}: required variables not in text {unused}")
+
+    pieces: list[bytes | str] = []
+    for literal, name in zip(literals[1:], names, strict=True):
+        pieces.append(name)
+        if literal:
+            pieces.append(literal.encode("utf-8"))
+    return CompiledTemplate(
+        template_id=template_id,
+        version=version,
+        prefix=literals[0].encode("utf-8"),
+        pieces=tuple(pieces),
+        variables=declared or {name: VariableSpec(name) for name in dict.fromkeys(names)},
+    )
+
+
+class PromptTemplateCache:
+    """Compiles each template version once and memoizes bound templates.
+
+    Usage:
+        templates = PromptTemplateCache(system_prompt=SYSTEM_PROMPT)
+        section = templates.bind(templates.get(row), {"fields": field_lines})
+        for segment in segments:
+            prompt = section.render(text=segment.text)
+    """
+
+    def __init__(self, system_prompt: str | None = None, max_entries: int = 512):
+        """Initialize the cache.
+
+        Args:
+            system_prompt: Static text placed before every template.
+            max_entries: Compiled and bound templates kept.
+        """
+        self.system_prompt = system_prompt
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[Any, ...], CompiledTemplate] = OrderedDict()
+        self.compiles = 0
+        self.hits = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _lookup(self, key: tuple[Any, ...]) -> CompiledTemplate | None:
+        compiled = self._entries.get(key)
+        if compiled is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return compiled
+
+    def _store(self, key: tuple[Any, ...], compiled: CompiledTemplate) -> CompiledTemplate:
+        self._entries[key] = compiled
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return compiled
+
+    def compile(
+        self, template_id: str, version: int, prompt_text: str, variables: Any = None
+    ) -> CompiledTemplate:
+        """Compiled form of a template version, compiling it on first use.
+
+        Raises:
+            PromptTemplateError: If the template is invalid.
+        """
+        key = ("template", str(template_id), version)
+        compiled = self._lookup(key)
+        if compiled is not None:
+            return compiled
+        compiled = compile_template(
+            prompt_text,
+            variables,
+            template_id=str(template_id),
+            version=version,
+            system_prompt=self.system_prompt,
+        )
+        self.compiles += 1
+        logger.debug(
+            "Prompt template compiled",
+            extra={
+                "template_id": str(template_id),
+                "version": version,
+                "prefix_bytes": len(compiled.prefix),
+                "slots": list(compiled.slots),
+            },
+        )
+        return self._store(key, compiled)
+
+    def get(self, template: SourcePromptTemplate) -> CompiledTemplate:
+        """Compiled form of a ``source_prompt_templates`` row."""
+        return self.compile(
+            str(template.template_id),
+            template.version or 1,
+            template.prompt_text,
+            template.variables,
+        )
+
+    def bind(self, compiled: CompiledTemplate, values: Mapping[str, Any]) -> CompiledTemplate:
+        """Memoized :meth:`CompiledTemplate.bind`."""
+        rendered = tuple(sorted((name, format_value(value)) for name, value in values.items()))
+        key = ("bound", compiled.template_id, compiled.version, compiled.prefix, rendered)
+        bound = self._lookup(key)
+        if bound is not None:
+            return bound
+        return self._store(key, compiled.bind(dict(rendered)))
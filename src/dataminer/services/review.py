@@ -0,0 +1,131 @@
+"""Incremental re-validation of reviewer corrections.
+
+A :class:`ReviewState` holds one document's field values, validation report
+and confidence evidence. :meth:`ReviewState.correct` applies a reviewer's
+corrections and, through the compiled program's field-to-rule index, re-runs
+only the field checks and cross-field rules that read the corrected fields,
+then re-scores only the fields whose validation status or consistency could
+have changed. Correcting ``defendant_birth_date`` re-runs the age and
+chronology rules and nothing else.
+
+The returned :class:`Correction` lists exactly the rows to write, so the
+caller can persist values, issues and confidences in one transaction.
+Corrected fields are reviewer-verified and get confidence 1.0.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Mapping
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING, Any
+
+from dataminer.services.confidence import ConfidenceScorer, FieldEvidence
+
+if TYPE_CHECKING:
+    from dataminer.services.validation import ValidationIssue, ValidationReport, ValidatorProgram
+
+logger = logging.getLogger(__name__)
+
+REVIEWED_CONFIDENCE = 1.0
+
+
+@dataclass
+class Correction:
+    """Outcome of applying reviewer corrections."""
+
+    corrected: dict[str, Any]
+    confidences: dict[str, float]
+    resolved: list[ValidationIssue] = field(default_factory=list)
+    raised: list[ValidationIssue] = field(default_factory=list)
+    rules_rerun: list[str] = field(default_factory=list)
+
+    @property
+    def affected_fields(self) -> list[str]:
+        """Fields whose confidence was updated."""
+        return list(self.confidences)
+
+
+class ReviewState:
+    """One document's validation state, updated incrementally per correction.
+
+    Usage:
+        state = ReviewState(program, values, evidence)
+        correction = state.correct({"defendant_birth_date": "1990-05-01"})
+        # The caller writes correction.corrected values and correction.confidences
+        # to the job's extracted fields, and records the resolved and raised issues.
+    """
+
+    def __init__(
+        self,
+        program: ValidatorProgram,
+        values: Mapping[str, Any],
+        evidence: Mapping[str, FieldEvidence],
+        scorer: ConfidenceScorer | None = None,
+        report: ValidationReport | None = None,
+    ):
+        """Initialize the state.
+
+        Args:
+            program: The source's compiled validation program.
+            values: Extracted field values.
+            evidence: Confidence evidence per field; validation factors are
+                refreshed from the report.
+            scorer: Confidence scorer. Defaults to the PRD weights.
+            report: Existing validation report; computed when omitted.
+        """
+        self.program = program
+        self.values = dict(values)
+        self.scorer = scorer or ConfidenceScorer()
+        self.report = report if report is not None else program.validate(self.values)
+        self.reviewed: set[str] = set()
+        self.evidence = {name: self._refresh(name, item) for name, item in evidence.items()}
+
+    def _refresh(self, name: str, evidence: FieldEvidence) -> FieldEvidence:
+        return replace(
+            evidence,
+            validation_status=self.report.status(name),
+            cross_field_consistency=self.report.consistency(name),
+        )
+
+    def confidences(self) -> dict[str, float]:
+        """Current confidence of every field."""
+        scores = self.scorer.score(self.evidence)
+        scores.update(dict.fromkeys(self.reviewed, REVIEWED_CONFIDENCE))
+        return scores
+
+    def correct(self, corrections: Mapping[str, Any]) -> Correction:
+        """Apply reviewer corrections and update only what depends on them."""
+        changed = {name for name, value in corrections.items() if self.values.get(name) != value}
+        self.values.update(corrections)
+        self.reviewed.update(corrections)
+
+        before = self.report
+        self.report, affected = self.program.revalidate(self.values, before, changed)
+        for name in affected & self.evidence.keys():
+            self.evidence[name] = self._refresh(name, self.evidence[name])
+
+        rescored = {
+            name: self.evidence[name]
+            for name in affected
+            if name in self.evidence and name not in self.reviewed
+        }
+        confidences = self.scorer.score(rescored) if rescored else {}
+        confidences.update(dict.fromkeys(corrections, REVIEWED_CONFIDENCE))
+
+        correction = Correction(
+            corrected=dict(corrections),
+            confidences=confidences,
+            resolved=[i for i in before.issues if i not in self.report.issues],
+            raised=[i for i in self.report.issues if i not in before.issues],
+            rules_rerun=[rule.name for rule in self.program.affected_rules(changed)],
+        )
+        logger.debug(
+            "Correction revalidated",
+            extra={
+                "fields": sorted(corrections),
+                "rules_rerun": len(correction.rules_rerun),
+                "rescored": len(confidences),
+            },
+        )
+        return correction
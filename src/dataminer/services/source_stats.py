@@ -0,0 +1,193 @@
+"""Incremental ``document_sources`` statistics.
+
+``total_documents_processed``, ``avg_accuracy`` and ``avg_cost_per_document``
+are maintained as streaming aggregates rather than recomputed from jobs:
+
+1. each worker adds completed jobs to a :class:`SourceStatsRecorder` (in memory);
+2. the recorder periodically appends one delta row per source to
+   ``source_stats_deltas`` (an insert, so workers never contend on source rows);
+3. a :class:`SourceStatsMerger` periodically consumes all pending deltas in one
+   statement, adding them to the source's exact running sums
+   (``accuracy_count``, ``accuracy_sum``, ``cost_sum``) and deriving the rounded
+   averages from those.
+
+Reading a source stays a primary-key lookup however many jobs have run.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from decimal import Decimal
+
+from dataminer.core.config import get_settings
+from dataminer.utils.periodic import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class SourceStatsDelta:
+    """Completed-job totals for one source."""
+
+    documents: int = 0
+    accuracy_count: int = 0
+    accuracy_sum: Decimal = Decimal(0)
+    cost_sum: Decimal = Decimal(0)
+
+    def add_job(self, cost: Decimal, accuracy: Decimal | float | None = None) -> None:
+        """Add one completed document."""
+        self.documents += 1
+        self.cost_sum += cost
+        if accuracy is not None:
+            self.accuracy_count += 1
+            self.accuracy_sum += Decimal(str(accuracy))
+
+    def merge(self, other: SourceStatsDelta) -> None:
+        """Add another delta into this one."""
+        self.documents += other.documents
+        self.accuracy_count += other.accuracy_count
+        self.accuracy_sum += other.accuracy_sum
+        self.cost_sum += other.cost_sum
+
+
+DeltaWriter = Callable[[dict[str, SourceStatsDelta]], Awaitable[None]]
+DeltaMerge = Callable[[], Awaitable[dict[str, int]]]
+
+
+async def write_source_deltas(batch: dict[str, SourceStatsDelta]) -> None:
+    """Append a batch with ``AddSourceStatsDeltas`` in its own transaction."""
+    from dataminer.db.repositories.source import SourceRepository
+    from dataminer.db.session import SessionLocal
+
+    source_ids = list(batch)
+    async with SessionLocal() as session:
+        await SourceRepository(session).add_source_stats_deltas(
+            source_ids=source_ids,
+            documents=[batch[s].documents for s in source_ids],
+            accuracy_counts=[batch[s].accuracy_count for s in source_ids],
+            accuracy_sums=[batch[s].accuracy_sum for s in source_ids],
+            cost_sums=[batch[s].cost_sum for s in source_ids],
+        )
+        await session.commit()
+
+
+async def merge_source_deltas() -> dict[str, int]:
+    """Run ``MergeSourceStatsDeltas`` in its own transaction."""
+    from dataminer.db.repositories.source import SourceRepository
+    from dataminer.db.session import SessionLocal
+
+    async with SessionLocal() as session:
+        merged = await SourceRepository(session).merge_source_stats_deltas()
+        await session.commit()
+    return merged
+
+
+class SourceStatsRecorder:
+    """Per-worker buffer of completed jobs, appended to the delta table in batches.
+
+    Usage:
+        recorder = SourceStatsRecorder()
+        recorder.start()
+        recorder.record_job(source_id, cost=ledger.total_cost, accuracy=accuracy)
+        ...
+        await recorder.stop()
+    """
+
+    def __init__(
+        self, writer: DeltaWriter = write_source_deltas, interval_seconds: float | None = None
+    ):
+        """Initialize the recorder.
+
+        Args:
+            writer: Appends a batch of deltas. Defaults to one database insert.
+            interval_seconds: Seconds between flushes. Defaults to
+                ``settings.source_stats_flush_seconds``.
+        """
+        self.writer = writer
+        self.interval_seconds = interval_seconds or get_settings().source_stats_flush_seconds
+        self._pending: dict[str, SourceStatsDelta] = {}
+        self._periodic = PeriodicTask(self.flush, self.interval_seconds, name="source-stats")
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def record_job(
+        self, source_id: str, cost: Decimal, accuracy: Decimal | float | None = None
+    ) -> None:
+        """Record a completed document of ``source_id``."""
+        delta = self._pending.get(source_id)
+        if delta is None:
+            delta = self._pending[source_id] = SourceStatsDelta()
+        delta.add_job(cost, accuracy)
+
+    async def flush(self) -> int:
+        """Append pending deltas, putting them back if the write fails.
+
+        Returns:
+            Number of sources written.
+        """
+        batch, self._pending = self._pending, {}
+        if not batch:
+            return 0
+        try:
+            await self.writer(batch)
+        except Exception as e:
+            for source_id, delta in batch.items():
+                current = self._pending.get(source_id)
+                if current is None:
+                    self._pending[source_id] = delta
+                else:
+                    current.merge(delta)
+            logger.warning(
+                "Source stats flush failed", extra={"sources": len(batch), "error": str(e)}
+            )
+            return 0
+        return len(batch)
+
+    def start(self) -> None:
+        """Start flushing in the background."""
+        self._periodic.start()
+
+    async def stop(self) -> None:
+        """Stop the background task and flush what is left."""
+        await self._periodic.stop()
+        await self.flush()
+
+
+class SourceStatsMerger:
+    """Periodically folds the delta table into ``document_sources``.
+
+    Any number of workers may run one: each pending delta is consumed by exactly
+    one merge.
+    """
+
+    def __init__(
+        self, merge: DeltaMerge = merge_source_deltas, interval_seconds: float | None = None
+    ):
+        """Initialize the merger.
+
+        Args:
+            merge: Runs one merge. Defaults to ``MergeSourceStatsDeltas``.
+            interval_seconds: Seconds between merges. Defaults to
+                ``settings.source_stats_merge_seconds``.
+        """
+        self.merge_once = merge
+        self.interval_seconds = interval_seconds or get_settings().source_stats_merge_seconds
+        self._periodic = PeriodicTask(self.merge, self.interval_seconds, name="source-stats-merge")
+
+    async def merge(self) -> dict[str, int]:
+        """Merge pending deltas now."""
+        merged = await self.merge_once()
+        if merged:
+            logger.info("Source stats merged", extra={"sources": len(merged)})
+        return merged
+
+    def start(self) -> None:
+        """Start merging in the background."""
+        self._periodic.start()
+
+    async def stop(self) -> None:
+        """Stop merging."""
+        await self._periodic.stop()
@@ -0,0 +1,286 @@
+"""Memory-bounded document processing.
+
+For very large documents (the PRD's upper bound is 2,000 pages) nothing is
+held for the whole document at once:
+
+- the PDF is never loaded into memory; MuPDF range-reads it from disk as pages
+  are requested, and every worker opens its own handle;
+- pages are extracted, scored and (if needed) OCR'd in a sliding window of
+  ``stream_window_pages`` pages;
+- finished page text is compressed and spilled to a :class:`PageStore` on disk,
+  which later stages read back page by page.
+
+Peak RSS therefore depends on the window size, not on the page count. A
+:class:`ProcessMemoryBudget` checks the worker process's RSS as pages complete
+and fails the job with :class:`MemoryLimitExceededError` before the next step
+would cross the cap, instead of letting the worker be OOM-killed.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import resource
+import struct
+import sys
+import tempfile
+import zlib
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO
+
+from dataminer.core.config import get_settings
+from dataminer.services.ocr import OCRWorkerPool
+from dataminer.services.ocr_routing import OCRRouter
+from dataminer.services.pdf_extraction import PDFExtractor
+
+if TYPE_CHECKING:
+    from dataminer.services.document_store import DocumentStore
+
+logger = logging.getLogger(__name__)
+
+_RECORD_HEADER = struct.Struct("<II")  # page number, compressed length
+
+
+class MemoryLimitExceededError(Exception):
+    """Raised when the worker's resident memory would grow past its configured cap."""
+
+
+class PageStore:
+    """Append-only, zlib-compressed on-disk store of page texts.
+
+    Each record is ``<page_number:u32><length:u32><zlib data>``. Only the offset
+    of each record is kept in memory, so reading any page is a single seek.
+    """
+
+    def __init__(self, path: str | Path, compression_level: int = 6):
+        """Create (or truncate) a page store at ``path``."""
+        self.path = Path(path)
+        self.compression_level = compression_level
+        self._file: BinaryIO = self.path.open("w+b")
+        self._offsets: dict[int, int] = {}
+        self.raw_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __contains__(self, page_number: object) -> bool:
+        return page_number in self._offsets
+
+    @property
+    def page_numbers(self) -> list[int]:
+        """Stored page numbers in order."""
+        return sorted(self._offsets)
+
+    @property
+    def stored_bytes(self) -> int:
+        """Size of the store on disk."""
+        self._file.seek(0, os.SEEK_END)
+        return self._file.tell()
+
+    def append(self, page_number: int, text: str) -> None:
+        """Compress and write a page's text."""
+        raw = text.encode("utf-8")
+        data = zlib.compress(raw, self.compression_level)
+        self._file.seek(0, os.SEEK_END)
+        self._offsets[page_number] = self._file.tell()
+        self._file.write(_RECORD_HEADER.pack(page_number, len(data)))
+        self._file.write(data)
+        self.raw_bytes += len(raw)
+
+    def get(self, page_number: int) -> str:
+        """Read one page's text back.
+
+        Raises:
+            KeyError: If the page is not in the store.
+        """
+        self._file.flush()
+        self._file.seek(self._offsets[page_number])
+        _, length = _RECORD_HEADER.unpack(self._file.read(_RECORD_HEADER.size))
+        return zlib.decompress(self._file.read(length)).decode("utf-8")
+
+    def iter_pages(self) -> Iterator[tuple[int, str]]:
+        """Yield ``(page_number, text)`` in page order, one page in memory at a time."""
+        for page_number in self.page_numbers:
+            yield page_number, self.get(page_number)
+
+    def close(self, delete: bool = False) -> None:
+        """Close the store, optionally removing its file."""
+        self._file.close()
+        if delete:
+            self.path.unlink(missing_ok=True)
+
+    def __enter__(self) -> PageStore:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process in MiB."""
+    try:
+        with Path("/proc/self/statm").open() as statm:
+            pages = int(statm.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except OSError:
+        # No procfs (e.g. macOS): fall back to the peak, which is an upper bound.
+        return peak_rss_mb()
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class ProcessMemoryBudget:
+    """Resident memory cap for the worker process running a job.
+
+    RSS is process-wide: it includes the interpreter, loaded libraries and any
+    other job running in the same worker, not just this job's pages. The cap is
+    therefore a guard against the worker being OOM-killed, not a per-job quota.
+
+    Checks are predictive: a check fails once the current RSS plus the largest
+    growth seen between two checks would exceed the cap, so the job stops while
+    there is still room for one more step rather than after it has gone over.
+    """
+
+    def __init__(self, max_rss_mb: int):
+        """Initialize the budget.
+
+        Args:
+            max_rss_mb: Maximum resident memory, in MiB, of the worker process.
+        """
+        self.max_rss_mb = max_rss_mb
+        self.peak_rss_mb = current_rss_mb()
+        self.max_step_mb = 0.0
+        self._last_rss_mb = self.peak_rss_mb
+
+    def check(self) -> None:
+        """Record current RSS and fail if the next step could cross the cap.
+
+        Raises:
+            MemoryLimitExceededError: If RSS plus the largest step seen so far
+                exceeds ``max_rss_mb``.
+        """
+        rss = current_rss_mb()
+        self.max_step_mb = max(self.max_step_mb, rss - self._last_rss_mb)
+        self._last_rss_mb = rss
+        self.peak_rss_mb = max(self.peak_rss_mb, rss)
+        if rss + self.max_step_mb > self.max_rss_mb:
+            raise MemoryLimitExceededError(
+                f"Worker resident memory {rss:.0f} MiB (growing up to "
+                f"{self.max_step_mb:.0f} MiB per page) would exceed the "
+                f"{self.max_rss_mb} MiB cap"
+            )
+
+
+@dataclass(slots=True)
+class StreamedDocument:
+    """Result of processing a document in streaming mode."""
+
+    page_store: PageStore
+    page_count: int = 0
+    ocr_pages: list[int] = field(default_factory=list)
+    peak_rss_mb: float = 0.0
+
+
+class StreamingDocumentProcessor:
+    """Extract, OCR-route and spill a document page by page.
+
+    Usage:
+        processor = StreamingDocumentProcessor(router=OCRRouter(ocr=pool))
+        result = await processor.process(path)
+        for page_number, text in result.page_store.iter_pages():
+            ...
+    """
+
+    def __init__(
+        self,
+        router: OCRRouter | None = None,
+        extractor: PDFExtractor | None = None,
+        store_dir: str | Path | None = None,
+        window_pages: int | None = None,
+        max_rss_mb: int | None = None,
+    ):
+        """Initialize the processor.
+
+        Args:
+            router: OCR router for pages with a poor text layer. Its
+                ``max_pending`` caps the pages held behind a slow OCR page.
+                Defaults to one whose OCR and page windows are ``window_pages``.
+            extractor: Page extractor. Defaults to one whose in-flight page ranges
+                fit within ``window_pages``.
+            store_dir: Directory for page stores. Defaults to the system temp dir.
+            window_pages: Pages in flight at once. Defaults to ``settings.stream_window_pages``.
+            max_rss_mb: Worker process memory cap, see :class:`ProcessMemoryBudget`.
+                Defaults to ``settings.worker_max_rss_mb``.
+        """
+        settings = get_settings()
+        self.window_pages = window_pages or settings.stream_window_pages
+        self.max_rss_mb = max_rss_mb or settings.worker_max_rss_mb
+        self.store_dir = Path(store_dir) if store_dir else Path(tempfile.gettempdir())
+        self.router = router or OCRRouter(
+            max_concurrency=self.window_pages, max_pending=self.window_pages
+        )
+        if extractor is None:
+            # The extractor keeps 2 ranges per worker in flight.
+            workers = min(settings.max_workers, os.cpu_count() or 1)
+            extractor = PDFExtractor(
+                max_workers=workers,
+                pages_per_task=max(1, self.window_pages // (2 * workers)),
+            )
+        self.extractor = extractor
+
+    async def process(self, path: str | Path) -> StreamedDocument:
+        """Process a document, spilling page text to an on-disk store.
+
+        Raises:
+            MemoryLimitExceededError: If the worker would exceed its memory cap.
+        """
+        path = str(path)
+        budget = ProcessMemoryBudget(self.max_rss_mb)
+        handle, store_path = tempfile.mkstemp(suffix=".pages", dir=self.store_dir)
+        os.close(handle)
+        result = StreamedDocument(page_store=PageStore(store_path))
+
+        try:
+            pages = self.extractor.stream_pages(path)
+            async for page in self.router.route(path, pages):
+                result.page_store.append(page.page_number, page.text)
+                result.page_count += 1
+                if page.ocr_used:
+                    result.ocr_pages.append(page.page_number)
+                budget.check()
+        except BaseException:
+            result.page_store.close(delete=True)
+            raise
+
+        result.peak_rss_mb = budget.peak_rss_mb
+        logger.info(
+            "Document processed in streaming mode",
+            extra={
+                "path": path,
+                "page_count": result.page_count,
+                "ocr_pages": len(result.ocr_pages),
+                "stored_bytes": result.page_store.stored_bytes,
+                "raw_bytes": result.page_store.raw_bytes,
+                "peak_rss_mb": round(result.peak_rss_mb, 1),
+            },
+        )
+        return result
+
+    async def process_stored(self, store: DocumentStore, key: str) -> StreamedDocument:
+        """Process a document from a document store without loading it into memory.
+
+        The store's sha256 is handed to an OCR worker pool, so its page cache
+        does not hash the document again.
+        """
+        path = await store.local_path(key)
+        if isinstance(self.router.ocr, OCRWorkerPool):
+            stored = await store.stat(key)
+            self.router.ocr.known_digest(path, stored.sha256)
+        return await self.process(path)
@@ -0,0 +1,200 @@
+"""Streaming extraction of LLM field answers.
+
+Detailed-pass answers for dozens of fields are long. Rather than waiting for
+the whole body and parsing it at once, :func:`extract_streaming` feeds the
+token stream to :class:`~dataminer.utils.json_stream.IncrementalJSONParser`
+and hands each field to ``on_field`` (e.g. validation) the moment its value
+closes, so validation overlaps generation.
+
+A stream that breaks off, or whose tail is malformed, keeps every field that
+arrived completely; :attr:`StreamedExtraction.missing` lists the rest.
+:class:`StreamingFieldExtractor` uses that to retry only the missing fields.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import time
+from collections.abc import AsyncIterable, Awaitable, Callable, Sequence
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from dataminer.services.field_extraction import ExtractedField
+from dataminer.services.llm_client import LLMClient, LLMError, LLMPass, LLMResponse, LLMStreamChunk
+from dataminer.utils.json_stream import IncrementalJSONParser, JSONStreamError
+
+if TYPE_CHECKING:
+    from dataminer.services.costs import JobCostLedger
+
+logger = logging.getLogger(__name__)
+
+FieldCallback = Callable[[ExtractedField], Awaitable[Any] | Any]
+PromptBuilder = Callable[[Sequence[str]], str]
+# Field name, or (task id, field name) for a packed answer
+FieldKey = str | tuple[str, str]
+
+
+@dataclass
+class StreamedExtraction:
+    """Fields received from one streamed answer.
+
+    ``fields`` is keyed by field name, or by ``(task id, field name)`` for a
+    packed answer, where two tasks may ask for the same field.
+    """
+
+    expected: tuple[str, ...]
+    fields: dict[FieldKey, ExtractedField] = field(default_factory=dict)
+    complete: bool = False
+    error: str | None = None
+    text: str = ""
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+
+    @property
+    def missing(self) -> list[str]:
+        """Expected fields that did not arrive (under any task, for a packed answer)."""
+        received = {key[1] if isinstance(key, tuple) else key for key in self.fields}
+        return [name for name in self.expected if name not in received]
+
+
+async def extract_streaming(
+    chunks: AsyncIterable[LLMStreamChunk | str],
+    expected: Sequence[str],
+    *,
+    section: str | None = None,
+    on_field: FieldCallback | None = None,
+    emit_depth: int = 1,
+) -> StreamedExtraction:
+    """Parse a streamed JSON answer field by field.
+
+    Args:
+        chunks: Token stream, e.g. :meth:`LLMClient.stream`.
+        expected: Field names asked for; other members are ignored.
+        section: Section recorded on the fields.
+        on_field: Called with each field as soon as it closes. Coroutines run
+            concurrently with the rest of the stream and are awaited at the end.
+        emit_depth: Depth of the object holding the fields: 1 for a flat answer,
+            2 for a packed answer keyed by task (the task id becomes the section
+            and, with the field name, the key in ``fields``).
+    """
+    wanted = frozenset(expected)
+    result = StreamedExtraction(expected=tuple(expected))
+    parser = IncrementalJSONParser(emit_depth=emit_depth)
+    pending: list[asyncio.Task[Any]] = []
+
+    def accept(path: tuple[str | int, ...], value: Any) -> None:
+        name = str(path[-1])
+        task = str(path[0]) if len(path) > 1 else None
+        key: FieldKey = name if task is None else (task, name)
+        if name not in wanted or key in result.fields:
+            return
+        extracted = ExtractedField.from_answer(name, value, task or section)
+        result.fields[key] = extracted
+        if on_field is not None:
+            outcome = on_field(extracted)
+            if inspect.isawaitable(outcome):
+                pending.append(asyncio.ensure_future(outcome))
+
+    try:
+        async for chunk in chunks:
+            if isinstance(chunk, LLMStreamChunk):
+                text = chunk.text
+                result.prompt_tokens = chunk.prompt_tokens or result.prompt_tokens
+                result.output_tokens = chunk.output_tokens or result.output_tokens
+            else:
+                text = chunk
+            for path, value in parser.feed(text):
+                accept(path, value)
+    except (LLMError, JSONStreamError) as e:
+        result.error = str(e)
+        logger.warning(
+            "Streamed answer ended early",
+            extra={"fields_received": len(result.fields), "error": str(e)},
+        )
+
+    result.complete = parser.complete and result.error is None
+    result.text = parser.text
+    if pending:
+        await asyncio.gather(*pending)
+    return result
+
+
+class StreamingFieldExtractor:
+    """Streams an extraction call and retries only the fields that did not arrive.
+
+    Usage:
+        extractor = StreamingFieldExtractor(llm)
+        result = await extractor.extract(
+            lambda names: render_prompt(section_text, names),
+            [f.field_name for f in fields],
+            model=profile.llm_model_detailed,
+            on_field=validate,
+            ledger=job_costs,
+        )
+    """
+
+    def __init__(self, llm: LLMClient):
+        """Initialize the extractor."""
+        self.llm = llm
+
+    async def extract(
+        self,
+        build_prompt: PromptBuilder,
+        fields: Sequence[str],
+        *,
+        model: str,
+        llm_pass: LLMPass = "detailed",
+        section: str | None = None,
+        on_field: FieldCallback | None = None,
+        ledger: JobCostLedger | None = None,
+        max_attempts: int = 2,
+        **kwargs: Any,
+    ) -> StreamedExtraction:
+        """Extract ``fields``, re-asking for missing ones up to ``max_attempts`` calls.
+
+        Args:
+            build_prompt: Renders the prompt for a list of field names.
+            fields: Field names to extract.
+            model: Model name.
+            llm_pass: Extraction pass.
+            section: Section recorded on the fields.
+            on_field: Called with each field as soon as it closes.
+            ledger: Job cost ledger to record each call in.
+            max_attempts: Calls made at most; later calls only ask for missing fields.
+            **kwargs: Passed to :meth:`LLMClient.stream`.
+        """
+        result = StreamedExtraction(expected=tuple(fields))
+        missing = list(fields)
+        for attempt in range(1, max_attempts + 1):
+            started = time.perf_counter()
+            stream = self.llm.stream(
+                build_prompt(missing), model=model, llm_pass=llm_pass, **kwargs
+            )
+            partial = await extract_streaming(stream, missing, section=section, on_field=on_field)
+            if ledger is not None:
+                ledger.record(
+                    llm_pass,
+                    LLMResponse(
+                        text=partial.text,
+                        model=model,
+                        prompt_tokens=partial.prompt_tokens,
+                        output_tokens=partial.output_tokens,
+                        latency_ms=(time.perf_counter() - started) * 1000,
+                        attempts=1,
+                    ),
+                )
+            result.fields.update(partial.fields)
+            result.prompt_tokens += partial.prompt_tokens
+            result.output_tokens += partial.output_tokens
+            result.error = partial.error
+            missing = result.missing
+            if not missing or attempt == max_attempts:
+                break
+            logger.info(
+                "Retrying missing fields",
+                extra={"attempt": attempt, "missing": len(missing), "error": partial.error},
+            )
+        result.complete = not missing
+        return result
@@ -0,0 +1,215 @@
+"""Batched rollups of prompt template usage stats.
+
+``source_prompt_templates`` keeps ``usage_count``, ``avg_confidence`` and
+``avg_tokens_used``. Updating them once per LLM call would serialize every
+worker on the rows of the busiest templates. Instead each worker records calls
+in a :class:`TemplateUsageAccumulator` (a dict update, no I/O), and a
+:class:`TemplateUsageFlusher` periodically drains it into one
+``MergePromptTemplateUsage`` statement that folds the deltas into the running
+averages. ``avg_confidence`` is weighted by ``confidence_count``, the number of
+uses that reported a confidence, so calls without one do not pull the mean
+towards its old value.
+
+The accumulator keeps count, sum and sum of squares per template, so the
+spread of confidence and token use is available in-process (for logs and
+metrics) even though only the averages are stored. A failed flush puts its
+deltas back, so nothing is lost; a crash loses at most one interval.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from decimal import Decimal
+from uuid import UUID
+
+from dataminer.core.config import get_settings
+from dataminer.utils.periodic import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class TemplateUsage:
+    """Usage of one template since the last flush."""
+
+    uses: int = 0
+    confidence_count: int = 0
+    confidence_sum: float = 0.0
+    confidence_sumsq: float = 0.0
+    tokens_sum: int = 0
+    tokens_sumsq: int = 0
+
+    def add(self, confidence: float | None, tokens: int) -> None:
+        """Record one call."""
+        self.uses += 1
+        self.tokens_sum += tokens
+        self.tokens_sumsq += tokens * tokens
+        if confidence is not None:
+            self.confidence_count += 1
+            self.confidence_sum += confidence
+            self.confidence_sumsq += confidence * confidence
+
+    def merge(self, other: TemplateUsage) -> None:
+        """Add another accumulation into this one."""
+        self.uses += other.uses
+        self.confidence_count += other.confidence_count
+        self.confidence_sum += other.confidence_sum
+        self.confidence_sumsq += other.confidence_sumsq
+        self.tokens_sum += other.tokens_sum
+        self.tokens_sumsq += other.tokens_sumsq
+
+    @property
+    def mean_confidence(self) -> float | None:
+        """Average confidence of calls that reported one."""
+        return self.confidence_sum / self.confidence_count if self.confidence_count else None
+
+    @property
+    def confidence_stddev(self) -> float | None:
+        """Population standard deviation of confidence."""
+        return _stddev(self.confidence_count, self.confidence_sum, self.confidence_sumsq)
+
+    @property
+    def mean_tokens(self) -> float | None:
+        """Average tokens per call."""
+        return self.tokens_sum / self.uses if self.uses else None
+
+    @property
+    def tokens_stddev(self) -> float | None:
+        """Population standard deviation of tokens per call."""
+        return _stddev(self.uses, self.tokens_sum, self.tokens_sumsq)
+
+
+def _stddev(count: int, total: float, total_sq: float) -> float | None:
+    if not count:
+        return None
+    mean = total / count
+    return math.sqrt(max(total_sq / count - mean * mean, 0.0))
+
+
+class TemplateUsageAccumulator:
+    """Per-worker template usage, drained in batches.
+
+    Usage:
+        usage = TemplateUsageAccumulator()
+        usage.record(template.template_id, confidence=0.91, tokens=response.total_tokens)
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty accumulator."""
+        self._usage: dict[UUID, TemplateUsage] = {}
+
+    def __len__(self) -> int:
+        return len(self._usage)
+
+    def record(self, template_id: UUID | str, confidence: float | None, tokens: int) -> None:
+        """Record one call made with a template."""
+        key = template_id if isinstance(template_id, UUID) else UUID(str(template_id))
+        usage = self._usage.get(key)
+        if usage is None:
+            usage = self._usage[key] = TemplateUsage()
+        usage.add(confidence, tokens)
+
+    def snapshot(self) -> dict[UUID, TemplateUsage]:
+        """Current accumulations (not reset)."""
+        return dict(self._usage)
+
+    def drain(self) -> dict[UUID, TemplateUsage]:
+        """Take the accumulations and start over."""
+        drained, self._usage = self._usage, {}
+        return drained
+
+    def restore(self, drained: dict[UUID, TemplateUsage]) -> None:
+        """Put back accumulations whose flush failed."""
+        for template_id, usage in drained.items():
+            current = self._usage.get(template_id)
+            if current is None:
+                self._usage[template_id] = usage
+            else:
+                current.merge(usage)
+
+
+UsageWriter = Callable[[dict[UUID, TemplateUsage]], Awaitable[None]]
+
+
+async def write_template_usage(batch: dict[UUID, TemplateUsage]) -> None:
+    """Write a batch with ``MergePromptTemplateUsage`` in its own transaction."""
+    from dataminer.db.repositories.source import SourceRepository
+    from dataminer.db.session import SessionLocal
+
+    template_ids = list(batch)
+    async with SessionLocal() as session:
+        await SourceRepository(session).merge_prompt_template_usage(
+            template_ids=template_ids,
+            uses=[batch[t].uses for t in template_ids],
+            confidence_counts=[batch[t].confidence_count for t in template_ids],
+            confidence_sums=[Decimal(repr(batch[t].confidence_sum)) for t in template_ids],
+            tokens_sums=[Decimal(batch[t].tokens_sum) for t in template_ids],
+        )
+        await session.commit()
+
+
+class TemplateUsageFlusher:
+    """Periodically flushes a :class:`TemplateUsageAccumulator`.
+
+    Usage:
+        flusher = TemplateUsageFlusher(usage)
+        flusher.start()
+        ...
+        await flusher.stop()  # final flush
+    """
+
+    def __init__(
+        self,
+        accumulator: TemplateUsageAccumulator,
+        writer: UsageWriter = write_template_usage,
+        interval_seconds: float | None = None,
+    ):
+        """Initialize the flusher.
+
+        Args:
+            accumulator: Accumulator to drain.
+            writer: Writes a drained batch. Defaults to one batched database statement.
+            interval_seconds: Seconds between flushes. Defaults to
+                ``settings.template_stats_flush_seconds``.
+        """
+        self.accumulator = accumulator
+        self.writer = writer
+        self.interval_seconds = interval_seconds or get_settings().template_stats_flush_seconds
+        self._periodic = PeriodicTask(self.flush, self.interval_seconds, name="template-usage")
+        self.flushes = 0
+
+    async def flush(self) -> int:
+        """Write everything accumulated so far.
+
+        Returns:
+            Number of templates written; 0 if nothing was pending or the write failed.
+        """
+        batch = self.accumulator.drain()
+        if not batch:
+            return 0
+        try:
+            await self.writer(batch)
+        except Exception as e:
+            self.accumulator.restore(batch)
+            logger.warning(
+                "Template usage flush failed", extra={"templates": len(batch), "error": str(e)}
+            )
+            return 0
+        self.flushes += 1
+        logger.debug(
+            "Template usage flushed",
+            extra={"templates": len(batch), "uses": sum(u.uses for u in batch.values())},
+        )
+        return len(batch)
+
+    def start(self) -> None:
+        """Start flushing in the background."""
+        self._periodic.start()
+
+    async def stop(self) -> None:
+        """Stop the background task and flush what is left."""
+        await self._periodic.stop()
+        await self.flush()
@@ -0,0 +1,695 @@
+"""Compiled validation of extracted fields (PRD §4.3).
+
+Each field's ``validation_rules`` JSON is compiled once per source into a
+:class:`ValidatorProgram`:
+
+- field rules become a chain of typed checks: ``required``, ``pattern``
+  (precompiled), ``type`` (``date``, ``integer``, ``number``, ``boolean``,
+  ``string``), ``min``/``max`` (dates accept ``"today"``), ``min_length``/
+  ``max_length`` and ``enum``;
+- ``custom`` rules (``function`` in the PRD's ``CROSS_FIELD_VALIDATION``) name a
+  cross-field validator from :data:`CROSS_FIELD_VALIDATORS` and list the
+  ``fields`` they read. They form a dependency graph from fields to
+  rules: a rule runs after its inputs' own checks and is skipped when an input
+  is invalid, so one bad date is reported once rather than by every rule that
+  reads it. :meth:`ValidatorProgram.rules_for` exposes the field-to-rule index,
+  and :meth:`ValidatorProgram.revalidate` uses it to re-run only the checks a
+  corrected field feeds.
+
+``validation_rules`` may be a single rule object or a list of them; every rule
+may set ``message`` and ``severity`` (``error`` or ``warning``). A rule object
+with none of the keys above is rejected rather than silently compiled to nothing. Programs are
+cached by source and rule-set version in a :class:`ValidationEngine`, like
+normalization programs.
+
+:meth:`ValidatorProgram.validate` checks one job's fields.
+:meth:`ValidatorProgram.validate_many` checks many jobs column by column,
+evaluating each distinct value of a field once, for re-validation backfills.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import re
+from collections import OrderedDict, defaultdict
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from itertools import pairwise
+from typing import TYPE_CHECKING, Any, Literal
+
+if TYPE_CHECKING:
+    from dataminer.services.field_extraction import FieldDefinition
+
+logger = logging.getLogger(__name__)
+
+Severity = Literal["error", "warning"]
+ValidationStatus = Literal["all_rules_pass", "minor_warnings", "format_issues", "validation_failed"]
+ConsistencyStatus = Literal["fully_consistent", "minor_discrepancy", "major_discrepancy"]
+
+GUILTY_VERDICTS = frozenset({"GUILTY", "BERSALAH", "TERBUKTI"})
+COURT_LEVELS = ("PN", "PT", "MA")
+
+
+class InvalidValidationRuleError(ValueError):
+    """Raised when a field's ``validation_rules`` cannot be compiled."""
+
+
+CROSS_FIELD_KEYS = ("custom", "function")
+FIELD_RULE_KEYS = frozenset(
+    {"required", "pattern", "type", "min", "max", "min_length", "max_length", "enum"}
+)
+
+
+@dataclass(frozen=True, slots=True)
+class ValidationIssue:
+    """A failed check."""
+
+    field_name: str
+    rule: str
+    message: str
+    severity: Severity = "error"
+    fields: tuple[str, ...] = ()
+
+
+@dataclass
+class ValidationReport:
+    """Outcome of validating one job's fields."""
+
+    issues: list[ValidationIssue] = field(default_factory=list)
+    invalid_fields: set[str] = field(default_factory=set)
+
+    @property
+    def passed(self) -> bool:
+        """Whether no check failed with ``error`` severity."""
+        return not any(issue.severity == "error" for issue in self.issues)
+
+    def for_field(self, field_name: str) -> list[ValidationIssue]:
+        """Issues of a field's own checks."""
+        return [i for i in self.issues if i.field_name == field_name and not i.fields]
+
+    def cross_field(self, field_name: str) -> list[ValidationIssue]:
+        """Cross-field issues involving a field."""
+        return [i for i in self.issues if field_name in i.fields]
+
+    def status(self, field_name: str) -> ValidationStatus:
+        """PRD ``validation_status`` of a field."""
+        issues = self.for_field(field_name)
+        if not issues:
+            return "all_rules_pass"
+        if any(i.rule == "required" for i in issues):
+            return "validation_failed"
+        if any(i.severity == "error" for i in issues):
+            return "format_issues"
+        return "minor_warnings"
+
+    def consistency(self, field_name: str) -> ConsistencyStatus:
+        """PRD ``cross_field_consistency`` of a field."""
+        issues = self.cross_field(field_name)
+        if not issues:
+            return "fully_consistent"
+        if any(i.severity == "error" for i in issues):
+            return "major_discrepancy"
+        return "minor_discrepancy"
+
+
+# ---------------------------------------------------------------------------
+# Value coercion
+
+
+def is_missing(value: Any) -> bool:
+    """Whether a value counts as absent."""
+    return value is None or (isinstance(value, str) and not value.strip()) or value == []
+
+
+def to_date(value: Any) -> date | None:
+    """Parse an ISO date (or datetime), or return None."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str):
+        try:
+            return date.fromisoformat(value.strip()[:10])
+        except ValueError:
+            return None
+    return None
+
+
+def to_number(value: Any) -> Decimal | None:
+    """Parse a number, or return None."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int | float | Decimal):
+        return Decimal(str(value))
+    if isinstance(value, str):
+        try:
+            return Decimal(value.strip().replace(",", ""))
+        except InvalidOperation:
+            return None
+    return None
+
+
+def _bound(value: Any, kind: str) -> Callable[[], Any]:
+    """A rule's ``min``/``max`` as a callable, so ``today`` is evaluated per run."""
+    if kind == "date":
+        if value == "today":
+            return date.today
+        parsed = to_date(value)
+        if parsed is None:
+            raise InvalidValidationRuleError(f"Invalid date bound {value!r}")
+        return lambda: parsed
+    number = to_number(value)
+    if number is None:
+        raise InvalidValidationRuleError(f"Invalid numeric bound {value!r}")
+    return lambda: number
+
+
+# ---------------------------------------------------------------------------
+# Field checks
+
+# A check returns a failure message or None.
+Check = Callable[[Any], str | None]
+
+
+@dataclass(frozen=True, slots=True)
+class _FieldCheck:
+    rule: str
+    check: Check
+    message: str
+    severity: Severity
+
+
+def _type_check(kind: str) -> Check:
+    if kind == "date":
+        return lambda v: None if to_date(v) is not None else "not a date"
+    if kind in ("integer", "bigint"):
+        return lambda v: (
+            None
+            if (n := to_number(v)) is not None and n == n.to_integral_value()
+            else "not an integer"
+        )
+    if kind in ("number", "decimal", "float"):
+        return lambda v: None if to_number(v) is not None else "not a number"
+    if kind == "boolean":
+        return lambda v: None if isinstance(v, bool) else "not a boolean"
+    if kind in ("string", "text"):
+        return lambda v: None if isinstance(v, str) else "not a string"
+    raise InvalidValidationRuleError(f"Unknown type {kind!r}")
+
+
+def _range_check(kind: str, low: Callable[[], Any] | None, high: Callable[[], Any] | None) -> Check:
+    convert: Callable[[Any], Any] = to_date if kind == "date" else to_number
+
+    def check(value: Any) -> str | None:
+        converted = convert(value)
+        if converted is None:
+            return None  # reported by the type check
+        if low is not None and converted < low():
+            return f"below minimum {low()}"
+        if high is not None and converted > high():
+            return f"above maximum {high()}"
+        return None
+
+    return check
+
+
+def _compile_field_rules(
+    field_name: str, rules: Mapping[str, Any], required: bool
+) -> list[_FieldCheck]:
+    severity: Severity = rules.get("severity", "error")
+    message = rules.get("message") or f"{field_name} is invalid"
+    checks: list[_FieldCheck] = []
+    if required or rules.get("required"):
+        checks.append(_FieldCheck("required", lambda _: None, f"{field_name} is required", "error"))
+
+    pattern = rules.get("pattern")
+    if pattern:
+        try:
+            regex = re.compile(pattern)
+        except re.error as e:
+            raise InvalidValidationRuleError(f"Field '{field_name}': {e}") from e
+        checks.append(
+            _FieldCheck(
+                "pattern",
+                lambda v: None if regex.search(str(v)) else "does not match pattern",
+                message,
+                severity,
+            )
+        )
+
+    kind = rules.get("type")
+    if kind:
+        checks.append(_FieldCheck("type", _type_check(kind), message, severity))
+    if "min" in rules or "max" in rules:
+        range_kind = "date" if kind == "date" else "number"
+        low = _bound(rules["min"], range_kind) if "min" in rules else None
+        high = _bound(rules["max"], range_kind) if "max" in rules else None
+        checks.append(_FieldCheck("range", _range_check(range_kind, low, high), message, severity))
+
+    min_length, max_length = rules.get("min_length"), rules.get("max_length")
+    if min_length is not None or max_length is not None:
+
+        def length(value: Any) -> str | None:
+            size = len(value) if isinstance(value, str | list) else len(str(value))
+            if min_length is not None and size < min_length:
+                return f"shorter than {min_length}"
+            if max_length is not None and size > max_length:
+                return f"longer than {max_length}"
+            return None
+
+        checks.append(_FieldCheck("length", length, message, severity))
+
+    allowed = rules.get("enum")
+    if allowed:
+        options = frozenset(str(option).upper() for option in allowed)
+        checks.append(
+            _FieldCheck(
+                "enum",
+                lambda v: None if str(v).upper() in options else "not an allowed value",
+                message,
+                severity,
+            )
+        )
+    return checks
+
+
+# ---------------------------------------------------------------------------
+# Cross-field validators
+
+# A cross-field validator returns True (consistent), False, or None (not applicable).
+CrossFieldValidator = Callable[[Sequence[Any], "CrossFieldRule"], bool | None]
+
+
+def validate_date_sequence(values: Sequence[Any], rule: CrossFieldRule) -> bool | None:
+    """Dates that are present must be in the listed order."""
+    dates = [d for d in map(to_date, values) if d is not None]
+    if len(dates) < 2:
+        return None
+    return all(a <= b for a, b in pairwise(dates))
+
+
+def validate_sentence(values: Sequence[Any], rule: CrossFieldRule) -> bool | None:
+    """A guilty verdict (first field) needs a prison term or fine (other fields)."""
+    verdict, *sentences = values
+    if is_missing(verdict):
+        return None
+    if str(verdict).strip().upper() not in GUILTY_VERDICTS:
+        return True
+    return any((n := to_number(value)) is not None and n > 0 for value in sentences)
+
+
+def validate_charge_proven(values: Sequence[Any], rule: CrossFieldRule) -> bool | None:
+    """The proven charge (first field) must appear among the charges (other fields)."""
+    proven, *charges = values
+    if is_missing(proven):
+        return None
+    candidates: list[str] = []
+    for charge in charges:
+        items = charge if isinstance(charge, list) else [charge]
+        for item in items:
+            if isinstance(item, Mapping):
+                candidates.extend(str(v) for v in item.values() if isinstance(v, str))
+            elif not is_missing(item):
+                candidates.append(str(item))
+    if not candidates:
+        return None
+    needle = " ".join(str(proven).lower().split())
+    return any(needle in " ".join(c.lower().split()) for c in candidates)
+
+
+def validate_age_matches(values: Sequence[Any], rule: CrossFieldRule) -> bool | None:
+    """Stated age matches birth date and decision date within ``tolerance`` years."""
+    birth, decided, age = to_date(values[0]), to_date(values[1]), to_number(values[2])
+    if birth is None or decided is None or age is None:
+        return None
+    years = decided.year - birth.year - ((decided.month, decided.day) < (birth.month, birth.day))
+    return abs(years - age) <= Decimal(str(rule.params.get("tolerance", 1)))
+
+
+def validate_prison_calculation(values: Sequence[Any], rule: CrossFieldRule) -> bool | None:
+    """``years * 12 + months`` equals the total months."""
+    years, months, total = (to_number(v) for v in values)
+    if total is None or (years is None and months is None):
+        return None
+    return (years or 0) * 12 + (months or 0) == total
+
+
+def validate_appeal_hierarchy(values: Sequence[Any], rule: CrossFieldRule) -> bool | None:
+    """A decision with a previous decision must come from an appeal court."""
+    level, previous = values
+    if is_missing(level):
+        return None
+    level = str(level).strip().upper()
+    if level not in COURT_LEVELS:
+        return False
+    return level != "PN" if not is_missing(previous) else True
+
+
+CROSS_FIELD_VALIDATORS: dict[str, CrossFieldValidator] = {
+    "validate_date_sequence": validate_date_sequence,
+    "validate_sentence": validate_sentence,
+    "validate_charge_proven": validate_charge_proven,
+    "validate_age_matches": validate_age_matches,
+    "validate_prison_calculation": validate_prison_calculation,
+    "validate_appeal_hierarchy": validate_appeal_hierarchy,
+}
+
+DEFAULT_RULE_FIELDS: dict[str, tuple[str, ...]] = {
+    "validate_sentence": (
+        "verdict",
+        "sentence_prison_total_months",
+        "sentence_prison_years",
+        "sentence_prison_months",
+        "sentence_fine",
+    ),
+    "validate_charge_proven": ("charge_proven", "charges", "charge_primary_article"),
+    "validate_age_matches": ("defendant_birth_date", "decision_date", "defendant_age"),
+    "validate_prison_calculation": (
+        "sentence_prison_years",
+        "sentence_prison_months",
+        "sentence_prison_total_months",
+    ),
+    "validate_appeal_hierarchy": ("court_level", "previous_decision"),
+}
+
+# Fields each validator reads: (minimum, maximum or None for no limit)
+RULE_ARITY: dict[str, tuple[int, int | None]] = {
+    "validate_date_sequence": (2, None),
+    "validate_sentence": (2, None),
+    "validate_charge_proven": (2, None),
+    "validate_age_matches": (3, 3),
+    "validate_prison_calculation": (3, 3),
+    "validate_appeal_hierarchy": (2, 2),
+}
+
+
+@dataclass(frozen=True, slots=True)
+class CrossFieldRule:
+    """A compiled cross-field rule."""
+
+    name: str
+    validator: CrossFieldValidator
+    fields: tuple[str, ...]
+    message: str
+    severity: Severity = "error"
+    params: Mapping[str, Any] = field(default_factory=dict)
+
+    def evaluate(self, values: Mapping[str, Any]) -> bool | None:
+        """Run the rule on a job's values."""
+        return self.validator(tuple(values.get(name) for name in self.fields), self)
+
+
+def _cross_function(rules: Mapping[str, Any]) -> str | None:
+    for key in CROSS_FIELD_KEYS:
+        if key in rules:
+            return str(rules[key])
+    return None
+
+
+def _compile_cross_rule(owner: str, function: str, rules: Mapping[str, Any]) -> CrossFieldRule:
+    validator = CROSS_FIELD_VALIDATORS.get(function)
+    if validator is None:
+        raise InvalidValidationRuleError(f"Field '{owner}': unknown custom validator {function!r}")
+    fields = tuple(rules.get("fields") or DEFAULT_RULE_FIELDS.get(function, (owner,)))
+    low, high = RULE_ARITY[function]
+    if len(fields) < low or (high is not None and len(fields) > high):
+        if high is None:
+            expected = f"at least {low}"
+        else:
+            expected = str(low) if low == high else f"{low} to {high}"
+        raise InvalidValidationRuleError(
+            f"Field '{owner}': {function} takes {expected} fields, got {list(fields)}"
+        )
+    params = {
+        k: v
+        for k, v in rules.items()
+        if k not in (*CROSS_FIELD_KEYS, "name", "fields", "message", "severity")
+    }
+    return CrossFieldRule(
+        name=rules.get("name") or f"{owner}:{function}",
+        validator=validator,
+        fields=fields,
+        message=rules.get("message") or f"{function} failed",
+        severity=rules.get("severity", "error"),
+        params=params,
+    )
+
+
+def _rule_objects(rules: Any) -> list[Mapping[str, Any]]:
+    if rules is None:
+        return []
+    if isinstance(rules, Mapping):
+        return [rules]
+    if isinstance(rules, list) and all(isinstance(rule, Mapping) for rule in rules):
+        return rules
+    raise InvalidValidationRuleError(f"validation_rules must be an object or a list, not {rules!r}")
+
+
+# ---------------------------------------------------------------------------
+# Program
+
+
+def rule_set_version(definitions: Iterable[FieldDefinition]) -> str:
+    """Fingerprint of a source's validation rules; changes whenever any rule changes."""
+    payload = json.dumps(
+        [[d.field_name, d.is_required, d.validation_rules] for d in definitions],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _hashable(value: Any) -> bool:
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+class ValidatorProgram:
+    """A source's compiled validation rules.
+
+    Usage:
+        program = ValidatorProgram.compile(definitions)
+        report = program.validate({"case_number": "12/Pid.B/2023/PN Jkt", ...})
+        reports = program.validate_many(jobs)
+    """
+
+    def __init__(
+        self,
+        field_checks: Mapping[str, Sequence[_FieldCheck]],
+        cross_rules: Sequence[CrossFieldRule],
+        version: str = "",
+    ):
+        """Initialize from compiled parts; use :meth:`compile`."""
+        self.version = version
+        self.field_checks = {name: tuple(checks) for name, checks in field_checks.items()}
+        self.cross_rules = tuple(cross_rules)
+        self._rules_by_field: dict[str, list[CrossFieldRule]] = defaultdict(list)
+        for rule in self.cross_rules:
+            for name in rule.fields:
+                self._rules_by_field[name].append(rule)
+
+    @classmethod
+    def compile(cls, definitions: Iterable[FieldDefinition]) -> ValidatorProgram:
+        """Compile field definitions' ``validation_rules``.
+
+        Raises:
+            InvalidValidationRuleError: If a rule is malformed.
+        """
+        definitions = tuple(definitions)
+        field_checks: dict[str, list[_FieldCheck]] = {}
+        cross_rules: list[CrossFieldRule] = []
+        for definition in definitions:
+            name = definition.field_name
+            checks: list[_FieldCheck] = []
+            required = definition.is_required
+            for rules in _rule_objects(definition.validation_rules):
+                function = _cross_function(rules)
+                if function is not None:
+                    cross_rules.append(_compile_cross_rule(name, function, rules))
+                elif FIELD_RULE_KEYS.isdisjoint(rules):
+                    raise InvalidValidationRuleError(
+                        f"Field '{name}': rule {dict(rules)!r} defines no check"
+                    )
+                else:
+                    checks.extend(_compile_field_rules(name, rules, required))
+                    required = False
+            if required:
+                checks.extend(_compile_field_rules(name, {}, True))
+            if checks:
+                field_checks[name] = checks
+        logger.debug(
+            "Validation rules compiled",
+            extra={"fields": len(field_checks), "cross_field_rules": len(cross_rules)},
+        )
+        return cls(field_checks, cross_rules, rule_set_version(definitions))
+
+    @property
+    def fields(self) -> frozenset[str]:
+        """Fields read by any check."""
+        return frozenset(self.field_checks) | frozenset(self._rules_by_field)
+
+    def rules_for(self, field_name: str) -> list[CrossFieldRule]:
+        """Cross-field rules that read a field."""
+        return list(self._rules_by_field.get(field_name, ()))
+
+    def check_field(self, field_name: str, value: Any) -> list[ValidationIssue]:
+        """Run a field's own checks on a value."""
+        checks = self.field_checks.get(field_name, ())
+        if is_missing(value):
+            return [
+                ValidationIssue(field_name, c.rule, c.message, c.severity)
+                for c in checks
+                if c.rule == "required"
+            ]
+        issues = []
+        for c in checks:
+            if c.rule == "required":
+                continue
+            failure = c.check(value)
+            if failure is not None:
+                issues.append(
+                    ValidationIssue(field_name, c.rule, f"{c.message} ({failure})", c.severity)
+                )
+        return issues
+
+    def check_rule(
+        self, rule: CrossFieldRule, values: Mapping[str, Any], invalid: set[str]
+    ) -> ValidationIssue | None:
+        """Run a cross-field rule unless one of its inputs is invalid."""
+        if invalid.intersection(rule.fields):
+            return None
+        if rule.evaluate(values) is False:
+            return ValidationIssue(rule.name, "custom", rule.message, rule.severity, rule.fields)
+        return None
+
+    def validate(self, values: Mapping[str, Any]) -> ValidationReport:
+        """Validate one job's field values."""
+        report = ValidationReport()
+        for name in self.field_checks:
+            issues = self.check_field(name, values.get(name))
+            if issues:
+                report.issues.extend(issues)
+                if any(i.severity == "error" for i in issues):
+                    report.invalid_fields.add(name)
+        for rule in self.cross_rules:
+            issue = self.check_rule(rule, values, report.invalid_fields)
+            if issue is not None:
+                report.issues.append(issue)
+        return report
+
+    def affected_rules(self, changed: Iterable[str]) -> list[CrossFieldRule]:
+        """Cross-field rules that read any changed field, in evaluation order."""
+        names = {rule.name for field_name in changed for rule in self.rules_for(field_name)}
+        return [rule for rule in self.cross_rules if rule.name in names]
+
+    def revalidate(
+        self, values: Mapping[str, Any], report: ValidationReport, changed: Iterable[str]
+    ) -> tuple[ValidationReport, set[str]]:
+        """Re-run only the checks that depend on changed fields.
+
+        Args:
+            values: The job's field values, changes applied.
+            report: The job's report before the change.
+            changed: Fields whose values changed.
+
+        Returns:
+            The updated report and the fields whose status or consistency may
+            have changed (the changed fields and every input of a rerun rule).
+        """
+        changed = set(changed)
+        rules = self.affected_rules(changed)
+        rerun = {rule.name for rule in rules}
+        updated = ValidationReport(
+            issues=[
+                i
+                for i in report.issues
+                if not (i.fields and i.field_name in rerun)
+                and not (not i.fields and i.field_name in changed)
+            ],
+            invalid_fields=report.invalid_fields - changed,
+        )
+        for name in changed:
+            issues = self.check_field(name, values.get(name))
+            updated.issues.extend(issues)
+            if any(i.severity == "error" for i in issues):
+                updated.invalid_fields.add(name)
+        for rule in rules:
+            issue = self.check_rule(rule, values, updated.invalid_fields)
+            if issue is not None:
+                updated.issues.append(issue)
+        affected = changed.union(*(rule.fields for rule in rules))
+        return updated, affected
+
+    def validate_many(self, jobs: Sequence[Mapping[str, Any]]) -> list[ValidationReport]:
+        """Validate many jobs, evaluating each distinct field value once."""
+        reports = [ValidationReport() for _ in jobs]
+        for name in self.field_checks:
+            memo: dict[Any, list[ValidationIssue]] = {}
+            for report, values in zip(reports, jobs, strict=True):
+                value = values.get(name)
+                if _hashable(value):
+                    key = (type(value), value)
+                    issues = memo.get(key)
+                    if issues is None:
+                        issues = memo[key] = self.check_field(name, value)
+                else:
+                    issues = self.check_field(name, value)
+                if issues:
+                    report.issues.extend(issues)
+                    if any(i.severity == "error" for i in issues):
+                        report.invalid_fields.add(name)
+        for rule in self.cross_rules:
+            outcomes: dict[Any, ValidationIssue | None] = {}
+            for report, values in zip(reports, jobs, strict=True):
+                inputs = tuple(values.get(name) for name in rule.fields)
+                if report.invalid_fields.intersection(rule.fields):
+                    continue
+                if _hashable(inputs):
+                    # Typed like the field memo: True == 1 must not share an outcome
+                    rule_key = tuple((type(value), value) for value in inputs)
+                    if rule_key not in outcomes:
+                        outcomes[rule_key] = self.check_rule(rule, values, set())
+                    issue = outcomes[rule_key]
+                else:
+                    issue = self.check_rule(rule, values, set())
+                if issue is not None:
+                    report.issues.append(issue)
+        return reports
+
+
+class ValidationEngine:
+    """Cache of compiled validator programs, keyed by source and rule-set version."""
+
+    def __init__(self, max_programs: int = 64):
+        """Initialize the engine.
+
+        Args:
+            max_programs: Compiled programs kept before the least recently used is dropped.
+        """
+        self.max_programs = max_programs
+        self._programs: OrderedDict[tuple[str, str], ValidatorProgram] = OrderedDict()
+
+    def program(self, source_id: str, definitions: Iterable[FieldDefinition]) -> ValidatorProgram:
+        """Return the compiled program for a source's current field definitions.
+
+        Raises:
+            InvalidValidationRuleError: If a rule is malformed.
+        """
+        definitions = tuple(definitions)
+        key = (source_id, rule_set_version(definitions))
+        program = self._programs.get(key)
+        if program is None:
+            program = ValidatorProgram.compile(definitions)
+            self._programs[key] = program
+            if len(self._programs) > self.max_programs:
+                self._programs.popitem(last=False)
+        else:
+            self._programs.move_to_end(key)
+        return program
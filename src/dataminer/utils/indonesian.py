@@ -0,0 +1,475 @@
+"""Single-pass parsing of Indonesian dates, number words and Rupiah amounts.
+
+Verdicts spell values out ("Lima Belas Oktober Dua Ribu Dua Puluh Tiga",
+"Rp. 1.500.000,- (satu juta lima ratus ribu rupiah)", "2 (dua) tahun").
+:class:`IndonesianValueScanner` recognizes all of them in one left-to-right
+scan instead of a cascade of regexes and ``strptime`` attempts per candidate:
+
+1. one tokenizer regex splits the text into numbers, numeric dates, ``Rp``
+   markers, ``,-`` suffixes and words;
+2. a table-driven state machine walks the tokens once. Number words are
+   folded through :data:`NUMBER_WORDS` as they are read, and each expression is
+   decided with at most a few tokens of lookahead: ``<day> <month> <year>``,
+   ``dd-mm-yyyy`` / ``dd/mm/yyyy``, ``Rp <amount>``, ``<amount> rupiah``, or
+   a bare number-word phrase.
+
+Conversions are memoized per phrase, so the dates and amounts that repeat
+throughout a long verdict are converted once.
+
+Numbers use Indonesian separators: ``.`` groups thousands and ``,`` marks
+decimals.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from functools import partial
+from typing import Literal
+
+ValueKind = Literal["date", "number", "currency"]
+
+MONTHS: dict[str, int] = {
+    "januari": 1,
+    "jan": 1,
+    "februari": 2,
+    "pebruari": 2,
+    "feb": 2,
+    "maret": 3,
+    "mar": 3,
+    "april": 4,
+    "apr": 4,
+    "mei": 5,
+    "juni": 6,
+    "jun": 6,
+    "juli": 7,
+    "jul": 7,
+    "agustus": 8,
+    "agu": 8,
+    "agt": 8,
+    "september": 9,
+    "sep": 9,
+    "sept": 9,
+    "oktober": 10,
+    "okt": 10,
+    "november": 11,
+    "nopember": 11,
+    "nov": 11,
+    "desember": 12,
+    "des": 12,
+}
+
+# Number words: (kind, value). A "unit" sets the pending digit, "teen" and
+# "multiplier" words fold it into the current group, "literal" words add to the
+# group directly, and a "scale" multiplies the group into the total.
+NUMBER_WORDS: dict[str, tuple[str, int]] = {
+    "nol": ("unit", 0),
+    "satu": ("unit", 1),
+    "dua": ("unit", 2),
+    "tiga": ("unit", 3),
+    "empat": ("unit", 4),
+    "lima": ("unit", 5),
+    "enam": ("unit", 6),
+    "tujuh": ("unit", 7),
+    "delapan": ("unit", 8),
+    "sembilan": ("unit", 9),
+    "sepuluh": ("literal", 10),
+    "sebelas": ("literal", 11),
+    "seratus": ("literal", 100),
+    "belas": ("teen", 10),
+    "puluh": ("multiplier", 10),
+    "ratus": ("multiplier", 100),
+    "seribu": ("scale", 1_000),
+    "ribu": ("scale", 1_000),
+    "sejuta": ("scale", 1_000_000),
+    "juta": ("scale", 1_000_000),
+    "miliar": ("scale", 1_000_000_000),
+    "milyar": ("scale", 1_000_000_000),
+    "triliun": ("scale", 1_000_000_000_000),
+}
+
+# Scale words after digits ("Rp 1,5 miliar")
+SCALES = {word: value for word, (kind, value) in NUMBER_WORDS.items() if kind == "scale"}
+
+CURRENCY_WORDS = frozenset({"rupiah"})
+
+_TOKEN = re.compile(
+    r"(?P<numdate>(?<![\d.,])\d{1,2}(?P<sep>[-/])\d{1,2}(?P=sep)\d{4}(?!\d))"
+    r"|(?P<rp>\bRp(?![^\W\d_])\.?)"
+    r"|(?P<dash>,-+)"
+    r"|(?P<num>\d{1,3}(?:\.\d{3})+(?:,\d+)?|\d+(?:,\d+)?)"
+    r"|(?P<word>[^\W\d_]+)",
+    re.IGNORECASE,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class ParsedValue:
+    """A recognized expression and its value."""
+
+    kind: ValueKind
+    value: date | int | Decimal
+    start: int
+    end: int
+    text: str
+
+
+@dataclass(frozen=True, slots=True)
+class _Token:
+    kind: str
+    text: str
+    start: int
+    end: int
+
+    @property
+    def lower(self) -> str:
+        return self.text.lower()
+
+
+def parse_digits(text: str) -> int | Decimal | None:
+    """Parse ``1.500.000`` or ``1,5`` (Indonesian separators)."""
+    cleaned = text.replace(".", "").replace(",", ".")
+    try:
+        number = Decimal(cleaned)
+    except InvalidOperation:
+        return None
+    return int(number) if number == number.to_integral_value() else number
+
+
+def words_to_number(words: tuple[str, ...]) -> int | None:
+    """Fold lowercase number words into an integer, or None if malformed."""
+    total = group = pending = 0
+    seen_pending = False
+    for word in words:
+        entry = NUMBER_WORDS.get(word)
+        if entry is None:
+            return None
+        kind, value = entry
+        if kind == "unit":
+            if seen_pending:
+                return None
+            pending, seen_pending = value, True
+        elif kind == "literal":
+            if seen_pending:
+                return None
+            group += value
+        elif kind == "teen":
+            if not seen_pending:
+                return None
+            group += pending + value
+            pending, seen_pending = 0, False
+        elif kind == "multiplier":
+            if not seen_pending:
+                return None
+            group += pending * value
+            pending, seen_pending = 0, False
+        else:
+            amount = group + pending
+            total += (amount if amount or seen_pending or group else 1) * value
+            group = pending = 0
+            seen_pending = False
+    return total + group + pending
+
+
+class _Memo:
+    """Bounded LRU memo of phrase conversions."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, ...], object] = OrderedDict()
+        self.hits = 0
+
+    def get(self, key: tuple[str, ...], compute: Callable[[], object]) -> object:
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+        value = self._entries[key] = compute()
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+
+def _safe_date(year: int, month: int, day: int) -> date | None:
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+class IndonesianValueScanner:
+    """Recognizes dates, number words and Rupiah amounts in one scan.
+
+    Usage:
+        scanner = IndonesianValueScanner()
+        for value in scanner.scan(text):
+            ...
+        iso_text = scanner.normalize(text)
+    """
+
+    def __init__(self, max_memo_entries: int = 4096):
+        """Initialize the scanner.
+
+        Args:
+            max_memo_entries: Converted phrases kept for reuse.
+        """
+        self._memo = _Memo(max_memo_entries)
+
+    @property
+    def memo_hits(self) -> int:
+        """Phrases served from the memo."""
+        return self._memo.hits
+
+    # -- token helpers --------------------------------------------------------
+
+    @staticmethod
+    def _tokens(text: str) -> list[_Token]:
+        tokens = []
+        for match in _TOKEN.finditer(text):
+            tokens.append(_Token(match.lastgroup or "", match.group(), match.start(), match.end()))
+        return tokens
+
+    @staticmethod
+    def _adjacent(text: str, left: _Token, right: _Token) -> bool:
+        gap = text[left.end : right.start]
+        return not gap or gap.isspace()
+
+    def _number_run(self, text: str, tokens: list[_Token], i: int) -> tuple[int, int] | None:
+        """Longest well-formed number-word phrase starting at ``i``: (value, end index)."""
+        j = i
+        while (
+            j < len(tokens)
+            and tokens[j].kind == "word"
+            and tokens[j].lower in NUMBER_WORDS
+            and (j == i or self._adjacent(text, tokens[j - 1], tokens[j]))
+        ):
+            j += 1
+        while j > i:
+            words = tuple(t.lower for t in tokens[i:j])
+            value = self._memo.get(("words", *words), partial(words_to_number, words))
+            if isinstance(value, int):
+                return value, j
+            j -= 1
+        return None
+
+    def _amount(
+        self, text: str, tokens: list[_Token], i: int
+    ) -> tuple[int | Decimal, int, bool] | None:
+        """Digits (with an optional scale word) or number words at ``i``.
+
+        Returns:
+            (value, end index, spelled out in words), or None.
+        """
+        token = tokens[i]
+        if token.kind == "num":
+            value = self._memo.get(("digits", token.text), lambda: parse_digits(token.text))
+            if not isinstance(value, int | Decimal):
+                return None
+            end = i + 1
+            if (
+                end < len(tokens)
+                and tokens[end].kind == "word"
+                and tokens[end].lower in SCALES
+                and self._adjacent(text, token, tokens[end])
+            ):
+                value = value * SCALES[tokens[end].lower]
+                value = int(value) if value == int(value) else value
+                end += 1
+            return value, end, False
+        if token.kind == "word":
+            run = self._number_run(text, tokens, i)
+            if run is not None:
+                return run[0], run[1], True
+        return None
+
+    @staticmethod
+    def _currency_end(text: str, tokens: list[_Token], end: int) -> int:
+        """Skip a ``,-`` and a ``rupiah`` after an amount."""
+        if (
+            end < len(tokens)
+            and tokens[end].kind == "dash"
+            and tokens[end].start == tokens[end - 1].end
+        ):
+            end += 1
+        if (
+            end < len(tokens)
+            and tokens[end].lower in CURRENCY_WORDS
+            and IndonesianValueScanner._adjacent(text, tokens[end - 1], tokens[end])
+        ):
+            end += 1
+        return end
+
+    # -- matchers ---------------------------------------------------------------
+
+    def _match_numdate(self, token: _Token) -> date | None:
+        def convert() -> date | None:
+            day, month, year = re.split(r"[-/]", token.text)
+            return _safe_date(int(year), int(month), int(day))
+
+        value = self._memo.get(("numdate", token.text), convert)
+        return value if isinstance(value, date) else None
+
+    def _match_date(
+        self, text: str, tokens: list[_Token], day: int, j: int
+    ) -> tuple[date, int] | None:
+        """``<day> <month> <year>`` where the day ended at token ``j``."""
+        if j + 1 >= len(tokens) or not 1 <= day <= 31:
+            return None
+        month_token = tokens[j]
+        month = MONTHS.get(month_token.lower)
+        if (
+            month is None
+            or month_token.kind != "word"
+            or not self._adjacent(text, tokens[j - 1], month_token)
+            or not self._adjacent(text, month_token, tokens[j + 1])
+        ):
+            return None
+        year_token = tokens[j + 1]
+        if year_token.kind == "num" and len(year_token.text) == 4 and year_token.text.isdigit():
+            year, end = int(year_token.text), j + 2
+        elif year_token.kind == "word":
+            run = self._number_run(text, tokens, j + 1)
+            if run is None:
+                return None
+            year, end = run
+        else:
+            return None
+        if not 1000 <= year <= 9999:
+            return None
+        parsed = _safe_date(year, month, day)
+        return (parsed, end) if parsed is not None else None
+
+    # -- scanning -----------------------------------------------------------------
+
+    def _iter(self, text: str) -> Iterator[ParsedValue]:
+        tokens = self._tokens(text)
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+
+            if token.kind == "numdate":
+                parsed = self._match_numdate(token)
+                if parsed is not None:
+                    yield ParsedValue("date", parsed, token.start, token.end, token.text)
+                i += 1
+                continue
+
+            if token.kind == "rp":
+                if i + 1 < len(tokens) and self._adjacent(text, token, tokens[i + 1]):
+                    amount = self._amount(text, tokens, i + 1)
+                    if amount is not None:
+                        value, end, _ = amount
+                        end = self._currency_end(text, tokens, end)
+                        last = tokens[end - 1]
+                        yield ParsedValue(
+                            "currency", value, token.start, last.end, text[token.start : last.end]
+                        )
+                        i = end
+                        continue
+                i += 1
+                continue
+
+            amount = self._amount(text, tokens, i)
+            if amount is None:
+                i += 1
+                continue
+            value, end, spelled = amount
+
+            if isinstance(value, int) and end < len(tokens) and tokens[end].lower in MONTHS:
+                matched = self._match_date(text, tokens, value, end)
+                if matched is not None:
+                    parsed, date_end = matched
+                    last = tokens[date_end - 1]
+                    yield ParsedValue(
+                        "date", parsed, token.start, last.end, text[token.start : last.end]
+                    )
+                    i = date_end
+                    continue
+
+            if (
+                end < len(tokens)
+                and tokens[end].lower in CURRENCY_WORDS
+                and self._adjacent(text, tokens[end - 1], tokens[end])
+            ):
+                last = tokens[end]
+                yield ParsedValue(
+                    "currency", value, token.start, last.end, text[token.start : last.end]
+                )
+                i = end + 1
+                continue
+
+            if spelled:
+                last = tokens[end - 1]
+                yield ParsedValue(
+                    "number", value, token.start, last.end, text[token.start : last.end]
+                )
+            i = end
+
+    def scan(self, text: str) -> list[ParsedValue]:
+        """All date, number-word and currency expressions in ``text``, in order."""
+        return list(self._iter(text))
+
+    def normalize(
+        self,
+        text: str,
+        *,
+        kinds: frozenset[ValueKind] = frozenset({"date", "currency"}),
+        currency_prefix: str = "Rp",
+    ) -> str:
+        """Rewrite expressions in canonical form.
+
+        Dates become ISO (``2023-10-15``), amounts ``Rp1500000`` and number
+        words digits.
+
+        Args:
+            text: Text to rewrite.
+            kinds: Kinds of expressions to rewrite.
+            currency_prefix: Prefix written before amounts.
+        """
+        out: list[str] = []
+        position = 0
+        for value in self._iter(text):
+            if value.kind not in kinds:
+                continue
+            out.append(text[position : value.start])
+            if value.kind == "date":
+                out.append(value.value.isoformat())  # type: ignore[union-attr]
+            elif value.kind == "currency":
+                out.append(f"{currency_prefix}{value.value}")
+            else:
+                out.append(str(value.value))
+            position = value.end
+        out.append(text[position:])
+        return "".join(out)
+
+    def first(self, text: str, kind: ValueKind) -> date | int | Decimal | None:
+        """Value of the first expression of ``kind`` in ``text``."""
+        for value in self._iter(text):
+            if value.kind == kind:
+                return value.value
+        return None
+
+
+_default_scanner = IndonesianValueScanner()
+
+
+def parse_date(text: str) -> date | None:
+    """First date in ``text`` (``15 Oktober 2023``, spelled out, ``15-10-2023``, ``15/10/2023``)."""
+    value = _default_scanner.first(text, "date")
+    return value if isinstance(value, date) else None
+
+
+def parse_currency(text: str) -> int | Decimal | None:
+    """First Rupiah amount in ``text``."""
+    value = _default_scanner.first(text, "currency")
+    return None if isinstance(value, date) else value
+
+
+def parse_number_words(text: str) -> int | None:
+    """First spelled-out number in ``text``."""
+    value = _default_scanner.first(text, "number")
+    return value if isinstance(value, int) else None
@@ -0,0 +1,189 @@
+"""Incremental JSON parsing of streamed LLM output.
+
+:class:`IncrementalJSONParser` is fed text chunks as they arrive and reports
+each object member at ``emit_depth`` as soon as its value closes. Only the
+structure is tracked while scanning (nesting, strings, escapes); a member's
+value is decoded with :func:`json.loads` once, when it is complete. Text before
+the first ``{`` (such as a Markdown code fence) and after the root object is
+ignored.
+
+When the stream stops early, every member that closed before the cut has
+already been emitted, and :attr:`IncrementalJSONParser.complete` is false.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import dataclass
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = frozenset(" \t\r\n")
+
+Path = tuple[str | int, ...]
+
+
+class JSONStreamError(ValueError):
+    """Raised when the streamed text is not well-formed JSON."""
+
+
+@dataclass(slots=True)
+class _Frame:
+    kind: str  # "{" or "["
+    expect: str  # "key", "colon", "value", "scalar" or "comma"
+    key: str | int | None = None
+    value_start: int | None = None
+
+
+class IncrementalJSONParser:
+    """Emits completed object members from a JSON document fed in chunks.
+
+    Usage:
+        parser = IncrementalJSONParser(emit_depth=1)
+        async for chunk in stream:
+            for path, value in parser.feed(chunk):
+                validate(path[-1], value)
+    """
+
+    def __init__(self, emit_depth: int = 1):
+        """Initialize the parser.
+
+        Args:
+            emit_depth: Nesting depth of the objects whose members are emitted;
+                1 is the root object, 2 the objects directly inside it.
+        """
+        if emit_depth < 1:
+            raise ValueError("emit_depth must be at least 1")
+        self.emit_depth = emit_depth
+        self._buffer = ""
+        self._pos = 0
+        self._stack: list[_Frame] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._started = False
+        self.complete = False
+        self.emitted = 0
+
+    @property
+    def text(self) -> str:
+        """Text received so far."""
+        return self._buffer
+
+    def feed(self, chunk: str) -> list[tuple[Path, Any]]:
+        """Consume a chunk and return the members it completed.
+
+        Raises:
+            JSONStreamError: If the text is not well-formed JSON. Members
+                completed before the error have already been returned.
+        """
+        self._buffer += chunk
+        events: list[tuple[Path, Any]] = []
+        buffer = self._buffer
+        for i in range(self._pos, len(buffer)):
+            if self.complete:
+                break
+            self._step(buffer, i, buffer[i], events)
+        self._pos = len(buffer)
+        return events
+
+    def _step(self, buffer: str, i: int, c: str, events: list[tuple[Path, Any]]) -> None:
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif c == "\\":
+                self._escape = True
+            elif c == '"':
+                self._in_string = False
+                self._end_string(buffer, i, events)
+            return
+
+        if not self._stack:
+            if c == "{" and not self._started:
+                self._started = True
+                self._stack.append(_Frame("{", "key"))
+            return
+
+        frame = self._stack[-1]
+        if c in _WHITESPACE:
+            if frame.expect == "scalar":
+                self._complete_value(buffer, i, events)
+            return
+
+        if frame.expect == "scalar":
+            if c not in ",}]":
+                return
+            self._complete_value(buffer, i, events)
+
+        if frame.expect == "key":
+            if c == '"':
+                self._start_string(i)
+            elif c == "}":
+                self._pop(buffer, i, events)
+            else:
+                self._error(i, "expected a key")
+        elif frame.expect == "colon":
+            if c != ":":
+                self._error(i, "expected ':'")
+            frame.expect = "value"
+        elif frame.expect == "value":
+            if c == "]" and frame.kind == "[":
+                self._pop(buffer, i, events)
+                return
+            frame.value_start = i
+            if c == '"':
+                self._start_string(i)
+            elif c in "{[":
+                self._stack.append(_Frame(c, "key" if c == "{" else "value", key=0))
+            else:
+                frame.expect = "scalar"
+        elif frame.expect == "comma":
+            if c == ",":
+                if frame.kind == "{":
+                    frame.expect = "key"
+                else:
+                    frame.expect = "value"
+                    frame.key = int(frame.key or 0) + 1
+            elif c == ("}" if frame.kind == "{" else "]"):
+                self._pop(buffer, i, events)
+            else:
+                self._error(i, "expected ',' or a closing bracket")
+
+    def _start_string(self, i: int) -> None:
+        self._in_string = True
+        self._string_start = i
+
+    def _end_string(self, buffer: str, i: int, events: list[tuple[Path, Any]]) -> None:
+        frame = self._stack[-1]
+        if frame.expect == "key":
+            frame.key = json.loads(buffer[self._string_start : i + 1])
+            frame.expect = "colon"
+        else:
+            self._complete_value(buffer, i + 1, events)
+
+    def _pop(self, buffer: str, i: int, events: list[tuple[Path, Any]]) -> None:
+        self._stack.pop()
+        if not self._stack:
+            self.complete = True
+            return
+        self._complete_value(buffer, i + 1, events)
+
+    def _complete_value(self, buffer: str, end: int, events: list[tuple[Path, Any]]) -> None:
+        """Close the value of the innermost frame, emitting it at ``emit_depth``."""
+        frame = self._stack[-1]
+        if len(self._stack) == self.emit_depth and frame.kind == "{":
+            raw = buffer[frame.value_start : end]
+            try:
+                value = json.loads(raw)
+            except json.JSONDecodeError as e:
+                raise JSONStreamError(f"Invalid value for {frame.key!r}: {raw[:80]!r}") from e
+            path = (*(f.key for f in self._stack[:-1]), frame.key)
+            events.append((path, value))  # type: ignore[arg-type]
+            self.emitted += 1
+        frame.value_start = None
+        frame.expect = "comma"
+
+    def _error(self, i: int, message: str) -> None:
+        raise JSONStreamError(f"{message} at offset {i}")
@@ -0,0 +1,59 @@
+"""A coroutine run at a fixed interval in the background."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """Runs ``callback`` every ``interval_seconds`` until stopped.
+
+    A failing run is logged and does not stop the schedule.
+
+    Usage:
+        task = PeriodicTask(flusher.flush, 30.0, name="template-usage")
+        task.start()
+        ...
+        await task.stop()
+    """
+
+    def __init__(
+        self, callback: Callable[[], Awaitable[Any]], interval_seconds: float, name: str = ""
+    ):
+        """Initialize the task."""
+        self.callback = callback
+        self.interval_seconds = interval_seconds
+        self.name = name or getattr(callback, "__qualname__", "periodic")
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the task is scheduled."""
+        return self._task is not None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.callback()
+            except Exception as e:
+                logger.warning("Periodic task failed", extra={"task": self.name, "error": str(e)})
+
+    def start(self) -> None:
+        """Start running in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=self.name)
+
+    async def stop(self) -> None:
+        """Cancel the background task."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
@@ -0,0 +1,222 @@
+"""Local token counting for segment sizing and cost estimation.
+
+Counting tokens with the provider's tokenizer on every window candidate, or
+calling a count-tokens endpoint, is far too slow for segmentation and budget
+checks. :class:`TokenCounter` layers three counters:
+
+- :class:`TokenEstimator`, a linear model over cheap text features (characters,
+  words, digits, symbols), to be fitted to the model's tokenizer on Indonesian
+  legal text. The features are counted with C-level string methods, and the
+  estimate is used whenever a count is clearly away from a limit;
+- an exact counter (the model's own tokenizer), used only when the estimate
+  falls within ``exact_margin`` of a limit;
+- an LRU cache of exact counts keyed by a hash of the text, so repeated
+  prompts, retries and re-segmentation never re-tokenize the same text.
+
+The shipped coefficients are an uncalibrated prior, not a fit to the Gemini
+tokenizer. Fit them with ``scripts/benchmark_tokens.py --fit`` against the
+production tokenizer, and again whenever the model family changes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import math
+import re
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import astuple, dataclass
+from functools import lru_cache
+
+from dataminer.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+ExactCounter = Callable[[str], int]
+
+_DIGITS = "0123456789"
+_SYMBOL_RE = re.compile(r"[^\w\s]")
+
+
+@dataclass(frozen=True, slots=True)
+class TokenEstimator:
+    """Linear token estimate from character, word, digit and symbol counts.
+
+    The defaults are an uncalibrated, conservative prior for Gemini's
+    SentencePiece vocabulary, which splits numbers into single digits; they lean
+    high so that a budget decided on an estimate is not exceeded by the real
+    count. Replace them with coefficients fitted against the production tokenizer.
+    """
+
+    intercept: float = 1.0
+    per_char: float = 0.22
+    per_word: float = 0.15
+    per_digit: float = 0.78
+    per_symbol: float = 0.5
+
+    @staticmethod
+    def features(text: str) -> tuple[int, int, int, int]:
+        """Character, word, digit and symbol counts of ``text``."""
+        return (
+            len(text),
+            len(text.split()),
+            sum(map(text.count, _DIGITS)),
+            len(_SYMBOL_RE.findall(text)),
+        )
+
+    def estimate(self, text: str) -> int:
+        """Approximate token count of ``text``."""
+        if not text:
+            return 0
+        chars, words, digits, symbols = self.features(text)
+        value = (
+            self.intercept
+            + self.per_char * chars
+            + self.per_word * words
+            + self.per_digit * digits
+            + self.per_symbol * symbols
+        )
+        return max(1, math.ceil(value))
+
+    @classmethod
+    def fit(cls, samples: Iterable[tuple[str, int]]) -> TokenEstimator:
+        """Least-squares fit of the coefficients to ``(text, token_count)`` samples.
+
+        Raises:
+            ValueError: If the samples cannot determine the coefficients.
+        """
+        rows = [((1.0, *map(float, cls.features(text))), float(count)) for text, count in samples]
+        size = 5
+        # Normal equations (X^T X) b = X^T y, solved by Gaussian elimination.
+        matrix = [[sum(x[i] * x[j] for x, _ in rows) for j in range(size)] for i in range(size)]
+        vector = [sum(x[i] * y for x, y in rows) for i in range(size)]
+        for column in range(size):
+            pivot = max(range(column, size), key=lambda row: abs(matrix[row][column]))
+            if abs(matrix[pivot][column]) < 1e-9:
+                raise ValueError("Samples are insufficient to fit the token estimator")
+            matrix[column], matrix[pivot] = matrix[pivot], matrix[column]
+            vector[column], vector[pivot] = vector[pivot], vector[column]
+            for row in range(column + 1, size):
+                factor = matrix[row][column] / matrix[column][column]
+                for k in range(column, size):
+                    matrix[row][k] -= factor * matrix[column][k]
+                vector[row] -= factor * vector[column]
+        coefficients = [0.0] * size
+        for row in reversed(range(size)):
+            known = sum(matrix[row][k] * coefficients[k] for k in range(row + 1, size))
+            coefficients[row] = (vector[row] - known) / matrix[row][row]
+        return cls(*coefficients)
+
+    def coefficients(self) -> tuple[float, ...]:
+        """Coefficients as ``(intercept, per_char, per_word, per_digit, per_symbol)``."""
+        return astuple(self)
+
+
+def load_exact_counter(model: str) -> ExactCounter | None:
+    """Load the local tokenizer for ``model``, or ``None`` when it is unavailable.
+
+    Uses the Vertex AI SDK's local tokenizer (``pip install dataminer[tokenizer]``),
+    which counts Gemini tokens offline once its model file is cached. The model
+    file is downloaded on first use; when that fails, or the model has no local
+    tokenizer, counts fall back to estimates.
+    """
+    try:
+        from vertexai.preview import tokenization
+    except ImportError:
+        logger.info("Vertex AI local tokenizer not installed, using estimated token counts")
+        return None
+    try:
+        tokenizer = tokenization.get_tokenizer_for_model(model)
+    except (OSError, ValueError) as e:
+        logger.warning(
+            "Local tokenizer unavailable, using estimated token counts",
+            extra={"model": model, "error": str(e)},
+        )
+        return None
+    return lambda text: tokenizer.count_tokens(text).total_tokens
+
+
+def text_key(text: str) -> bytes:
+    """Cache key for ``text``: a 128-bit BLAKE2 digest."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+class TokenCounter:
+    """Fast, cached token counting that is exact only where it matters.
+
+    Usage:
+        counter = get_token_counter()
+        if not counter.fits(prompt, budget):
+            ...
+    """
+
+    def __init__(
+        self,
+        estimator: TokenEstimator | None = None,
+        exact: ExactCounter | None = None,
+        exact_margin: float | None = None,
+        cache_size: int | None = None,
+    ):
+        """Initialize the counter.
+
+        Args:
+            estimator: Fast estimator. Defaults to the uncalibrated prior
+                coefficients of :class:`TokenEstimator`.
+            exact: Exact counter. Without one, estimates are used everywhere.
+            exact_margin: Relative distance from a limit within which the exact
+                counter is used. Defaults to ``settings.token_exact_margin``.
+            cache_size: Exact counts kept. Defaults to ``settings.token_cache_size``.
+        """
+        settings = get_settings()
+        self.estimator = estimator or TokenEstimator()
+        self.exact = exact
+        self.exact_margin = (
+            exact_margin if exact_margin is not None else settings.token_exact_margin
+        )
+        self.cache_size = cache_size or settings.token_cache_size
+        self._cache: OrderedDict[bytes, int] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def estimate(self, text: str) -> int:
+        """Approximate token count of ``text``."""
+        return self.estimator.estimate(text)
+
+    def count(self, text: str) -> int:
+        """Exact token count when an exact counter is available, else the estimate."""
+        if self.exact is None:
+            return self.estimate(text)
+        key = text_key(text)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return cached
+        self.misses += 1
+        tokens = self.exact(text)
+        self._cache[key] = tokens
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return tokens
+
+    def count_near(self, text: str, limit: int) -> int:
+        """Token count that is exact when it is close to ``limit``."""
+        estimate = self.estimate(text)
+        if abs(estimate - limit) <= limit * self.exact_margin:
+            return self.count(text)
+        return estimate
+
+    def fits(self, text: str, limit: int) -> bool:
+        """Check whether ``text`` is at most ``limit`` tokens."""
+        return self.count_near(text, limit) <= limit
+
+    def total(self, texts: Sequence[str]) -> int:
+        """Estimated total tokens of several texts."""
+        return sum(self.estimate(text) for text in texts)
+
+
+@lru_cache
+def get_token_counter() -> TokenCounter:
+    """Get the shared token counter for ``settings.tokenizer_model``."""
+    return TokenCounter(exact=load_exact_counter(get_settings().tokenizer_model))
@@ -0,0 +1,177 @@
+"""Source classification and language detection tests."""
+
+import pytest
+
+from dataminer.services.classification import (
+    ClassificationError,
+    FingerprintIndex,
+    LanguageModel,
+    LLMSourceEscalation,
+    SourceClassifier,
+    SourceFingerprint,
+    sample_pages,
+    trigram_vector,
+)
+from dataminer.services.llm_client import LLMError, LLMResponse
+
+ID_VERDICT = (
+    "PUTUSAN Nomor 123/Pid.Sus/2023/PN Jkt.Sel DEMI KEADILAN BERDASARKAN KETUHANAN YANG "
+    "MAHA ESA. Pengadilan Negeri Jakarta Selatan yang memeriksa dan mengadili perkara pidana "
+    "pada tingkat pertama telah menjatuhkan putusan sebagai berikut dalam perkara Terdakwa "
+    "yang didakwa oleh Penuntut Umum karena secara bersama-sama melakukan korupsi dan "
+    "merugikan keuangan negara, sehingga saksi-saksi dihadirkan di persidangan untuk "
+    "memberikan keterangan di bawah sumpah mengenai perbuatan terdakwa tersebut."
+)
+SG_JUDGMENT = (
+    "[2023] SGHC 45 IN THE GENERAL DIVISION OF THE HIGH COURT OF THE REPUBLIC OF SINGAPORE. "
+    "Coram: Tan Siong Thye J. The accused was charged with trafficking in a controlled drug "
+    "and claimed trial. Having heard the evidence of the witnesses called by the prosecution, "
+    "I found that the charge was proved beyond reasonable doubt and convicted the accused, "
+    "and these are the grounds on which the sentence was imposed."
+)
+MY_RECORD = (
+    "Suruhanjaya Pencegahan Rasuah Malaysia. Nama pesalah: Ahmad bin Ali, No. KP "
+    "800101-14-5678. Mahkamah Sesyen Kuala Lumpur mendapati tertuduh bersalah atas "
+    "pertuduhan di bawah Seksyen 17 Akta Suruhanjaya kerana telah meminta suapan wang "
+    "tunai daripada seorang kontraktor, dan tertuduh hendaklah membayar denda yang "
+    "dikenakan atau dipenjarakan sekiranya gagal berbuat demikian."
+)
+
+
+@pytest.fixture(scope="module")
+def classifier() -> SourceClassifier:
+    return SourceClassifier(sample_size=5, min_confidence=0.75)
+
+
+@pytest.mark.parametrize(
+    ("pages", "source", "language"),
+    [
+        ([ID_VERDICT] * 12, "ID_SC", "id"),
+        ([SG_JUDGMENT] * 4, "SG_SC", "en"),
+        ([MY_RECORD], "MY_PR", "ms"),
+    ],
+)
+def test_clear_documents_classified_by_rules(
+    classifier: SourceClassifier, pages: list[str], source: str, language: str
+) -> None:
+    """Test clear documents are classified without escalation."""
+    result = classifier.classify(pages)
+    assert result.source == source
+    assert result.language == language
+    assert result.confidence >= 0.75
+    assert not result.needs_llm
+    assert result.method == "rules"
+    assert result.evidence[source]
+
+
+def test_mixed_language_document(classifier: SourceClassifier) -> None:
+    """Test a document with Indonesian and English pages reports both languages."""
+    result = classifier.classify([ID_VERDICT, ID_VERDICT, SG_JUDGMENT.split(". ", 1)[1]])
+    assert result.source == "ID_SC"
+    assert set(result.languages) == {"id", "en"}
+    assert result.language == "id"
+
+
+def test_ambiguous_document_needs_llm(classifier: SourceClassifier) -> None:
+    """Test weak or conflicting evidence is flagged for escalation."""
+    assert classifier.classify(["Notulen rapat tentang pengadaan dan Penyedia."]).needs_llm
+    empty = classifier.classify(["Lorem ipsum dolor sit amet."])
+    assert empty.source is None
+    assert empty.confidence == 0.0
+    assert empty.needs_llm
+
+
+def test_fingerprints_scan_once_and_count_distinct_patterns() -> None:
+    """Test repeated matches of one pattern score once."""
+    index = FingerprintIndex(
+        [
+            SourceFingerprint("A", ((r"\bfoo\b", 1.0), (r"bar", 2.0))),
+            SourceFingerprint("B", ((r"baz", 1.0),)),
+        ]
+    )
+    scores, evidence = index.scan("foo foo FOO bar")
+    assert scores == {"A": 3.0, "B": 0.0}
+    assert evidence == {"A": ["foo", "bar"]}
+
+
+def test_fingerprint_rejects_capturing_groups() -> None:
+    """Test capturing groups, which would break the combined index, are rejected."""
+    with pytest.raises(ClassificationError, match="non-capturing"):
+        FingerprintIndex([SourceFingerprint("A", ((r"(foo)", 1.0),))])
+    with pytest.raises(ClassificationError):
+        FingerprintIndex([SourceFingerprint("A", ((r"(?:foo", 1.0),))])
+
+
+def test_language_model_detects_language() -> None:
+    """Test profile similarity separates Indonesian, Malay and English."""
+    model = LanguageModel.from_samples()
+    assert model.detect(ID_VERDICT) == ("id",)
+    assert model.detect(MY_RECORD) == ("ms",)
+    assert model.detect(SG_JUDGMENT) == ("en",)
+    assert model.detect("") == ()
+    vector = trigram_vector(SG_JUDGMENT)
+    assert vector.shape == (4096,)
+    assert float(vector @ vector) == pytest.approx(1.0)
+
+
+def test_language_model_abstains_without_margin() -> None:
+    """Test a chunk close to two profiles casts no vote instead of guessing."""
+    model = LanguageModel.from_samples()
+    plain = (
+        "Saya tinggal di Bandung bersama keluarga. Setiap pagi ayah berangkat kerja naik "
+        "sepeda motor dan ibu memasak sarapan untuk kami semua. Pada hari libur kami biasanya "
+        "pergi ke pasar untuk membeli sayur dan buah, lalu sore harinya bermain di taman."
+    )
+    id_score, ms_score, _ = model.similarities([plain])[0]
+    assert abs(id_score - ms_score) < 0.04
+    assert model.detect(plain) == ()
+    assert model.detect(plain, min_margin=0.0)
+
+
+def test_sample_pages() -> None:
+    """Test sampling keeps the first pages, the last page and spaced middle pages."""
+    pages = [str(i) for i in range(20)]
+    assert sample_pages(pages, 5) == ["0", "1", "7", "12", "19"]
+    assert sample_pages(pages[:3], 5) == ["0", "1", "2"]
+    assert sample_pages(pages, 1) == ["0"]
+    assert sample_pages(pages, 2) == ["0", "19"]
+    assert sample_pages(["x" * 10], 5, max_chars=4) == ["xxxx"]
+
+
+async def test_resolve_escalates_only_ambiguous_documents(classifier: SourceClassifier) -> None:
+    """Test the LLM is consulted only when the rules are not confident."""
+    calls: list[list[str]] = []
+
+    async def escalate(sample: str, candidates: list[str]) -> str | None:
+        calls.append(list(candidates))
+        return "ID_LKPP"
+
+    clear = await classifier.resolve([ID_VERDICT], escalate)
+    assert clear.source == "ID_SC"
+    assert calls == []
+
+    resolved = await classifier.resolve(["Notulen rapat tentang Penyedia."], escalate)
+    assert resolved.source == "ID_LKPP"
+    assert resolved.method == "llm"
+    assert not resolved.needs_llm
+    assert calls[0][0] == "ID_LKPP"
+
+
+class _FakeLLM:
+    def __init__(self, text: str | None):
+        self.text = text
+
+    async def generate(self, prompt: str, **kwargs: object) -> LLMResponse:
+        if self.text is None:
+            raise LLMError("unavailable")
+        return LLMResponse(self.text, str(kwargs["model"]), 10, 5, 1.0, 1)
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [('{"source": "OS"}', "OS"), ('{"source": "XX"}', None), ("not json", None), (None, None)],
+)
+async def test_llm_escalation(text: str | None, expected: str | None) -> None:
+    """Test the LLM answer is accepted only when it names a candidate."""
+    escalation = LLMSourceEscalation(_FakeLLM(text), model="test-model")  # type: ignore[arg-type]
+    assert await escalation("Aliases: ...", ["OS", "SG_SC"]) == expected
@@ -0,0 +1,131 @@
+"""Confidence scoring tests."""
+
+import numpy as np
+import pytest
+
+from dataminer.services.confidence import (
+    CONFIDENCE_FACTORS,
+    CONFIDENCE_WEIGHTS,
+    ConfidenceScorer,
+    ConfidenceScoringError,
+    FieldEvidence,
+    field_threshold,
+    field_tier,
+    llm_certainty,
+)
+from dataminer.services.field_extraction import ExtractedField, FieldDefinition
+from dataminer.services.validation import ValidatorProgram
+
+BEST = FieldEvidence("regex_match", "explicit_label", "all_rules_pass", "fully_consistent", "high")
+WEAK = FieldEvidence("llm_only", "implicit_location", "format_issues", "major_discrepancy", "low")
+
+
+def _reference(evidence: FieldEvidence) -> float:
+    """Per-field weighted average, as written in the PRD."""
+    total = weights = 0.0
+    for factor, weight in CONFIDENCE_WEIGHTS.items():
+        level = getattr(evidence, factor)
+        if level is not None:
+            total += CONFIDENCE_FACTORS[factor][level] * weight
+            weights += weight
+    return total / weights
+
+
+def test_score_matches_weighted_average() -> None:
+    """Test vectorized scores equal the per-field weighted average."""
+    partial = FieldEvidence("llm_with_validation", "section_present", llm_certainty="medium")
+    scores = ConfidenceScorer().score({"a": BEST, "b": WEAK, "c": partial})
+    assert scores["a"] == pytest.approx(_reference(BEST))
+    assert scores["b"] == pytest.approx(_reference(WEAK))
+    assert scores["c"] == pytest.approx(_reference(partial))
+    assert ConfidenceScorer().score({"d": FieldEvidence()}) == {"d": 0.0}
+
+
+def test_batch_review_flags() -> None:
+    """Test review flags and priorities per job."""
+    scorer = ConfidenceScorer()
+    encoded = scorer.encode(
+        {
+            "ok": {"case_number": BEST, "witness_count": BEST},
+            "standard": {"case_number": BEST, "witness_count": WEAK},
+            "critical": {"case_number": WEAK, "witness_count": BEST},
+        }
+    )
+    batch = scorer.score_batch(encoded)
+    assert batch.requires_review.tolist() == [False, True, True]
+    assert batch.below_threshold.tolist() == [False, False, False, True, True, False]
+    ok, standard, critical = batch.review_priority.tolist()
+    assert ok == 0
+    assert 1 <= standard < critical <= 10
+    assert batch.review_updates()[0] == ("ok", False, None)
+    assert batch.review_updates()[2] == ("critical", True, critical)
+
+
+def test_rescoring_with_new_weights_and_thresholds() -> None:
+    """Test an encoded batch can be rescored without re-encoding."""
+    almost = FieldEvidence("llm_with_validation", "section_present", "all_rules_pass", None, "high")
+    encoded = ConfidenceScorer().encode({1: {"witness_count": almost}})
+    assert not ConfidenceScorer().score_batch(encoded).requires_review[0]
+    strict = ConfidenceScorer(thresholds={"standard": 0.95})
+    assert strict.score_batch(encoded).requires_review[0]
+    heavy = ConfidenceScorer(weights={"field_presence": 5.0})
+    assert heavy.confidence(encoded)[0] < ConfidenceScorer().confidence(encoded)[0]
+
+
+def test_field_threshold_applies_when_stricter() -> None:
+    """Test a field's own threshold raises its tier threshold."""
+    scorer = ConfidenceScorer()
+    encoded = scorer.encode({1: {"witness_count": BEST}}, {"witness_count": 0.99})
+    assert scorer.thresholds(encoded).tolist() == [0.99]
+    assert scorer.score_batch(encoded).requires_review[0]
+
+
+def test_tier_follows_field_category() -> None:
+    """Test a field's category decides its tier before the PRD name lists."""
+    assert field_tier("court_name", "critical") == "critical"
+    assert field_tier("case_number", "contextual") == "standard"
+    assert field_tier("case_number", "metadata") == "critical"
+    assert field_tier("case_number") == "critical"
+    assert field_threshold(FieldDefinition("court_name", field_category="Important")) == 0.85
+    scorer = ConfidenceScorer()
+    encoded = scorer.encode(
+        {1: {"court_name": WEAK, "witness_count": WEAK}},
+        field_categories={"court_name": "critical"},
+    )
+    assert scorer.thresholds(encoded).tolist() == [0.90, 0.75]
+
+
+def test_unknown_levels_rejected() -> None:
+    """Test unknown factors and levels raise."""
+    with pytest.raises(ConfidenceScoringError):
+        ConfidenceScorer(weights={"vibes": 1.0})
+    with pytest.raises(ConfidenceScoringError):
+        ConfidenceScorer().encode({1: {"x": FieldEvidence(extraction_method="guess")}})
+
+
+def test_evidence_from_field() -> None:
+    """Test factor levels derived from an extraction and its validation report."""
+    program = ValidatorProgram.compile(
+        [FieldDefinition("defendant_nik", validation_rules={"pattern": r"^\d{16}$"})]
+    )
+    report = program.validate({"defendant_nik": "12"})
+    field = ExtractedField("defendant_nik", "12", 0.7, "llm", section="identity")
+    evidence = FieldEvidence.from_field(field, report, expected_section="identity")
+    assert evidence == FieldEvidence(
+        "llm_with_validation", "section_present", "format_issues", "fully_consistent", "medium"
+    )
+    regex = ExtractedField("case_number", "1/Pid.B/2023/PN", 1.0, "regex")
+    assert FieldEvidence.from_field(regex).extraction_method == "regex_match"
+    assert [llm_certainty(c) for c in (0.9, 0.7, 0.2)] == ["high", "medium", "low"]
+    missing = ExtractedField("verdict", None, 0.0, "llm")
+    assert FieldEvidence.from_field(missing).field_presence == "not_found"
+
+
+def test_large_batch_is_vectorized() -> None:
+    """Test a large batch scores consistently with single-job scoring."""
+    scorer = ConfidenceScorer()
+    jobs = {i: {"case_number": BEST if i % 3 else WEAK, "witness_count": WEAK} for i in range(2000)}
+    batch = scorer.score_batch(scorer.encode(jobs))
+    assert batch.confidence.shape == (4000,)
+    assert int(np.count_nonzero(batch.requires_review)) == 2000
+    assert batch.review_priority[0] > batch.review_priority[1]
@@ -0,0 +1,107 @@
+"""Document store and fetcher tests."""
+
+import asyncio
+import hashlib
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+import httpx
+import pytest
+
+from dataminer.services.document_store import (
+    DocumentFetcher,
+    DocumentFetchError,
+    DocumentNotFoundError,
+    LocalDocumentStore,
+    content_key,
+)
+
+CONTENT = b"%PDF-1.7\n" + bytes(range(256)) * 1000
+
+
+async def _chunks(data: bytes, size: int = 4096) -> AsyncIterator[bytes]:
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+async def test_put_stream_is_content_addressed(tmp_path: Path) -> None:
+    """Test uploads are hashed and stored under their sha256 key."""
+    store = LocalDocumentStore(tmp_path)
+    stored = await store.put_stream(_chunks(CONTENT))
+    again = await store.put_stream(_chunks(CONTENT))
+
+    sha256 = hashlib.sha256(CONTENT).hexdigest()
+    assert stored.sha256 == sha256
+    assert stored.key == content_key(sha256)
+    assert stored.size == len(CONTENT)
+    assert again == stored
+    assert await store.stat(stored.key) == stored
+    assert not list(tmp_path.glob(".upload-*"))
+
+
+async def test_ranged_and_streamed_reads(tmp_path: Path) -> None:
+    """Test ranged reads and chunked streaming."""
+    store = LocalDocumentStore(tmp_path)
+    stored = await store.put_stream(_chunks(CONTENT))
+
+    assert await store.read_range(stored.key, 9, 4) == bytes([0, 1, 2, 3])
+    assert b"".join([chunk async for chunk in store.stream(stored.key, 1000)]) == CONTENT
+    assert (await store.local_path(stored.key)).read_bytes() == CONTENT
+
+
+async def test_missing_key(tmp_path: Path) -> None:
+    """Test missing and escaping keys are reported as not found."""
+    store = LocalDocumentStore(tmp_path)
+
+    assert not await store.exists(content_key("00" * 32))
+    with pytest.raises(DocumentNotFoundError):
+        await store.read_range(content_key("00" * 32), 0, 1)
+    with pytest.raises(DocumentNotFoundError):
+        await store.local_path("../outside")
+
+
+async def test_fetcher_streams_into_store(tmp_path: Path) -> None:
+    """Test downloads land in the store with their hash."""
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=CONTENT))
+    store = LocalDocumentStore(tmp_path)
+
+    async with httpx.AsyncClient(transport=transport) as client:
+        fetcher = DocumentFetcher(store, client=client)
+        stored = await fetcher.fetch("https://putusan3.mahkamahagung.go.id/doc.pdf")
+
+    assert stored.sha256 == hashlib.sha256(CONTENT).hexdigest()
+
+
+async def test_fetcher_caps_concurrency_per_host(tmp_path: Path) -> None:
+    """Test no more than max_per_host downloads run against one host."""
+    active: dict[str, int] = {}
+    peak: dict[str, int] = {}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        active[host] = active.get(host, 0) + 1
+        peak[host] = max(peak.get(host, 0), active[host])
+        await asyncio.sleep(0.01)
+        active[host] -= 1
+        return httpx.Response(200, content=request.url.path.encode())
+
+    store = LocalDocumentStore(tmp_path)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        fetcher = DocumentFetcher(store, client=client, max_per_host=2)
+        urls = [f"https://{host}/{n}.pdf" for host in ("a.test", "b.test") for n in range(6)]
+        await asyncio.gather(*(fetcher.fetch(url) for url in urls))
+
+    assert peak == {"a.test": 2, "b.test": 2}
+
+
+async def test_fetcher_http_error(tmp_path: Path) -> None:
+    """Test error statuses raise and leave nothing behind."""
+    transport = httpx.MockTransport(lambda request: httpx.Response(404))
+    store = LocalDocumentStore(tmp_path)
+
+    async with httpx.AsyncClient(transport=transport) as client:
+        fetcher = DocumentFetcher(store, client=client)
+        with pytest.raises(DocumentFetchError):
+            await fetcher.fetch("https://a.test/missing.pdf")
+
+    assert not list(tmp_path.rglob("*"))
@@ -0,0 +1,90 @@
+"""Regex-first field extraction tests."""
+
+import pytest
+
+from dataminer.services.field_extraction import (
+    REGEX_CONFIDENCE,
+    FieldDefinition,
+    InvalidFieldPatternError,
+    RegexFieldExtractor,
+)
+from dataminer.services.segmentation import SectionScanner
+
+TEXT = """PUTUSAN
+Nomor 123/Pid.Sus-TPK/2023/PN Jkt.Pst
+Pengadilan Negeri Jakarta Pusat
+Nama lengkap : BUDI SANTOSO
+NIK : 3174012345670001
+DAKWAAN
+Pasal 2 ayat (1) jo. Pasal 18 Undang-Undang Tipikor
+MENGADILI
+Menyatakan Terdakwa terbukti bersalah
+"""
+
+DEFINITIONS = [
+    FieldDefinition(
+        "case_number",
+        extraction_method="regex",
+        extraction_section="header",
+        regex_pattern=r"Nomor\s+(\d+/Pid[.\w-]*/\d{4}/(?:PN|PT|MA)[\w. ]*)",
+    ),
+    FieldDefinition(
+        "defendant_nik",
+        extraction_method="hybrid",
+        extraction_section="header",
+        regex_pattern=r"NIK\s*:\s*(?P<value>\d{16})",
+    ),
+    FieldDefinition(
+        "court_level",
+        extraction_method="regex",
+        regex_pattern=r"/(PN|PT|MA)\b",
+    ),
+    FieldDefinition(
+        "article_charged_first",
+        extraction_method="hybrid",
+        extraction_section="DAKWAAN",
+        regex_pattern=r"(Pasal \d+(?: ayat \(\d+\))?)",
+    ),
+    FieldDefinition(
+        "verdict_article",
+        extraction_method="hybrid",
+        extraction_section="MENGADILI",
+        regex_pattern=r"(Pasal \d+)",
+    ),
+    FieldDefinition("defendant_name", extraction_method="llm", extraction_section="header"),
+    FieldDefinition("defendant_age", extraction_method="calculated"),
+]
+
+
+def test_regex_fields_are_resolved_and_removed_from_llm_list() -> None:
+    """Test regex/hybrid matches resolve fields and only the rest go to the LLM."""
+    spans = SectionScanner().scan(TEXT)
+    resolution = RegexFieldExtractor(DEFINITIONS).extract(TEXT, spans)
+
+    values = {name: field.value for name, field in resolution.resolved.items()}
+    assert values == {
+        "case_number": "123/Pid.Sus-TPK/2023/PN Jkt.Pst",
+        "defendant_nik": "3174012345670001",
+        "court_level": "PN",
+        "article_charged_first": "Pasal 2 ayat (1)",
+    }
+    assert all(f.confidence == REGEX_CONFIDENCE for f in resolution.resolved.values())
+    assert resolution.resolved["article_charged_first"].section == "charges"
+    nik = resolution.resolved["defendant_nik"]
+    assert TEXT[nik.start : nik.end] == "3174012345670001"
+    # Pasal 2 is in DAKWAAN, not MENGADILI: the verdict field is left to the LLM.
+    assert resolution.llm_field_names == ["verdict_article", "defendant_name"]
+    assert set(resolution.remaining_by_section()) == {"verdict", "header"}
+
+
+def test_unmatched_regex_field_falls_back_to_llm() -> None:
+    """Test a regex field without a match is still extracted by the LLM."""
+    resolution = RegexFieldExtractor(DEFINITIONS[:1]).extract("tanpa nomor perkara")
+    assert resolution.resolved == {}
+    assert resolution.llm_field_names == ["case_number"]
+
+
+def test_invalid_pattern_fails_at_compile_time() -> None:
+    """Test broken patterns are reported when the extractor is built."""
+    with pytest.raises(InvalidFieldPatternError, match="case_number"):
+        RegexFieldExtractor([FieldDefinition("case_number", "regex", regex_pattern="(")])
@@ -0,0 +1,109 @@
+"""Indonesian date, number-word and currency parsing tests."""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from dataminer.utils.indonesian import (
+    IndonesianValueScanner,
+    parse_currency,
+    parse_date,
+    parse_number_words,
+    words_to_number,
+)
+
+
+@pytest.mark.parametrize(
+    ("phrase", "expected"),
+    [
+        ("lima belas", 15),
+        ("sebelas", 11),
+        ("dua puluh tiga", 23),
+        ("seratus dua puluh lima", 125),
+        ("dua ribu dua puluh tiga", 2023),
+        ("seribu sembilan ratus sembilan puluh sembilan", 1999),
+        ("satu juta lima ratus ribu", 1_500_000),
+        ("dua miliar", 2_000_000_000),
+        ("dua tiga", None),
+        ("puluh", None),
+    ],
+)
+def test_words_to_number(phrase: str, expected: int | None) -> None:
+    """Test number words fold into integers."""
+    assert words_to_number(tuple(phrase.split())) == expected
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ("Lima Belas Oktober Dua Ribu Dua Puluh Tiga", date(2023, 10, 15)),
+        ("pada tanggal 15 Oktober 2023, terdakwa", date(2023, 10, 15)),
+        ("diputus 15-10-2023", date(2023, 10, 15)),
+        ("diputus 15/10/2023", date(2023, 10, 15)),
+        ("tanggal 1 Nopember 2021", date(2021, 11, 1)),
+        ("31-02-2023", None),
+        ("15 Oktober", None),
+    ],
+)
+def test_parse_date(text: str, expected: date | None) -> None:
+    """Test the PRD date formats, spelled out or numeric."""
+    assert parse_date(text) == expected
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ("denda Rp. 1.500.000,- subsidair", 1_500_000),
+        ("sebesar Rp 250.000.000,00", 250_000_000),
+        ("Rp1,5 miliar", 1_500_000_000),
+        ("5.000 rupiah", 5_000),
+        ("seratus dua puluh lima juta rupiah", 125_000_000),
+        ("Rp 2,5", Decimal("2.5")),
+        ("tanpa denda", None),
+    ],
+)
+def test_parse_currency(text: str, expected: int | Decimal | None) -> None:
+    """Test Rupiah amounts become integers."""
+    assert parse_currency(text) == expected
+
+
+def test_scan_finds_every_expression_in_order() -> None:
+    """Test one scan yields dates, amounts and number words with their spans."""
+    text = (
+        "Pada hari Senin tanggal 5 Januari 2023 menjatuhkan pidana penjara selama "
+        "2 (dua) tahun dan denda Rp. 1.500.000,- (satu juta lima ratus ribu rupiah)"
+    )
+    values = IndonesianValueScanner().scan(text)
+    assert [(v.kind, v.value) for v in values] == [
+        ("date", date(2023, 1, 5)),
+        ("number", 2),
+        ("currency", 1_500_000),
+        ("currency", 1_500_000),
+    ]
+    assert [text[v.start : v.end] for v in values] == [v.text for v in values]
+    assert values[2].text == "Rp. 1.500.000,-"
+
+
+def test_normalize_rewrites_expressions() -> None:
+    """Test dates become ISO and amounts integers; other text is untouched."""
+    scanner = IndonesianValueScanner()
+    text = "Lima Belas Oktober Dua Ribu Dua Puluh Tiga, denda Rp. 1.500.000,- selama 2 (dua) tahun"
+    assert scanner.normalize(text) == "2023-10-15, denda Rp1500000 selama 2 (dua) tahun"
+    assert scanner.normalize(text, kinds=frozenset({"number"})).endswith("2 (2) tahun")
+
+
+def test_repeated_phrases_are_memoized() -> None:
+    """Test a repeated phrase is converted once."""
+    scanner = IndonesianValueScanner()
+    scanner.scan("Rp. 1.500.000,- dan Lima Belas Oktober Dua Ribu Dua Puluh Tiga")
+    hits = scanner.memo_hits
+    scanner.scan("Rp. 1.500.000,- dan Lima Belas Oktober Dua Ribu Dua Puluh Tiga")
+    assert scanner.memo_hits > hits
+
+
+def test_plain_numbers_are_not_values() -> None:
+    """Test bare digits (article numbers, counts) are left alone."""
+    assert IndonesianValueScanner().scan("Pasal 114 ayat (2) dan 3 orang saksi") == []
+    assert parse_number_words("selama 6 (enam) bulan") == 6
+    assert parse_number_words("Pasal 114") is None
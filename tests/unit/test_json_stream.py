@@ -0,0 +1,63 @@
+"""Incremental JSON parser tests."""
+
+import json
+
+import pytest
+
+from dataminer.utils.json_stream import IncrementalJSONParser, JSONStreamError
+
+ANSWER = {
+    "case_number": {"value": "12/Pid.B/2023/PN Jkt", "confidence": 0.97},
+    "charges": [{"article": 'Pasal 2 "UU" Tipikor', "proven": True}, {"article": None}],
+    "sentence_prison_total_months": 48,
+    "verdict": "bersalah",
+}
+
+
+def _feed_by(parser: IncrementalJSONParser, text: str, size: int) -> list:
+    events = []
+    for i in range(0, len(text), size):
+        events.extend(parser.feed(text[i : i + size]))
+    return events
+
+
+@pytest.mark.parametrize("size", [1, 7, 1000])
+def test_members_are_emitted_as_they_close(size: int) -> None:
+    """Test every top-level member is decoded once, whatever the chunking."""
+    text = "```json\n" + json.dumps(ANSWER, indent=2, ensure_ascii=False) + "\n```"
+    parser = IncrementalJSONParser()
+    events = _feed_by(parser, text, size)
+
+    assert {path[0]: value for path, value in events} == ANSWER
+    assert [path for path, _ in events] == [(key,) for key in ANSWER]
+    assert parser.complete
+
+
+def test_member_is_available_before_the_stream_ends() -> None:
+    """Test a member is emitted as soon as its value closes."""
+    parser = IncrementalJSONParser()
+    assert parser.feed('{"verdict": "bersal') == []
+    assert parser.feed('ah", "sentence_prison_total_months": 4') == [(("verdict",), "bersalah")]
+    # A number only closes at the next delimiter.
+    assert parser.feed("8") == []
+    assert parser.feed("}") == [(("sentence_prison_total_months",), 48)]
+
+
+def test_truncated_and_malformed_tails_keep_closed_members() -> None:
+    """Test cut-off and garbled streams keep what arrived completely."""
+    parser = IncrementalJSONParser()
+    events = parser.feed('{"verdict": "bersalah", "case_number": {"value": "12/Pid')
+    assert events == [(("verdict",), "bersalah")]
+    assert not parser.complete
+
+    broken = IncrementalJSONParser()
+    assert broken.feed('{"verdict": "bersalah", ') == [(("verdict",), "bersalah")]
+    with pytest.raises(JSONStreamError):
+        broken.feed('"judge": tru,}')
+
+
+def test_nested_depth_emits_per_task_fields() -> None:
+    """Test emit_depth=2 reports fields of a packed answer with their task."""
+    parser = IncrementalJSONParser(emit_depth=2)
+    events = parser.feed('{"header": {"case_number": "1"}, "panel": {"judge_presiding": "Budi"}}')
+    assert events == [(("header", "case_number"), "1"), (("panel", "judge_presiding"), "Budi")]
@@ -0,0 +1,244 @@
+"""LLM response cache and cost ledger tests."""
+
+import asyncio
+from decimal import Decimal
+from typing import Any
+
+import httpx
+import pytest
+
+from dataminer.services import llm_cache
+from dataminer.services.costs import JobCostLedger, call_cost
+from dataminer.services.llm_cache import CacheKey, LLMResponseCache, MemoryTier
+from dataminer.services.llm_client import LLMClient, LLMResponse
+
+MODEL = "gemini-1.5-pro"
+
+
+class FakeRedis:
+    """Dict-backed stand-in for the Redis commands the cache uses."""
+
+    def __init__(self, fail: bool = False) -> None:
+        self.data: dict[str, bytes] = {}
+        self.expiry: dict[str, int | None] = {}
+        self.fail = fail
+
+    async def get(self, name: str) -> Any:
+        if self.fail:
+            raise ConnectionError("redis down")
+        return self.data.get(name)
+
+    async def set(self, name: str, value: bytes, ex: int | None = None, *, nx: bool = False) -> Any:
+        if self.fail:
+            raise ConnectionError("redis down")
+        if nx and name in self.data:
+            return None
+        self.data[name] = value
+        self.expiry[name] = ex
+        return True
+
+    async def delete(self, *names: str) -> Any:
+        for name in names:
+            self.data.pop(name, None)
+            self.expiry.pop(name, None)
+        return len(names)
+
+
+class SlowLLM:
+    """Counts calls and answers after a delay, so concurrent callers overlap."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def generate(self, prompt: str, **kwargs: Any) -> LLMResponse:
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return LLMResponse('{"ok": true}', str(kwargs["model"]), 1000, 200, 50.0, 1)
+
+
+async def _token() -> str:
+    return "token"
+
+
+def _llm(calls: list[str]) -> LLMClient:
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.content.decode())
+        return httpx.Response(
+            200,
+            json={
+                "candidates": [{"content": {"parts": [{"text": '{"ok": true}'}]}}],
+                "usageMetadata": {"promptTokenCount": 1000, "candidatesTokenCount": 200},
+            },
+        )
+
+    return LLMClient(
+        base_url="http://llm.test/v1/models",
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        token_provider=_token,
+    )
+
+
+async def test_identical_prompt_is_paid_once_and_saving_recorded() -> None:
+    """Test repeats hit the cache and count as savings in the ledger."""
+    calls: list[str] = []
+    redis = FakeRedis()
+    cache = LLMResponseCache(_llm(calls), redis=redis, ttl_seconds=60)
+    ledger = JobCostLedger()
+    kwargs: dict[str, Any] = {
+        "template_id": "t1",
+        "template_version": 3,
+        "model": MODEL,
+        "llm_pass": "detailed",
+        "temperature": 0.1,
+        "ledger": ledger,
+    }
+
+    first = await cache.generate("segmen", **kwargs)
+    second = await cache.generate("segmen", **kwargs)
+
+    assert len(calls) == 1
+    assert not first.cached
+    assert second.cached
+    assert second.text == first.text
+    assert [ex for name, ex in redis.expiry.items() if not name.endswith(":lock")] == [60]
+    cost = call_cost(MODEL, 1000, 200)
+    assert ledger.costs == {"cost_llm_detailed": cost}
+    assert ledger.savings == {"cost_llm_detailed": cost}
+    assert (ledger.cache_hits, ledger.tokens_used_total, ledger.tokens_saved_total) == (
+        1,
+        1200,
+        1200,
+    )
+    columns = ledger.job_columns()
+    assert columns["cost_llm_detailed"] == Decimal("0.0022")
+    assert columns["cost_llm_cache_savings"] == Decimal("0.0022")
+    assert (columns["tokens_saved_total"], columns["llm_cache_hits"]) == (1200, 1)
+
+
+async def test_concurrent_identical_prompts_are_paid_once() -> None:
+    """Test callers racing on one key share a single model call."""
+    llm = SlowLLM()
+    cache = LLMResponseCache(llm, redis=FakeRedis())  # type: ignore[arg-type]
+    ledger = JobCostLedger()
+
+    responses = await asyncio.gather(
+        *(
+            cache.generate("p", template_id="t", template_version=1, model=MODEL, ledger=ledger)
+            for _ in range(5)
+        )
+    )
+
+    assert llm.calls == 1
+    assert [r.cached for r in responses] == [False, True, True, True, True]
+    assert (cache.misses, cache.hits, cache.coalesced) == (1, 4, 4)
+    assert ledger.cache_hits == 4
+    assert ledger.total_saved == 4 * ledger.total_cost
+    assert cache._inflight == {}
+
+
+async def test_workers_wait_for_the_lock_holder(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test a second worker missing the same key waits for the first worker's answer."""
+    monkeypatch.setattr(llm_cache, "LOCK_POLL_SECONDS", 0.01)
+    llm = SlowLLM()
+    redis = FakeRedis()
+    worker_a = LLMResponseCache(llm, redis=redis)  # type: ignore[arg-type]
+    worker_b = LLMResponseCache(llm, redis=redis)  # type: ignore[arg-type]
+
+    first, second = await asyncio.gather(
+        worker_a.generate("p", template_id="t", template_version=1, model=MODEL),
+        worker_b.generate("p", template_id="t", template_version=1, model=MODEL),
+    )
+
+    assert llm.calls == 1
+    assert not first.cached
+    assert second.cached
+    assert not [name for name in redis.data if name.endswith(":lock")]
+
+
+async def test_failed_call_is_not_cached_and_releases_the_lock() -> None:
+    """Test every waiter sees the error and a later call retries the model."""
+    calls = 0
+
+    class FailingLLM:
+        async def generate(self, prompt: str, **kwargs: Any) -> LLMResponse:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            raise ConnectionError("model down")
+
+    redis = FakeRedis()
+    cache = LLMResponseCache(FailingLLM(), redis=redis)  # type: ignore[arg-type]
+    results = await asyncio.gather(
+        *(cache.generate("p", template_id="t", template_version=1, model=MODEL) for _ in range(3)),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(r, ConnectionError) for r in results)
+    assert calls == 1
+    assert redis.data == {}
+    with pytest.raises(ConnectionError):
+        await cache.generate("p", template_id="t", template_version=1, model=MODEL)
+    assert calls == 2
+
+
+async def test_key_changes_with_template_version_and_shared_tier_is_used() -> None:
+    """Test a new template version misses and another worker hits Redis."""
+    calls: list[str] = []
+    redis = FakeRedis()
+    worker_a = LLMResponseCache(_llm(calls), redis=redis)
+    worker_b = LLMResponseCache(_llm(calls), redis=redis)
+
+    await worker_a.generate("p", template_id="t", template_version=1, model=MODEL)
+    hit = await worker_b.generate("p", template_id="t", template_version=1, model=MODEL)
+    await worker_b.generate("p", template_id="t", template_version=2, model=MODEL)
+
+    assert hit.cached
+    assert len(calls) == 2
+
+
+async def test_high_temperature_and_redis_failures_bypass_cache() -> None:
+    """Test sampling calls are never cached and Redis errors are not fatal."""
+    calls: list[str] = []
+    cache = LLMResponseCache(_llm(calls), redis=FakeRedis(fail=True), max_temperature=0.2)
+
+    for _ in range(2):
+        await cache.generate("p", template_id="t", template_version=1, model=MODEL, temperature=0.9)
+    assert len(calls) == 2
+
+    await cache.generate("p", template_id="t", template_version=1, model=MODEL, temperature=0.0)
+    hit = await cache.generate(
+        "p", template_id="t", template_version=1, model=MODEL, temperature=0.0
+    )
+    assert hit.cached  # served by the in-process tier
+    assert len(calls) == 3
+
+
+def test_memory_tier_limits() -> None:
+    """Test the in-process tier evicts by entries and bytes and expires entries."""
+    tier = MemoryTier(max_entries=2, max_bytes=10, ttl_seconds=60)
+    tier.put("a", b"1234")
+    tier.put("b", b"1234")
+    tier.get("a")
+    tier.put("c", b"1234")  # evicts b, the least recently used
+    assert tier.get("b") is None
+    assert tier.get("a") == b"1234"
+    tier.put("d", b"12345678")  # over max_bytes with the others
+    assert tier.size_bytes <= 10
+
+    expired = MemoryTier(max_entries=2, max_bytes=10, ttl_seconds=-1)
+    expired.put("a", b"1")
+    assert expired.get("a") is None
+    assert len(expired) == 0
+
+
+def test_cache_key() -> None:
+    """Test the key covers every input."""
+    key = CacheKey.for_prompt("t", 1, MODEL, 0.1, "prompt")
+    assert key.redis_key.startswith(f"dataminer:llm:v1:t:1:{MODEL}:0.10:")
+    assert key != CacheKey.for_prompt("t", 1, MODEL, 0.1, "prompt ")
+
+
+@pytest.mark.parametrize(("model", "expected"), [("gemini-1.5-flash-002", "0.000135")])
+def test_call_cost_matches_versioned_models(model: str, expected: str) -> None:
+    """Test versioned model names use the family price."""
+    assert call_cost(model, 1000, 200) == Decimal(expected)
@@ -0,0 +1,173 @@
+"""LLM client tests."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from dataminer.services.llm_client import (
+    LLMClient,
+    LLMError,
+    LLMRateLimitError,
+    ModelLimits,
+)
+
+BASE_URL = "http://llm.test/v1/models"
+
+
+def _ok(text: str = '{"nama": "BUDI"}') -> httpx.Response:
+    return httpx.Response(
+        200,
+        json={
+            "candidates": [{"content": {"parts": [{"text": text}]}}],
+            "usageMetadata": {"promptTokenCount": 12, "candidatesTokenCount": 5},
+        },
+    )
+
+
+def _client(handler, **kwargs) -> LLMClient:  # type: ignore[no-untyped-def]
+    return LLMClient(
+        base_url=BASE_URL,
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        token_provider=_token,
+        backoff_base_seconds=0.001,
+        **kwargs,
+    )
+
+
+async def _token() -> str:
+    return "token"
+
+
+async def test_generate_parses_response_and_sends_request() -> None:
+    """Test the request body, auth header and parsed response."""
+    seen: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return _ok()
+
+    async with _client(handler) as llm:
+        response = await llm.generate("prompt", model="gemini-1.5-flash", temperature=0.0)
+
+    assert response.text == '{"nama": "BUDI"}'
+    assert (response.prompt_tokens, response.output_tokens, response.total_tokens) == (12, 5, 17)
+    assert response.attempts == 1
+    request = seen[0]
+    assert request.url.path == "/v1/models/gemini-1.5-flash:generateContent"
+    assert request.headers["authorization"] == "Bearer token"
+    body = json.loads(request.content)
+    assert body["contents"][0]["parts"][0]["text"] == "prompt"
+    assert body["generationConfig"]["temperature"] == 0.0
+
+
+async def test_generate_retries_transient_errors_up_to_max_retries() -> None:
+    """Test 5xx and timeouts are retried and the retry budget is honored."""
+    responses = iter([httpx.Response(503), "timeout", _ok()])
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        response = next(responses)
+        if response == "timeout":
+            raise httpx.ReadTimeout("slow", request=request)
+        return response  # type: ignore[return-value]
+
+    async with _client(handler) as llm:
+        response = await llm.generate("prompt", model="m", max_retries=2)
+    assert response.attempts == 3
+
+    calls = 0
+
+    def failing(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return httpx.Response(500)
+
+    async with _client(failing) as llm:
+        with pytest.raises(LLMError, match="HTTP 500"):
+            await llm.generate("prompt", model="m", max_retries=1)
+    assert calls == 2
+
+
+async def test_generate_retries_malformed_response_body() -> None:
+    """Test a 200 with a body that is not JSON is retried like a 5xx."""
+    responses = iter([httpx.Response(200, text="<html>proxy error</html>"), _ok()])
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return next(responses)
+
+    async with _client(handler) as llm:
+        response = await llm.generate("prompt", model="m", max_retries=1)
+    assert response.attempts == 2
+
+    def truncated(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, text='{"candidates": [')
+
+    async with _client(truncated) as llm:
+        with pytest.raises(LLMError, match="malformed response"):
+            await llm.generate("prompt", model="m", max_retries=1)
+
+
+async def test_generate_does_not_retry_client_errors() -> None:
+    """Test non-retryable errors fail immediately."""
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return httpx.Response(400, json={"error": "bad request"})
+
+    async with _client(handler) as llm:
+        with pytest.raises(LLMError, match="HTTP 400"):
+            await llm.generate("prompt", model="m", max_retries=3)
+    assert calls == 1
+
+
+async def test_rate_limit_cools_down_model() -> None:
+    """Test a 429 holds back the model for Retry-After and then raises when exhausted."""
+    times: list[float] = []
+    loop = asyncio.get_running_loop()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        times.append(loop.time())
+        return httpx.Response(429, headers={"retry-after": "0.05"})
+
+    async with _client(handler) as llm:
+        with pytest.raises(LLMRateLimitError):
+            await llm.generate("prompt", model="m", max_retries=1)
+    assert times[1] - times[0] >= 0.04
+
+
+async def test_concurrency_is_limited_per_model() -> None:
+    """Test each model has its own concurrency cap."""
+    active: dict[str, int] = {"a": 0, "b": 0}
+    peak: dict[str, int] = {"a": 0, "b": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        model = request.url.path.rsplit("/", 1)[-1].split(":")[0]
+        active[model] += 1
+        peak[model] = max(peak[model], active[model])
+        await asyncio.sleep(0.01)
+        active[model] -= 1
+        return _ok()
+
+    limits = {"a": ModelLimits(concurrency=2), "b": ModelLimits(concurrency=5)}
+    async with _client(handler, limits=limits) as llm:
+        await asyncio.gather(
+            *(llm.generate("p", model=model) for model in ["a", "b"] for _ in range(10))
+        )
+    assert peak == {"a": 2, "b": 5}
+
+
+async def test_pass_timeouts() -> None:
+    """Test each pass uses its own read timeout."""
+    timeouts: list[float] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        timeouts.append(request.extensions["timeout"]["read"])
+        return _ok()
+
+    async with _client(handler, pass_timeouts={"quick": 5.0, "deep_dive": 120.0}) as llm:
+        await llm.generate("p", model="m", llm_pass="quick")
+        await llm.generate("p", model="m", llm_pass="deep_dive")
+    assert timeouts == [5.0, 120.0]
@@ -0,0 +1,77 @@
+"""Normalization rule engine tests."""
+
+import pytest
+
+from dataminer.services.normalization import (
+    InvalidNormalizationRuleError,
+    NormalizationEngine,
+    NormalizationProgram,
+    NormalizationRule,
+    trie_pattern,
+)
+
+
+def test_trie_pattern_prefers_longest_literal() -> None:
+    """Test the trie regex matches the longest literal at each position."""
+    import re
+
+    regex = re.compile(trie_pattern(["Rp", "Rp.", "Pasal", "Pas"]))
+    assert regex.findall("Rp. 500 Pasal 2 Pas Rp") == ["Rp.", "Pasal", "Pas", "Rp"]
+
+
+def test_literal_rules_in_one_pass() -> None:
+    """Test literal rules at one priority are applied simultaneously."""
+    program = NormalizationProgram.compile(
+        [
+            NormalizationRule("currency", "Rp.", "Rp"),
+            NormalizationRule("currency-space", "Rp ", "Rp"),
+            NormalizationRule("ocr-yang", "yank", "yang"),
+        ]
+    )
+    assert program.normalize("uang yank Rp. 500 dan Rp 200") == "uang yang Rp 500 dan Rp200"
+
+
+def test_priority_order_and_regex_rules() -> None:
+    """Test rules run in priority order, regex replacements included."""
+    program = NormalizationProgram.compile(
+        [
+            NormalizationRule("collapse-space", r"[ \t]{2,}", " ", is_regex=True, priority=200),
+            NormalizationRule("pasal", r"(?i)\bpasal\s+(\d+)", r"Pasal \1", True, priority=10),
+            NormalizationRule("tab", "\t", "  ", priority=5),
+        ]
+    )
+    assert program.normalize("PASAL\t114\tayat") == "Pasal 114 ayat"
+
+
+def test_section_index() -> None:
+    """Test section-scoped rules only apply to their sections."""
+    program = NormalizationProgram.compile(
+        [
+            NormalizationRule("terdakwa", "terdakwa", "Terdakwa"),
+            NormalizationRule("amar", "MEMUTUSKAN", "MENGADILI", apply_to_sections=("verdict",)),
+        ]
+    )
+    text = "terdakwa MEMUTUSKAN"
+    assert program.normalize(text, "header") == "Terdakwa MEMUTUSKAN"
+    assert program.normalize(text, "verdict") == "Terdakwa MENGADILI"
+    assert program.normalize(text) == "Terdakwa MENGADILI"
+    assert program.steps_for("header") is program.steps_for("header")
+
+
+def test_invalid_regex_rejected() -> None:
+    """Test a broken regex fails compilation with the rule name."""
+    with pytest.raises(InvalidNormalizationRuleError, match="broken"):
+        NormalizationProgram.compile([NormalizationRule("broken", "(", is_regex=True)])
+
+
+def test_engine_caches_by_rule_set_version() -> None:
+    """Test programs are reused until the rule set changes."""
+    engine = NormalizationEngine(max_programs=2)
+    rules = [NormalizationRule("yank", "yank", "yang")]
+
+    first = engine.program("ID_SC", rules)
+    assert engine.program("ID_SC", list(rules)) is first
+
+    changed = engine.program("ID_SC", [NormalizationRule("yank", "yank", "yang", priority=1)])
+    assert changed is not first
+    assert changed.version != first.version
@@ -0,0 +1,95 @@
+"""OCR engine and worker pool tests."""
+
+import sys
+from collections.abc import Callable
+from pathlib import Path
+
+import pymupdf
+import pytest
+
+from dataminer.services import ocr
+from dataminer.services.ocr import OCRWorkerPool, PytesseractEngine, create_engine
+from dataminer.services.page_cache import PageImage, render_page, sha256_file
+
+
+class FakeEngine:
+    """Engine that reports the image it was given."""
+
+    name = "fake"
+
+    def recognize(self, image: PageImage) -> str:
+        return f"{image.width}x{image.height}:{len(image.samples)}"
+
+    def close(self) -> None:
+        pass
+
+
+def test_render_page_to_grayscale(make_pdf: Callable[..., Path]) -> None:
+    """Test pages render to raw 8-bit grayscale at the requested DPI."""
+    path = make_pdf(["PUTUSAN"])
+    with pymupdf.open(path) as doc:
+        width_pt = doc[0].rect.width
+        image = render_page(doc, 1, dpi=144)
+
+    assert image.width == round(width_pt * 2)
+    assert len(image.samples) == image.width * image.height
+
+
+def test_create_engine_falls_back_without_tesserocr(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test auto engine selection falls back to pytesseract."""
+    monkeypatch.setitem(sys.modules, "tesserocr", None)
+
+    assert isinstance(create_engine("auto"), PytesseractEngine)
+    with pytest.raises(ImportError):
+        create_engine("tesserocr")
+
+
+def test_worker_reuses_engine_and_document(
+    make_pdf: Callable[..., Path], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test a worker OCRs pages with its loaded engine and cached document."""
+    path = str(make_pdf(["one", "two", "three"]))
+    monkeypatch.setattr(ocr, "_worker_engine", FakeEngine())
+    monkeypatch.setattr(ocr, "_worker_cache", None)
+    monkeypatch.setattr(ocr, "_worker_doc", None)
+    monkeypatch.setattr(ocr, "_worker_doc_path", None)
+
+    texts = ocr._ocr_pages_in_worker(path, [1, 3], 72)
+    doc = ocr._worker_doc
+    ocr._ocr_pages_in_worker(path, [2], 72)
+
+    assert len(texts) == 2
+    assert texts[0].startswith("595x842")  # A4 at 72 DPI
+    assert ocr._worker_doc is doc
+    doc.close()
+
+
+def test_uninitialized_worker_raises(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test OCR fails clearly outside an initialized worker."""
+    monkeypatch.setattr(ocr, "_worker_engine", None)
+    with pytest.raises(RuntimeError):
+        ocr._ocr_pages_in_worker("doc.pdf", [1], 300)
+
+
+def test_pool_uses_known_digest_and_hashes_unknown_files_once(
+    make_pdf: Callable[..., Path], tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test page cache keys come from the store's digest, hashing a file at most once."""
+    path = str(make_pdf(["one"]))
+    hashed: list[str] = []
+
+    def counting_sha256(file: str) -> str:
+        hashed.append(file)
+        return sha256_file(file)
+
+    monkeypatch.setattr(ocr, "sha256_file", counting_sha256)
+    pool = OCRWorkerPool(max_workers=1, page_cache_dir=tmp_path / "cache")
+
+    pool.known_digest(path, "a" * 64)
+    assert pool.digest(path) == "a" * 64
+    assert hashed == []
+
+    other = str(make_pdf(["two"]))
+    assert pool.digest(other) == pool.digest(other)
+    assert hashed == [other]
+    assert OCRWorkerPool(max_workers=1, page_cache_dir="").digest(path) is None
@@ -0,0 +1,132 @@
+"""OCR correction index tests."""
+
+import re
+from pathlib import Path
+
+import pytest
+
+from dataminer.services.ocr_correction import (
+    DEFAULT_LEXICON,
+    OCRCorrector,
+    OCRIndexError,
+    SymSpellIndex,
+    confusable_variants,
+    deletes,
+    edit_distance,
+)
+
+LEXICON = {word: len(DEFAULT_LEXICON) - rank for rank, word in enumerate(DEFAULT_LEXICON)}
+
+
+@pytest.fixture(scope="module")
+def index() -> SymSpellIndex:
+    return SymSpellIndex.build(LEXICON)
+
+
+def test_deletes_and_edit_distance() -> None:
+    """Test the delete neighbourhood and bounded distance."""
+    assert deletes("abc", 1, 7) == {"abc", "bc", "ac", "ab"}
+    assert "yan" in deletes("yank", 1, 7)
+    assert edit_distance("terdakwa", "terdakva", 2) == 1
+    assert edit_distance("ab", "ba", 2) == 1
+    assert edit_distance("pidana", "perkara", 2) == 3
+
+
+def test_lookup(index: SymSpellIndex) -> None:
+    """Test lookups find close words, closest and most frequent first."""
+    assert index.lookup("terdakva")[0].term == "terdakwa"
+    assert index.lookup("yank")[0].term == "yang"
+    assert index.lookup("pengadi1an", 2)[0].term == "pengadilan"
+    assert index.lookup("xyzzyq") == []
+    assert "pasal" in index
+    assert "pasai" not in index
+    assert index.frequency("PASAL") == LEXICON["pasal"]
+
+
+def test_save_and_load_memory_mapped(index: SymSpellIndex, tmp_path: Path) -> None:
+    """Test an index round-trips through a memory-mapped file."""
+    path = tmp_path / "lexicon.idx"
+    index.save(path)
+    loaded = SymSpellIndex.load(path)
+    try:
+        assert len(loaded) == len(index)
+        assert loaded.lookup("menimbng") == index.lookup("menimbng")
+    finally:
+        loaded.close()
+
+
+def test_invalid_index_file(tmp_path: Path) -> None:
+    """Test files that are not an index are rejected."""
+    empty = tmp_path / "empty.idx"
+    empty.write_bytes(b"")
+    with pytest.raises(OCRIndexError):
+        SymSpellIndex.load(empty)
+    with pytest.raises(OCRIndexError):
+        SymSpellIndex(b"not an index at all, definitely not")
+
+
+def test_confusable_variants() -> None:
+    """Test confusable rewrites."""
+    assert "pasal" in confusable_variants("pasai")
+    assert "oleh" in confusable_variants("0leh")
+    assert "terdakwa" in confusable_variants("terdakvva")
+    assert "memiliki" in confusable_variants("rnemiliki")
+
+
+def test_correct_text_keeps_case_and_punctuation(index: SymSpellIndex) -> None:
+    """Test OCR errors are fixed in place."""
+    corrector = OCRCorrector(index)
+    text = "Menimbang, bahwa Terdakvva teIah terbukti bersaIah melanggar PasaI 114 ayat (2)"
+    assert corrector.correct_text(text) == (
+        "Menimbang, bahwa Terdakwa telah terbukti bersalah melanggar Pasal 114 ayat (2)"
+    )
+    assert corrector.correct_text("0leh TERDAKVVA yank dI") == "oleh TERDAKWA yang di"
+    assert corrector.correct_text("iPhone 2023 Rp. 1.500.000,-") == "iPhone 2023 Rp. 1.500.000,-"
+    assert corrector.corrections == 8
+
+
+def test_clean_misreads_corrected(index: SymSpellIndex) -> None:
+    """Test clean-letter misreads one edit from a dominant word are fixed."""
+    corrector = OCRCorrector(index)
+    assert corrector.correct_text("tidal bukli 1ni s4ksi") == "tidak bukti ini saksi"
+    ambiguous = OCRCorrector(SymSpellIndex.build({"tanggal": 50, "tinggal": 40}))
+    assert ambiguous.correct_token("tonggal") == "tonggal"
+
+
+def test_clean_prose_unchanged() -> None:
+    """Test words of a corpus lexicon and names are not "corrected"."""
+    text = (
+        "Saksi Sari bertempat tinggal di Bandung, menerima dana dari ayah Terdakwa "
+        "dan merasa sakit hati; Hari itu tetap apa adanya."
+    )
+    corpus = {word: 1 for word in re.findall(r"[^\W\d_]+", text.lower()) if word != "sari"}
+    corrector = OCRCorrector(SymSpellIndex.build({**corpus, **LEXICON}))
+    assert corrector.correct_text(text) == text
+    assert corrector.corrections == 0
+
+
+def test_short_tokens_not_edited(index: SymSpellIndex) -> None:
+    """Test tokens under three characters only get confusable fixes."""
+    corrector = OCRCorrector(index)
+    assert corrector.correct_token("dl") == "di"
+    assert corrector.correct_token("ab") == "ab"
+
+
+def test_from_settings_builds_index_once(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test the configured index file is built on first use and mapped afterwards."""
+    from dataminer.core.config import get_settings
+
+    path = tmp_path / "ocr" / "lexicon.idx"
+    monkeypatch.setenv("OCR_CORRECTION_INDEX_PATH", str(path))
+    get_settings.cache_clear()
+    try:
+        with pytest.raises(OCRIndexError, match="corpus lexicon"):
+            OCRCorrector.from_settings()
+        first = OCRCorrector.from_settings({"terdakwa": 5})
+        assert path.exists()
+        second = OCRCorrector.from_settings({"other": 1})
+        assert second.correct_token("terdakvva") == "terdakwa"
+        first.index.close()
+        second.index.close()
+    finally:
+        get_settings.cache_clear()
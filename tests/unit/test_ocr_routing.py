@@ -0,0 +1,105 @@
+"""Page quality scoring and OCR routing tests."""
+
+import asyncio
+import threading
+from collections.abc import AsyncIterator
+
+from dataminer.services.ocr_routing import OCRRouter
+from dataminer.services.page_quality import score_page_text
+from dataminer.services.pdf_extraction import PageText
+
+GOOD_PAGE = (
+    "Menimbang, bahwa Terdakwa telah didakwa oleh Penuntut Umum dengan dakwaan "
+    "sebagaimana diatur dan diancam pidana dalam Pasal 2 ayat (1) Undang-Undang "
+    "Nomor 31 Tahun 1999 tentang Pemberantasan Tindak Pidana Korupsi, yang pada "
+    "pokoknya menyatakan bahwa Terdakwa terbukti secara sah dan meyakinkan bersalah."
+) * 2
+
+GARBAGE_PAGE = "(cid:12)(cid:44)(cid:3)" * 40 + " ��� \x07\x07 xq zzkj"
+
+
+def test_score_good_page() -> None:
+    """Test a healthy text layer scores high."""
+    quality = score_page_text(GOOD_PAGE)
+    assert quality.char_density == 1.0
+    assert quality.garbage_ratio == 0.0
+    assert quality.dictionary_hit_rate > 0.3
+    assert not quality.needs_ocr(0.80)
+
+
+def test_score_empty_and_garbage_pages() -> None:
+    """Test scanned and broken pages fall below the threshold."""
+    assert score_page_text("").score == 0.0
+    assert score_page_text("   \n ").needs_ocr(0.80)
+
+    garbage = score_page_text(GARBAGE_PAGE)
+    assert garbage.garbage_ratio > 0.5
+    assert garbage.needs_ocr(0.80)
+
+
+def test_score_sparse_page() -> None:
+    """Test a page with a few words of text layer (e.g. a stamp) is routed to OCR."""
+    assert score_page_text("Salinan resmi").needs_ocr(0.80)
+
+
+async def _pages(texts: list[str]) -> AsyncIterator[PageText]:
+    for number, text in enumerate(texts, start=1):
+        yield PageText(number, text, "pymupdf", 1.0)
+
+
+async def test_router_only_ocrs_failing_pages() -> None:
+    """Test only pages below the threshold are OCR'd, in order."""
+    calls: list[int] = []
+
+    def fake_ocr(path: str, page_number: int) -> str:
+        calls.append(page_number)
+        return GOOD_PAGE
+
+    router = OCRRouter(threshold=0.80, max_concurrency=2, ocr=fake_ocr)
+    texts = [GOOD_PAGE, "", GOOD_PAGE, GARBAGE_PAGE, "", GOOD_PAGE]
+    document = await router.process("doc.pdf", _pages(texts))
+
+    assert [page.page_number for page in document.pages] == [1, 2, 3, 4, 5, 6]
+    assert document.ocr_pages == [2, 4, 5]
+    assert sorted(calls) == [2, 4, 5]
+    assert document.ocr_used
+    assert not document.is_scanned
+    assert document.pages[1].method == "ocr"
+    assert document.pages[0].method == "pymupdf"
+
+
+async def test_router_keeps_better_extracted_text() -> None:
+    """Test OCR output is discarded when it scores worse than the text layer."""
+    router = OCRRouter(threshold=0.99, ocr=lambda path, page_number: "")
+    document = await router.process("doc.pdf", _pages(["Salinan resmi putusan"]))
+
+    page = document.pages[0]
+    assert not page.ocr_used
+    assert page.method == "pymupdf"
+    assert page.text == "Salinan resmi putusan"
+    assert document.ocr_pages == []
+
+
+async def test_router_bounds_pages_behind_slow_ocr() -> None:
+    """Test finished pages do not pile up behind a slow OCR page at the head."""
+    release = threading.Event()
+    pulled: list[int] = []
+
+    def slow_ocr(path: str, page_number: int) -> str:
+        release.wait(timeout=5)
+        return GOOD_PAGE
+
+    async def pages() -> AsyncIterator[PageText]:
+        for number in range(1, 41):
+            pulled.append(number)
+            yield PageText(number, "" if number == 1 else GOOD_PAGE, "pymupdf", 1.0)
+
+    router = OCRRouter(max_concurrency=2, max_pending=6, ocr=slow_ocr)
+    task = asyncio.create_task(router.process("doc.pdf", pages()))
+    await asyncio.sleep(0.1)
+    assert len(pulled) == 6
+    release.set()
+    document = await task
+
+    assert [page.page_number for page in document.pages] == list(range(1, 41))
+    assert document.ocr_pages == [1]
@@ -0,0 +1,81 @@
+"""Rendered page cache tests."""
+
+import os
+from collections.abc import Callable
+from pathlib import Path
+
+import pymupdf
+import pytest
+
+from dataminer.services.page_cache import PageImage, PageImageCache, sha256_file
+
+SHA = "ab" * 32
+
+
+def _image(size: int = 10, colorspace: str = "gray") -> PageImage:
+    channels = 1 if colorspace == "gray" else 3
+    return PageImage(size, size, bytes(size * size * channels), colorspace)  # type: ignore[arg-type]
+
+
+def test_pnm_roundtrip() -> None:
+    """Test images serialize to PNM and back unchanged."""
+    for colorspace in ("gray", "rgb"):
+        image = _image(colorspace=colorspace)
+        assert PageImage.from_pnm(image.to_pnm()) == image
+
+    with pytest.raises(ValueError):
+        PageImage.from_pnm(_image().to_pnm()[:-1])
+
+
+def test_cache_keyed_by_page_dpi_and_colorspace(tmp_path: Path) -> None:
+    """Test entries are keyed by document, page, DPI and colorspace."""
+    cache = PageImageCache(tmp_path, max_bytes=10 * 1024 * 1024)
+    cache.put(SHA, 1, 300, _image())
+
+    assert cache.get(SHA, 1, 300) == _image()
+    assert cache.get(SHA, 1, 150) is None
+    assert cache.get(SHA, 2, 300) is None
+    assert cache.get(SHA, 1, 300, "rgb") is None
+    assert not list(tmp_path.glob("*/.tmp-*"))
+
+
+def test_lru_eviction(tmp_path: Path) -> None:
+    """Test least recently used entries are evicted first."""
+    entry_size = len(_image().to_pnm())
+    cache = PageImageCache(tmp_path, max_bytes=entry_size * 3)
+
+    for page in (1, 2, 3):
+        cache.put(SHA, page, 300, _image())
+        path = next(tmp_path.glob(f"*/*-p{page}-*"))
+        os.utime(path, (page, page))  # deterministic recency: page 1 is oldest
+    cache.get(SHA, 1, 300)  # page 1 becomes most recent
+
+    cache.put(SHA, 4, 300, _image())
+
+    assert cache.get(SHA, 2, 300) is None
+    assert cache.get(SHA, 1, 300) is not None
+    assert cache.get(SHA, 4, 300) is not None
+    assert cache.size_bytes() <= cache.max_bytes
+
+
+def test_corrupt_entry_is_a_miss(tmp_path: Path) -> None:
+    """Test a damaged entry is discarded rather than returned."""
+    cache = PageImageCache(tmp_path, max_bytes=1024 * 1024)
+    cache.put(SHA, 1, 300, _image())
+    path = next(tmp_path.glob("*/*.pnm"))
+    path.write_bytes(b"P5\n10 10\n255\nshort")
+
+    assert cache.get(SHA, 1, 300) is None
+    assert not path.exists()
+
+
+def test_get_or_render(make_pdf: Callable[..., Path], tmp_path: Path) -> None:
+    """Test pages are rendered once and served from the cache afterwards."""
+    pdf = make_pdf(["PUTUSAN"])
+    cache = PageImageCache(tmp_path / "cache", max_bytes=64 * 1024 * 1024)
+    sha = sha256_file(pdf)
+
+    with pymupdf.open(pdf) as doc:
+        rendered = cache.get_or_render(doc, sha, 1, 72)
+    assert cache.get(sha, 1, 72) == rendered
+    assert rendered.colorspace == "gray"
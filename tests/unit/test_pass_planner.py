@@ -0,0 +1,87 @@
+"""Pass planner tests."""
+
+from decimal import Decimal
+
+from dataminer.services.costs import JobCostLedger
+from dataminer.services.field_extraction import FieldDefinition
+from dataminer.services.pass_planner import FieldGroup, PassPlanner, PlannerConfig
+
+HEADER = FieldGroup(
+    "header",
+    (FieldDefinition("case_number"), FieldDefinition("defendant_occupation")),
+    text_tokens=2000,
+)
+CHARGES = FieldGroup("charges", (FieldDefinition("charge_primary_article"),), text_tokens=3000)
+
+
+def _planner(max_cost: str = "2.00", deep_dive: bool = True) -> PassPlanner:
+    config = PlannerConfig(
+        llm_model_quick="gemini-1.5-flash",
+        llm_model_detailed="gemini-1.5-pro",
+        max_cost_per_document=Decimal(max_cost),
+        enable_deep_dive_pass=deep_dive,
+    )
+    return PassPlanner(config, JobCostLedger())
+
+
+def test_easy_document_needs_no_further_calls() -> None:
+    """Test confident quick-pass results skip every later pass."""
+    planner = _planner()
+    confidences = {"case_number": 0.97, "defendant_occupation": 0.8, "charge_primary_article": 0.9}
+
+    planner.plan_detailed([HEADER, CHARGES], confidences)
+    planner.plan_validation([HEADER, CHARGES], confidences)
+    planner.plan_deep_dive([HEADER, CHARGES], confidences)
+
+    assert planner.calls_planned() == 0
+    assert len(planner.decisions) == 6
+    assert {decision.action for decision in planner.decisions} == {"skip"}
+
+
+def test_only_weak_fields_go_to_the_detailed_model() -> None:
+    """Test tier thresholds select fields and reserve budget."""
+    planner = _planner()
+    # case_number is critical (0.90); occupation is standard (0.75).
+    header, charges = planner.plan_detailed(
+        [HEADER, CHARGES],
+        {"case_number": 0.88, "defendant_occupation": 0.8, "charge_primary_article": 0.86},
+    )
+
+    assert (header.action, header.model, header.fields) == (
+        "run",
+        "gemini-1.5-pro",
+        ("case_number",),
+    )
+    assert charges.action == "skip"
+    assert planner.reserved == header.estimated_cost > 0
+
+    (validation, _) = planner.plan_validation([HEADER, CHARGES], {"case_number": 0.92})
+    assert (validation.model, validation.fields) == ("gemini-1.5-flash", ("case_number",))
+
+
+def test_tight_budget_downgrades_and_exhausted_budget_skips() -> None:
+    """Test the planner falls back to the quick model, then skips."""
+    planner = _planner(max_cost="0.02")
+    planner.ledger.costs["cost_llm_quick"] = Decimal("0.016")
+
+    (decision,) = planner.plan_detailed([CHARGES], {})
+    assert (decision.action, decision.model) == ("downgrade", "gemini-1.5-flash")
+    assert "budget tight" in decision.reason
+
+    broke = _planner(max_cost="0.0001")
+    (skipped,) = broke.plan_detailed([CHARGES], {})
+    assert (skipped.action, skipped.model) == ("skip", None)
+    assert broke.reserved == 0
+
+
+def test_deep_dive_respects_profile() -> None:
+    """Test the deep dive runs only when enabled and below its threshold."""
+    low = {"case_number": 0.5, "defendant_occupation": 0.9}
+    (disabled,) = _planner(deep_dive=False).plan_deep_dive([HEADER], low)
+    assert disabled.action == "skip"
+
+    planner = _planner()
+    (enabled,) = planner.plan_deep_dive([HEADER], low)
+    assert enabled.fields == ("case_number",)
+    planner.settle(enabled)
+    assert planner.reserved == 0
@@ -0,0 +1,59 @@
+"""PDF extraction service tests."""
+
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from dataminer.services.pdf_extraction import PDFExtractor, count_pages, extract_page_range
+
+
+def test_count_pages(make_pdf: Callable[..., Path]) -> None:
+    """Test page counting."""
+    path = make_pdf(["one", "two", "three"])
+    assert count_pages(path) == 3
+
+
+def test_extract_page_range_with_pdfplumber(make_pdf: Callable[..., Path]) -> None:
+    """Test pdfplumber extraction of a page range."""
+    path = make_pdf(["PUTUSAN", "DAKWAAN", "MENGADILI"])
+    pages = extract_page_range(str(path), 1, 3, method="pdfplumber")
+    assert [page.page_number for page in pages] == [2, 3]
+    assert all(page.method == "pdfplumber" for page in pages)
+    assert "DAKWAAN" in pages[0].text
+
+
+async def test_stream_pages_in_order(make_pdf: Callable[..., Path]) -> None:
+    """Test pages are yielded in order across page ranges."""
+    texts = [f"Halaman {i}" for i in range(1, 12)]
+    path = make_pdf(texts)
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        extractor = PDFExtractor(max_workers=3, pages_per_task=2, executor=executor)
+        pages = [page async for page in extractor.stream_pages(path)]
+
+    assert [page.page_number for page in pages] == list(range(1, 12))
+    for page, text in zip(pages, texts, strict=True):
+        assert text in page.text
+        assert page.method == "pymupdf"
+        assert page.duration_ms >= 0
+
+
+async def test_extract_with_process_pool(make_pdf: Callable[..., Path]) -> None:
+    """Test full extraction through worker processes records timings."""
+    path = make_pdf(["PUTUSAN Nomor 1", "MENGADILI"])
+
+    async with PDFExtractor(max_workers=2, pages_per_task=1) as extractor:
+        result = await extractor.extract(path)
+
+    assert result.page_count == 2
+    assert "MENGADILI" in result.text
+    assert result.duration_ms > 0
+    assert result.pages_per_second > 0
+
+
+def test_invalid_pages_per_task() -> None:
+    """Test pages_per_task must be positive."""
+    with pytest.raises(ValueError):
+        PDFExtractor(max_workers=1, pages_per_task=0)
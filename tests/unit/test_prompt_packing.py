@@ -0,0 +1,126 @@
+"""Prompt packing tests."""
+
+import json
+
+import pytest
+
+from dataminer.services.prompt_packing import (
+    PackedPromptRunner,
+    PackedResponseError,
+    PromptBatch,
+    PromptPacker,
+    PromptPart,
+    demultiplex,
+)
+from dataminer.utils.tokens import TokenCounter
+
+HEADER = PromptPart(
+    "header", "Read the header.", "PUTUSAN Nomor 12/Pid.B/2023/PN Jkt", ("case_number",)
+)
+PANEL = PromptPart("panel", "Read the panel.", "Hakim Ketua: Budi", ("judge_presiding",))
+VERDICT = PromptPart("verdict", "Read the verdict.", "MENGADILI ... " * 200, ("verdict",))
+
+
+def _packer(max_prompt_tokens: int = 4000) -> PromptPacker:
+    return PromptPacker(
+        max_prompt_tokens, instructions="Answer in JSON.", token_counter=TokenCounter()
+    )
+
+
+def _answer(prompt: str, keys: list[str]) -> str:
+    values = {"header": "case_number", "panel": "judge_presiding", "verdict": "verdict"}
+    return json.dumps(
+        {
+            key: {values[key]: {"value": f"{key}-value", "confidence": 0.9}}
+            for key in keys
+            if key in prompt
+        }
+    )
+
+
+def test_small_parts_share_a_request_within_budget() -> None:
+    """Test parts are packed together until the budget is reached."""
+    packer = _packer()
+    (batch,) = packer.pack([HEADER, PANEL, VERDICT])
+    assert set(batch.keys) == {"header", "panel", "verdict"}
+    assert batch.tokens <= packer.max_prompt_tokens
+
+    prompt = batch.render(packer.instructions)
+    assert prompt.count("Answer in JSON.") == 1
+    assert "### TASK panel" in prompt
+
+    tight = _packer(max_prompt_tokens=packer.part_tokens(VERDICT) + 20)
+    batches = tight.pack([HEADER, PANEL, VERDICT])
+    assert [b.keys for b in batches] == [["verdict"], ["header", "panel"]]
+
+
+def test_demultiplex_maps_fields_back_to_parts() -> None:
+    """Test a packed answer is split per part, ignoring unrequested fields."""
+    batch = PromptBatch([HEADER, PANEL])
+    response = (
+        "```json\n"
+        '{"header": {"case_number": {"value": "12/Pid.B/2023", "confidence": 1.4},'
+        ' "other": 1}, "panel": {"judge_presiding": "Budi"}}\n```'
+    )
+    results = demultiplex(batch, response)
+
+    case_number = results["header"]["case_number"]
+    assert (case_number.value, case_number.confidence, case_number.section) == (
+        "12/Pid.B/2023",
+        1.0,
+        "header",
+    )
+    assert "other" not in results["header"]
+    assert results["panel"]["judge_presiding"].confidence == 0.0
+
+    with pytest.raises(PackedResponseError):
+        demultiplex(batch, "not json")
+
+
+async def test_runner_packs_calls_and_splits_on_failure() -> None:
+    """Test one request for all parts, and bisecting when an answer is unusable."""
+    prompts: list[str] = []
+
+    async def generate(prompt: str) -> str:
+        prompts.append(prompt)
+        return _answer(prompt, ["header", "panel", "verdict"])
+
+    outcome = await PackedPromptRunner(_packer(), generate).run([HEADER, PANEL, VERDICT])
+    assert outcome.requests == 1
+    assert outcome.fields["judge_presiding"].value == "panel-value"
+
+    async def flaky(prompt: str) -> str:
+        # Garbles any request containing the verdict alongside other tasks,
+        # and always drops the panel.
+        if "TASK verdict" in prompt and prompt.count("### TASK") > 1:
+            return '{"header": {"case_number": '
+        return _answer(prompt, ["header", "verdict"])
+
+    outcome = await PackedPromptRunner(_packer(), flaky).run([HEADER, PANEL, VERDICT])
+    assert set(outcome.fields) == {"case_number", "verdict"}
+    assert outcome.failed == ["panel"]
+    assert outcome.requests > 1
+
+
+async def test_runner_retries_parts_of_a_failed_request() -> None:
+    """Test a request that raises is retried per part instead of aborting the run."""
+    prompts: list[str] = []
+
+    async def generate(prompt: str) -> str:
+        prompts.append(prompt)
+        if prompt.count("### TASK") > 1 or "TASK panel" in prompt:
+            raise TimeoutError("upstream timed out")
+        return _answer(prompt, ["header", "verdict"])
+
+    outcome = await PackedPromptRunner(_packer(), generate).run([HEADER, PANEL, VERDICT])
+    assert set(outcome.fields) == {"case_number", "verdict"}
+    assert outcome.failed == ["panel"]
+    assert outcome.requests == len(prompts) > 3
+
+
+def test_split_batches_are_resized() -> None:
+    """Test a batch built from some parts counts only those parts' tokens."""
+    packer = _packer()
+    (full,) = packer.pack([HEADER, PANEL, VERDICT])
+    half = packer.batch([HEADER, PANEL])
+    assert half.tokens == full.tokens - packer.part_tokens(VERDICT)
@@ -0,0 +1,101 @@
+"""Prompt template compiler tests."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from dataminer.services.prompt_templates import (
+    PromptTemplateCache,
+    PromptTemplateError,
+    compile_template,
+    parse_variables,
+)
+
+SYSTEM = "You are a legal document extraction specialist."
+TEXT = (
+    "Extract the following fields from this court judgment {{ section }}:\n"
+    "{{fields}}\n\nRespond in JSON.\n\n<<<\n{{ text }}\n>>>"
+)
+
+
+def _row(version: int = 1, prompt_text: str = TEXT) -> SimpleNamespace:
+    return SimpleNamespace(
+        template_id="tpl-1",
+        version=version,
+        prompt_text=prompt_text,
+        variables=["section", "fields", "text"],
+    )
+
+
+def test_compiled_template_renders_and_keeps_static_prefix() -> None:
+    """Test the prefix holds the system prompt and leading instructions."""
+    compiled = compile_template(TEXT, ["section", "fields", "text"], system_prompt=SYSTEM)
+
+    assert (
+        compiled.prefix_text
+        == f"{SYSTEM}\n\nExtract the following fields from this court judgment "
+    )
+    assert compiled.slots == ("section", "fields", "text")
+    prompt = compiled.render(section="header", fields=["case_number", "court_name"], text="PUTUSAN")
+    assert prompt.endswith(
+        "header:\n- case_number\n- court_name\n\nRespond in JSON.\n\n<<<\nPUTUSAN\n>>>"
+    )
+    with pytest.raises(PromptTemplateError, match="missing value for 'text'"):
+        compiled.render(section="header", fields=[])
+
+
+def test_bound_values_extend_the_byte_stable_prefix() -> None:
+    """Test binding per-section values leaves only the segment slot."""
+    cache = PromptTemplateCache(system_prompt=SYSTEM)
+    compiled = cache.get(_row())
+    bound = cache.bind(compiled, {"section": "header", "fields": ["case_number"]})
+
+    assert bound.slots == ("text",)
+    assert bound.prefix.startswith(compiled.prefix)
+    first, second = bound.render(text="segment one"), bound.render(text="segment two")
+    assert first.startswith(bound.prefix_text) and second.startswith(bound.prefix_text)
+    assert bound.render(text="x") == compiled.render(
+        section="header", fields=["case_number"], text="x"
+    )
+    assert cache.bind(compiled, {"fields": ["case_number"], "section": "header"}) is bound
+
+
+def test_templates_compile_once_per_version() -> None:
+    """Test a version is parsed once, and a new version is compiled again."""
+    cache = PromptTemplateCache()
+    assert cache.get(_row()) is cache.get(_row())
+    assert cache.compiles == 1
+
+    updated = cache.get(_row(version=2, prompt_text="{{section}} {{fields}} {{text}}"))
+    assert cache.compiles == 2
+    assert updated.prefix == b""
+
+
+def test_invalid_templates_are_rejected() -> None:
+    """Test malformed, undeclared and unused variables raise."""
+    with pytest.raises(PromptTemplateError, match="malformed"):
+        compile_template("Extract {{ text }", ["text"])
+    with pytest.raises(PromptTemplateError, match="malformed"):
+        compile_template("Extract {{ text-body }}", ["text"])
+    with pytest.raises(PromptTemplateError, match="undeclared"):
+        compile_template("{{ text }} {{ extra }}", ["text"])
+    with pytest.raises(PromptTemplateError, match="not in text"):
+        compile_template("{{ text }}", ["text", "fields"])
+
+    variables = [{"name": "lang", "default": "id"}, {"name": "note", "required": False}]
+    assert not parse_variables(variables)["lang"].required
+    compiled = compile_template("{{lang}}|{{note}}|", variables)
+    assert compiled.render() == "id||"
+    # Literal JSON braces are not slots.
+    assert compile_template('Return {"value": 1}').render() == 'Return {"value": 1}'
+
+
+def test_nested_json_output_example_compiles() -> None:
+    """Test ``{{``/``}}`` inside a JSON example are literal, next to real slots."""
+    example = '{"case_number": {"value": "x", "confidence": 0.9}}'
+    text = "Fields:\n{{ fields }}\nAnswer like: " + example + '\nList: [{{"a": 1}}]\n{{ text }}'
+    compiled = compile_template(text, ["fields", "text"])
+    rendered = compiled.render(fields="- case_number", text="PUTUSAN")
+    assert rendered == (
+        "Fields:\n- case_number\nAnswer like: " + example + '\nList: [{{"a": 1}}]\nPUTUSAN'
+    )
@@ -0,0 +1,110 @@
+"""Incremental re-validation tests."""
+
+import pytest
+
+from dataminer.services.confidence import ConfidenceScorer, FieldEvidence
+from dataminer.services.field_extraction import FieldDefinition
+from dataminer.services.review import REVIEWED_CONFIDENCE, ReviewState
+from dataminer.services.validation import ValidatorProgram
+
+DATES = ["defendant_birth_date", "arrest_date", "decision_date"]
+LLM = FieldEvidence("llm_with_validation", "section_present", llm_certainty="high")
+
+
+@pytest.fixture
+def program() -> ValidatorProgram:
+    return ValidatorProgram.compile(
+        [
+            FieldDefinition(
+                "defendant_birth_date",
+                validation_rules=[
+                    {"type": "date"},
+                    {"custom": "validate_date_sequence", "fields": DATES, "name": "chronology"},
+                ],
+            ),
+            FieldDefinition(
+                "defendant_age",
+                validation_rules=[
+                    {"type": "integer"},
+                    {"custom": "validate_age_matches", "name": "age_calculation"},
+                ],
+            ),
+            FieldDefinition(
+                "sentence_prison_total_months",
+                validation_rules={"custom": "validate_prison_calculation", "name": "prison_total"},
+            ),
+            FieldDefinition("case_number", validation_rules={"pattern": r"^\d+/"}),
+        ]
+    )
+
+
+def _values(**overrides: object) -> dict[str, object]:
+    values: dict[str, object] = {
+        "defendant_birth_date": "1995-05-01",
+        "arrest_date": "2023-01-10",
+        "decision_date": "2023-06-01",
+        "defendant_age": 28,
+        "sentence_prison_years": 1,
+        "sentence_prison_months": 0,
+        "sentence_prison_total_months": 12,
+        "case_number": "12/Pid.B/2023/PN",
+    }
+    values.update(overrides)
+    return values
+
+
+def test_affected_rules_from_index(program: ValidatorProgram) -> None:
+    """Test a field maps to exactly the rules that read it."""
+    assert [r.name for r in program.affected_rules(["defendant_birth_date"])] == [
+        "chronology",
+        "age_calculation",
+    ]
+    assert program.affected_rules(["case_number"]) == []
+
+
+def test_revalidate_matches_full_validation(program: ValidatorProgram) -> None:
+    """Test incremental re-validation ends where a full validation would."""
+    values = _values(defendant_birth_date="2024-01-01", case_number="bad")
+    report = program.validate(values)
+    values["defendant_birth_date"] = "1990-05-01"
+    updated, affected = program.revalidate(values, report, ["defendant_birth_date"])
+    assert set(updated.issues) == set(program.validate(values).issues)
+    assert updated.invalid_fields == program.validate(values).invalid_fields
+    assert "sentence_prison_total_months" not in affected
+    assert {"defendant_birth_date", "decision_date", "defendant_age"} <= affected
+
+
+def test_correction_reruns_only_dependent_rules(program: ValidatorProgram) -> None:
+    """Test a correction resolves issues and rescores only the affected fields."""
+    values = _values(defendant_birth_date="1980-05-01")
+    evidence = dict.fromkeys(values, LLM)
+    state = ReviewState(program, values, evidence)
+    before = state.confidences()
+    assert before["defendant_age"] < before["case_number"]
+
+    correction = state.correct({"defendant_birth_date": "1995-05-01"})
+    assert correction.rules_rerun == ["chronology", "age_calculation"]
+    assert [i.field_name for i in correction.resolved] == ["age_calculation"]
+    assert correction.raised == []
+    assert correction.confidences["defendant_birth_date"] == REVIEWED_CONFIDENCE
+    assert "case_number" not in correction.confidences
+    assert "sentence_prison_total_months" not in correction.confidences
+    assert correction.confidences["defendant_age"] == pytest.approx(before["case_number"])
+    assert state.confidences()["defendant_age"] == correction.confidences["defendant_age"]
+
+
+def test_correction_can_raise_issues(program: ValidatorProgram) -> None:
+    """Test a bad correction raises issues on the fields it feeds."""
+    state = ReviewState(program, _values(), {"defendant_age": LLM}, scorer=ConfidenceScorer())
+    correction = state.correct({"decision_date": "2022-01-01"})
+    assert [i.field_name for i in correction.raised] == ["chronology", "age_calculation"]
+    assert state.report.consistency("defendant_age") == "major_discrepancy"
+    assert set(correction.affected_fields) == {"defendant_age", "decision_date"}
+
+
+def test_unchanged_correction_reruns_nothing(program: ValidatorProgram) -> None:
+    """Test confirming a value marks it reviewed without re-running rules."""
+    state = ReviewState(program, _values(), {"case_number": LLM})
+    correction = state.correct({"case_number": "12/Pid.B/2023/PN"})
+    assert correction.rules_rerun == []
+    assert correction.confidences == {"case_number": REVIEWED_CONFIDENCE}
@@ -0,0 +1,140 @@
+"""Section scanner tests."""
+
+import itertools
+
+import pytest
+
+from dataminer.services.segmentation import SectionScanner, Segmenter
+from dataminer.utils.tokens import TokenCounter
+
+JUDGMENT = """PUTUSAN
+Nomor 123/Pid.Sus-TPK/2023/PN Jkt.Pst
+Pengadilan Negeri Jakarta Pusat yang memeriksa dan mengadili perkara pidana
+TENTANG DUDUK PERKARA
+Terdakwa didakwa dengan dakwaan sebagai berikut:
+DAKWAAN :
+Primair ...
+Dakwaan
+BARANG BUKTI
+1 (satu) unit mobil
+TUNTUTAN PIDANA
+Menuntut supaya ...
+PERTIMBANGAN HUKUM
+Menimbang ...
+M E N G A D I L I :
+1. Menyatakan Terdakwa terbukti ...
+"""
+
+
+def test_scan_finds_sections_in_order() -> None:
+    """Test each marker is found once, in order, with contiguous spans."""
+    spans = SectionScanner().scan(JUDGMENT)
+
+    assert [span.section for span in spans] == [
+        "header",
+        "background",
+        "charges",
+        "evidence",
+        "prosecution",
+        "considerations",
+        "verdict",
+    ]
+    assert spans[0].start == 0
+    assert spans[-1].end == len(JUDGMENT)
+    for previous, current in itertools.pairwise(spans):
+        assert previous.end == current.start
+    assert JUDGMENT[spans[-1].start :].startswith("M E N G A D I L I")
+    assert "mengadili perkara" in JUDGMENT[spans[0].start : spans[0].end]
+
+
+def test_scan_tolerates_ocr_variants_and_case() -> None:
+    """Test confusable glyphs and mixed case still match."""
+    text = "Header\nDakwaan\nisi\nPERT1MBANGAN\nisi\nMENGAD1L1\namar\n"
+    spans = SectionScanner().scan(text)
+
+    assert [span.section for span in spans] == ["header", "charges", "considerations", "verdict"]
+
+
+def test_scan_skips_missing_sections() -> None:
+    """Test a missing section does not hide later ones."""
+    text = "Header\nDAKWAAN\nisi\nMENGADILI\namar\n"
+    assert [span.section for span in SectionScanner().scan(text)] == [
+        "header",
+        "charges",
+        "verdict",
+    ]
+
+
+def test_scan_without_markers() -> None:
+    """Test text without headings is a single header section."""
+    spans = SectionScanner().scan("tidak ada judul")
+    assert len(spans) == 1
+    assert (spans[0].section, spans[0].start, spans[0].end) == ("header", 0, 15)
+
+
+def test_scanner_for_method() -> None:
+    """Test the marker table comes from the segmentation method."""
+    assert SectionScanner.for_method("section_based").markers
+    assert SectionScanner.for_method("fixed_token").scan("DAKWAAN\n")[0].section == "header"
+    with pytest.raises(ValueError):
+        SectionScanner.for_method("llm")
+
+
+def test_segmenter_windows_respect_budget_overlap_and_sections() -> None:
+    """Test windows stay within budget, overlap, and never cross sections."""
+    body = " ".join(f"kata{i} Menimbang bahwa terdakwa" for i in range(400))
+    text = f"Header\nDAKWAAN\n{body}\nMENGADILI\n{body}\n"
+    segmenter = Segmenter(segment_size_tokens=200, segment_overlap_tokens=20)
+
+    segments = segmenter.segment(text)
+
+    assert {segment.section for segment in segments} == {"header", "charges", "verdict"}
+    assert all(segment.estimated_tokens() <= 200 for segment in segments)
+    charges = [segment for segment in segments if segment.section == "charges"]
+    assert len(charges) > 1
+    for previous, current in itertools.pairwise(charges):
+        assert current.start < previous.end  # overlapping
+        assert current.text.split()[0] in previous.text
+    verdict = next(segment for segment in segments if segment.section == "verdict")
+    assert verdict.text.startswith("MENGADILI")
+    assert [segment.index for segment in segments] == list(range(len(segments)))
+
+
+def test_segments_share_one_buffer() -> None:
+    """Test segments are views into a single buffer and decode non-ASCII text."""
+    text = "Header\nDAKWAAN\n" + "Terdakwa \u2014 saksi \u2018ahli\u2019 " * 300 + "\u00e9" * 2000
+    segments = Segmenter(segment_size_tokens=100, segment_overlap_tokens=10).segment(text)
+
+    buffer = segments[0].buffer
+    assert all(segment.buffer is buffer for segment in segments)
+    assert isinstance(segments[1].data, memoryview)
+    assert segments[1].data.obj is buffer.data
+    assert segments[1].text.startswith("DAKWAAN")
+    assert (
+        "".join(segment.text for segment in segments if segment.section == "header") == "Header\n"
+    )
+    assert all("�" not in segment.text for segment in segments)
+
+
+def test_segmenter_checks_windows_with_token_counter() -> None:
+    """Test windows denser than bytes_per_token assumes are shrunk to the budget."""
+    amounts = " ".join(f"Rp{i:,}.000,00" for i in range(10_000, 12_000))
+    text = f"Header\nDAKWAAN\n{amounts}\n"
+    # One token per character: four times denser than the byte heuristic assumes.
+    counter = TokenCounter(exact=len, exact_margin=10.0)
+    segmenter = Segmenter(segment_size_tokens=100, segment_overlap_tokens=10, token_counter=counter)
+
+    segments = segmenter.segment(text)
+
+    assert all(len(segment.text) <= 100 for segment in segments)
+    assert max(len(segment.text) for segment in segments) > 80
+    charges = [segment for segment in segments if segment.section == "charges"]
+    for previous, current in itertools.pairwise(charges):
+        # Ten tokens of overlap, widened back to the start of a word.
+        assert 10 <= previous.end - current.start <= 10 + len("Rp10,000.000,00 ")
+
+
+def test_segmenter_rejects_overlap_not_smaller_than_size() -> None:
+    """Test overlap must be smaller than the window."""
+    with pytest.raises(ValueError):
+        Segmenter(segment_size_tokens=100, segment_overlap_tokens=100)
@@ -0,0 +1,67 @@
+"""Incremental source statistics tests."""
+
+import asyncio
+from decimal import Decimal
+
+from dataminer.services.source_stats import (
+    SourceStatsDelta,
+    SourceStatsMerger,
+    SourceStatsRecorder,
+)
+
+
+async def test_recorder_batches_jobs_per_source() -> None:
+    """Test completed jobs become one delta per source per flush."""
+    batches: list[dict[str, SourceStatsDelta]] = []
+
+    async def writer(batch: dict[str, SourceStatsDelta]) -> None:
+        batches.append(batch)
+
+    recorder = SourceStatsRecorder(writer, interval_seconds=60)
+    recorder.record_job("ID_SC", Decimal("0.12"), accuracy=0.96)
+    recorder.record_job("ID_SC", Decimal("0.30"))
+    recorder.record_job("SG_SC", Decimal("0.05"), accuracy=Decimal("0.90"))
+
+    assert await recorder.flush() == 2
+    (batch,) = batches
+    assert batch["ID_SC"] == SourceStatsDelta(2, 1, Decimal("0.96"), Decimal("0.42"))
+    assert batch["SG_SC"].accuracy_count == 1
+    assert await recorder.flush() == 0
+
+
+async def test_failed_flush_keeps_deltas() -> None:
+    """Test deltas survive a failed write and merge with newer jobs."""
+    healthy = False
+    written: list[dict[str, SourceStatsDelta]] = []
+
+    async def writer(batch: dict[str, SourceStatsDelta]) -> None:
+        if not healthy:
+            raise ConnectionError("database down")
+        written.append(batch)
+
+    recorder = SourceStatsRecorder(writer, interval_seconds=60)
+    recorder.record_job("ID_SC", Decimal("0.10"))
+    assert await recorder.flush() == 0
+    recorder.record_job("ID_SC", Decimal("0.20"))
+
+    healthy = True
+    await recorder.stop()
+    assert written[0]["ID_SC"].documents == 2
+    assert written[0]["ID_SC"].cost_sum == Decimal("0.30")
+
+
+async def test_merger_runs_periodically() -> None:
+    """Test the merger folds deltas on its schedule."""
+    calls = 0
+
+    async def merge() -> dict[str, int]:
+        nonlocal calls
+        calls += 1
+        return {"ID_SC": calls}
+
+    merger = SourceStatsMerger(merge, interval_seconds=0.01)
+    merger.start()
+    await asyncio.sleep(0.05)
+    await merger.stop()
+    assert calls >= 2
+    assert await merger.merge() == {"ID_SC": calls}
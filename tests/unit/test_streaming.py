@@ -0,0 +1,190 @@
+"""Streaming (memory-bounded) processing tests."""
+
+import asyncio
+import json
+import subprocess
+import sys
+import textwrap
+import threading
+from collections.abc import AsyncIterator, Callable
+from pathlib import Path
+
+import pytest
+
+from dataminer.services.streaming import (
+    MemoryLimitExceededError,
+    PageStore,
+    ProcessMemoryBudget,
+    StreamingDocumentProcessor,
+)
+
+PAGE_TEXT = "Menimbang, bahwa Terdakwa telah didakwa oleh Penuntut Umum dengan dakwaan. " * 10
+
+# Runs in a fresh interpreter so the measured peak RSS belongs to the job alone.
+_JOB_SCRIPT = textwrap.dedent(
+    """
+    import asyncio, json, sys
+    from concurrent.futures import ThreadPoolExecutor
+
+    import pymupdf
+
+    from dataminer.services.ocr_routing import OCRRouter
+    from dataminer.services.pdf_extraction import PDFExtractor
+    from dataminer.services.streaming import StreamingDocumentProcessor, peak_rss_mb
+
+    pages, cap, workdir = int(sys.argv[1]), int(sys.argv[2]), sys.argv[3]
+    text = {text!r}
+    path = f"{{workdir}}/doc-{{pages}}.pdf"
+    with pymupdf.open() as doc:
+        for number in range(pages):
+            page = doc.new_page()
+            if number % 5:  # every fifth page is "scanned" and goes to OCR
+                page.insert_textbox(pymupdf.Rect(50, 50, 545, 790), text)
+        doc.save(path)
+
+    async def main():
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            processor = StreamingDocumentProcessor(
+                router=OCRRouter(ocr=lambda path, number: text * 20, max_concurrency=8),
+                extractor=PDFExtractor(max_workers=2, pages_per_task=4, executor=executor),
+                store_dir=workdir,
+                window_pages=16,
+                max_rss_mb=cap,
+            )
+            result = await processor.process(path)
+            store = result.page_store
+            assert sum(1 for _ in store.iter_pages()) == pages
+            print(json.dumps({{
+                "pages": result.page_count,
+                "ocr_pages": len(result.ocr_pages),
+                "peak_rss_mb": peak_rss_mb(),
+            }}))
+            store.close(delete=True)
+
+    asyncio.run(main())
+    """
+).format(text=PAGE_TEXT)
+
+
+def _run_job(pages: int, cap_mb: int, workdir: Path) -> dict[str, float]:
+    completed = subprocess.run(
+        [sys.executable, "-c", _JOB_SCRIPT, str(pages), str(cap_mb), str(workdir)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def test_page_store_roundtrip(tmp_path: Path) -> None:
+    """Test pages are compressed on disk and read back individually."""
+    with PageStore(tmp_path / "doc.pages") as store:
+        store.append(2, "dua " * 500)
+        store.append(1, "satu " * 500)
+
+        assert len(store) == 2
+        assert store.get(1) == "satu " * 500
+        assert [number for number, _ in store.iter_pages()] == [1, 2]
+        assert store.stored_bytes < store.raw_bytes / 10
+        with pytest.raises(KeyError):
+            store.get(3)
+
+
+def test_memory_budget_enforced() -> None:
+    """Test exceeding the cap raises instead of growing unbounded."""
+    with pytest.raises(MemoryLimitExceededError):
+        ProcessMemoryBudget(max_rss_mb=1).check()
+
+
+def test_memory_budget_fails_before_crossing_cap(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test the budget stops the job while the next step would still fit under the cap."""
+    readings = iter([100.0, 150.0, 200.0, 230.0])
+    monkeypatch.setattr("dataminer.services.streaming.current_rss_mb", lambda: next(readings))
+
+    budget = ProcessMemoryBudget(max_rss_mb=260)
+    budget.check()
+    budget.check()
+    with pytest.raises(MemoryLimitExceededError, match="would exceed the 260 MiB cap"):
+        budget.check()
+    assert budget.peak_rss_mb == 230.0
+    assert budget.max_step_mb == 50.0
+
+
+async def test_processor_spills_pages(make_pdf: Callable[..., Path], tmp_path: Path) -> None:
+    """Test every page ends up in the page store and OCR'd pages are recorded."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    from dataminer.services.ocr_routing import OCRRouter
+    from dataminer.services.pdf_extraction import PDFExtractor
+
+    path = make_pdf([PAGE_TEXT, "", PAGE_TEXT])
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        processor = StreamingDocumentProcessor(
+            router=OCRRouter(ocr=lambda path, number: PAGE_TEXT),
+            extractor=PDFExtractor(max_workers=2, pages_per_task=1, executor=executor),
+            store_dir=tmp_path,
+            window_pages=2,
+            max_rss_mb=64 * 1024,
+        )
+        result = await processor.process(path)
+
+    assert result.page_count == 3
+    assert result.ocr_pages == [2]
+    assert result.page_store.get(2) == PAGE_TEXT
+    result.page_store.close(delete=True)
+
+
+async def test_slow_ocr_head_page_bounds_buffered_pages(
+    make_pdf: Callable[..., Path], tmp_path: Path
+) -> None:
+    """Test pages behind a slow OCR page stop extraction instead of piling up."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    from dataminer.services.ocr_routing import OCRRouter
+    from dataminer.services.pdf_extraction import PageText, PDFExtractor
+
+    release = threading.Event()
+    pulled: list[int] = []
+
+    class CountingExtractor(PDFExtractor):
+        async def stream_pages(self, path: str | Path) -> AsyncIterator[PageText]:
+            async for page in super().stream_pages(path):
+                pulled.append(page.page_number)
+                yield page
+
+    def slow_ocr(path: str, page_number: int) -> str:
+        release.wait(timeout=5)
+        return PAGE_TEXT
+
+    path = make_pdf(["", *[PAGE_TEXT] * 29])
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        processor = StreamingDocumentProcessor(
+            router=OCRRouter(ocr=slow_ocr, max_concurrency=2, max_pending=4),
+            extractor=CountingExtractor(max_workers=1, pages_per_task=1, executor=executor),
+            store_dir=tmp_path,
+            window_pages=4,
+            max_rss_mb=64 * 1024,
+        )
+        task = asyncio.create_task(processor.process(path))
+        await asyncio.sleep(0.3)
+        assert len(pulled) == 4
+        release.set()
+        result = await task
+
+    assert result.page_count == 30
+    assert result.ocr_pages == [1]
+    result.page_store.close(delete=True)
+
+
+@pytest.mark.slow
+def test_peak_rss_independent_of_page_count(tmp_path: Path) -> None:
+    """Test peak RSS stays under the cap and does not grow with page count."""
+    cap_mb = 400
+    small = _run_job(50, cap_mb, tmp_path)
+    large = _run_job(1000, cap_mb, tmp_path)
+
+    assert large["pages"] == 1000
+    assert large["ocr_pages"] == 200
+    assert large["peak_rss_mb"] < cap_mb
+    # Twenty times the pages may only cost a small, constant amount more memory.
+    assert large["peak_rss_mb"] - small["peak_rss_mb"] < 40
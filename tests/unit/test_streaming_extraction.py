@@ -0,0 +1,140 @@
+"""Streaming extraction tests."""
+
+import asyncio
+import json
+
+import httpx
+
+from dataminer.services.costs import JobCostLedger
+from dataminer.services.field_extraction import ExtractedField
+from dataminer.services.llm_client import LLMClient
+from dataminer.services.streaming_extraction import StreamingFieldExtractor, extract_streaming
+
+BASE_URL = "http://llm.test/v1/models"
+FIELDS = ["case_number", "verdict", "judge_presiding"]
+
+
+def _sse(pieces: list[str], usage: bool = True) -> bytes:
+    events = []
+    for index, piece in enumerate(pieces):
+        event: dict = {"candidates": [{"content": {"parts": [{"text": piece}]}}]}
+        if usage and index == len(pieces) - 1:
+            event["usageMetadata"] = {"promptTokenCount": 100, "candidatesTokenCount": 20}
+        events.append(f"data: {json.dumps(event)}\r\n\r\n")
+    return "".join(events).encode()
+
+
+async def _token() -> str:
+    return "token"
+
+
+async def _chunks(*pieces: str):  # type: ignore[no-untyped-def]
+    for piece in pieces:
+        yield piece
+
+
+async def test_fields_reach_the_callback_before_the_stream_ends() -> None:
+    """Test each field is handed on as soon as it closes."""
+    seen: list[str] = []
+
+    async def on_field(extracted: ExtractedField) -> None:
+        assert isinstance(extracted, ExtractedField)
+        seen.append(extracted.field_name)
+
+    async def chunks():  # type: ignore[no-untyped-def]
+        yield '{"verdict": {"value": "bersalah", "confidence": 0.9},'
+        await asyncio.sleep(0)
+        assert seen == ["verdict"]
+        yield ' "case_number": "1", "other": 2}'
+
+    result = await extract_streaming(chunks(), FIELDS, section="verdict", on_field=on_field)
+
+    assert set(seen) == {"verdict", "case_number"}
+    assert result.complete
+    assert result.missing == ["judge_presiding"]
+    assert result.fields["verdict"].section == "verdict"
+    assert "other" not in result.fields
+
+
+async def test_packed_answer_keeps_same_field_from_each_task() -> None:
+    """Test two packed tasks answering the same field both keep their answer."""
+    result = await extract_streaming(
+        _chunks(
+            '{"panel": {"judge_presiding": "A", "verdict": "bersalah"}, ',
+            '"appeal": {"judge_presiding": "B"}}',
+        ),
+        FIELDS,
+        emit_depth=2,
+    )
+
+    assert result.fields[("panel", "judge_presiding")].value == "A"
+    assert result.fields[("appeal", "judge_presiding")].value == "B"
+    assert result.fields[("appeal", "judge_presiding")].section == "appeal"
+    assert result.missing == ["case_number"]
+
+
+async def test_truncated_stream_keeps_complete_fields() -> None:
+    """Test a stream that stops mid-value keeps every closed field."""
+    result = await extract_streaming(_chunks('{"case_number": "1", "verdict": "bersal'), FIELDS)
+    assert not result.complete
+    assert list(result.fields) == ["case_number"]
+    assert result.missing == ["verdict", "judge_presiding"]
+
+
+async def test_retry_asks_only_for_missing_fields() -> None:
+    """Test the streamed call is retried for the fields that did not arrive."""
+    prompts: list[str] = []
+    bodies = [
+        _sse(['{"case_number": {"value": "1", "confidence": 0.95}, ', '"verdict": "bers']),
+        _sse(['{"verdict": "bersalah", "judge_presiding": "Budi"}']),
+    ]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.path.endswith(":streamGenerateContent")
+        assert request.url.params["alt"] == "sse"
+        prompts.append(json.loads(request.content)["contents"][0]["parts"][0]["text"])
+        return httpx.Response(200, content=bodies[len(prompts) - 1])
+
+    llm = LLMClient(
+        base_url=BASE_URL,
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        token_provider=_token,
+    )
+    ledger = JobCostLedger()
+    result = await StreamingFieldExtractor(llm).extract(
+        lambda names: "extract: " + ",".join(names),
+        FIELDS,
+        model="gemini-1.5-pro",
+        ledger=ledger,
+    )
+
+    assert prompts == [
+        "extract: case_number,verdict,judge_presiding",
+        "extract: verdict,judge_presiding",
+    ]
+    assert result.complete
+    assert result.fields["verdict"].value == "bersalah"
+    assert result.fields["case_number"].confidence == 0.95
+    assert ledger.calls == 2
+    assert ledger.tokens_used_total == 240
+
+
+async def test_malformed_event_keeps_fields_already_received() -> None:
+    """Test a truncated SSE event ends the stream as an LLMError, keeping parsed fields."""
+    body = _sse(['{"case_number": {"value": "1", "confidence": 0.9}, ', '"verdict": "bers'])
+    body += b'data: {"candidates": [{"content": {"parts": [{"te\r\n\r\n'
+
+    llm = LLMClient(
+        base_url=BASE_URL,
+        client=httpx.AsyncClient(
+            transport=httpx.MockTransport(lambda _: httpx.Response(200, content=body))
+        ),
+        token_provider=_token,
+    )
+    result = await extract_streaming(
+        llm.stream("prompt", model="gemini-1.5-pro", max_retries=0), FIELDS
+    )
+
+    assert "stream failed" in (result.error or "")
+    assert not result.complete
+    assert list(result.fields) == ["case_number"]
@@ -0,0 +1,76 @@
+"""Template usage rollup tests."""
+
+import asyncio
+from uuid import UUID, uuid4
+
+import pytest
+
+from dataminer.services.template_stats import (
+    TemplateUsage,
+    TemplateUsageAccumulator,
+    TemplateUsageFlusher,
+)
+
+TEMPLATE = uuid4()
+
+
+def test_accumulator_keeps_count_sum_and_spread() -> None:
+    """Test per-template moments and their derived statistics."""
+    usage = TemplateUsageAccumulator()
+    usage.record(TEMPLATE, 0.8, 1000)
+    usage.record(str(TEMPLATE), 0.9, 3000)
+    usage.record(TEMPLATE, None, 2000)
+
+    stats = usage.snapshot()[TEMPLATE]
+    assert (stats.uses, stats.confidence_count, stats.tokens_sum) == (3, 2, 6000)
+    assert stats.mean_confidence == pytest.approx(0.85)
+    assert stats.confidence_stddev == pytest.approx(0.05)
+    assert stats.mean_tokens == 2000
+    assert stats.tokens_stddev == pytest.approx((2_000_000 / 3) ** 0.5)
+    assert TemplateUsage().mean_confidence is None
+
+
+async def test_flush_writes_one_batch_and_restores_on_failure() -> None:
+    """Test a flush drains everything, and a failed write puts it back."""
+    usage = TemplateUsageAccumulator()
+    other = uuid4()
+    usage.record(TEMPLATE, 0.9, 100)
+    usage.record(other, 0.7, 200)
+    written: list[dict[UUID, TemplateUsage]] = []
+    fail = True
+
+    async def writer(batch: dict[UUID, TemplateUsage]) -> None:
+        if fail:
+            raise ConnectionError("database down")
+        written.append(batch)
+
+    flusher = TemplateUsageFlusher(usage, writer, interval_seconds=60)
+    assert await flusher.flush() == 0
+    usage.record(TEMPLATE, 0.8, 300)  # recorded while the write was failing
+    assert usage.snapshot()[TEMPLATE].uses == 2
+
+    fail = False
+    assert await flusher.flush() == 2
+    assert len(written) == 1
+    assert written[0][TEMPLATE].tokens_sum == 400
+    assert len(usage) == 0
+    assert await flusher.flush() == 0
+
+
+async def test_flusher_runs_periodically_and_flushes_on_stop() -> None:
+    """Test the background task flushes and stop() writes the remainder."""
+    usage = TemplateUsageAccumulator()
+    batches: list[int] = []
+
+    async def writer(batch: dict[UUID, TemplateUsage]) -> None:
+        batches.append(sum(u.uses for u in batch.values()))
+
+    flusher = TemplateUsageFlusher(usage, writer, interval_seconds=0.01)
+    flusher.start()
+    usage.record(TEMPLATE, 0.9, 10)
+    await asyncio.sleep(0.05)
+    usage.record(TEMPLATE, 0.9, 10)
+    await flusher.stop()
+
+    assert sum(batches) == 2
+    assert len(batches) == 2
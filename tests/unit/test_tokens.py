@@ -0,0 +1,82 @@
+"""Token counter tests."""
+
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+from dataminer.utils.tokens import TokenCounter, TokenEstimator, load_exact_counter
+
+TEXT = (
+    "Menimbang, bahwa Terdakwa telah didakwa melanggar Pasal 2 ayat (1) "
+    "Undang-Undang Nomor 31 Tahun 1999 dengan kerugian Rp1.500.000.000,00."
+)
+
+
+def test_estimator_features_and_estimate() -> None:
+    """Test feature counts and a monotone estimate."""
+    chars, words, digits, symbols = TokenEstimator.features("Pasal 2 (1), Rp1.000")
+    assert (chars, words, digits, symbols) == (20, 4, 6, 4)
+    assert TokenEstimator().estimate("") == 0
+    assert TokenEstimator().estimate(TEXT * 2) > TokenEstimator().estimate(TEXT)
+
+
+def test_estimator_fit_recovers_coefficients() -> None:
+    """Test least squares recovers a known linear tokenizer."""
+    truth = TokenEstimator(intercept=2.0, per_char=0.2, per_word=0.5, per_digit=0.7, per_symbol=1.0)
+    samples = []
+    for i in range(1, 40):
+        text = ("kata " * i) + ("12 " * (i % 7)) + ("(,) " * (i % 5)) + "x" * (i % 11)
+        chars, words, digits, symbols = TokenEstimator.features(text)
+        count = 2.0 + 0.2 * chars + 0.5 * words + 0.7 * digits + 1.0 * symbols
+        samples.append((text, round(count * 1000)))
+
+    fitted = TokenEstimator.fit(samples)
+
+    for got, expected in zip(fitted.coefficients(), truth.coefficients(), strict=True):
+        assert got == pytest.approx(expected * 1000, rel=1e-3, abs=1e-3)
+
+
+def test_counter_uses_exact_only_near_limit_and_caches() -> None:
+    """Test exact counts are computed near a limit and served from the cache."""
+    calls: list[str] = []
+
+    def exact(text: str) -> int:
+        calls.append(text)
+        return 40
+
+    counter = TokenCounter(exact=exact, exact_margin=0.15, cache_size=2)
+    estimate = counter.estimate(TEXT)
+
+    assert counter.fits(TEXT, limit=estimate * 10)  # far below: estimate only
+    assert not calls
+    assert counter.count_near(TEXT, limit=estimate) == 40
+    assert counter.count_near(TEXT, limit=estimate) == 40
+    assert calls == [TEXT]
+    assert (counter.hits, counter.misses) == (1, 1)
+
+    counter.count("a")
+    counter.count("b")  # evicts TEXT
+    counter.count(TEXT)
+    assert len(calls) == 4
+
+
+def test_counter_without_exact_falls_back_to_estimate() -> None:
+    """Test the counter works without an exact tokenizer."""
+    counter = TokenCounter()
+    assert counter.count(TEXT) == counter.estimate(TEXT)
+
+
+def test_tokenizer_download_failure_falls_back_to_estimates(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test a tokenizer whose model file cannot be fetched leaves estimates in use."""
+
+    def get_tokenizer_for_model(model: str) -> object:
+        raise OSError("Temporary failure in name resolution")
+
+    tokenization = SimpleNamespace(get_tokenizer_for_model=get_tokenizer_for_model)
+    monkeypatch.setitem(sys.modules, "vertexai", SimpleNamespace())
+    monkeypatch.setitem(sys.modules, "vertexai.preview", SimpleNamespace(tokenization=tokenization))
+
+    assert load_exact_counter("gemini-1.5-flash") is None
@@ -0,0 +1,291 @@
+"""Compiled validation rule tests."""
+
+from datetime import date, timedelta
+
+import pytest
+
+from dataminer.services.field_extraction import FieldDefinition
+from dataminer.services.validation import (
+    InvalidValidationRuleError,
+    ValidationEngine,
+    ValidatorProgram,
+    validate_age_matches,
+    validate_appeal_hierarchy,
+)
+
+CASE_PATTERN = r"^\d+/(Pid|Pdt)\.[A-Za-z.]+/\d{4}/(PN|PT|MA)"
+
+DATES = [
+    "incident_date",
+    "arrest_date",
+    "hearing_date_first",
+    "hearing_date_last",
+    "decision_date",
+]
+
+
+def _definitions() -> list[FieldDefinition]:
+    return [
+        FieldDefinition(
+            "case_number",
+            is_required=True,
+            validation_rules={"pattern": CASE_PATTERN, "message": "Invalid case number"},
+        ),
+        FieldDefinition(
+            "defendant_nik",
+            validation_rules={"pattern": r"^\d{16}$", "severity": "warning"},
+        ),
+        FieldDefinition(
+            "decision_date",
+            is_required=True,
+            validation_rules=[
+                {"type": "date", "min": "1945-01-01", "max": "today"},
+                {"custom": "validate_date_sequence", "fields": DATES, "message": "Out of order"},
+            ],
+        ),
+        FieldDefinition(
+            "sentence_prison_total_months",
+            validation_rules=[
+                {"type": "integer", "min": 0},
+                {"custom": "validate_prison_calculation", "message": "Total mismatch"},
+            ],
+        ),
+        FieldDefinition("arrest_date", validation_rules={"type": "date"}),
+        FieldDefinition(
+            "verdict",
+            validation_rules=[
+                {"enum": ["GUILTY", "NOT_GUILTY", "ACQUITTED"]},
+                {"custom": "validate_sentence", "message": "Guilty verdict without sentence"},
+            ],
+        ),
+    ]
+
+
+def _job(**overrides: object) -> dict[str, object]:
+    values: dict[str, object] = {
+        "case_number": "123/Pid.B/2023/PN Jkt.Sel",
+        "defendant_nik": "3174012345678901",
+        "arrest_date": "2023-01-10",
+        "decision_date": "2023-06-01",
+        "sentence_prison_years": 1,
+        "sentence_prison_months": 6,
+        "sentence_prison_total_months": 18,
+        "verdict": "GUILTY",
+    }
+    values.update(overrides)
+    return values
+
+
+@pytest.fixture
+def program() -> ValidatorProgram:
+    return ValidatorProgram.compile(_definitions())
+
+
+def test_valid_job_passes(program: ValidatorProgram) -> None:
+    """Test a consistent job has no issues."""
+    report = program.validate(_job())
+    assert report.issues == []
+    assert report.passed
+    assert report.status("case_number") == "all_rules_pass"
+    assert report.consistency("decision_date") == "fully_consistent"
+
+
+def test_field_checks(program: ValidatorProgram) -> None:
+    """Test required, pattern, type and range checks."""
+    future = (date.today() + timedelta(days=2)).isoformat()
+    report = program.validate(
+        _job(case_number=None, defendant_nik="123", decision_date=future, verdict="maybe")
+    )
+    rules = {(i.field_name, i.rule) for i in report.issues}
+    assert rules == {
+        ("case_number", "required"),
+        ("defendant_nik", "pattern"),
+        ("decision_date", "range"),
+        ("verdict", "enum"),
+    }
+    assert report.status("case_number") == "validation_failed"
+    assert report.status("decision_date") == "format_issues"
+    assert report.status("defendant_nik") == "minor_warnings"
+    assert not report.passed
+
+
+def test_cross_field_rules(program: ValidatorProgram) -> None:
+    """Test custom rules report the fields they read."""
+    report = program.validate(
+        _job(arrest_date="2023-08-01", sentence_prison_total_months=20, verdict="GUILTY")
+    )
+    messages = {i.message for i in report.issues}
+    assert messages == {"Out of order", "Total mismatch"}
+    assert report.consistency("arrest_date") == "major_discrepancy"
+    assert report.consistency("sentence_prison_years") == "major_discrepancy"
+    assert report.consistency("case_number") == "fully_consistent"
+
+    report = program.validate(
+        _job(
+            sentence_prison_years=None, sentence_prison_months=None, sentence_prison_total_months=0
+        )
+    )
+    assert [i.message for i in report.issues] == ["Guilty verdict without sentence"]
+
+
+def test_cross_field_rule_skipped_when_input_invalid(program: ValidatorProgram) -> None:
+    """Test an invalid input is reported once, not again by the rules reading it."""
+    report = program.validate(_job(arrest_date="not a date", decision_date="2023-01-01"))
+    assert [(i.field_name, i.rule) for i in report.issues] == [("arrest_date", "type")]
+
+
+def test_dependency_index(program: ValidatorProgram) -> None:
+    """Test the field-to-rule index."""
+    assert [r.name for r in program.rules_for("arrest_date")] == [
+        "decision_date:validate_date_sequence"
+    ]
+    assert [r.name for r in program.rules_for("sentence_prison_months")] == [
+        "sentence_prison_total_months:validate_prison_calculation",
+        "verdict:validate_sentence",
+    ]
+    assert program.rules_for("case_number") == []
+    assert "sentence_fine" in program.fields
+
+
+def test_validate_many_matches_validate(program: ValidatorProgram) -> None:
+    """Test batch validation gives the same reports as one-by-one validation."""
+    jobs = [
+        _job(),
+        _job(case_number="bad"),
+        _job(arrest_date="2024-01-01"),
+        _job(),
+        _job(defendant_nik=["not", "hashable"]),
+        _job(decision_date="1900-01-01"),
+    ]
+    batch = program.validate_many(jobs)
+    assert [r.issues for r in batch] == [program.validate(job).issues for job in jobs]
+    assert [r.invalid_fields for r in batch] == [program.validate(j).invalid_fields for j in jobs]
+
+
+def test_validate_many_does_not_conflate_equal_values_of_other_types() -> None:
+    """Test ``True`` and ``1`` get their own cross-rule outcomes in batch validation."""
+    program = ValidatorProgram.compile(
+        [
+            FieldDefinition(
+                "verdict",
+                validation_rules={"custom": "validate_sentence", "fields": ["verdict", "fine"]},
+            )
+        ]
+    )
+    jobs = [{"verdict": "GUILTY", "fine": 1}, {"verdict": "GUILTY", "fine": True}]
+    assert [r.issues for r in program.validate_many(jobs)] == [
+        program.validate(job).issues for job in jobs
+    ]
+    assert program.validate(jobs[1]).issues
+
+
+def test_invalid_rules_rejected() -> None:
+    """Test malformed rules fail at compile time."""
+    with pytest.raises(InvalidValidationRuleError):
+        ValidatorProgram.compile([FieldDefinition("x", validation_rules={"pattern": "("})])
+    with pytest.raises(InvalidValidationRuleError):
+        ValidatorProgram.compile([FieldDefinition("x", validation_rules={"custom": "nope"})])
+    with pytest.raises(InvalidValidationRuleError):
+        ValidatorProgram.compile([FieldDefinition("x", validation_rules={"type": "uuid"})])
+    with pytest.raises(InvalidValidationRuleError):
+        ValidatorProgram.compile(
+            [FieldDefinition("x", validation_rules={"type": "date", "min": "yesterday"})]
+        )
+    with pytest.raises(InvalidValidationRuleError, match="defines no check"):
+        ValidatorProgram.compile([FieldDefinition("x", validation_rules={"regex": r"\d+"})])
+
+
+@pytest.mark.parametrize(
+    ("rule", "expected"),
+    [
+        ({"custom": "validate_prison_calculation", "fields": ["a", "b"]}, "takes 3 fields"),
+        ({"custom": "validate_age_matches", "fields": ["a"]}, "takes 3 fields"),
+        ({"custom": "validate_appeal_hierarchy", "fields": ["a", "b", "c"]}, "takes 2 fields"),
+        ({"custom": "validate_date_sequence"}, "takes at least 2 fields"),
+        ({"function": "validate_sentence", "fields": ["verdict"]}, "takes at least 2 fields"),
+    ],
+)
+def test_cross_field_rule_arity_checked(rule: dict[str, object], expected: str) -> None:
+    """Test a cross-field rule with the wrong number of fields fails at compile time."""
+    with pytest.raises(InvalidValidationRuleError, match=expected):
+        ValidatorProgram.compile([FieldDefinition("x", validation_rules=rule)])
+
+
+def test_prd_cross_field_rules_compile() -> None:
+    """Test rules written like the PRD's CROSS_FIELD_VALIDATION use ``function``."""
+    cross_field_validation = {
+        "age_calculation": {
+            "fields": ["defendant_birth_date", "decision_date", "defendant_age"],
+            "function": "validate_age_matches",
+            "tolerance": 1,
+        },
+        "prison_total": {
+            "fields": [
+                "sentence_prison_years",
+                "sentence_prison_months",
+                "sentence_prison_total_months",
+            ],
+            "function": "validate_prison_calculation",
+        },
+        "court_level_appeal": {
+            "fields": ["court_level", "previous_decision"],
+            "function": "validate_appeal_hierarchy",
+        },
+    }
+    program = ValidatorProgram.compile(
+        [
+            FieldDefinition(
+                "defendant_age",
+                validation_rules=[
+                    {"name": name, **rule} for name, rule in cross_field_validation.items()
+                ],
+            )
+        ]
+    )
+    assert [r.name for r in program.cross_rules] == list(cross_field_validation)
+    assert program.cross_rules[0].params == {"tolerance": 1}
+    report = program.validate(
+        {
+            "defendant_birth_date": "2000-01-01",
+            "decision_date": "2023-06-01",
+            "defendant_age": 60,
+            "sentence_prison_years": 1,
+            "sentence_prison_months": 6,
+            "sentence_prison_total_months": 18,
+            "court_level": "PT",
+            "previous_decision": "PN decision 12/2022",
+        }
+    )
+    assert [i.field_name for i in report.issues] == ["age_calculation"]
+
+
+def test_age_and_appeal_validators() -> None:
+    """Test the age and appeal hierarchy validators."""
+    program = ValidatorProgram.compile(
+        [
+            FieldDefinition(
+                "defendant_age",
+                validation_rules={"custom": "validate_age_matches", "tolerance": 1},
+            ),
+            FieldDefinition(
+                "court_level", validation_rules={"custom": "validate_appeal_hierarchy"}
+            ),
+        ]
+    )
+    age_rule, appeal_rule = program.cross_rules
+    assert validate_age_matches(("1990-05-01", "2023-04-30", 32), age_rule) is True
+    assert validate_age_matches(("1990-05-01", "2023-04-30", 35), age_rule) is False
+    assert validate_age_matches((None, "2023-04-30", 35), age_rule) is None
+    assert validate_appeal_hierarchy(("PT", "PN decision 12/2022"), appeal_rule) is True
+    assert validate_appeal_hierarchy(("PN", "PN decision 12/2022"), appeal_rule) is False
+    assert validate_appeal_hierarchy(("XX", None), appeal_rule) is False
+
+
+def test_engine_caches_by_rule_set_version() -> None:
+    """Test programs are compiled once per source and rule-set version."""
+    engine = ValidationEngine()
+    definitions = _definitions()
+    first = engine.program("ID_SC", definitions)
+    assert engine.program("ID_SC", _definitions()) is first
+    changed = [*definitions[:-1], FieldDefinition("verdict", validation_rules={"enum": ["X"]})]
+    assert engine.program("ID_SC", changed) is not first